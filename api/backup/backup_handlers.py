@@ -8,7 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.session import get_db
 from api.backup.backup_services import BackupService
-from api.backup.backup_pydantic import BackupResponse, RestoreResponse, BackupListResponse
+from api.backup.backup_pydantic import BackupResponse, RestoreResponse, BackupListResponse, ReferenceCacheStats
+from api.reference_cache import reference_cache
 
 backup_router = APIRouter(prefix="/db", tags=["database"])
 
@@ -53,3 +54,9 @@ async def download_backup(filename: str):
         filename=filename,
         media_type="application/json"
     )
+
+
+@backup_router.get("/reference_cache", response_model=ReferenceCacheStats)
+async def get_reference_cache_stats():
+    """Попадания и промахи кэша справочников, размеры загруженных справочников."""
+    return reference_cache.stats()
@@ -24,3 +24,12 @@ class BackupListResponse(TunedModel):
     """Список доступных бэкапов"""
     backups: List[str]
     count: int
+
+
+class ReferenceCacheStats(TunedModel):
+    """Счётчики кэша справочников"""
+    hits: int
+    misses: int
+    reloads: int
+    # Число записей загруженных справочников, None - справочник не загружен
+    tables: Dict[str, int | None]
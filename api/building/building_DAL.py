@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Building
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class BuildingDAL:
@@ -31,13 +32,9 @@ class BuildingDAL:
         return deleted_building
 
     @log_exceptions
-    async def get_all_buildings(self, page: int, limit: int) -> list[Building]:
-        if page == 0:
-            query = select(Building).order_by(Building.building_number.asc())
-        else:
-            query = select(Building).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        return list(result.scalars().all())
+    async def get_all_buildings(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Building)
+        return await fetch_page(self.db_session, query, (Building.building_number,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_building_by_number(self, building_number: int) -> Building | None:
@@ -28,7 +28,7 @@ async def get_building_by_address(address: str, request: Request, db: AsyncSessi
 
 @building_router.get("/search", response_model=ShowBuildingListWithHATEOAS)
 async def get_all_buildings(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await building_service._get_all_buildings(query_param.page, query_param.limit, request, db)
+    return await building_service._get_all_buildings(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @building_router.delete("/delete/{building_number}", response_model=ShowBuildingWithHATEOAS, responses={404: {"description": "Здание не найдено"}})
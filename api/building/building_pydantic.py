@@ -30,3 +30,4 @@ class ShowBuildingWithHATEOAS(TunedModel):
 class ShowBuildingListWithHATEOAS(TunedModel):
     buildings: List[ShowBuildingWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
@@ -2,12 +2,23 @@ from api.building.building_pydantic import *
 from api.services_helpers import ensure_building_exists, ensure_building_unique 
 from api.building.building_DAL import BuildingDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+BUILDING_LINKS = LinkSet(
+    self=Link("get_building_by_number"),
+    update=Link("update_building"),
+    delete=Link("delete_building"),
+    buildings=Link("get_all_buildings"),
+    cabinets=Link("get_cabinets_by_building")
+)
+
 
 class BuildingService:
     async def _create_new_building(self, body: CreateBuilding, request: Request, db) -> ShowBuildingWithHATEOAS:
@@ -23,20 +34,11 @@ class BuildingService:
                         city=body.city,
                         building_address=body.building_address
                     )
-                    building_number = building.building_number
                     building_pydantic = ShowBuilding.model_validate(building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                        "update": f'{api_base_url}/buildings/update',
-                        "delete": f'{api_base_url}/buildings/delete/{building_number}',
-                        "buildings": f'{api_base_url}/buildings',
-                        "cabinets": f'{api_base_url}/cabinets/search/by_building/{building_number}'
-                    }
+                    hateoas_links = BUILDING_LINKS.bind(api_base_url)(building)
 
                     return ShowBuildingWithHATEOAS(building=building_pydantic, links=hateoas_links)
 
@@ -59,17 +61,9 @@ class BuildingService:
                         raise HTTPException(status_code=404, detail=f"Здание с номером: {building_number} не найдено")
                     building_pydantic = ShowBuilding.model_validate(building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                        "update": f'{api_base_url}/buildings/update',
-                        "delete": f'{api_base_url}/buildings/delete/{building_number}',
-                        "buildings": f'{api_base_url}/buildings',
-                        "cabinets": f'{api_base_url}/cabinets/search/by_building/{building_number}'
-                    }
+                    hateoas_links = BUILDING_LINKS.bind(api_base_url)(building)
 
                     return ShowBuildingWithHATEOAS(building=building_pydantic, links=hateoas_links)
 
@@ -88,20 +82,11 @@ class BuildingService:
                     building = await building_dal.get_building_by_address(address)
                     if not building:
                         raise HTTPException(status_code=404, detail=f"Здание по адресу: {address} не найдено")
-                    building_number = building.building_number
                     building_pydantic = ShowBuilding.model_validate(building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                        "update": f'{api_base_url}/buildings/update',
-                        "delete": f'{api_base_url}/buildings/delete/{building_number}',
-                        "buildings": f'{api_base_url}/buildings',
-                        "cabinets": f'{api_base_url}/cabinets/search/by_building/{building_number}'
-                    }
+                    hateoas_links = BUILDING_LINKS.bind(api_base_url)(building)
 
                     return ShowBuildingWithHATEOAS(building=building_pydantic, links=hateoas_links)
 
@@ -112,37 +97,35 @@ class BuildingService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_buildings(self, page: int, limit: int, request: Request, db) -> ShowBuildingListWithHATEOAS:
+    async def _get_all_buildings(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowBuildingListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 building_dal = BuildingDAL(session)
                 try:
-                    buildings = await building_dal.get_all_buildings(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    buildings_with_hateoas = []
-                    for building in buildings:
+                    building_links = BUILDING_LINKS.bind(api_base_url)
+
+                    def to_hateoas(building) -> ShowBuildingWithHATEOAS:
                         building_pydantic = ShowBuilding.model_validate(building, from_attributes=True)
-                        building_number = building.building_number
-                        building_links = {
-                            "self": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                            "update": f'{api_base_url}/buildings/update',
-                            "delete": f'{api_base_url}/buildings/delete/{building_number}',
-                            "buildings": f'{api_base_url}/buildings',
-                            "cabinets": f'{api_base_url}/cabinets/search/by_building/{building_number}'
-                        }
-                        building_with_links = ShowBuildingWithHATEOAS(building=building_pydantic, links=building_links)
-                        buildings_with_hateoas.append(building_with_links)
+                        building_with_links = ShowBuildingWithHATEOAS(building=building_pydantic, links=building_links(building))
+                        return building_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: BuildingDAL(stream_session).get_all_buildings(page, limit, cursor, stream=True), to_hateoas)
+
+                    buildings = await building_dal.get_all_buildings(page, limit, cursor)
+
+                    buildings_with_hateoas = [to_hateoas(building) for building in buildings]
 
                     collection_links = {
-                        "self": f'{api_base_url}/buildings/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/buildings/create'
+                        "self": route_url(api_base_url, "get_all_buildings", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_buildings", query=page_query(None, limit, buildings.next_cursor)) if buildings.next_cursor else None,
+                        "create": route_url(api_base_url, "create_building")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowBuildingListWithHATEOAS(buildings=buildings_with_hateoas, links=collection_links)
+                    return ShowBuildingListWithHATEOAS(buildings=buildings_with_hateoas, links=collection_links, next_cursor=buildings.next_cursor)
 
                 except HTTPException:
                     raise
@@ -165,14 +148,12 @@ class BuildingService:
 
                     building_pydantic = ShowBuilding.model_validate(building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "buildings": f'{api_base_url}/buildings',
-                        "create": f'{api_base_url}/buildings/create',
-                        "cabinets": f'{api_base_url}/cabinets/search/by_building/{building_number}'
+                        "buildings": route_url(api_base_url, "get_all_buildings"),
+                        "create": route_url(api_base_url, "create_building"),
+                        "cabinets": route_url(api_base_url, "get_cabinets_by_building", building_number=building_number)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -206,20 +187,11 @@ class BuildingService:
                     if not building:
                         raise HTTPException(status_code=404, detail=f"Здание с номером: {body.building_number} не найдено")
 
-                    building_number = building.building_number 
                     building_pydantic = ShowBuilding.model_validate(building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                        "update": f'{api_base_url}/buildings/update',
-                        "delete": f'{api_base_url}/buildings/delete/{building_number}',
-                        "buildings": f'{api_base_url}/buildings',
-                        "cabinets": f'{api_base_url}/cabinets/search/by_building/{building_number}'
-                    }
+                    hateoas_links = BUILDING_LINKS.bind(api_base_url)(building)
 
                     return ShowBuildingWithHATEOAS(building=building_pydantic, links=hateoas_links)
 
@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Cabinet
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class CabinetDAL:
@@ -30,25 +31,14 @@ class CabinetDAL:
         return deleted_cabinet
 
     @log_exceptions
-    async def get_all_cabinets(self, page: int, limit: int) -> list[Cabinet]:
-        if page == 0:
-            query = select(Cabinet).order_by(Cabinet.cabinet_number.asc())
-        else:
-            query = select(Cabinet).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        cabinets = list(result.scalars().all())
-        return cabinets
+    async def get_all_cabinets(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Cabinet)
+        return await fetch_page(self.db_session, query, (Cabinet.cabinet_number, Cabinet.building_number), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_cabinets_by_building(self, building_number: int, page: int, limit: int) -> list[Cabinet]:
-        if page == 0:
-            query = select(Cabinet).where(Cabinet.building_number == building_number).order_by(
-                Cabinet.cabinet_number.asc())
-        else:
-            query = select(Cabinet).where(Cabinet.building_number == building_number).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        cabinets = list(result.scalars().all())
-        return cabinets
+    async def get_cabinets_by_building(self, building_number: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Cabinet).where(Cabinet.building_number == building_number)
+        return await fetch_page(self.db_session, query, (Cabinet.cabinet_number, Cabinet.building_number), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_cabinet_by_number_and_building(self, building_number: int, cabinet_number: int) -> Cabinet | None:
@@ -58,6 +48,24 @@ class CabinetDAL:
         cabinet_row = res.scalar_one_or_none()
         return cabinet_row
 
+    @log_exceptions
+    async def get_available_cabinets(self, building_number: int | None = None, min_capacity: int | None = None,
+                                     excluded_states: list[str] | None = None) -> list[Cabinet]:
+        """
+        Cabinets which can be used for sessions: state is not in excluded_states (lowercase),
+        capacity is not less than min_capacity (cabinets with unknown capacity are kept)
+        """
+        query = select(Cabinet)
+        if building_number is not None:
+            query = query.where(Cabinet.building_number == building_number)
+        if min_capacity is not None:
+            query = query.where(or_(Cabinet.capacity.is_(None), Cabinet.capacity >= min_capacity))
+        if excluded_states:
+            query = query.where(or_(Cabinet.cabinet_state.is_(None), func.lower(Cabinet.cabinet_state).not_in(excluded_states)))
+        result = await self.db_session.execute(query)
+        cabinets = list(result.scalars().all())
+        return cabinets
+
     @log_exceptions
     async def update_cabinet(self, search_building_number: int, search_cabinet_number: int, **kwargs) -> Cabinet | None:
         """
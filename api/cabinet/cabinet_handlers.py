@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, status, Request
+from fastapi import APIRouter, Depends, Query, status, Request
+from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 from api.cabinet.cabinet_pydantic import *
@@ -21,14 +22,25 @@ async def get_cabinet_by_number_and_building(building_number: int, cabinet_numbe
     return await cabinet_service._get_cabinet_by_number_and_building(building_number, cabinet_number, request, db)
 
 
+@cabinet_router.get("/free", response_model=ShowFreeCabinetListWithHATEOAS)
+async def get_free_cabinets(request: Request,
+                            session_date: date = Query(..., alias="date"),
+                            session_number: int = Query(..., ge=1),
+                            min_capacity: int | None = Query(None, ge=0, description="Нужное количество мест"),
+                            building_number: int | None = Query(None, alias="building"),
+                            group_name: str | None = Query(None, description="Взять количество мест по размеру группы"),
+                            db: AsyncSession = Depends(get_db)):
+    return await cabinet_service._get_free_cabinets(session_date, session_number, min_capacity, building_number, group_name, request, db)
+
+
 @cabinet_router.get("/search", response_model=ShowCabinetListWithHATEOAS)
 async def get_all_cabinets(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await cabinet_service._get_all_cabinets(query_param.page, query_param.limit, request, db)
+    return await cabinet_service._get_all_cabinets(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @cabinet_router.get("/search/by_building/{building_number}", response_model=ShowCabinetListWithHATEOAS, responses={404: {"description": "Кабинеты не найдены"}})
 async def get_cabinets_by_building(building_number: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await cabinet_service._get_cabinets_by_building(building_number, query_param.page, query_param.limit, request, db)
+    return await cabinet_service._get_cabinets_by_building(building_number, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @cabinet_router.delete("/delete/{building_number}/{cabinet_number}", response_model=ShowCabinetWithHATEOAS, responses={404: {"description": "Кабинет не найден"}})
@@ -34,3 +34,15 @@ class ShowCabinetWithHATEOAS(TunedModel):
 class ShowCabinetListWithHATEOAS(TunedModel):
     cabinets: List[ShowCabinetWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
+
+
+class ShowFreeCabinetWithHATEOAS(TunedModel):
+    cabinet: ShowCabinet
+    spare_seats: int | None = None
+    links: dict[str, str] = {}
+
+
+class ShowFreeCabinetListWithHATEOAS(TunedModel):
+    cabinets: List[ShowFreeCabinetWithHATEOAS]
+    links: dict[str, str] = {}
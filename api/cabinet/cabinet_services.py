@@ -2,13 +2,32 @@ from api.cabinet.cabinet_pydantic import *
 from api.services_helpers import ensure_cabinet_exists, ensure_cabinet_unique, ensure_building_exists
 from api.cabinet.cabinet_DAL import CabinetDAL
 from api.building.building_DAL import BuildingDAL
+from api.group.group_DAL import GroupDAL
+from api.session.session_DAL import SessionDAL
+from api.session.occupancy_index import CABINET
+from api.session.occupancy_loader import get_slots_occupancy
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
+from datetime import date
+
+from config.settings import CABINET_UNAVAILABLE_STATES
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+CABINET_LINKS = LinkSet(
+    self=Link("get_cabinet_by_number_and_building"),
+    update=Link("update_cabinet"),
+    delete=Link("delete_cabinet"),
+    cabinets=Link("get_all_cabinets"),
+    building=Link("get_building_by_number"),
+    sessions=Link("get_sessions_by_cabinet")
+)
+
 
 class CabinetService:
     async def _create_new_cabinet(self, body: CreateCabinet, request: Request, db) -> ShowCabinetWithHATEOAS:
@@ -32,22 +51,11 @@ class CabinetService:
                         capacity=body.capacity,
                         cabinet_state=body.cabinet_state
                     )
-                    cabinet_number = cabinet.cabinet_number
-                    building_number = cabinet.building_number
                     cabinet_pydantic = ShowCabinet.model_validate(cabinet, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/cabinets/search/by_building_and_number/{building_number}/{cabinet_number}',
-                        "update": f'{api_base_url}/cabinets/update',
-                        "delete": f'{api_base_url}/cabinets/delete/{building_number}/{cabinet_number}',
-                        "cabinets": f'{api_base_url}/cabinets',
-                        "building": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                        "sessions": f'{api_base_url}/sessions/search/by_cabinet/{building_number}/{cabinet_number}'
-                    }
+                    hateoas_links = CABINET_LINKS.bind(api_base_url)(cabinet)
 
                     return ShowCabinetWithHATEOAS(cabinet=cabinet_pydantic, links=hateoas_links)
 
@@ -70,18 +78,9 @@ class CabinetService:
                         raise HTTPException(status_code=404, detail=f"Кабинет с номером {cabinet_number} в здании {building_number} не найден")
                     cabinet_pydantic = ShowCabinet.model_validate(cabinet, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/cabinets/search/by_building_and_number/{building_number}/{cabinet_number}',
-                        "update": f'{api_base_url}/cabinets/update',
-                        "delete": f'{api_base_url}/cabinets/delete/{building_number}/{cabinet_number}',
-                        "cabinets": f'{api_base_url}/cabinets',
-                        "building": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                        "sessions": f'{api_base_url}/sessions/search/by_cabinet/{building_number}/{cabinet_number}'
-                    }
+                    hateoas_links = CABINET_LINKS.bind(api_base_url)(cabinet)
 
                     return ShowCabinetWithHATEOAS(cabinet=cabinet_pydantic, links=hateoas_links)
 
@@ -92,39 +91,35 @@ class CabinetService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_cabinets(self, page: int, limit: int, request: Request, db) -> ShowCabinetListWithHATEOAS:
+    async def _get_all_cabinets(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowCabinetListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 cabinet_dal = CabinetDAL(session)
                 try:
-                    cabinets = await cabinet_dal.get_all_cabinets(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    cabinets_with_hateoas = []
-                    for cabinet in cabinets:
+                    cabinet_links = CABINET_LINKS.bind(api_base_url)
+
+                    def to_hateoas(cabinet) -> ShowCabinetWithHATEOAS:
                         cabinet_pydantic = ShowCabinet.model_validate(cabinet, from_attributes=True)
-                        cabinet_number = cabinet.cabinet_number
-                        building_number = cabinet.building_number
-                        cabinet_links = {
-                            "self": f'{api_base_url}/cabinets/search/by_building_and_number/{building_number}/{cabinet_number}',
-                            "update": f'{api_base_url}/cabinets/update',
-                            "delete": f'{api_base_url}/cabinets/delete/{building_number}/{cabinet_number}',
-                            "cabinets": f'{api_base_url}/cabinets',
-                            "building": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                            "sessions": f'{api_base_url}/sessions/search/by_cabinet/{building_number}/{cabinet_number}'
-                        }
-                        cabinet_with_links = ShowCabinetWithHATEOAS(cabinet=cabinet_pydantic, links=cabinet_links)
-                        cabinets_with_hateoas.append(cabinet_with_links)
+                        cabinet_with_links = ShowCabinetWithHATEOAS(cabinet=cabinet_pydantic, links=cabinet_links(cabinet))
+                        return cabinet_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: CabinetDAL(stream_session).get_all_cabinets(page, limit, cursor, stream=True), to_hateoas)
+
+                    cabinets = await cabinet_dal.get_all_cabinets(page, limit, cursor)
+
+                    cabinets_with_hateoas = [to_hateoas(cabinet) for cabinet in cabinets]
 
                     collection_links = {
-                        "self": f'{api_base_url}/cabinets/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/cabinets/create'
+                        "self": route_url(api_base_url, "get_all_cabinets", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_cabinets", query=page_query(None, limit, cabinets.next_cursor)) if cabinets.next_cursor else None,
+                        "create": route_url(api_base_url, "create_cabinet")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowCabinetListWithHATEOAS(cabinets=cabinets_with_hateoas, links=collection_links)
+                    return ShowCabinetListWithHATEOAS(cabinets=cabinets_with_hateoas, links=collection_links, next_cursor=cabinets.next_cursor)
 
                 except HTTPException:
                     raise
@@ -133,7 +128,65 @@ class CabinetService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_cabinets_by_building(self, building_number: int, page: int, limit: int, request: Request, db) -> ShowCabinetListWithHATEOAS:
+    async def _get_free_cabinets(self, session_date: date, session_number: int, min_capacity: int | None,
+                                 building_number: int | None, group_name: str | None, request: Request, db) -> ShowFreeCabinetListWithHATEOAS:
+        """
+        Cabinets without a session in the slot, the best fitting first:
+        the least spare seats for the needed capacity, cabinets with unknown capacity at the end.
+        Busy cabinets are taken from the occupancy index, not from the sessions table
+        """
+        async with db as session:
+            async with session.begin():
+                cabinet_dal = CabinetDAL(session)
+                session_dal = SessionDAL(session)
+                try:
+                    # Needed capacity is the size of the group, if it is not given explicitly
+                    if min_capacity is None and group_name is not None:
+                        group = await GroupDAL(session).get_group_by_name(group_name)
+                        if not group:
+                            raise HTTPException(status_code=404, detail=f"Группа с названием {group_name} не найдена")
+                        min_capacity = group.quantity_students
+
+                    cabinets = await cabinet_dal.get_available_cabinets(building_number, min_capacity, CABINET_UNAVAILABLE_STATES)
+                    occupancy = await get_slots_occupancy(session_dal, [(session_date, session_number)])
+
+                    free_cabinets = []
+                    for cabinet in cabinets:
+                        if not occupancy.is_free(CABINET, (cabinet.building_number, cabinet.cabinet_number), session_date, session_number):
+                            continue
+                        spare_seats = None
+                        if cabinet.capacity is not None:
+                            spare_seats = cabinet.capacity - (min_capacity or 0)
+                        free_cabinets.append((cabinet, spare_seats))
+                    free_cabinets.sort(key=lambda item: (item[1] is None, item[1] or 0,
+                                                         item[0].building_number, item[0].cabinet_number))
+
+                    api_base_url = request_base_url(request)
+
+                    cabinet_links = CABINET_LINKS.bind(api_base_url)
+                    cabinets_with_hateoas = []
+                    for cabinet, spare_seats in free_cabinets:
+                        cabinet_pydantic = ShowCabinet.model_validate(cabinet, from_attributes=True)
+                        cabinets_with_hateoas.append(ShowFreeCabinetWithHATEOAS(cabinet=cabinet_pydantic,
+                                                                                spare_seats=spare_seats,
+                                                                                links=cabinet_links(cabinet)))
+
+                    collection_links = {
+                        "self": route_url(api_base_url, "get_free_cabinets", query=f"date={session_date}&session_number={session_number}"),
+                        "cabinets": route_url(api_base_url, "get_all_cabinets"),
+                        "sessions": route_url(api_base_url, "get_sessions_by_date", session_date=session_date)
+                    }
+
+                    return ShowFreeCabinetListWithHATEOAS(cabinets=cabinets_with_hateoas, links=collection_links)
+
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Поиск свободных кабинетов отменён (Ошибка: {e})")
+                    raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
+
+
+    async def _get_cabinets_by_building(self, building_number: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowCabinetListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 building_dal = BuildingDAL(session)
@@ -144,34 +197,31 @@ class CabinetService:
                         raise HTTPException(status_code=404,
                                             detail=f"Здание с номером {building_number} не найдено")
 
-                    cabinets = await cabinet_dal.get_cabinets_by_building(building_number, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    cabinets_with_hateoas = []
-                    for cabinet in cabinets:
+                    cabinet_links = CABINET_LINKS.bind(api_base_url)
+
+                    def to_hateoas(cabinet) -> ShowCabinetWithHATEOAS:
                         cabinet_pydantic = ShowCabinet.model_validate(cabinet, from_attributes=True)
-                        cabinet_number = cabinet.cabinet_number
-                        cabinet_links = {
-                            "self": f'{api_base_url}/cabinets/search/by_building_and_number/{building_number}/{cabinet_number}',
-                            "update": f'{api_base_url}/cabinets/update',
-                            "delete": f'{api_base_url}/cabinets/delete/{building_number}/{cabinet_number}',
-                            "cabinets": f'{api_base_url}/cabinets',
-                            "building": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                            "sessions": f'{api_base_url}/sessions/search/by_cabinet/{building_number}/{cabinet_number}'
-                        }
-                        cabinet_with_links = ShowCabinetWithHATEOAS(cabinet=cabinet_pydantic, links=cabinet_links)
-                        cabinets_with_hateoas.append(cabinet_with_links)
+                        cabinet_with_links = ShowCabinetWithHATEOAS(cabinet=cabinet_pydantic, links=cabinet_links(cabinet))
+                        return cabinet_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: CabinetDAL(stream_session).get_cabinets_by_building(building_number, page, limit, cursor, stream=True), to_hateoas)
+
+                    cabinets = await cabinet_dal.get_cabinets_by_building(building_number, page, limit, cursor)
+
+                    cabinets_with_hateoas = [to_hateoas(cabinet) for cabinet in cabinets]
 
                     collection_links = {
-                        "self": f'{api_base_url}/cabinets/search/by_building/{building_number}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/cabinets/create',
-                        "building": f'{api_base_url}/buildings/search/by_number/{building_number}'
+                        "self": route_url(api_base_url, "get_cabinets_by_building", query=page_query(page, limit, cursor), building_number=building_number),
+                        "next": route_url(api_base_url, "get_cabinets_by_building", query=page_query(None, limit, cabinets.next_cursor), building_number=building_number) if cabinets.next_cursor else None,
+                        "create": route_url(api_base_url, "create_cabinet"),
+                        "building": route_url(api_base_url, "get_building_by_number", building_number=building_number)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowCabinetListWithHATEOAS(cabinets=cabinets_with_hateoas, links=collection_links)
+                    return ShowCabinetListWithHATEOAS(cabinets=cabinets_with_hateoas, links=collection_links, next_cursor=cabinets.next_cursor)
 
                 except HTTPException:
                     raise
@@ -191,14 +241,12 @@ class CabinetService:
 
                     cabinet_pydantic = ShowCabinet.model_validate(cabinet, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "cabinets": f'{api_base_url}/cabinets',
-                        "create": f'{api_base_url}/cabinets/create',
-                        "building": f'{api_base_url}/buildings/search/by_number/{building_number}'
+                        "cabinets": route_url(api_base_url, "get_all_cabinets"),
+                        "create": route_url(api_base_url, "create_cabinet"),
+                        "building": route_url(api_base_url, "get_building_by_number", building_number=building_number)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -251,22 +299,11 @@ class CabinetService:
                     if not cabinet:
                         raise HTTPException(status_code=404, detail="Кабинет не был обновлён")
 
-                    cabinet_number = cabinet.cabinet_number
-                    building_number = cabinet.building_number
                     cabinet_pydantic = ShowCabinet.model_validate(cabinet, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/cabinets/search/by_building_and_number/{building_number}/{cabinet_number}',
-                        "update": f'{api_base_url}/cabinets/update',
-                        "delete": f'{api_base_url}/cabinets/delete/{building_number}/{cabinet_number}',
-                        "cabinets": f'{api_base_url}/cabinets',
-                        "building": f'{api_base_url}/buildings/search/by_number/{building_number}',
-                        "sessions": f'{api_base_url}/sessions/search/by_cabinet/{building_number}/{cabinet_number}'
-                    }
+                    hateoas_links = CABINET_LINKS.bind(api_base_url)(cabinet)
 
                     return ShowCabinetWithHATEOAS(cabinet=cabinet_pydantic, links=hateoas_links)
 
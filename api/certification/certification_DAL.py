@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Certification
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class CertificationDAL:
@@ -34,6 +35,17 @@ class CertificationDAL:
         await self.db_session.flush()
         return new_certification
 
+    @log_exceptions
+    async def create_certifications(self, certifications_data: list[dict]) -> None:
+        """
+        Insert many rows with one statement.
+        certifications_data - list of dicts with keys: id (of the hours row), credit, differentiated_credit,
+        course_project, course_work, control_work, other_form
+        """
+        if not certifications_data:
+            return
+        await self.db_session.execute(insert(Certification), certifications_data)
+
     @log_exceptions
     async def delete_certification(self, id: int) -> Certification | None:
         query = delete(Certification).where(Certification.id == id).returning(Certification)
@@ -42,14 +54,9 @@ class CertificationDAL:
         return deleted_certification
 
     @log_exceptions
-    async def get_all_certifications(self, page: int, limit: int) -> list[Certification]:
-        if page == 0:
-            query = select(Certification).order_by(Certification.id.asc())
-        else:
-            query = select(Certification).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        certifications = list(result.scalars().all())
-        return certifications
+    async def get_all_certifications(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Certification)
+        return await fetch_page(self.db_session, query, (Certification.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_certification_by_id(self, id: int) -> Certification | None:
@@ -59,14 +66,9 @@ class CertificationDAL:
         return certification_row
     
     @log_exceptions
-    async def get_certifications_by_ids(self, ids: list[int], page: int, limit: int) -> list[Certification]:
+    async def get_certifications_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
         query = select(Certification).where(Certification.id.in_(ids))
-        if page > 0:
-            offset_value = (page - 1) * limit
-            query = query.offset(offset_value).limit(limit)
-        result = await self.db_session.execute(query)
-        certifications = list(result.scalars().all())
-        return certifications if certifications is not None else []
+        return await fetch_page(self.db_session, query, (Certification.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_certification(self, target_id: int, **kwargs) -> Certification | None:
@@ -23,12 +23,12 @@ async def get_certification_by_id(certification_id: int, request: Request, db: A
 
 @certification_router.get("/search/by_ids", response_model=ShowCertificationListWithHATEOAS, responses={404: {"description": "Сертификации не найдены"}})
 async def get_certifications_by_ids(query_param: Annotated[QueryParams, Depends()], request: Request, ids: list[int] = Query(...), db: AsyncSession = Depends(get_db)):
-    return await certification_service._get_certifications_by_ids(ids, query_param.page, query_param.limit, request, db)
+    return await certification_service._get_certifications_by_ids(ids, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @certification_router.get("/search", response_model=ShowCertificationListWithHATEOAS)
 async def get_all_certifications(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await certification_service._get_all_certifications(query_param.page, query_param.limit, request, db)
+    return await certification_service._get_all_certifications(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @certification_router.delete("/delete/{certification_id}", response_model=ShowCertificationWithHATEOAS, responses={404: {"description": "Сертификация не найдена"}})
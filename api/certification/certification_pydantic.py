@@ -41,4 +41,5 @@ class ShowCertificationWithHATEOAS(TunedModel):
 class ShowCertificationListWithHATEOAS(TunedModel):
     certifications: List[ShowCertificationWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
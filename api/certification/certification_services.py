@@ -3,12 +3,23 @@ from api.services_helpers import ensure_certification_exists, ensure_subject_in_
 from api.certification.certification_DAL import CertificationDAL
 from api.subject_in_cycle_hours.subject_in_cycle_hours_DAL import SubjectsInCycleHoursDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+CERTIFICATION_LINKS = LinkSet(
+    self=Link("get_certification_by_id", certification_id="id"),
+    update=Link("update_certification"),
+    delete=Link("delete_certification", certification_id="id"),
+    certifications=Link("get_all_certifications"),
+    subjects_in_cycle_hours=Link("get_subject_in_cycle_hours_by_id", hours_id="id")
+)
+
 
 class CertificationService:
     async def _create_new_certification(self, body: CreateCertification, request: Request, db) -> ShowCertificationWithHATEOAS:
@@ -29,20 +40,11 @@ class CertificationService:
                         control_work=body.control_work,
                         other_form=body.other_form
                     )
-                    certification_id = certification.id
                     certification_pydantic = ShowCertification.model_validate(certification, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/certifications/search/by_id/{certification_id}',
-                        "update": f'{api_base_url}/certifications/update',
-                        "delete": f'{api_base_url}/certifications/delete/{certification_id}',
-                        "certifications": f'{api_base_url}/certifications',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{certification_id}'
-                    }
+                    hateoas_links = CERTIFICATION_LINKS.bind(api_base_url)(certification)
 
                     return ShowCertificationWithHATEOAS(certification=certification_pydantic, links=hateoas_links)
 
@@ -65,17 +67,9 @@ class CertificationService:
                         raise HTTPException(status_code=404, detail=f"Сертификация с id {certification_id} не найдена")
                     certification_pydantic = ShowCertification.model_validate(certification, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/certifications/search/by_id/{certification_id}',
-                        "update": f'{api_base_url}/certifications/update',
-                        "delete": f'{api_base_url}/certifications/delete/{certification_id}',
-                        "certifications": f'{api_base_url}/certifications',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{certification_id}'
-                    }
+                    hateoas_links = CERTIFICATION_LINKS.bind(api_base_url)(certification)
 
                     return ShowCertificationWithHATEOAS(certification=certification_pydantic, links=hateoas_links)
 
@@ -86,40 +80,37 @@ class CertificationService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_certifications(self, page: int, limit: int, request: Request, db) -> ShowCertificationListWithHATEOAS:
+    async def _get_all_certifications(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowCertificationListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 certification_dal = CertificationDAL(session)
                 try:
-                    certifications = await certification_dal.get_all_certifications(page, limit)
-                    if certifications is None:
-                        certifications = []
+                    api_base_url = request_base_url(request)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    certification_links = CERTIFICATION_LINKS.bind(api_base_url)
 
-                    certifications_with_hateoas = []
-                    for certification in certifications:
+                    def to_hateoas(certification) -> ShowCertificationWithHATEOAS:
                         certification_pydantic = ShowCertification.model_validate(certification, from_attributes=True)
-                        certification_id = certification.id
-                        certification_links = {
-                            "self": f'{api_base_url}/certifications/search/by_id/{certification_id}',
-                            "update": f'{api_base_url}/certifications/update',
-                            "delete": f'{api_base_url}/certifications/delete/{certification_id}',
-                            "certifications": f'{api_base_url}/certifications',
-                            "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{certification_id}'
-                        }
-                        certification_with_links = ShowCertificationWithHATEOAS(certification=certification_pydantic, links=certification_links)
-                        certifications_with_hateoas.append(certification_with_links)
+                        certification_with_links = ShowCertificationWithHATEOAS(certification=certification_pydantic, links=certification_links(certification))
+                        return certification_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: CertificationDAL(stream_session).get_all_certifications(page, limit, cursor, stream=True), to_hateoas)
+
+                    certifications = await certification_dal.get_all_certifications(page, limit, cursor)
+                    if certifications is None:
+                        certifications = []
+
+                    certifications_with_hateoas = [to_hateoas(certification) for certification in certifications]
 
                     collection_links = {
-                        "self": f'{api_base_url}/certifications/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/certifications/create'
+                        "self": route_url(api_base_url, "get_all_certifications", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_certifications", query=page_query(None, limit, certifications.next_cursor)) if certifications.next_cursor else None,
+                        "create": route_url(api_base_url, "create_certification")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowCertificationListWithHATEOAS(certifications=certifications_with_hateoas, links=collection_links)
+                    return ShowCertificationListWithHATEOAS(certifications=certifications_with_hateoas, links=collection_links, next_cursor=certifications.next_cursor)
 
                 except HTTPException:
                     raise
@@ -128,34 +119,34 @@ class CertificationService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
                 
                 
-    async def _get_certifications_by_ids(self, ids: list[int], page: int, limit: int, request: Request, db) -> ShowCertificationListWithHATEOAS:
+    async def _get_certifications_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None, request: Request, db) -> ShowCertificationListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 certification_dal = CertificationDAL(session)
                 try:
-                    certifications_list = await certification_dal.get_certifications_by_ids(ids, page, limit)
+                    api_base_url = request_base_url(request)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    certification_links = CERTIFICATION_LINKS.bind(api_base_url)
 
-                    certifications_with_hateoas = []
-                    for certification in certifications_list:
+                    def to_hateoas(certification) -> ShowCertificationWithHATEOAS:
                         certification_pydantic = ShowCertification.model_validate(certification, from_attributes=True)
-                        certification_id = certification.id
-                        certification_links = {
-                            "self": f'{api_base_url}/certifications/search/by_id/{certification_id}',
-                            "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{certification_id}', 
-                        }
-                        certification_with_links = ShowCertificationWithHATEOAS(certification=certification_pydantic, links=certification_links)
-                        certifications_with_hateoas.append(certification_with_links)
+                        certification_with_links = ShowCertificationWithHATEOAS(certification=certification_pydantic, links=certification_links(certification))
+                        return certification_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: CertificationDAL(stream_session).get_certifications_by_ids(ids, page, limit, cursor, stream=True), to_hateoas)
+
+                    certifications_list = await certification_dal.get_certifications_by_ids(ids, page, limit, cursor)
+
+                    certifications_with_hateoas = [to_hateoas(certification) for certification in certifications_list]
 
                     collection_links = {
-                        "self": f'{api_base_url}/certifications/search/by_ids?page={page}&limit={limit}&ids={",".join(map(str, ids))}',
+                        "self": route_url(api_base_url, "get_certifications_by_ids", query=f'{page_query(page, limit, cursor)}&ids={",".join(map(str, ids))}'),
+                        "next": route_url(api_base_url, "get_certifications_by_ids", query=f'{page_query(None, limit, certifications_list.next_cursor)}&ids={",".join(map(str, ids))}') if certifications_list.next_cursor else None,
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowCertificationListWithHATEOAS(certifications=certifications_with_hateoas, links=collection_links)
+                    return ShowCertificationListWithHATEOAS(certifications=certifications_with_hateoas, links=collection_links, next_cursor=certifications_list.next_cursor)
 
                 except HTTPException:
                     raise
@@ -180,14 +171,12 @@ class CertificationService:
 
                     certification_pydantic = ShowCertification.model_validate(certification, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "certifications": f'{api_base_url}/certifications',
-                        "create": f'{api_base_url}/certifications/create',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{certification_id}'
+                        "certifications": route_url(api_base_url, "get_all_certifications"),
+                        "create": route_url(api_base_url, "create_certification"),
+                        "subjects_in_cycle_hours": route_url(api_base_url, "get_subject_in_cycle_hours_by_id", hours_id=certification_id)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -217,20 +206,11 @@ class CertificationService:
                     if not certification:
                         raise HTTPException(status_code=404, detail=f"Сертификация с id {body.certification_id} не найдена")
 
-                    certification_id = certification.id
                     certification_pydantic = ShowCertification.model_validate(certification, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/certifications/search/by_id/{certification_id}',
-                        "update": f'{api_base_url}/certifications/update',
-                        "delete": f'{api_base_url}/certifications/delete/{certification_id}',
-                        "certifications": f'{api_base_url}/certifications',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{certification_id}'
-                    }
+                    hateoas_links = CERTIFICATION_LINKS.bind(api_base_url)(certification)
 
                     return ShowCertificationWithHATEOAS(certification=certification_pydantic, links=hateoas_links)
 
@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Chapter
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class ChapterDAL:
@@ -21,6 +22,18 @@ class ChapterDAL:
         await self.db_session.flush()
         return new_chapter
 
+    @log_exceptions
+    async def create_chapters(self, chapters_data: list[dict]) -> list[int]:
+        """
+        Insert many rows with one statement, returns the ids in the order of the data.
+        chapters_data - list of dicts with keys: code, name, plan_id
+        """
+        if not chapters_data:
+            return []
+        query = insert(Chapter).returning(Chapter.id, sort_by_parameter_order=True)
+        result = await self.db_session.scalars(query, chapters_data)
+        return list(result.all())
+
     @log_exceptions
     async def delete_chapter(self, id: int) -> Chapter | None:
         query = delete(Chapter).where(Chapter.id == id).returning(Chapter)
@@ -29,14 +42,9 @@ class ChapterDAL:
         return deleted_chapter
 
     @log_exceptions
-    async def get_all_chapters(self, page: int, limit: int) -> list[Chapter]:
-        if page == 0:
-            query = select(Chapter).order_by(Chapter.id.asc())
-        else:
-            query = select(Chapter).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        chapters = list(result.scalars().all())
-        return chapters
+    async def get_all_chapters(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Chapter)
+        return await fetch_page(self.db_session, query, (Chapter.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_chapter_by_id(self, id: int) -> Chapter | None:
@@ -46,14 +54,9 @@ class ChapterDAL:
         return chapter_row
 
     @log_exceptions
-    async def get_chapters_by_plan(self, plan_id: int, page: int, limit: int) -> list[Chapter]:
-        if page == 0:
-            query = select(Chapter).where(Chapter.plan_id == plan_id).order_by(Chapter.id.asc())
-        else:
-            query = select(Chapter).where(Chapter.plan_id == plan_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        chapters = list(result.scalars().all())
-        return chapters
+    async def get_chapters_by_plan(self, plan_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Chapter).where(Chapter.plan_id == plan_id)
+        return await fetch_page(self.db_session, query, (Chapter.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_chapter(self, target_id: int, **kwargs) -> Chapter | None:
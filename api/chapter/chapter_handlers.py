@@ -23,12 +23,12 @@ async def get_chapter_by_id(chapter_id: int, request: Request, db: AsyncSession
 
 @chapter_router.get("/search/by_plan/{plan_id}", response_model=ShowChapterListWithHATEOAS, responses={404: {"description": "Главы не найдены"}})
 async def get_chapters_by_plan(plan_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await chapter_service._get_chapters_by_plan(plan_id, query_param.page, query_param.limit, request, db)
+    return await chapter_service._get_chapters_by_plan(plan_id, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @chapter_router.get("/search", response_model=ShowChapterListWithHATEOAS)
 async def get_all_chapters(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await chapter_service._get_all_chapters(query_param.page, query_param.limit, request, db)
+    return await chapter_service._get_all_chapters(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @chapter_router.delete("/delete/{chapter_id}", response_model=ShowChapterWithHATEOAS, responses={404: {"description": "Раздел не найден"}})
@@ -31,4 +31,5 @@ class ShowChapterWithHATEOAS(TunedModel):
 class ShowChapterListWithHATEOAS(TunedModel):
     chapters: List[ShowChapterWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
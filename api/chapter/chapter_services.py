@@ -3,12 +3,24 @@ from api.services_helpers import ensure_chapter_exists, ensure_plan_exists
 from api.chapter.chapter_DAL import ChapterDAL
 from api.plan.plan_DAL import PlanDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+CHAPTER_LINKS = LinkSet(
+    self=Link("get_chapter_by_id", chapter_id="id"),
+    update=Link("update_chapter"),
+    delete=Link("delete_chapter", chapter_id="id"),
+    chapters=Link("get_all_chapters"),
+    plan=Link("get_plan_by_id"),
+    cycles=Link("get_cycles_by_chapter", chapter_in_plan_id="id")
+)
+
 
 class ChapterService:
     async def _create_new_chapter(self, body: CreateChapter, request: Request, db) -> ShowChapterWithHATEOAS:
@@ -25,21 +37,11 @@ class ChapterService:
                         name=body.name,
                         plan_id=body.plan_id
                     )
-                    chapter_id = chapter.id
                     chapter_pydantic = ShowChapter.model_validate(chapter, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/chapters/search/by_id/{chapter_id}',
-                        "update": f'{api_base_url}/chapters/update',
-                        "delete": f'{api_base_url}/chapters/delete/{chapter_id}',
-                        "chapters": f'{api_base_url}/chapters',
-                        "plan": f'{api_base_url}/plans/search/by_id/{body.plan_id}',
-                        "cycles": f'{api_base_url}/cycles/search/by_chapter/{chapter_id}'
-                    }
+                    hateoas_links = CHAPTER_LINKS.bind(api_base_url)(chapter)
 
                     return ShowChapterWithHATEOAS(chapter=chapter_pydantic, links=hateoas_links)
 
@@ -62,18 +64,9 @@ class ChapterService:
                         raise HTTPException(status_code=404, detail=f"Раздел с id {chapter_id} не найден")
                     chapter_pydantic = ShowChapter.model_validate(chapter, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/chapters/search/by_id/{chapter_id}',
-                        "update": f'{api_base_url}/chapters/update',
-                        "delete": f'{api_base_url}/chapters/delete/{chapter_id}',
-                        "chapters": f'{api_base_url}/chapters',
-                        "plan": f'{api_base_url}/plans/search/by_id/{chapter.plan_id}',
-                        "cycles": f'{api_base_url}/cycles/search/by_chapter/{chapter_id}'
-                    }
+                    hateoas_links = CHAPTER_LINKS.bind(api_base_url)(chapter)
 
                     return ShowChapterWithHATEOAS(chapter=chapter_pydantic, links=hateoas_links)
 
@@ -84,7 +77,7 @@ class ChapterService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_chapters_by_plan(self, plan_id: int, page: int, limit: int, request: Request, db) -> ShowChapterListWithHATEOAS:
+    async def _get_chapters_by_plan(self, plan_id: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowChapterListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 plan_dal = PlanDAL(session)
@@ -93,34 +86,31 @@ class ChapterService:
                     if not await ensure_plan_exists(plan_dal, plan_id):
                         raise HTTPException(status_code=404, detail=f"Учебный план с id {plan_id} не найден")
 
-                    chapters = await chapter_dal.get_chapters_by_plan(plan_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    chapter_links = CHAPTER_LINKS.bind(api_base_url)
 
-                    chapters_with_hateoas = []
-                    for chapter in chapters:
+                    def to_hateoas(chapter) -> ShowChapterWithHATEOAS:
                         chapter_pydantic = ShowChapter.model_validate(chapter, from_attributes=True)
-                        chapter_id = chapter.id
-                        chapter_links = {
-                            "self": f'{api_base_url}/chapters/search/by_id/{chapter_id}',
-                            "update": f'{api_base_url}/chapters/update',
-                            "delete": f'{api_base_url}/chapters/delete/{chapter_id}',
-                            "chapters": f'{api_base_url}/chapters',
-                            "plan": f'{api_base_url}/plans/search/by_id/{plan_id}',
-                            "cycles": f'{api_base_url}/cycles/search/by_chapter/{chapter_id}'
-                        }
-                        chapter_with_links = ShowChapterWithHATEOAS(chapter=chapter_pydantic, links=chapter_links)
-                        chapters_with_hateoas.append(chapter_with_links)
+                        chapter_with_links = ShowChapterWithHATEOAS(chapter=chapter_pydantic, links=chapter_links(chapter))
+                        return chapter_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: ChapterDAL(stream_session).get_chapters_by_plan(plan_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    chapters = await chapter_dal.get_chapters_by_plan(plan_id, page, limit, cursor)
+
+                    chapters_with_hateoas = [to_hateoas(chapter) for chapter in chapters]
 
                     collection_links = {
-                        "self": f'{api_base_url}/chapters/search/by_plan/{plan_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/chapters/create',
-                        "plan": f'{api_base_url}/plans/search/by_id/{plan_id}'
+                        "self": route_url(api_base_url, "get_chapters_by_plan", query=page_query(page, limit, cursor), plan_id=plan_id),
+                        "next": route_url(api_base_url, "get_chapters_by_plan", query=page_query(None, limit, chapters.next_cursor), plan_id=plan_id) if chapters.next_cursor else None,
+                        "create": route_url(api_base_url, "create_chapter"),
+                        "plan": route_url(api_base_url, "get_plan_by_id", plan_id=plan_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowChapterListWithHATEOAS(chapters=chapters_with_hateoas, links=collection_links)
+                    return ShowChapterListWithHATEOAS(chapters=chapters_with_hateoas, links=collection_links, next_cursor=chapters.next_cursor)
 
                 except HTTPException:
                     raise
@@ -129,38 +119,35 @@ class ChapterService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_chapters(self, page: int, limit: int, request: Request, db) -> ShowChapterListWithHATEOAS:
+    async def _get_all_chapters(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowChapterListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 chapter_dal = ChapterDAL(session)
                 try:
-                    chapters = await chapter_dal.get_all_chapters(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    chapter_links = CHAPTER_LINKS.bind(api_base_url)
 
-                    chapters_with_hateoas = []
-                    for chapter in chapters:
+                    def to_hateoas(chapter) -> ShowChapterWithHATEOAS:
                         chapter_pydantic = ShowChapter.model_validate(chapter, from_attributes=True)
-                        chapter_id = chapter.id
-                        chapter_links = {
-                            "self": f'{api_base_url}/chapters/search/by_id/{chapter_id}',
-                            "update": f'{api_base_url}/chapters/update',
-                            "delete": f'{api_base_url}/chapters/delete/{chapter_id}',
-                            "chapters": f'{api_base_url}/chapters',
-                            "plan": f'{api_base_url}/plans/search/by_id/{chapter.plan_id}',
-                            "cycles": f'{api_base_url}/cycles/search/by_chapter/{chapter_id}'
-                        }
-                        chapter_with_links = ShowChapterWithHATEOAS(chapter=chapter_pydantic, links=chapter_links)
-                        chapters_with_hateoas.append(chapter_with_links)
+                        chapter_with_links = ShowChapterWithHATEOAS(chapter=chapter_pydantic, links=chapter_links(chapter))
+                        return chapter_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: ChapterDAL(stream_session).get_all_chapters(page, limit, cursor, stream=True), to_hateoas)
+
+                    chapters = await chapter_dal.get_all_chapters(page, limit, cursor)
+
+                    chapters_with_hateoas = [to_hateoas(chapter) for chapter in chapters]
 
                     collection_links = {
-                        "self": f'{api_base_url}/chapters/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/chapters/create'
+                        "self": route_url(api_base_url, "get_all_chapters", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_chapters", query=page_query(None, limit, chapters.next_cursor)) if chapters.next_cursor else None,
+                        "create": route_url(api_base_url, "create_chapter")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowChapterListWithHATEOAS(chapters=chapters_with_hateoas, links=collection_links)
+                    return ShowChapterListWithHATEOAS(chapters=chapters_with_hateoas, links=collection_links, next_cursor=chapters.next_cursor)
 
                 except HTTPException:
                     raise
@@ -183,14 +170,12 @@ class ChapterService:
 
                     chapter_pydantic = ShowChapter.model_validate(chapter, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "chapters": f'{api_base_url}/chapters',
-                        "create": f'{api_base_url}/chapters/create',
-                        "plan": f'{api_base_url}/plans/search/by_id/{chapter.plan_id}'
+                        "chapters": route_url(api_base_url, "get_all_chapters"),
+                        "create": route_url(api_base_url, "create_chapter"),
+                        "plan": route_url(api_base_url, "get_plan_by_id", plan_id=chapter.plan_id)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -225,21 +210,11 @@ class ChapterService:
                     if not chapter:
                         raise HTTPException(status_code=404, detail=f"Раздел с id {body.chapter_id} не найден")
 
-                    chapter_id = chapter.id
                     chapter_pydantic = ShowChapter.model_validate(chapter, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/chapters/search/by_id/{chapter_id}',
-                        "update": f'{api_base_url}/chapters/update',
-                        "delete": f'{api_base_url}/chapters/delete/{chapter_id}',
-                        "chapters": f'{api_base_url}/chapters',
-                        "plan": f'{api_base_url}/plans/search/by_id/{chapter.plan_id}',
-                        "cycles": f'{api_base_url}/cycles/search/by_chapter/{chapter_id}'
-                    }
+                    hateoas_links = CHAPTER_LINKS.bind(api_base_url)(chapter)
 
                     return ShowChapterWithHATEOAS(chapter=chapter_pydantic, links=hateoas_links)
 
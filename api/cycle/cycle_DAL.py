@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Cycle
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class CycleDAL:
@@ -22,6 +23,18 @@ class CycleDAL:
         await self.db_session.flush()
         return new_cycle
 
+    @log_exceptions
+    async def create_cycles(self, cycles_data: list[dict]) -> list[int]:
+        """
+        Insert many rows with one statement, returns the ids in the order of the data.
+        cycles_data - list of dicts with keys: contains_modules, code, name, chapter_in_plan_id
+        """
+        if not cycles_data:
+            return []
+        query = insert(Cycle).returning(Cycle.id, sort_by_parameter_order=True)
+        result = await self.db_session.scalars(query, cycles_data)
+        return list(result.all())
+
     @log_exceptions
     async def delete_cycle(self, id: int) -> Cycle | None:
         query = delete(Cycle).where(Cycle.id == id).returning(Cycle)
@@ -30,14 +43,9 @@ class CycleDAL:
         return deleted_cycle
 
     @log_exceptions
-    async def get_all_cycles(self, page: int, limit: int) -> list[Cycle]:
-        if page == 0:
-            query = select(Cycle).order_by(Cycle.id.asc())
-        else:
-            query = select(Cycle).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        cycles = list(result.scalars().all())
-        return cycles
+    async def get_all_cycles(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Cycle)
+        return await fetch_page(self.db_session, query, (Cycle.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_cycle_by_id(self, id: int) -> Cycle | None:
@@ -47,14 +55,9 @@ class CycleDAL:
         return cycle_row
 
     @log_exceptions
-    async def get_cycles_by_chapter(self, chapter_in_plan_id: int, page: int, limit: int) -> list[Cycle]:
-        if page == 0:
-            query = select(Cycle).where(Cycle.chapter_in_plan_id == chapter_in_plan_id).order_by(Cycle.id.asc())
-        else:
-            query = select(Cycle).where(Cycle.chapter_in_plan_id == chapter_in_plan_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        cycles = list(result.scalars().all())
-        return cycles
+    async def get_cycles_by_chapter(self, chapter_in_plan_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Cycle).where(Cycle.chapter_in_plan_id == chapter_in_plan_id)
+        return await fetch_page(self.db_session, query, (Cycle.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_cycle(self, target_id: int, **kwargs) -> Cycle | None:
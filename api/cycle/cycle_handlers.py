@@ -23,12 +23,12 @@ async def get_cycle_by_id(cycle_id: int, request: Request, db: AsyncSession = De
 
 @cycle_router.get("/search/by_chapter/{chapter_in_plan_id}", response_model=ShowCycleListWithHATEOAS, responses={404: {"description": "Циклы не найдены"}})
 async def get_cycles_by_chapter(chapter_in_plan_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await cycle_service._get_cycles_by_chapter(chapter_in_plan_id, query_param.page, query_param.limit, request, db)
+    return await cycle_service._get_cycles_by_chapter(chapter_in_plan_id, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @cycle_router.get("/search", response_model=ShowCycleListWithHATEOAS)
 async def get_all_cycles(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await cycle_service._get_all_cycles(query_param.page, query_param.limit, request, db)
+    return await cycle_service._get_all_cycles(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @cycle_router.delete("/delete/{cycle_id}", response_model=ShowCycleWithHATEOAS, responses={404: {"description": "Цикл не найден"}})
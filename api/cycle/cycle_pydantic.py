@@ -34,4 +34,5 @@ class ShowCycleWithHATEOAS(TunedModel):
 class ShowCycleListWithHATEOAS(TunedModel):
     cycles: List[ShowCycleWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
@@ -3,12 +3,25 @@ from api.services_helpers import ensure_chapter_exists, ensure_cycle_exists
 from api.cycle.cycle_DAL import CycleDAL
 from api.chapter.chapter_DAL import ChapterDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+CYCLE_LINKS = LinkSet(
+    self=Link("get_cycle_by_id", cycle_id="id"),
+    update=Link("update_cycle"),
+    delete=Link("delete_cycle", cycle_id="id"),
+    cycles=Link("get_all_cycles"),
+    chapter=Link("get_chapter_by_id", chapter_id="chapter_in_plan_id"),
+    modules=Link("get_modules_by_cycle", cycle_in_chapter_id="id"),
+    subjects_in_cycle=Link("get_subjects_in_cycle_by_cycle", cycle_in_chapter_id="id")
+)
+
 
 class CycleService:
     async def _create_new_cycle(self, body: CreateCycle, request: Request, db) -> ShowCycleWithHATEOAS:
@@ -26,22 +39,11 @@ class CycleService:
                         name=body.name,
                         chapter_in_plan_id=body.chapter_in_plan_id
                     )
-                    cycle_id = cycle.id 
                     cycle_pydantic = ShowCycle.model_validate(cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/cycles/search/by_id/{cycle_id}',
-                        "update": f'{api_base_url}/cycles/update',
-                        "delete": f'{api_base_url}/cycles/delete/{cycle_id}',
-                        "cycles": f'{api_base_url}/cycles',
-                        "chapter": f'{api_base_url}/chapters/search/by_id/{body.chapter_in_plan_id}',
-                        "modules": f'{api_base_url}/modules/search/by_cycle/{cycle_id}',
-                        "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_cycle/{cycle_id}'
-                    }
+                    hateoas_links = CYCLE_LINKS.bind(api_base_url)(cycle)
 
                     return ShowCycleWithHATEOAS(cycle=cycle_pydantic, links=hateoas_links)
 
@@ -64,19 +66,9 @@ class CycleService:
                         raise HTTPException(status_code=404, detail=f"Цикл с id {cycle_id} не найден")
                     cycle_pydantic = ShowCycle.model_validate(cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/cycles/search/by_id/{cycle_id}',
-                        "update": f'{api_base_url}/cycles/update',
-                        "delete": f'{api_base_url}/cycles/delete/{cycle_id}',
-                        "cycles": f'{api_base_url}/cycles',
-                        "chapter": f'{api_base_url}/chapters/search/by_id/{cycle.chapter_in_plan_id}',
-                        "modules": f'{api_base_url}/modules/search/by_cycle/{cycle_id}',
-                        "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_cycle/{cycle_id}'
-                    }
+                    hateoas_links = CYCLE_LINKS.bind(api_base_url)(cycle)
 
                     return ShowCycleWithHATEOAS(cycle=cycle_pydantic, links=hateoas_links)
 
@@ -87,7 +79,7 @@ class CycleService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_cycles_by_chapter(self, chapter_in_plan_id: int, page: int, limit: int, request: Request, db) -> ShowCycleListWithHATEOAS:
+    async def _get_cycles_by_chapter(self, chapter_in_plan_id: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowCycleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 chapter_dal = ChapterDAL(session)
@@ -96,35 +88,31 @@ class CycleService:
                     if not await ensure_chapter_exists(chapter_dal, chapter_in_plan_id):
                         raise HTTPException(status_code=404, detail=f"Глава с id {chapter_in_plan_id} не найдена")
 
-                    cycles = await cycle_dal.get_cycles_by_chapter(chapter_in_plan_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    cycle_links = CYCLE_LINKS.bind(api_base_url)
 
-                    cycles_with_hateoas = []
-                    for cycle in cycles:
+                    def to_hateoas(cycle) -> ShowCycleWithHATEOAS:
                         cycle_pydantic = ShowCycle.model_validate(cycle, from_attributes=True)
-                        cycle_id = cycle.id
-                        cycle_links = {
-                            "self": f'{api_base_url}/cycles/search/by_id/{cycle_id}',
-                            "update": f'{api_base_url}/cycles/update',
-                            "delete": f'{api_base_url}/cycles/delete/{cycle_id}',
-                            "cycles": f'{api_base_url}/cycles',
-                            "chapter": f'{api_base_url}/chapters/search/by_id/{chapter_in_plan_id}',
-                            "modules": f'{api_base_url}/modules/search/by_cycle/{cycle_id}',
-                            "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_cycle/{cycle_id}'
-                        }
-                        cycle_with_links = ShowCycleWithHATEOAS(cycle=cycle_pydantic, links=cycle_links)
-                        cycles_with_hateoas.append(cycle_with_links)
+                        cycle_with_links = ShowCycleWithHATEOAS(cycle=cycle_pydantic, links=cycle_links(cycle))
+                        return cycle_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: CycleDAL(stream_session).get_cycles_by_chapter(chapter_in_plan_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    cycles = await cycle_dal.get_cycles_by_chapter(chapter_in_plan_id, page, limit, cursor)
+
+                    cycles_with_hateoas = [to_hateoas(cycle) for cycle in cycles]
 
                     collection_links = {
-                        "self": f'{api_base_url}/cycles/search/by_chapter/{chapter_in_plan_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/cycles/create',
-                        "chapter": f'{api_base_url}/chapters/search/by_id/{chapter_in_plan_id}'
+                        "self": route_url(api_base_url, "get_cycles_by_chapter", query=page_query(page, limit, cursor), chapter_in_plan_id=chapter_in_plan_id),
+                        "next": route_url(api_base_url, "get_cycles_by_chapter", query=page_query(None, limit, cycles.next_cursor), chapter_in_plan_id=chapter_in_plan_id) if cycles.next_cursor else None,
+                        "create": route_url(api_base_url, "create_cycle"),
+                        "chapter": route_url(api_base_url, "get_chapter_by_id", chapter_id=chapter_in_plan_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowCycleListWithHATEOAS(cycles=cycles_with_hateoas, links=collection_links)
+                    return ShowCycleListWithHATEOAS(cycles=cycles_with_hateoas, links=collection_links, next_cursor=cycles.next_cursor)
 
                 except HTTPException:
                     raise
@@ -133,39 +121,35 @@ class CycleService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_cycles(self, page: int, limit: int, request: Request, db) -> ShowCycleListWithHATEOAS:
+    async def _get_all_cycles(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowCycleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 cycle_dal = CycleDAL(session)
                 try:
-                    cycles = await cycle_dal.get_all_cycles(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    cycle_links = CYCLE_LINKS.bind(api_base_url)
 
-                    cycles_with_hateoas = []
-                    for cycle in cycles:
+                    def to_hateoas(cycle) -> ShowCycleWithHATEOAS:
                         cycle_pydantic = ShowCycle.model_validate(cycle, from_attributes=True)
-                        cycle_id = cycle.id
-                        cycle_links = {
-                            "self": f'{api_base_url}/cycles/search/by_id/{cycle_id}',
-                            "update": f'{api_base_url}/cycles/update',
-                            "delete": f'{api_base_url}/cycles/delete/{cycle_id}',
-                            "cycles": f'{api_base_url}/cycles',
-                            "chapter": f'{api_base_url}/chapters/search/by_id/{cycle.chapter_in_plan_id}',
-                            "modules": f'{api_base_url}/modules/search/by_cycle/{cycle_id}',
-                            "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_cycle/{cycle_id}'
-                        }
-                        cycle_with_links = ShowCycleWithHATEOAS(cycle=cycle_pydantic, links=cycle_links)
-                        cycles_with_hateoas.append(cycle_with_links)
+                        cycle_with_links = ShowCycleWithHATEOAS(cycle=cycle_pydantic, links=cycle_links(cycle))
+                        return cycle_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: CycleDAL(stream_session).get_all_cycles(page, limit, cursor, stream=True), to_hateoas)
+
+                    cycles = await cycle_dal.get_all_cycles(page, limit, cursor)
+
+                    cycles_with_hateoas = [to_hateoas(cycle) for cycle in cycles]
 
                     collection_links = {
-                        "self": f'{api_base_url}/cycles/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/cycles/create'
+                        "self": route_url(api_base_url, "get_all_cycles", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_cycles", query=page_query(None, limit, cycles.next_cursor)) if cycles.next_cursor else None,
+                        "create": route_url(api_base_url, "create_cycle")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowCycleListWithHATEOAS(cycles=cycles_with_hateoas, links=collection_links)
+                    return ShowCycleListWithHATEOAS(cycles=cycles_with_hateoas, links=collection_links, next_cursor=cycles.next_cursor)
 
                 except HTTPException:
                     raise
@@ -189,14 +173,12 @@ class CycleService:
 
                     cycle_pydantic = ShowCycle.model_validate(cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "cycles": f'{api_base_url}/cycles',
-                        "create": f'{api_base_url}/cycles/create',
-                        "chapter": f'{api_base_url}/chapters/search/by_id/{cycle.chapter_in_plan_id}'
+                        "cycles": route_url(api_base_url, "get_all_cycles"),
+                        "create": route_url(api_base_url, "create_cycle"),
+                        "chapter": route_url(api_base_url, "get_chapter_by_id", chapter_id=cycle.chapter_in_plan_id)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -232,22 +214,11 @@ class CycleService:
                     if not cycle:
                         raise HTTPException(status_code=404, detail=f"Цикл с id {body.cycle_id} не найден")
 
-                    cycle_id = cycle.id
                     cycle_pydantic = ShowCycle.model_validate(cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/cycles/search/by_id/{cycle_id}',
-                        "update": f'{api_base_url}/cycles/update',
-                        "delete": f'{api_base_url}/cycles/delete/{cycle_id}',
-                        "cycles": f'{api_base_url}/cycles',
-                        "chapter": f'{api_base_url}/chapters/search/by_id/{cycle.chapter_in_plan_id}',
-                        "modules": f'{api_base_url}/modules/search/by_cycle/{cycle_id}',
-                        "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_cycle/{cycle_id}'
-                    }
+                    hateoas_links = CYCLE_LINKS.bind(api_base_url)(cycle)
 
                     return ShowCycleWithHATEOAS(cycle=cycle_pydantic, links=hateoas_links)
 
@@ -0,0 +1,134 @@
+"""
+Sparse fieldsets and embedded related rows of the list endpoints.
+?fields=id,session_number - only these fields of the entity are sent;
+?expand=plan.teacher,cabinet - the related rows are sent in "embedded" of every item,
+so the client doesn't follow the links of every row one by one.
+The expanded relations are read by selectinload: one query per relation for the whole page,
+a page costs the same number of queries whatever its size
+"""
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query
+from sqlalchemy.orm import selectinload
+
+from api.serialization import schema_adapter
+
+
+class Embed:
+    """Related row (or rows) embedded by ?expand= with its schema and the relations embedded into it"""
+    __slots__ = ("schema", "children")
+
+    def __init__(self, schema: type, /, **children: "Embed"):
+        self.schema = schema
+        self.children = children
+
+
+class Projection:
+    """Fields and relations asked by one request"""
+    __slots__ = ("entity_fields", "fields", "tree", "options")
+
+    def __init__(self, entity_fields: frozenset[str], fields: frozenset[str] | None, tree: dict, options: list):
+        self.entity_fields = entity_fields
+        self.fields = fields
+        # relation name -> (relationship attribute, Embed, subtree)
+        self.tree = tree
+        self.options = options
+
+    def embed(self, row) -> dict[str, Any] | None:
+        """Embedded related rows of a row, None if nothing is expanded"""
+        return _embed(row, self.tree) if self.tree else None
+
+    def item_exclude(self, entity_key: str) -> dict[str, Any]:
+        """Exclude argument of the dump of one item {entity_key: ..., "links": ..., "embedded": ...}"""
+        exclude: dict[str, Any] = {}
+        if self.fields is not None:
+            exclude[entity_key] = self.entity_fields - self.fields
+        if not self.tree:
+            exclude["embedded"] = True
+        return exclude
+
+    def list_exclude(self, items_key: str, entity_key: str) -> dict[str, Any]:
+        """Exclude argument of the dump of a list response {items_key: [item, ...], "links": ...}"""
+        return {items_key: {"__all__": self.item_exclude(entity_key)}}
+
+
+def _embed(row, tree: dict) -> dict[str, Any]:
+    embedded = {}
+    for name, (attribute, embed, subtree) in tree.items():
+        value = getattr(row, attribute.key)
+        if value is None:
+            embedded[name] = None
+        elif attribute.property.uselist:
+            embedded[name] = [_embed_row(related, embed, subtree) for related in value]
+        else:
+            embedded[name] = _embed_row(value, embed, subtree)
+    return embedded
+
+
+def _embed_row(related, embed: Embed, subtree: dict) -> dict[str, Any]:
+    adapter = schema_adapter(embed.schema)
+    data = adapter.dump_python(adapter.validate_python(related, from_attributes=True))
+    if subtree:
+        data.update(_embed(related, subtree))
+    return data
+
+
+class Expansion:
+    """
+    Fields of an entity and the relations which may be expanded, a dependency of the list handlers:
+    projection: Annotated[Projection, Depends(SESSION_EXPANSION)]
+    """
+    def __init__(self, model: type, schema: type, /, **relations: Embed):
+        self.model = model
+        self.fields = frozenset(schema.model_fields)
+        self.relations = relations
+        self.paths = sorted(self._check(model, relations, ""))
+
+    def _check(self, model: type, relations: dict[str, Embed], prefix: str) -> list[str]:
+        """Every relation must exist on the model and not hide a field of the schema of its parent"""
+        paths = []
+        for name, embed in relations.items():
+            attribute = getattr(model, name)
+            if not hasattr(attribute, "property") or not hasattr(attribute.property, "mapper"):
+                raise TypeError(f"{model.__name__}.{name} is not a relationship")
+            clashes = embed.children.keys() & embed.schema.model_fields.keys()
+            if clashes:
+                raise TypeError(f"Relations {sorted(clashes)} hide fields of {embed.schema.__name__}")
+            paths.append(prefix + name)
+            paths.extend(self._check(attribute.property.mapper.class_, embed.children, f"{prefix}{name}."))
+        return paths
+
+    def __call__(self,
+                 fields: Annotated[str | None, Query(description="Поля элемента через запятую")] = None,
+                 expand: Annotated[str | None, Query(description="Связанные записи через запятую, "
+                                                                 "например plan.teacher,cabinet")] = None
+                 ) -> Projection:
+        return self.project(fields, expand)
+
+    def project(self, fields: str | None = None, expand: str | None = None) -> Projection:
+        selected = None
+        if fields:
+            selected = frozenset(field.strip() for field in fields.split(",") if field.strip())
+            unknown = selected - self.fields
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Неизвестные поля: {', '.join(sorted(unknown))}. "
+                                                            f"Доступны: {', '.join(sorted(self.fields))}")
+
+        tree: dict = {}
+        options = []
+        for path in (expand or "").split(","):
+            path = path.strip()
+            if not path:
+                continue
+            if path not in self.paths:
+                raise HTTPException(status_code=400, detail=f"Неизвестная связь для expand: {path}. "
+                                                            f"Доступны: {', '.join(self.paths)}")
+            model, relations, level, option = self.model, self.relations, tree, None
+            for name in path.split("."):
+                attribute = getattr(model, name)
+                option = selectinload(attribute) if option is None else option.selectinload(attribute)
+                embed = relations[name]
+                level = level.setdefault(name, (attribute, embed, {}))[2]
+                model, relations = attribute.property.mapper.class_, embed.children
+            options.append(option)
+        return Projection(self.fields, selected, tree, options)
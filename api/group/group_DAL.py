@@ -1,8 +1,12 @@
+from typing import Sequence
+
 from sqlalchemy import select, delete, update, distinct
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ExecutableOption
 
 from db.models import Group, TeacherInPlan, SubjectsInCycleHours, SubjectsInCycle
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class GroupDAL:
@@ -31,14 +35,9 @@ class GroupDAL:
         return deleted_group
 
     @log_exceptions
-    async def get_all_groups(self, page: int, limit: int) -> list[Group]:
-        if page == 0:
-            query = select(Group).order_by(Group.group_name.asc())
-        else:
-            query = select(Group).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        groups = list(result.scalars().all())
-        return groups
+    async def get_all_groups(self, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Group).options(*options)
+        return await fetch_page(self.db_session, query, (Group.group_name,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_group_by_name(self, group_name: str) -> Group | None:
@@ -55,24 +54,14 @@ class GroupDAL:
         return groups
     
     @log_exceptions
-    async def get_groups_by_speciality(self, speciality_code: str, page: int, limit: int) -> list[Group]:
-        if page == 0:
-            query = select(Group).where(Group.speciality_code == speciality_code).order_by(Group.group_name.asc())
-        else:
-            query = select(Group).where(Group.speciality_code == speciality_code).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        groups = list(result.scalars().all())
-        return groups if groups is not None else []
-    
+    async def get_groups_by_speciality(self, speciality_code: str, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Group).options(*options).where(Group.speciality_code == speciality_code)
+        return await fetch_page(self.db_session, query, (Group.group_name,), page, limit, cursor, stream)
+
     @log_exceptions
-    async def get_groups_by_names(self, group_names: list[str], page: int, limit: int) -> list[Group]:
-        query = select(Group).where(Group.group_name.in_(group_names))
-        if page > 0:
-            offset_value = (page - 1) * limit
-            query = query.offset(offset_value).limit(limit)
-        result = await self.db_session.execute(query)
-        groups = list(result.scalars().all())
-        return groups if groups is not None else []
+    async def get_groups_by_names(self, group_names: list[str], page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Group).options(*options).where(Group.group_name.in_(group_names))
+        return await fetch_page(self.db_session, query, (Group.group_name,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_group(self, target_group_name: str, **kwargs) -> Group | None:
@@ -4,7 +4,8 @@ from typing import Annotated
 from api.group.group_pydantic import *
 from api.models import QueryParams
 from db.session import get_db
-from api.group.group_services import GroupService
+from api.group.group_services import GroupService, GROUP_EXPANSION
+from api.expansion import Projection
 
 group_router = APIRouter()
 
@@ -27,18 +28,18 @@ async def get_group_by_advisor(advisor_id: int, request: Request, db: AsyncSessi
 
 
 @group_router.get("/search/by_speciality/{speciality_code}", response_model=ShowGroupListWithHATEOAS, responses={404: {"description": "Группы не найдены"}})
-async def get_groups_by_speciality(speciality_code: str, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await group_service._get_groups_by_speciality(speciality_code, query_param.page, query_param.limit, request, db)
+async def get_groups_by_speciality(speciality_code: str, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(GROUP_EXPANSION)], db: AsyncSession = Depends(get_db)):
+    return await group_service._get_groups_by_speciality(speciality_code, query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @group_router.get("/search/by_names", response_model=ShowGroupListWithHATEOAS, responses={404: {"description": "Группы не найдены"}})
-async def get_groups_by_names(query_param: Annotated[QueryParams, Depends()], request: Request, names: list[str] = Query(...), db: AsyncSession = Depends(get_db)):
-    return await group_service._get_groups_by_names(names, query_param.page, query_param.limit, request, db)
+async def get_groups_by_names(query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(GROUP_EXPANSION)], names: list[str] = Query(...), db: AsyncSession = Depends(get_db)):
+    return await group_service._get_groups_by_names(names, query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @group_router.get("/search", response_model=ShowGroupListWithHATEOAS)
-async def get_all_groups(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await group_service._get_all_groups(query_param.page, query_param.limit, request, db)
+async def get_all_groups(query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(GROUP_EXPANSION)], db: AsyncSession = Depends(get_db)):
+    return await group_service._get_all_groups(query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @group_router.delete("/delete/{group_name}", response_model=ShowGroupWithHATEOAS, responses={404: {"description": "Группа не найдена"}})
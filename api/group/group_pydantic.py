@@ -1,5 +1,5 @@
 from api.models import TunedModel
-from typing import List
+from typing import Any, List
 
 
 class ShowGroup(TunedModel):
@@ -31,11 +31,14 @@ class UpdateGroup(TunedModel):
 class ShowGroupWithHATEOAS(TunedModel):
     group: ShowGroup
     links: dict[str, str] = {}
+    # Related rows asked by ?expand=, sent only with it
+    embedded: dict[str, Any] | None = None
 
 
 class ShowGroupListWithHATEOAS(TunedModel):
     groups: List[ShowGroupWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
 
 
 class ShowSubject(TunedModel):
@@ -4,13 +4,46 @@ from api.services_helpers import ensure_group_exists, ensure_group_unique, ensur
 from api.group.group_DAL import GroupDAL
 from api.speciality.speciality_DAL import SpecialityDAL
 from api.teacher.teacher_DAL import TeacherDAL
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
+from api.serialization import orjson_response
+from api.expansion import Embed, Expansion, Projection
+from api.teacher.teacher_pydantic import ShowTeacher
+from api.speciality.speciality_pydantic import ShowSpeciality
+from api.stream.stream_pydantic import ShowStream
+from api.teacher_in_plan.teacher_in_plan_pydantic import ShowTeacherInPlan
+from api.subject_in_cycle_hours.subject_in_cycle_hours_pydantic import ShowSubjectsInCycleHours
+from api.subject_in_cycle.subject_in_cycle_pydantic import ShowSubjectsInCycle
+from db.models import Group
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+GROUP_LINKS = LinkSet(
+    self=Link("get_group_by_name"),
+    update=Link("update_group"),
+    delete=Link("delete_group"),
+    groups=Link("get_all_groups"),
+    advisor=Link("get_teacher_by_id", teacher_id="group_advisor_id", when=("group_advisor_id",)),
+    speciality=Link("get_speciality_by_code", when=("speciality_code",)),
+    streams=Link("get_streams_by_group"),
+    teachers_in_plans=Link("get_teachers_in_plans_by_group")
+)
+
+GROUP_EXPANSION = Expansion(
+    Group, ShowGroup,
+    advisor=Embed(ShowTeacher),
+    speciality=Embed(ShowSpeciality),
+    streams=Embed(ShowStream),
+    teachers_in_plans=Embed(ShowTeacherInPlan,
+                            teacher=Embed(ShowTeacher),
+                            subjects_hours=Embed(ShowSubjectsInCycleHours, subjects_in_cycle=Embed(ShowSubjectsInCycle)))
+)
+
 
 class GroupService:
     async def _create_new_group(self, body: CreateGroup, request: Request, db) -> ShowGroupWithHATEOAS:
@@ -41,25 +74,11 @@ class GroupService:
                         quantity_students=body.quantity_students,
                         group_advisor_id=body.group_advisor_id
                     )
-                    group_name = group.group_name
                     group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                        "update": f'{api_base_url}/groups/update',
-                        "delete": f'{api_base_url}/groups/delete/{group_name}',
-                        "groups": f'{api_base_url}/groups',
-                        "advisor": f'{api_base_url}/teachers/search/by_id/{group.group_advisor_id}' if group.group_advisor_id else None,
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{group.speciality_code}' if group.speciality_code else None,
-                        "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}',
-                        "streams": f'{api_base_url}/streams/search/by_group/{group_name}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}'
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = GROUP_LINKS.bind(api_base_url)(group)
 
                     return ShowGroupWithHATEOAS(group=group_pydantic, links=hateoas_links)
 
@@ -82,22 +101,9 @@ class GroupService:
                         raise HTTPException(status_code=404, detail=f"Группа с названием: {group_name} не найдена")
                     group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                        "update": f'{api_base_url}/groups/update',
-                        "delete": f'{api_base_url}/groups/delete/{group_name}',
-                        "groups": f'{api_base_url}/groups',
-                        "advisor": f'{api_base_url}/teachers/search/by_id/{group.group_advisor_id}' if group.group_advisor_id else None,
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{group.speciality_code}' if group.speciality_code else None,
-                        "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}',
-                        "streams": f'{api_base_url}/streams/search/by_group/{group_name}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}'
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = GROUP_LINKS.bind(api_base_url)(group)
 
                     return ShowGroupWithHATEOAS(group=group_pydantic, links=hateoas_links)
 
@@ -121,33 +127,19 @@ class GroupService:
                     if not groups:
                         raise HTTPException(status_code=404, detail=f"Группы преподавателя с id {advisor_id} не найдены")
                     
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     groups_with_hateoas = []
+                    group_links = GROUP_LINKS.bind(api_base_url)
                     for group in groups:
                         group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
-                        group_name = group.group_name
-                        group_links = {
-                            "self": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "update": f'{api_base_url}/groups/update',
-                            "delete": f'{api_base_url}/groups/delete/{group_name}',
-                            "groups": f'{api_base_url}/groups',
-                            "advisor": f'{api_base_url}/teachers/search/by_id/{advisor_id}',
-                            "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{group.speciality_code}' if group.speciality_code else None,
-                            "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}',
-                            "streams": f'{api_base_url}/streams/search/by_group/{group_name}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}'
-                        }
-                        group_links = {k: v for k, v in group_links.items() if v is not None}
-                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links)
+                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links(group))
                         groups_with_hateoas.append(group_with_links)
 
                     collection_links = {
-                        "self": f'{api_base_url}/groups/search/by_advisor/{advisor_id}',
-                        "create": f'{api_base_url}/groups/create',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{advisor_id}'
+                        "self": route_url(api_base_url, "get_group_by_advisor", advisor_id=advisor_id),
+                        "create": route_url(api_base_url, "create_group"),
+                        "teacher": route_url(api_base_url, "get_teacher_by_id", teacher_id=advisor_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
@@ -160,42 +152,37 @@ class GroupService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера при получении групп по преподавателю.")
 
 
-    async def _get_all_groups(self, page: int, limit: int, request: Request, db) -> ShowGroupListWithHATEOAS:
+    async def _get_all_groups(self, page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 group_dal = GroupDAL(session)
                 try:
-                    groups = await group_dal.get_all_groups(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    groups_with_hateoas = []
-                    for group in groups:
+                    group_links = GROUP_LINKS.bind(api_base_url)
+
+                    def to_hateoas(group) -> ShowGroupWithHATEOAS:
                         group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
-                        group_name = group.group_name
-                        group_links = {
-                            "self": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "update": f'{api_base_url}/groups/update',
-                            "delete": f'{api_base_url}/groups/delete/{group_name}',
-                            "groups": f'{api_base_url}/groups',
-                            "advisor": f'{api_base_url}/teachers/search/by_id/{group.group_advisor_id}' if group.group_advisor_id else None,
-                            "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{group.speciality_code}' if group.speciality_code else None,
-                            "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}',
-                            "streams": f'{api_base_url}/streams/search/by_group/{group_name}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}'
-                        }
-                        group_links = {k: v for k, v in group_links.items() if v is not None}
-                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links)
-                        groups_with_hateoas.append(group_with_links)
+                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links(group), embedded=projection.embed(group))
+                        return group_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: GroupDAL(stream_session).get_all_groups(page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("group"))
+
+                    groups = await group_dal.get_all_groups(page, limit, cursor, options=projection.options)
+
+                    groups_with_hateoas = [to_hateoas(group) for group in groups]
 
                     collection_links = {
-                        "self": f'{api_base_url}/groups/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/groups/create'
+                        "self": route_url(api_base_url, "get_all_groups", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_groups", query=page_query(None, limit, groups.next_cursor)) if groups.next_cursor else None,
+                        "create": route_url(api_base_url, "create_group")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowGroupListWithHATEOAS(groups=groups_with_hateoas, links=collection_links)
+                    return orjson_response(ShowGroupListWithHATEOAS, ShowGroupListWithHATEOAS(groups=groups_with_hateoas, links=collection_links, next_cursor=groups.next_cursor),
+                                           exclude=projection.list_exclude("groups", "group"))
 
                 except HTTPException:
                     raise
@@ -204,7 +191,7 @@ class GroupService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_groups_by_speciality(self, speciality_code: str, page: int, limit: int, request: Request, db) -> ShowGroupListWithHATEOAS:
+    async def _get_groups_by_speciality(self, speciality_code: str, page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 speciality_dal = SpecialityDAL(session)
@@ -213,38 +200,33 @@ class GroupService:
                     if not await ensure_speciality_exists(speciality_dal, speciality_code):
                         raise HTTPException(status_code=404, detail=f"Специальность с кодом {speciality_code} не найдена")
 
-                    groups = await group_dal.get_groups_by_speciality(speciality_code, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    groups_with_hateoas = []
-                    for group in groups:
+                    group_links = GROUP_LINKS.bind(api_base_url)
+
+                    def to_hateoas(group) -> ShowGroupWithHATEOAS:
                         group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
-                        group_name = group.group_name
-                        group_links = {
-                            "self": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "update": f'{api_base_url}/groups/update',
-                            "delete": f'{api_base_url}/groups/delete/{group_name}',
-                            "groups": f'{api_base_url}/groups',
-                            "advisor": f'{api_base_url}/teachers/search/by_id/{group.group_advisor_id}' if group.group_advisor_id else None,
-                            "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{speciality_code}',
-                            "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}',
-                            "streams": f'{api_base_url}/streams/search/by_group/{group_name}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}'
-                        }
-                        group_links = {k: v for k, v in group_links.items() if v is not None}
-                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links)
-                        groups_with_hateoas.append(group_with_links)
+                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links(group), embedded=projection.embed(group))
+                        return group_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: GroupDAL(stream_session).get_groups_by_speciality(speciality_code, page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("group"))
+
+                    groups = await group_dal.get_groups_by_speciality(speciality_code, page, limit, cursor, options=projection.options)
+
+                    groups_with_hateoas = [to_hateoas(group) for group in groups]
 
                     collection_links = {
-                        "self": f'{api_base_url}/groups/search/by_speciality/{speciality_code}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/groups/create',
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{speciality_code}'
+                        "self": route_url(api_base_url, "get_groups_by_speciality", query=page_query(page, limit, cursor), speciality_code=speciality_code),
+                        "next": route_url(api_base_url, "get_groups_by_speciality", query=page_query(None, limit, groups.next_cursor), speciality_code=speciality_code) if groups.next_cursor else None,
+                        "create": route_url(api_base_url, "create_group"),
+                        "speciality": route_url(api_base_url, "get_speciality_by_code", speciality_code=speciality_code)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowGroupListWithHATEOAS(groups=groups_with_hateoas, links=collection_links)
+                    return orjson_response(ShowGroupListWithHATEOAS, ShowGroupListWithHATEOAS(groups=groups_with_hateoas, links=collection_links, next_cursor=groups.next_cursor),
+                                           exclude=projection.list_exclude("groups", "group"))
 
                 except HTTPException:
                     raise
@@ -253,37 +235,36 @@ class GroupService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
                 
                 
-    async def _get_groups_by_names(self, names: list[str], page: int, limit: int, request: Request, db) -> ShowGroupListWithHATEOAS:
+    async def _get_groups_by_names(self, names: list[str], page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 group_dal = GroupDAL(session)
                 try:
-                    groups_list = await group_dal.get_groups_by_names(names, page, limit)
+                    api_base_url = request_base_url(request)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    group_links = GROUP_LINKS.bind(api_base_url)
 
-                    groups_with_hateoas = []
-                    for group in groups_list:
+                    def to_hateoas(group) -> ShowGroupWithHATEOAS:
                         group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
-                        group_name = group.group_name
-                        group_links = {
-                            "self": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "advisor": f'{api_base_url}/teachers/search/by_id/{group.group_advisor_id}' if group.group_advisor_id else None,
-                            "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{group.speciality_code}' if group.speciality_code else None,
-                        }
-                        
-                        group_links = {k: v for k, v in group_links.items() if v is not None}
-                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links)
-                        groups_with_hateoas.append(group_with_links)
+                        group_with_links = ShowGroupWithHATEOAS(group=group_pydantic, links=group_links(group), embedded=projection.embed(group))
+                        return group_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: GroupDAL(stream_session).get_groups_by_names(names, page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("group"))
+
+                    groups_list = await group_dal.get_groups_by_names(names, page, limit, cursor, options=projection.options)
+
+                    groups_with_hateoas = [to_hateoas(group) for group in groups_list]
 
                     collection_links = {
-                        "self": f'{api_base_url}/groups/search/by_names?page={page}&limit={limit}&names={",".join(map(str, names))}',
+                        "self": route_url(api_base_url, "get_groups_by_names", query=f'{page_query(page, limit, cursor)}&names={",".join(map(str, names))}'),
+                        "next": route_url(api_base_url, "get_groups_by_names", query=f'{page_query(None, limit, groups_list.next_cursor)}&names={",".join(map(str, names))}') if groups_list.next_cursor else None,
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowGroupListWithHATEOAS(groups=groups_with_hateoas, links=collection_links)
+                    return orjson_response(ShowGroupListWithHATEOAS, ShowGroupListWithHATEOAS(groups=groups_with_hateoas, links=collection_links, next_cursor=groups_list.next_cursor),
+                                           exclude=projection.list_exclude("groups", "group"))
 
                 except HTTPException:
                     raise
@@ -303,13 +284,11 @@ class GroupService:
 
                     group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "groups": f'{api_base_url}/groups',
-                        "create": f'{api_base_url}/groups/create'
+                        "groups": route_url(api_base_url, "get_all_groups"),
+                        "create": route_url(api_base_url, "create_group")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -359,25 +338,11 @@ class GroupService:
                     if not group:
                         raise HTTPException(status_code=404, detail=f"Группа {body.group_name} не найдена")
 
-                    group_name = group.group_name
                     group_pydantic = ShowGroup.model_validate(group, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                        "update": f'{api_base_url}/groups/update',
-                        "delete": f'{api_base_url}/groups/delete/{group_name}',
-                        "groups": f'{api_base_url}/groups',
-                        "advisor": f'{api_base_url}/teachers/search/by_id/{group.group_advisor_id}' if group.group_advisor_id else None,
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{group.speciality_code}' if group.speciality_code else None,
-                        "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}',
-                        "streams": f'{api_base_url}/streams/search/by_group/{group_name}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}'
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = GROUP_LINKS.bind(api_base_url)(group)
 
                     return ShowGroupWithHATEOAS(group=group_pydantic, links=hateoas_links)
 
@@ -409,15 +374,13 @@ class GroupService:
                         for subject in subjects
                     ]
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "self": f'{api_base_url}/groups/{group_name}/subjects',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                        "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}'
+                        "self": route_url(api_base_url, "get_subjects_by_group", group_name=group_name),
+                        "group": route_url(api_base_url, "get_group_by_name", group_name=group_name),
+                        "sessions": route_url(api_base_url, "get_sessions_by_filter", query=f"group_names={group_name}"),
+                        "teachers_in_plans": route_url(api_base_url, "get_teachers_in_plans_by_group", group_name=group_name)
                     }
 
                     return ShowSubjectList(subjects=subjects_list, links=hateoas_links)
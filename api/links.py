@@ -0,0 +1,110 @@
+"""
+HATEOAS links built from the route table of the app.
+The path templates of the routes are read once at startup (load_route_templates),
+a LinkSet is compiled into one function per links mode, the base url is its argument
+(it comes from the Host header and never gets into the generated source),
+so a row costs the same f-strings as the links written by hand.
+?links=none|self|full chooses which links the items of a list get
+"""
+import re
+from functools import partial
+from typing import Annotated, Callable, Iterable, Literal, get_args
+
+from fastapi import Query, Request
+from fastapi.routing import APIRoute
+
+
+LinksMode = Literal["none", "self", "full"]
+LINKS_MODES: tuple[str, ...] = get_args(LinksMode)
+LinksQuery = Annotated[LinksMode, Query(description="Ссылки элементов списка: none - без ссылок, "
+                                                    "self - только ссылка на элемент, full - все ссылки")]
+
+# Route name -> path template, e.g. "get_sessions_by_date" -> "/sessions/search/by_date/{session_date}"
+ROUTE_TEMPLATES: dict[str, str] = {}
+_ESCAPED_PATH_PARAMETER = re.compile(r"{{(\w+)}}")
+_LINK_SETS: list["LinkSet"] = []
+
+
+def load_route_templates(routes: Iterable) -> None:
+    """Read the path templates of the app routes, every link must point to an existing route"""
+    for route in routes:
+        if isinstance(route, APIRoute):
+            ROUTE_TEMPLATES[route.name] = route.path_format
+    missing = {link.route_name for link_set in _LINK_SETS for link in link_set.links.values()} - ROUTE_TEMPLATES.keys()
+    if missing:
+        raise RuntimeError(f"Ссылки на несуществующие маршруты: {', '.join(sorted(missing))}")
+
+
+def request_base_url(request: Request) -> str:
+    return str(request.base_url).rstrip('/')
+
+
+def route_url(base_url: str, route_name: str, /, query: str | None = None, **path_parameters) -> str:
+    """Link of one route, for the links made once per response (collections, pages), query - the query string"""
+    url = base_url + ROUTE_TEMPLATES[route_name].format(**path_parameters)
+    return f"{url}?{query}" if query else url
+
+
+class Link:
+    """
+    Link of an entity to a route.
+    Path parameters are read from the attributes of the same name,
+    attributes - path parameter -> attribute when the names differ;
+    when - attributes which must all be set, otherwise the link is skipped
+    """
+    __slots__ = ("route_name", "attributes", "when")
+
+    def __init__(self, route_name: str, /, when: tuple[str, ...] = (), **attributes: str):
+        self.route_name = route_name
+        self.attributes = attributes
+        self.when = when
+
+
+class LinkSet:
+    """Links of an entity by their names, "self" is the link to the entity itself"""
+    def __init__(self, /, **links: Link):
+        self.links = links
+        self._builders: dict[str, Callable[[object, str], dict[str, str]]] = {}
+        _LINK_SETS.append(self)
+
+    def bind(self, base_url: str, mode: LinksMode = "full") -> Callable[[object], dict[str, str]]:
+        """Function row -> links of the row for the base url and the mode of a response"""
+        builder = self._builders.get(mode)
+        if builder is None:
+            # Compiled on the first use, the route templates are loaded at startup
+            builder = self._builders[mode] = self._compile(mode)
+        return partial(builder, base_url=base_url)
+
+    def _compile(self, mode: LinksMode) -> Callable[[object, str], dict[str, str]]:
+        """
+        Source of one function with an f-string per link, the same code as the links written by hand:
+        def build(row, base_url):
+            links = {"self": f"{base_url}/sessions/search/by_composite_key/{row.session_number}/...", ...}
+            if row.cabinet_number and row.building_number:
+                links["cabinet"] = f"..."
+            return links
+        """
+        names = [] if mode == "none" else ["self"] if mode == "self" else list(self.links)
+        always, optional = [], []
+        for name in names:
+            link = self.links[name]
+            path = ROUTE_TEMPLATES[link.route_name].replace("{", "{{").replace("}", "}}")
+            # {{parameter}} -> {row.attribute}
+            url = "f" + repr("{base_url}" + _ESCAPED_PATH_PARAMETER.sub(
+                lambda match: "{row.%s}" % _identifier(link.attributes.get(match.group(1), match.group(1))), path))
+            if link.when:
+                condition = " and ".join(f"row.{_identifier(attribute)}" for attribute in link.when)
+                optional.append(f"    if {condition}:\n        links[{name!r}] = {url}\n")
+            else:
+                always.append(f"{name!r}: {url}")
+
+        source = "def build(row, base_url):\n    links = {" + ", ".join(always) + "}\n" + "".join(optional) + "    return links\n"
+        namespace = {}
+        exec(compile(source, f"<links {', '.join(self.links)}>", "exec"), namespace)
+        return namespace["build"]
+
+
+def _identifier(attribute: str) -> str:
+    if not attribute.isidentifier():
+        raise ValueError(f"Недопустимое имя атрибута ссылки: {attribute}")
+    return attribute
@@ -0,0 +1,168 @@
+"""
+Request-scoped loader of rows by key, the existence checks of api/services_helpers.py go through it.
+The loader lives in the db session of the request, so a key is looked up once per request:
+a loaded row answers the existence checks of its key, a failed check answers a later load with None.
+Lookups awaited together (asyncio.gather) are batched into one query per key and deduplicated:
+    SELECT teachers.id FROM teachers WHERE teachers.id IN (...)
+Existence checks read the key columns only (SELECT EXISTS for a single key), ORM objects are built by load().
+The keys of the reference tables are checked in api.reference_cache without a query.
+Any write of the session (flush, INSERT/UPDATE/DELETE statement), commit or rollback drops what was looked up
+"""
+import asyncio
+from typing import Any, Hashable
+
+from sqlalchemy import and_, event, exists, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as SyncSession
+
+from api.reference_cache import reference_cache
+
+
+LOADER_KEY = "request_loader"
+
+# What a batch of lookups fetches: whether the rows exist, the rows, the whole cached reference table
+EXISTS, LOAD, TABLE = "exists", "load", "table"
+
+
+class Key:
+    """
+    Columns identifying a row of a model: Key(Teacher.id), Key(Cabinet.building_number, Cabinet.cabinet_number).
+    The value of a single column key is the value itself, of a composite key - the tuple of the values
+    """
+    __slots__ = ("model", "columns")
+
+    def __init__(self, *columns):
+        self.columns = columns
+        self.model = columns[0].class_
+
+    def match(self, value: Hashable):
+        if len(self.columns) == 1:
+            return self.columns[0] == value
+        return and_(*(column == part for column, part in zip(self.columns, value)))
+
+    def among(self, values: list[Hashable]):
+        if len(self.columns) == 1:
+            return self.columns[0].in_(values)
+        return tuple_(*self.columns).in_(values)
+
+    def value_of(self, row) -> Hashable:
+        """Value of the key of a loaded row or of a row of the key columns"""
+        if len(self.columns) == 1:
+            return getattr(row, self.columns[0].key)
+        return tuple(getattr(row, column.key) for column in self.columns)
+
+
+class RequestLoader:
+    """Rows and existence of keys looked up in one db session"""
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+        # (key, value) -> row, None if there is no row
+        self.rows: dict[tuple[Key, Hashable], Any] = {}
+        # (key, value) -> whether the row exists
+        self.found: dict[tuple[Key, Hashable], bool] = {}
+        # (key, what is fetched) -> value -> future of the result
+        self._pending: dict[tuple[Key, str], dict[Hashable, asyncio.Future]] = {}
+        self._dispatch: asyncio.Task | None = None
+
+    async def exists(self, key: Key, value: Hashable) -> bool:
+        if (key, value) in self.rows:
+            return self.rows[(key, value)] is not None
+        if (key, value) in self.found:
+            return self.found[(key, value)]
+        if reference_cache.serves(self.db_session, key):
+            found = reference_cache.lookup(key, value)
+            if found is not None:
+                return found
+            return await self._enqueue(key, value, TABLE)
+        return await self._enqueue(key, value, EXISTS)
+
+    async def load(self, key: Key, value: Hashable) -> Any | None:
+        if (key, value) in self.rows:
+            return self.rows[(key, value)]
+        if self.found.get((key, value)) is False:
+            return None
+        return await self._enqueue(key, value, LOAD)
+
+    def _enqueue(self, key: Key, value: Hashable, mode: str) -> asyncio.Future:
+        batch = self._pending.setdefault((key, mode), {})
+        future = batch.get(value)
+        if future is None:
+            future = batch[value] = asyncio.get_running_loop().create_future()
+        if self._dispatch is None:
+            self._dispatch = asyncio.create_task(self._run())
+        return future
+
+    async def _run(self) -> None:
+        # Let the other lookups awaited together get into the batches
+        await asyncio.sleep(0)
+        try:
+            # One query at a time, the db session can't run them concurrently
+            while self._pending:
+                (key, mode), batch = next(iter(self._pending.items()))
+                del self._pending[(key, mode)]
+                try:
+                    results = await self._fetch(key, mode, list(batch))
+                except Exception as error:
+                    for future in batch.values():
+                        if not future.done():
+                            future.set_exception(error)
+                    continue
+                for value, future in batch.items():
+                    if not future.done():
+                        future.set_result(results[value])
+        finally:
+            self._dispatch = None
+
+    async def _fetch(self, key: Key, mode: str, values: list[Hashable]) -> dict[Hashable, Any]:
+        if mode == TABLE:
+            table_values = await reference_cache.reload(self.db_session, key)
+            return {value: value in table_values for value in values}
+
+        if mode == LOAD:
+            res = await self.db_session.execute(select(key.model).where(key.among(values)))
+            loaded = {key.value_of(row): row for row in res.scalars()}
+            results = {value: loaded.get(value) for value in values}
+            self.rows.update(((key, value), row) for value, row in results.items())
+            return results
+
+        if len(values) == 1:
+            found = {values[0]} if await self.db_session.scalar(select(exists().where(key.match(values[0])))) else set()
+        else:
+            res = await self.db_session.execute(select(*key.columns).where(key.among(values)))
+            found = {key.value_of(row) for row in res}
+        results = {value: value in found for value in values}
+        self.found.update(((key, value), is_found) for value, is_found in results.items())
+        return results
+
+
+def request_loader(db_session: AsyncSession) -> RequestLoader:
+    """Loader of the db session, made on the first lookup"""
+    loader = db_session.info.get(LOADER_KEY)
+    if loader is None:
+        loader = db_session.info[LOADER_KEY] = RequestLoader(db_session)
+    return loader
+
+
+def _drop_loader(sync_session: SyncSession) -> None:
+    sync_session.info.pop(LOADER_KEY, None)
+
+
+@event.listens_for(SyncSession, "do_orm_execute")
+def _drop_loader_on_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        _drop_loader(orm_execute_state.session)
+
+
+@event.listens_for(SyncSession, "after_flush")
+def _drop_loader_after_flush(sync_session, flush_context):
+    _drop_loader(sync_session)
+
+
+@event.listens_for(SyncSession, "after_commit")
+def _drop_loader_after_commit(sync_session):
+    _drop_loader(sync_session)
+
+
+@event.listens_for(SyncSession, "after_soft_rollback")
+def _drop_loader_after_rollback(sync_session, previous_transaction):
+    _drop_loader(sync_session)
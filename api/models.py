@@ -2,10 +2,13 @@
 File for creating validation models
 """
 
-from pydantic import BaseModel, EmailStr, Field
+from fastapi import HTTPException
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
 from datetime import date
 
+from api.pagination import decode_cursor, FIRST_PAGE_CURSOR, INVALID_CURSOR_DETAIL
+
 
 class TunedModel(BaseModel):
     class Config:
@@ -19,10 +22,24 @@ class TunedModel(BaseModel):
 class QueryParams(TunedModel):
     """
     This is model for validate query params
-    when we need to retrieve all data from the table
+    when we need to retrieve all data from the table.
+    page: 0 - all rows, n - the page by offset.
+    Keyset pages: cursor=first for the first page, then the cursor from next_cursor of the previous page.
+    With Accept: application/x-ndjson all rows after the cursor are streamed line by line
      """
     page: int = Field(default=0, ge=0)
     limit: int = Field(default=10, ge=1, le=100)
+    cursor: str | None = None
+
+    @field_validator("cursor")
+    @classmethod
+    def check_cursor(cls, cursor: str | None) -> str | None:
+        if cursor is not None and cursor != FIRST_PAGE_CURSOR:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=INVALID_CURSOR_DETAIL)
+        return cursor
 
 
 '''
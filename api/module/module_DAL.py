@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Module
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class ModuleDAL:
@@ -21,6 +22,18 @@ class ModuleDAL:
         await self.db_session.flush()
         return new_module
 
+    @log_exceptions
+    async def create_modules(self, modules_data: list[dict]) -> list[int]:
+        """
+        Insert many rows with one statement, returns the ids in the order of the data.
+        modules_data - list of dicts with keys: name, code, cycle_in_chapter_id
+        """
+        if not modules_data:
+            return []
+        query = insert(Module).returning(Module.id, sort_by_parameter_order=True)
+        result = await self.db_session.scalars(query, modules_data)
+        return list(result.all())
+
     @log_exceptions
     async def delete_module(self, id: int) -> Module | None:
         query = delete(Module).where(Module.id == id).returning(Module)
@@ -29,14 +42,9 @@ class ModuleDAL:
         return deleted_module
 
     @log_exceptions
-    async def get_all_modules(self, page: int, limit: int) -> list[Module]:
-        if page == 0:
-            query = select(Module).order_by(Module.id.asc())
-        else:
-            query = select(Module).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        modules = list(result.scalars().all())
-        return modules
+    async def get_all_modules(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Module)
+        return await fetch_page(self.db_session, query, (Module.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_module_by_id(self, id: int) -> Module | None:
@@ -46,14 +54,9 @@ class ModuleDAL:
         return module_row
 
     @log_exceptions
-    async def get_modules_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int) -> list[Module]:
-        if page == 0:
-            query = select(Module).where(Module.cycle_in_chapter_id == cycle_in_chapter_id).order_by(Module.id.asc())
-        else:
-            query = select(Module).where(Module.cycle_in_chapter_id == cycle_in_chapter_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        modules = list(result.scalars().all())
-        return modules
+    async def get_modules_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Module).where(Module.cycle_in_chapter_id == cycle_in_chapter_id)
+        return await fetch_page(self.db_session, query, (Module.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_module(self, target_id: int, **kwargs) -> Module | None:
@@ -23,12 +23,12 @@ async def get_module_by_id(module_id: int, request: Request, db: AsyncSession =
 
 @module_router.get("/search/by_cycle/{cycle_in_chapter_id}", response_model=ShowModuleListWithHATEOAS, responses={404: {"description": "Модули не найдены"}})
 async def get_modules_by_cycle(cycle_in_chapter_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await module_service._get_modules_by_cycle(cycle_in_chapter_id, query_param.page, query_param.limit, request, db)
+    return await module_service._get_modules_by_cycle(cycle_in_chapter_id, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @module_router.get("/search", response_model=ShowModuleListWithHATEOAS)
 async def get_all_modules(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await module_service._get_all_modules(query_param.page, query_param.limit, request, db)
+    return await module_service._get_all_modules(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @module_router.delete("/delete/{module_id}", response_model=ShowModuleWithHATEOAS, responses={404: {"description": "Модуль не найден"}})
@@ -31,4 +31,5 @@ class ShowModuleWithHATEOAS(TunedModel):
 class ShowModuleListWithHATEOAS(TunedModel):
     modules: List[ShowModuleWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
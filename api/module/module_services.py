@@ -3,12 +3,24 @@ from api.services_helpers import ensure_cycle_contains_modules, ensure_cycle_exi
 from api.module.module_DAL import ModuleDAL
 from api.cycle.cycle_DAL import CycleDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+MODULE_LINKS = LinkSet(
+    self=Link("get_module_by_id", module_id="id"),
+    update=Link("update_module"),
+    delete=Link("delete_module", module_id="id"),
+    modules=Link("get_all_modules"),
+    cycle=Link("get_cycle_by_id", cycle_id="cycle_in_chapter_id"),
+    subjects_in_cycle=Link("get_subjects_in_cycle_by_module", module_in_cycle_id="id")
+)
+
 
 class ModuleService:
     async def _create_new_module(self, body: CreateModule, request: Request, db) -> ShowModuleWithHATEOAS:
@@ -28,21 +40,11 @@ class ModuleService:
                         code=body.code,
                         cycle_in_chapter_id=body.cycle_in_chapter_id
                     )
-                    module_id = module.id
                     module_pydantic = ShowModule.model_validate(module, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/modules/search/by_id/{module_id}',
-                        "update": f'{api_base_url}/modules/update',
-                        "delete": f'{api_base_url}/modules/delete/{module_id}',
-                        "modules": f'{api_base_url}/modules',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{body.cycle_in_chapter_id}',
-                        "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_module/{module_id}'
-                    }
+                    hateoas_links = MODULE_LINKS.bind(api_base_url)(module)
 
                     return ShowModuleWithHATEOAS(module=module_pydantic, links=hateoas_links)
 
@@ -65,18 +67,9 @@ class ModuleService:
                         raise HTTPException(status_code=404, detail=f"Модуль с id {module_id} не найден")
                     module_pydantic = ShowModule.model_validate(module, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/modules/search/by_id/{module_id}',
-                        "update": f'{api_base_url}/modules/update',
-                        "delete": f'{api_base_url}/modules/delete/{module_id}',
-                        "modules": f'{api_base_url}/modules',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{module.cycle_in_chapter_id}',
-                        "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_module/{module_id}'
-                    }
+                    hateoas_links = MODULE_LINKS.bind(api_base_url)(module)
 
                     return ShowModuleWithHATEOAS(module=module_pydantic, links=hateoas_links)
 
@@ -87,7 +80,7 @@ class ModuleService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_modules_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int, request: Request, db) -> ShowModuleListWithHATEOAS:
+    async def _get_modules_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowModuleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 cycle_dal = CycleDAL(session)
@@ -96,34 +89,31 @@ class ModuleService:
                     if not await ensure_cycle_exists(cycle_dal, cycle_in_chapter_id):
                         raise HTTPException(status_code=404, detail=f"Цикл с id {cycle_in_chapter_id} не найден")
 
-                    modules = await module_dal.get_modules_by_cycle(cycle_in_chapter_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    module_links = MODULE_LINKS.bind(api_base_url)
 
-                    modules_with_hateoas = []
-                    for module in modules:
+                    def to_hateoas(module) -> ShowModuleWithHATEOAS:
                         module_pydantic = ShowModule.model_validate(module, from_attributes=True)
-                        module_id = module.id
-                        module_links = {
-                            "self": f'{api_base_url}/modules/search/by_id/{module_id}',
-                            "update": f'{api_base_url}/modules/update',
-                            "delete": f'{api_base_url}/modules/delete/{module_id}',
-                            "modules": f'{api_base_url}/modules',
-                            "cycle": f'{api_base_url}/cycles/search/by_id/{cycle_in_chapter_id}',
-                            "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_module/{module_id}'
-                        }
-                        module_with_links = ShowModuleWithHATEOAS(module=module_pydantic, links=module_links)
-                        modules_with_hateoas.append(module_with_links)
+                        module_with_links = ShowModuleWithHATEOAS(module=module_pydantic, links=module_links(module))
+                        return module_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: ModuleDAL(stream_session).get_modules_by_cycle(cycle_in_chapter_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    modules = await module_dal.get_modules_by_cycle(cycle_in_chapter_id, page, limit, cursor)
+
+                    modules_with_hateoas = [to_hateoas(module) for module in modules]
 
                     collection_links = {
-                        "self": f'{api_base_url}/modules/search/by_cycle/{cycle_in_chapter_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/modules/create',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{cycle_in_chapter_id}'
+                        "self": route_url(api_base_url, "get_modules_by_cycle", query=page_query(page, limit, cursor), cycle_in_chapter_id=cycle_in_chapter_id),
+                        "next": route_url(api_base_url, "get_modules_by_cycle", query=page_query(None, limit, modules.next_cursor), cycle_in_chapter_id=cycle_in_chapter_id) if modules.next_cursor else None,
+                        "create": route_url(api_base_url, "create_module"),
+                        "cycle": route_url(api_base_url, "get_cycle_by_id", cycle_id=cycle_in_chapter_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowModuleListWithHATEOAS(modules=modules_with_hateoas, links=collection_links)
+                    return ShowModuleListWithHATEOAS(modules=modules_with_hateoas, links=collection_links, next_cursor=modules.next_cursor)
 
                 except HTTPException:
                     raise
@@ -132,38 +122,35 @@ class ModuleService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_modules(self, page: int, limit: int, request: Request, db) -> ShowModuleListWithHATEOAS:
+    async def _get_all_modules(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowModuleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 module_dal = ModuleDAL(session)
                 try:
-                    modules = await module_dal.get_all_modules(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    module_links = MODULE_LINKS.bind(api_base_url)
 
-                    modules_with_hateoas = []
-                    for module in modules:
+                    def to_hateoas(module) -> ShowModuleWithHATEOAS:
                         module_pydantic = ShowModule.model_validate(module, from_attributes=True)
-                        module_id = module.id
-                        module_links = {
-                            "self": f'{api_base_url}/modules/search/by_id/{module_id}',
-                            "update": f'{api_base_url}/modules/update',
-                            "delete": f'{api_base_url}/modules/delete/{module_id}',
-                            "modules": f'{api_base_url}/modules',
-                            "cycle": f'{api_base_url}/cycles/search/by_id/{module.cycle_in_chapter_id}',
-                            "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_module/{module_id}'
-                        }
-                        module_with_links = ShowModuleWithHATEOAS(module=module_pydantic, links=module_links)
-                        modules_with_hateoas.append(module_with_links)
+                        module_with_links = ShowModuleWithHATEOAS(module=module_pydantic, links=module_links(module))
+                        return module_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: ModuleDAL(stream_session).get_all_modules(page, limit, cursor, stream=True), to_hateoas)
+
+                    modules = await module_dal.get_all_modules(page, limit, cursor)
+
+                    modules_with_hateoas = [to_hateoas(module) for module in modules]
 
                     collection_links = {
-                        "self": f'{api_base_url}/modules/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/modules/create'
+                        "self": route_url(api_base_url, "get_all_modules", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_modules", query=page_query(None, limit, modules.next_cursor)) if modules.next_cursor else None,
+                        "create": route_url(api_base_url, "create_module")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowModuleListWithHATEOAS(modules=modules_with_hateoas, links=collection_links)
+                    return ShowModuleListWithHATEOAS(modules=modules_with_hateoas, links=collection_links, next_cursor=modules.next_cursor)
 
                 except HTTPException:
                     raise
@@ -186,14 +173,12 @@ class ModuleService:
 
                     module_pydantic = ShowModule.model_validate(module, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "modules": f'{api_base_url}/modules',
-                        "create": f'{api_base_url}/modules/create',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{module.cycle_in_chapter_id}'
+                        "modules": route_url(api_base_url, "get_all_modules"),
+                        "create": route_url(api_base_url, "create_module"),
+                        "cycle": route_url(api_base_url, "get_cycle_by_id", cycle_id=module.cycle_in_chapter_id)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -229,21 +214,11 @@ class ModuleService:
                     if not module:
                         raise HTTPException(status_code=404, detail=f"Модуль с id {body.module_id} не найден")
 
-                    module_id = module.id 
                     module_pydantic = ShowModule.model_validate(module, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/modules/search/by_id/{module_id}',
-                        "update": f'{api_base_url}/modules/update',
-                        "delete": f'{api_base_url}/modules/delete/{module_id}',
-                        "modules": f'{api_base_url}/modules',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{module.cycle_in_chapter_id}',
-                        "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_module/{module_id}'
-                    }
+                    hateoas_links = MODULE_LINKS.bind(api_base_url)(module)
 
                     return ShowModuleWithHATEOAS(module=module_pydantic, links=hateoas_links)
 
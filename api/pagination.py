@@ -0,0 +1,114 @@
+"""
+Keyset (cursor) pagination of the list endpoints.
+A page is read after the key of the last row of the previous page:
+WHERE (key columns) > (cursor) ORDER BY key columns LIMIT limit + 1,
+so every page costs the same on the index of the key columns.
+Keyset pages are asked for explicitly: cursor=first for the first page, then the cursor from next_cursor.
+Without a cursor the page number works as before: 0 - all rows, n - the page by offset.
+In the streaming mode the rows are read by a server-side cursor in the order of the key columns
+"""
+import base64
+import json
+from datetime import date
+from typing import Any, Sequence
+from urllib.parse import urlencode
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncScalarResult
+
+
+INVALID_CURSOR_DETAIL = "Некорректный курсор страницы"
+# Cursor of the first keyset page
+FIRST_PAGE_CURSOR = "first"
+# Rows fetched from the server-side cursor at a time in the streaming mode
+STREAM_BATCH_SIZE = 500
+
+RowStream = AsyncScalarResult
+
+
+class Page(list):
+    """Rows of a page and the cursor of the next page, None on the last page"""
+    def __init__(self, rows: Sequence = (), next_cursor: str | None = None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor from the key values of a row"""
+    payload = [{"d": value.isoformat()} if isinstance(value, date) else value for value in values]
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_value(value: Any) -> int | str | date:
+    """Key value from the cursor payload, only the values written by encode_cursor are accepted"""
+    if isinstance(value, dict) and value.keys() == {"d"} and isinstance(value["d"], str):
+        return date.fromisoformat(value["d"])
+    if isinstance(value, str) or (isinstance(value, int) and not isinstance(value, bool)):
+        return value
+    raise ValueError(INVALID_CURSOR_DETAIL)
+
+
+def decode_cursor(cursor: str) -> list:
+    """Key values from the cursor, ValueError if the cursor is broken"""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    payload = json.loads(raw)
+    if not isinstance(payload, list) or not payload:
+        raise ValueError(INVALID_CURSOR_DETAIL)
+    return [decode_value(value) for value in payload]
+
+
+def cursor_key(cursor: str, key_columns: Sequence) -> list:
+    """
+    Key values of the cursor checked against the key columns: one value of the column type per column.
+    HTTPException 400 for any broken cursor, so a forged cursor never reaches the database
+    """
+    try:
+        values = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR_DETAIL)
+    if len(values) != len(key_columns):
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR_DETAIL)
+    for value, column in zip(values, key_columns):
+        if not isinstance(value, column.type.python_type):
+            raise HTTPException(status_code=400, detail=INVALID_CURSOR_DETAIL)
+    return values
+
+
+def page_query(page: int | None, limit: int, cursor: str | None = None) -> str:
+    """Query string of a page for the HATEOAS links"""
+    params = {"limit": limit}
+    if cursor is not None:
+        params["cursor"] = cursor
+    else:
+        params["page"] = page
+    return urlencode(params)
+
+
+async def fetch_page(db_session: AsyncSession, query: Select, key_columns: Sequence, page: int, limit: int,
+                     cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+    """
+    Entities of the query ordered by key_columns, the columns must be unique together and not null.
+    cursor == FIRST_PAGE_CURSOR - the first page, other cursor - the page after the cursor;
+    without a cursor: page == 0 - all rows, page > 0 - the page by offset (compatibility);
+    stream - all rows (after the cursor) as an async stream of a server-side cursor, page and limit are ignored
+    """
+    query = query.order_by(*key_columns)
+    if cursor is not None and cursor != FIRST_PAGE_CURSOR:
+        query = query.where(tuple_(*key_columns) > tuple_(*cursor_key(cursor, key_columns)))
+    if stream:
+        return await db_session.stream_scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    if cursor is None and page == 0:
+        result = await db_session.execute(query)
+        return Page(result.scalars().all())
+    if cursor is None:
+        query = query.offset((page - 1) * limit)
+
+    # One extra row tells whether there is a next page
+    result = await db_session.execute(query.limit(limit + 1))
+    rows = list(result.scalars().all())
+    if len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor([getattr(rows[-1], column.key) for column in key_columns]))
@@ -1,15 +1,41 @@
+import asyncio
 import json
 import os
+import tempfile
 from typing import List
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Query
 import traceback
 from db.session import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from api.parser.persistence_service import PersistenceService 
-from api.parser.parser_service import ParserService
+from api.parser.parser_service import ParserService, parse_plan_file_in_worker
+from config.settings import PARSER_UPLOAD_CHUNK_SIZE
+from config.logging_config import configure_logging
+
+# Create logger object
+logger = configure_logging()
 
 parser_router = APIRouter()
 
+
+async def save_upload_to_temp_file(file: UploadFile, upload_dir: str) -> tuple[str, int]:
+    """Запись загрузки во временный файл кусками, без чтения всего файла в память. Возвращает (путь, размер)"""
+    os.makedirs(upload_dir, exist_ok=True)
+    suffix = os.path.splitext(file.filename or "")[1]
+    temp_file = await asyncio.to_thread(tempfile.NamedTemporaryFile, dir=upload_dir, suffix=suffix, delete=False)
+    size = 0
+    try:
+        while chunk := await file.read(PARSER_UPLOAD_CHUNK_SIZE):
+            await asyncio.to_thread(temp_file.write, chunk)
+            size += len(chunk)
+    except BaseException:
+        await asyncio.to_thread(temp_file.close)
+        await asyncio.to_thread(os.remove, temp_file.name)
+        raise
+    await asyncio.to_thread(temp_file.close)
+    return temp_file.name, size
+
+
 @parser_router.post("/upload/", status_code=201)
 async def upload_file_and_parse(
     file: UploadFile = File(...),
@@ -21,8 +47,6 @@ async def upload_file_and_parse(
     modules: str = Form(None, description="JSON строка или comma-separated строка"),
     db_session: AsyncSession = Depends(get_db)
 ):
-    file_path = None
-
     # Приоритет: справочник > ручной ввод > значения по умолчанию
     if reference_name:
         # Загрузка из справочника
@@ -48,29 +72,19 @@ async def upload_file_and_parse(
         except (json.JSONDecodeError, TypeError):
             modules_list = [item.strip() for item in modules.split(',') if item.strip()] if modules else ["ОУД", "ПОО", "ПМ.02", "ПМ.03", "ПМ.05", "ПМ.06", "ПМ.07"]
 
-    upload_dir = "uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-
-    file_path = os.path.join(upload_dir, file.filename)
-    contents = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    file_path, size = await save_upload_to_temp_file(file, "uploads")
 
-    print(f"Загружен файл: {file.filename}")
-    print(f"Список разделов: {chapters_list}")
-    print(f"Список циклов: {cycles_list}")
-    print(f"Список модулей: {modules_list}")
+    logger.info(f"Загружен файл: {file.filename}")
+    logger.debug(f"Список разделов: {chapters_list}")
+    logger.debug(f"Список циклов: {cycles_list}")
+    logger.debug(f"Список модулей: {modules_list}")
 
     try:
-        parser = ParserService(
-            chapters=chapters_list,
-            cycles=cycles_list,
-            modules=modules_list,
-            sheet_name="План"
+        # Парсинг в процессе пула, в event loop возвращаемся только для сохранения в БД
+        result = await parse_plan_file_in_worker(
+            file_path, file.filename, chapters_list, cycles_list, modules_list, sheet_name="План"
         )
 
-        result = parser.parse_excel_file(file_path)
-
         persistence_service = PersistenceService(db_session)
 
         async with db_session.begin():
@@ -78,7 +92,7 @@ async def upload_file_and_parse(
 
         return {
             "filename": file.filename,
-            "size": len(contents),
+            "size": size,
             "chapters_count": len(chapters_list),
             "cycles_count": len(cycles_list),
             "modules_count": len(modules_list),
@@ -89,16 +103,15 @@ async def upload_file_and_parse(
         }
 
     except Exception as e:
-        print(f"Ошибка при парсинге или сохранении в БД: {e}")
+        logger.error(f"Ошибка при парсинге или сохранении в БД: {e}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Ошибка при парсинге файла или сохранении в БД: {str(e)}")
     finally:
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                print(f"Временный файл {file.filename} удален.")
-            except OSError as e:
-                print(f"Не удалось удалить временный файл {file.filename}: {e}")
+        try:
+            await asyncio.to_thread(os.remove, file_path)
+            logger.debug(f"Временный файл {file.filename} удален.")
+        except OSError as e:
+            logger.warning(f"Не удалось удалить временный файл {file.filename}: {e}")
 
 
 @parser_router.get("/references/")
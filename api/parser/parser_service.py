@@ -1,4 +1,7 @@
+import asyncio
+import multiprocessing
 import os
+import numpy as np
 import pandas as pd
 import re
 from typing import List, Dict, Any, Optional, Tuple, Union
@@ -6,6 +9,43 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 import json
 import math 
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from config.settings import PARSER_DEBUG_FILE_STRUCTURE, PARSER_WORKERS
+from config.logging_config import configure_logging
+
+# Create logger object
+logger = configure_logging()
+
+# Шаблоны поиска по ячейкам листа, компилируются один раз
+SPECIALITY_CODE_PATTERN = re.compile(r'\b(\d{2}\.\d{2}\.\d{2})\b')
+YEAR_PATTERN = re.compile(r'(20\d{2})')
+BARE_YEAR_PATTERN = re.compile(r'^20\d{2}\.?0*$')
+START_YEAR_LABEL = 'год начала'
+SEMESTER_PATTERN = re.compile(r'семестр', re.IGNORECASE)
+SEMESTER_NUMBER_PATTERN = re.compile(r'семестр\s+(\d+)', re.IGNORECASE)
+DIGIT_PATTERN = re.compile(r'\d')
+OP_VOLUME_PATTERN = re.compile(r'объём\s+оп', re.IGNORECASE)
+
+
+def _present_cells(df: pd.DataFrame) -> pd.Series:
+    """
+    Непустые ячейки листа одной Series в порядке обхода по строкам, индекс - номер ячейки (row * число колонок + col).
+    Строковые методы .str дают NaN для нестроковых ячеек, поэтому маски с na=False отбирают только текст
+    """
+    cells = df.to_numpy(dtype=object).ravel()
+    present = np.flatnonzero(pd.notna(cells))
+    return pd.Series(cells[present], index=present, dtype=object)
+
+
+def _cell_positions(df: pd.DataFrame, mask: pd.Series) -> np.ndarray:
+    """Позиции (row, col) ячеек маски в порядке обхода по строкам"""
+    grid = np.zeros(df.size, dtype=bool)
+    grid[mask.index.to_numpy()[mask.to_numpy(dtype=bool)]] = True
+    return np.argwhere(grid.reshape(df.shape))
+
 
 @dataclass
 class SemesterInfo:
@@ -59,6 +99,67 @@ class Certification:
     control_work: bool
     other_form: bool
 
+class PlanWorkbook:
+    """
+    Книга учебного плана, открытая и разобранная один раз на загрузку.
+    Формат определяется по сигнатуре файла (xls - xlrd, xlsx - openpyxl), листы разбираются
+    из уже открытой книги при первом обращении и запоминаются для всех проходов парсера
+    """
+    # Сигнатуры форматов: OLE2 (xls) и zip (xlsx)
+    SIGNATURES = {b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1': 'xlrd', b'PK\x03\x04': 'openpyxl'}
+    # xlrd разбирает листы только при обращении к ним, а не всю книгу при открытии
+    ENGINE_KWARGS = {'xlrd': {'on_demand': True}}
+
+    def __init__(self, source: Union[str, bytes], file_name: Optional[str] = None):
+        self.file_name = file_name or (os.path.basename(source) if isinstance(source, str) else "")
+        content = BytesIO(source) if isinstance(source, bytes) else source
+        self.engine = self.detect_engine(content)
+        self.excel_file = pd.ExcelFile(content, engine=self.engine, engine_kwargs=self.ENGINE_KWARGS.get(self.engine))
+        self.sheet_names = self.excel_file.sheet_names
+        self._sheets: Dict[str, pd.DataFrame] = {}
+        logger.debug(f"Книга '{self.file_name}' открыта ({self.engine or 'движок pandas'}), листы: {self.sheet_names}")
+
+    @classmethod
+    def detect_engine(cls, content: Union[str, BytesIO]) -> Optional[str]:
+        """Движок чтения по первым байтам файла, None - выбор остаётся за pandas"""
+        if isinstance(content, str):
+            with open(content, 'rb') as f:
+                header = f.read(8)
+        else:
+            header = content.getvalue()[:8]
+        for signature, engine in cls.SIGNATURES.items():
+            if header.startswith(signature):
+                return engine
+        return None
+
+    def sheet(self, sheet_name: str) -> pd.DataFrame:
+        df = self._sheets.get(sheet_name)
+        if df is None:
+            df = self._sheets[sheet_name] = pd.read_excel(self.excel_file, header=None, sheet_name=sheet_name)
+        return df
+
+    def title_sheet(self) -> pd.DataFrame:
+        """Титульный лист - первый лист книги"""
+        return self.sheet(self.sheet_names[0])
+
+    def plan_sheet(self, sheet_name: str) -> pd.DataFrame:
+        """Лист плана по имени, без него - первый лист"""
+        if sheet_name in self.sheet_names:
+            logger.debug(f"Используем лист: {sheet_name}")
+            return self.sheet(sheet_name)
+        logger.warning(f"Лист '{sheet_name}' не найден, используем первый лист: {self.sheet_names[0]}")
+        return self.sheet(self.sheet_names[0])
+
+    def close(self):
+        self.excel_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class ParserService:
     def __init__(self, chapters: List[str] = None, cycles: List[str] = None, modules: List[str] = None, sheet_name: str = "План"):
         self.chapters = chapters or ["ОП", "ПП"]
@@ -113,103 +214,98 @@ class ParserService:
         with open(self.reference_file_path, 'w', encoding='utf-8') as f:
             json.dump(refs, f, ensure_ascii=False, indent=2)
     
-    def parse_title_sheet(self, file_path: str) -> Tuple[Optional[int], Optional[str]]:
+    def parse_title_sheet(self, file_path: str, workbook: Optional[PlanWorkbook] = None) -> Tuple[Optional[int], Optional[str]]:
         """
         Извлекает год и код специальности из титульного листа (первый лист).
+        workbook - уже открытая книга этого файла, без неё файл открывается заново
         
         Возвращает:
             Tuple[Optional[int], Optional[str]]: (year, speciality_code)
         """
         try:
-            excel_file = pd.ExcelFile(file_path)
+            if workbook is None:
+                workbook = PlanWorkbook(file_path)
             # Используем первый лист (титульный)
-            title_sheet = excel_file.sheet_names[0]
-            df = pd.read_excel(file_path, header=None, sheet_name=title_sheet)
-            
-            year = None
-            speciality_code = None
+            df = workbook.title_sheet()
             
-            # Поиск кода специальности (ищем паттерн XX.XX.XX)
-            speciality_pattern = re.compile(r'\b(\d{2}\.\d{2}\.\d{2})\b')
-            
-            for row_idx in range(len(df)):
-                for col_idx in range(len(df.columns)):
-                    cell_value = df.iloc[row_idx, col_idx]
-                    
-                    if pd.notna(cell_value):
-                        cell_str = str(cell_value).strip()
-                        
-                        # Поиск кода специальности в формате XX.XX.XX
-                        if not speciality_code:
-                            match = speciality_pattern.search(cell_str)
-                            if match:
-                                speciality_code = match.group(1)
-                                print(f"Найден код специальности '{speciality_code}' в ({row_idx}, {col_idx})")
-                        
-                        # Поиск года начала подготовки
-                        # Ищем ячейку с текстом "год начала" или "год начала подготовки"
-                        if 'год начала' in cell_str.lower():
-                            # Год может быть в этой же ячейке или в соседних
-                            year_match = re.search(r'(20\d{2})', cell_str)
-                            if year_match:
-                                year = int(year_match.group(1))
-                                print(f"Найден год '{year}' в метке ({row_idx}, {col_idx}): {cell_str}")
-                            else:
-                                # Проверяем следующие ячейки в этой строке
-                                for next_col in range(col_idx + 1, min(col_idx + 10, len(df.columns))):
-                                    next_value = df.iloc[row_idx, next_col]
-                                    if pd.notna(next_value):
-                                        next_str = str(next_value)
-                                        year_match = re.search(r'(20\d{2})', next_str)
-                                        if year_match:
-                                            year = int(year_match.group(1))
-                                            print(f"Найден год '{year}' в ({row_idx}, {next_col}): {next_str}")
-                                            break
-                        
-                        # Прямой поиск года в формате 20XX (отдельное 4-значное число)
-                        if year is None and re.match(r'^20\d{2}\.?0*$', cell_str):
-                            year = int(float(cell_str))
-                            print(f"Найден год '{year}' в ({row_idx}, {col_idx}): {cell_str}")
+            year, speciality_code = self.find_title_values(df)
             
             # Если год не найден, пробуем извлечь из названия файла
             if year is None:
-                file_name_match = re.search(r'(20\d{2})\s*год', os.path.basename(file_path))
+                file_name_match = re.search(r'(20\d{2})\s*год', workbook.file_name)
                 if file_name_match:
                     year = int(file_name_match.group(1))
-                    print(f"Год '{year}' извлечён из имени файла")
+                    logger.info(f"Год '{year}' извлечён из имени файла")
             
             # Если специальность не найдена, пробуем извлечь из названия файла
             if not speciality_code:
-                file_spec_match = re.search(r'(\d{2}\.\d{2}\.\d{2})', os.path.basename(file_path))
+                file_spec_match = re.search(r'(\d{2}\.\d{2}\.\d{2})', workbook.file_name)
                 if file_spec_match:
                     speciality_code = file_spec_match.group(1)
-                    print(f"Код специальности '{speciality_code}' извлечён из имени файла")
+                    logger.info(f"Код специальности '{speciality_code}' извлечён из имени файла")
             
             return year, speciality_code
             
         except Exception as e:
-            print(f"Ошибка при парсинге титульного листа: {e}")
+            logger.error(f"Ошибка при парсинге титульного листа: {e}")
             return None, None
 
-    def debug_print_file_structure(self, file_path: str):
-        print("=== ОТЛАДКА ФАЙЛА ===")
+    def find_title_values(self, df: pd.DataFrame) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Поиск года начала подготовки и кода специальности по ячейкам титульного листа.
+        Код - первое совпадение XX.XX.XX по строкам, год - из последней метки "год начала"
+        (в самой метке или в одной из 9 следующих ячеек строки), без метки - первая ячейка вида 20XX
+        """
+        texts = _present_cells(df).astype(str).str.strip()
 
-        try:
-            excel_file = pd.ExcelFile(file_path)
-            print(f"Доступные листы: {excel_file.sheet_names}")
+        speciality_code = None
+        codes = texts.str.extract(SPECIALITY_CODE_PATTERN, expand=False)
+        speciality_cells = _cell_positions(df, codes.notna())
+        if speciality_cells.size:
+            row_idx, col_idx = speciality_cells[0]
+            speciality_code = codes[codes.notna()].iat[0]
+            logger.debug(f"Найден код специальности '{speciality_code}' в ({row_idx}, {col_idx})")
 
-            if self.sheet_name in excel_file.sheet_names:
-                print(f"Используем лист: {self.sheet_name}")
-                df = pd.read_excel(file_path, header=None, sheet_name=self.sheet_name)
-            else:
-                print(f"Лист '{self.sheet_name}' не найден, используем первый лист: {excel_file.sheet_names[0]}")
-                df = pd.read_excel(file_path, header=None, sheet_name=excel_file.sheet_names[0])
+        year = None
+        labels = texts.str.lower().str.contains(START_YEAR_LABEL, regex=False, na=False)
+        for row_idx, col_idx in _cell_positions(df, labels):
+            label_year = self._find_label_year(df, int(row_idx), int(col_idx))
+            if label_year is not None:
+                year = label_year
+
+        if year is None:
+            bare_years = _cell_positions(df, texts.str.match(BARE_YEAR_PATTERN, na=False))
+            if bare_years.size:
+                row_idx, col_idx = bare_years[0]
+                year = int(float(str(df.iat[row_idx, col_idx]).strip()))
+                logger.debug(f"Найден год '{year}' в ({row_idx}, {col_idx}): {df.iat[row_idx, col_idx]}")
+
+        return year, speciality_code
 
-            print(f"Размерность DataFrame: {df.shape}")
-            print(f"Первые 10 строк:")
-            print(df.head(10))
-            print(f"Последние 10 строк:")
-            print(df.tail(10))
+    def _find_label_year(self, df: pd.DataFrame, row_idx: int, col_idx: int) -> Optional[int]:
+        """Год в ячейке метки "год начала" или в одной из 9 следующих ячеек её строки"""
+        for next_col in range(col_idx, min(col_idx + 10, len(df.columns))):
+            next_value = df.iat[row_idx, next_col]
+            if pd.notna(next_value):
+                year_match = YEAR_PATTERN.search(str(next_value))
+                if year_match:
+                    year = int(year_match.group(1))
+                    logger.debug(f"Найден год '{year}' в ({row_idx}, {next_col}): {next_value}")
+                    return year
+        return None
+
+    def debug_print_file_structure(self, file_path: str, workbook: Optional[PlanWorkbook] = None):
+        logger.debug("=== ОТЛАДКА ФАЙЛА ===")
+
+        try:
+            if workbook is None:
+                workbook = PlanWorkbook(file_path)
+            logger.debug(f"Доступные листы: {workbook.sheet_names}")
+            df = workbook.plan_sheet(self.sheet_name)
+
+            logger.debug(f"Размерность DataFrame: {df.shape}")
+            logger.debug(f"Первые 10 строк:\n{df.head(10)}")
+            logger.debug(f"Последние 10 строк:\n{df.tail(10)}")
 
             found_keywords = []
             for row_idx in range(min(30, len(df))):
@@ -225,15 +321,15 @@ class ParserService:
                             found_keywords.append(f"Категория в ({row_idx}, {col_idx}): {cell_value}")
 
             if found_keywords:
-                print("Найденные ключевые слова:")
+                logger.debug("Найденные ключевые слова:")
                 for kw in found_keywords:
-                    print(f"  {kw}")
+                    logger.debug(f"  {kw}")
             else:
-                print("Ключевые слова не найдены в первых 30 строках/колонках")
+                logger.debug("Ключевые слова не найдены в первых 30 строках/колонках")
 
         except Exception as e:
-            print(f"Ошибка при отладке файла: {e}")
-        print("=== КОНЕЦ ОТЛАДКИ ===")
+            logger.warning(f"Ошибка при отладке файла: {e}")
+        logger.debug("=== КОНЕЦ ОТЛАДКИ ===")
     
     def parse_weeks_string(self, input_str: str) -> Tuple[float, int]:
         """Парсинг строк с неделями"""
@@ -266,27 +362,15 @@ class ParserService:
     
     def find_semester_rows(self, df: pd.DataFrame) -> List[Tuple[int, int, str]]:
         """Находит строки с 'Семестр'"""
-        results = []
-        
-        for row_idx in range(len(df)):
-            for col_idx in range(len(df.columns)):
-                cell_value = df.iloc[row_idx, col_idx]
-                
-                if pd.notna(cell_value) and isinstance(cell_value, str):
-                    # Ищем различные варианты написания "Семестр"
-                    if re.search(r'семестр', cell_value, re.IGNORECASE):
-                        # Извлекаем номер семестра
-                        match = re.search(r'(\d+)', cell_value)
-                        if match:
-                            semester_num = int(match.group(1))
-                            results.append((row_idx, col_idx, cell_value))
-        
-        return results
+        cells = _present_cells(df)
+        # Ищем различные варианты написания "Семестр" с номером семестра
+        mask = cells.str.contains(SEMESTER_PATTERN, na=False) & cells.str.contains(DIGIT_PATTERN, na=False)
+        return [(int(row_idx), int(col_idx), df.iat[row_idx, col_idx]) for row_idx, col_idx in _cell_positions(df, mask)]
     
     def parse_semester_weeks(self, df: pd.DataFrame) -> List[SemesterInfo]:
         """Парсинг недель по семестрам"""
         semester_rows = self.find_semester_rows(df)
-        print(f"Найдено {len(semester_rows)} строк с 'Семестр': {semester_rows}")
+        logger.debug(f"Найдено {len(semester_rows)} строк с 'Семестр': {semester_rows}")
         
         semester_info_list = []
         
@@ -308,7 +392,7 @@ class ParserService:
                         practice_weeks=practice_weeks
                     )
                     semester_info_list.append(semester_info)
-                    print(f"Найдены недели для семестра {semester_num}: weeks={weeks}, practice_weeks={practice_weeks}")
+                    logger.debug(f"Найдены недели для семестра {semester_num}: weeks={weeks}, practice_weeks={practice_weeks}")
                 else:
                     # Если ячейка пустая, создаем с нулями
                     match = re.search(r'(\d+)', value)
@@ -319,90 +403,57 @@ class ParserService:
                         practice_weeks=0
                     )
                     semester_info_list.append(semester_info)
-                    print(f"Создана пустая запись для семестра {semester_num}")
+                    logger.debug(f"Создана пустая запись для семестра {semester_num}")
         
         return semester_info_list
     
     def find_second_op_volume_row(self, df: pd.DataFrame) -> Optional[int]:
         """Находит вторую строку с 'Объём ОП'"""
-        op_volume_rows = []
-        
-        for row_idx in range(len(df)):
-            row = df.iloc[row_idx]
-            for cell in row:
-                if pd.notna(cell) and isinstance(cell, str):
-                    if re.search(r'объём\s+оп', cell, re.IGNORECASE):
-                        op_volume_rows.append(row_idx)
-                        print(f"Найдена строка 'Объём ОП' на строке {row_idx}: {cell}")
-                        if len(op_volume_rows) == 2:
-                            return op_volume_rows[1]
-        
-        print(f"Найдено {len(op_volume_rows)} строк с 'Объём ОП'")
+        mask = _present_cells(df).str.contains(OP_VOLUME_PATTERN, na=False)
+        # Строка учитывается столько раз, сколько в ней ячеек с 'Объём ОП'
+        op_volume_rows = [int(row_idx) for row_idx, _ in _cell_positions(df, mask)[:2]]
+        for row_idx in op_volume_rows:
+            logger.debug(f"Найдена строка 'Объём ОП' на строке {row_idx}")
+        
+        if len(op_volume_rows) < 2:
+            logger.warning(f"Найдено {len(op_volume_rows)} строк с 'Объём ОП'")
         return op_volume_rows[1] if len(op_volume_rows) >= 2 else (op_volume_rows[0] if op_volume_rows else None)
     
     def find_semester_columns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Находит колонки с 'Семестр' и номером"""
-        semester_columns = []
+        cells = _present_cells(df)
+        numbers = cells.str.extract(SEMESTER_NUMBER_PATTERN, expand=False)
+        mask = numbers.notna()
+        numbers = numbers[mask].astype(int)
         
-        for row_idx in range(len(df)):
-            for col_idx in range(len(df.columns)):
-                cell_value = df.iloc[row_idx, col_idx]
-                
-                if pd.notna(cell_value) and isinstance(cell_value, str):
-                    match = re.search(r'семестр\s+(\d+)', cell_value, re.IGNORECASE)
-                    if match:
-                        semester_num = int(match.group(1))
-                        semester_columns.append({
-                            'semester': semester_num,
-                            'col_index': col_idx,
-                            'row_index': row_idx
-                        })
-                        print(f"Найдена колонка семестра {semester_num} на ({row_idx}, {col_idx}): {cell_value}")
+        semester_columns = []
+        for (row_idx, col_idx), semester_num in zip(_cell_positions(df, mask), numbers):
+            semester_columns.append({
+                'semester': int(semester_num),
+                'col_index': int(col_idx),
+                'row_index': int(row_idx)
+            })
+            logger.debug(f"Найдена колонка семестра {semester_num} на ({row_idx}, {col_idx}): {df.iat[row_idx, col_idx]}")
         
         return semester_columns
     
     def extract_semester_data(self, subject_row: pd.Series, semester_col_index: int) -> Dict[str, float]:
         """Извлечение данных из 10 колонок после значения семестра"""
-        data = {
-            'value': 0,
-            'col1': 0, 'col2': 0, 'col3': 0, 'col4': 0, 'col5': 0,
-            'col6': 0, 'col7': 0, 'col8': 0, 'col9': 0, 'col10': 0
-        }
+        field_names = ['value', 'col1', 'col2', 'col3', 'col4', 'col5', 'col6', 'col7', 'col8', 'col9', 'col10']
+        data = {field_name: 0 for field_name in field_names}
         
-        if len(subject_row) > semester_col_index:
-            cell_value = subject_row.iloc[semester_col_index]
+        # Значение семестра и 10 колонок после него одним срезом строки
+        cells = subject_row.iloc[semester_col_index:semester_col_index + len(field_names)].tolist()
+        for field_name, cell_value in zip(field_names, cells):
             if pd.notna(cell_value) and cell_value != "" and cell_value != 0:
                 # Проверяем, является ли значение числом
                 if isinstance(cell_value, (int, float)) and not math.isnan(cell_value):
-                    data['value'] = float(cell_value)
+                    data[field_name] = float(cell_value)
                 elif isinstance(cell_value, str) and cell_value.replace('.', '').replace('-', '').isdigit():
                     try:
-                        data['value'] = float(cell_value)
+                        data[field_name] = float(cell_value)
                     except ValueError:
-                        data['value'] = 0
-                else:
-                    data['value'] = 0
-        
-        col_names = ['col1', 'col2', 'col3', 'col4', 'col5', 'col6', 'col7', 'col8', 'col9', 'col10']
-        for i, col_name in enumerate(col_names):
-            col_index = semester_col_index + 1 + i
-            if len(subject_row) > col_index:
-                cell_value = subject_row.iloc[col_index]
-                if pd.notna(cell_value) and cell_value != "" and cell_value != 0:
-                    # Проверяем, является ли значение числом
-                    if isinstance(cell_value, (int, float)) and not math.isnan(cell_value):
-                        data[col_name] = float(cell_value)
-                    elif isinstance(cell_value, str) and cell_value.replace('.', '').replace('-', '').isdigit():
-                        try:
-                            data[col_name] = float(cell_value)
-                        except ValueError:
-                            data[col_name] = 0
-                    else:
-                        data[col_name] = 0
-                else:
-                    data[col_name] = 0
-            else:
-                data[col_name] = 0
+                        data[field_name] = 0
         
         return data
     
@@ -431,30 +482,28 @@ class ParserService:
         semesters_info = []
         
         if op_volume_row_idx is None:
-            print("Вторая строка 'Объём ОП' не найдена")
+            logger.warning("Вторая строка 'Объём ОП' не найдена")
             return semesters_info
         
-        print(f"Обработка предмета '{subject_name}' для {len(semester_columns)} семестров")
+        logger.debug(f"Обработка предмета '{subject_name}' для {len(semester_columns)} семестров")
         
         for sem_col in semester_columns:
             semester_col_index = sem_col['col_index']
             
             if len(subject_row) > semester_col_index:
                 semester_data = self.extract_semester_data(subject_row, semester_col_index)
-                print("SEMESTER DATA", semester_data)
                 
                 # Проверяем, есть ли значение в "value"
                 if (semester_data['value'] != 0 and 
                     semester_data['value'] is not None and 
                     semester_data['value'] != "") or semester_data['col4'] != 0:
                     
-                    print(f"Найдены данные для семестра {sem_col['semester']}: {semester_data}")
-                    print(f"{self.is_practice_subject(subject_name)} Проверка на практику")
+                    logger.debug(f"Найдены данные для семестра {sem_col['semester']}: {semester_data}")
                     
                     if self.is_practice_subject(subject_name):
                         # Для практик: умножаем 36 на значение в practical_hours (col4)
                         practical_hours = semester_data['col4']
-                        print(f"practical_hours: {practical_hours}")
+                        logger.debug(f"practical_hours: {practical_hours}")
                         
                         if practical_hours and practical_hours != 0 and practical_hours != "":
                             lectures_hours = 36 * practical_hours
@@ -470,9 +519,9 @@ class ParserService:
                                 certification_hours=semester_data['col9']
                             )
                             semesters_info.append(hour_record)
-                            print(f"Создана запись для практики '{subject_name}', семестр {sem_col['semester']}")
+                            logger.debug(f"Создана запись для практики '{subject_name}', семестр {sem_col['semester']}")
                         else:
-                            print(f"Практика '{subject_name}' не имеет practical_hours или practical_hours = 0, пропускаем")
+                            logger.debug(f"Практика '{subject_name}' не имеет practical_hours или practical_hours = 0, пропускаем")
                     else:
                         # Для обычных предметов: стандартная обработка
                         hour_record = SubjectHours(
@@ -487,44 +536,71 @@ class ParserService:
                             certification_hours=semester_data['col9']
                         )
                         semesters_info.append(hour_record)
-                        print(f"Создана запись для предмета '{subject_name}', семестр {sem_col['semester']}")
+                        logger.debug(f"Создана запись для предмета '{subject_name}', семестр {sem_col['semester']}")
         
         return semesters_info
     
-    def find_subject_in_data(self, df: pd.DataFrame, subject_code: str, subject_name: str) -> Optional[Tuple[int, pd.Series]]:
-        """Поиск предмета в данных по коду и названию"""
-        for row_idx in range(len(df)):
-            row = df.iloc[row_idx]
-            if len(row) >= 3:  # Проверяем, что строка имеет хотя бы 3 колонки
-                code = row.iloc[1] if 1 < len(row) else None  # код в колонке 1
-                name = row.iloc[2] if 2 < len(row) else None  # название в колонке 2
-                
-                if (pd.notna(code) and pd.notna(name) and 
-                    str(code) == subject_code and str(name) == subject_name):
-                    print(f"Найден предмет: {subject_code} - {subject_name} на строке {row_idx}")
-                    return row_idx, row
+    def build_subject_index(self, df: pd.DataFrame) -> Dict[Tuple[str, str], Tuple[int, pd.Series]]:
+        """
+        Индекс строк предметов за один проход по листу: (код, название) -> (номер строки, строка),
+        код в колонке 1, название в колонке 2, для повторяющихся берётся первая строка
+        """
+        if len(df.columns) < 3:
+            return {}
+        values = df.to_numpy(dtype=object)
+        rows = np.flatnonzero((df.iloc[:, 1].notna() & df.iloc[:, 2].notna()).to_numpy())
+        
+        subject_index = {}
+        for row_idx in rows:
+            key = (str(values[row_idx, 1]), str(values[row_idx, 2]))
+            if key not in subject_index:
+                subject_index[key] = (int(row_idx), pd.Series(values[row_idx], index=df.columns, name=df.index[row_idx]))
+        return subject_index
+    
+    def find_subject_in_data(
+        self, 
+        df: pd.DataFrame, 
+        subject_code: str, 
+        subject_name: str, 
+        subject_index: Optional[Dict[Tuple[str, str], Tuple[int, pd.Series]]] = None
+    ) -> Optional[Tuple[int, pd.Series]]:
+        """Поиск предмета в данных по коду и названию, subject_index - индекс build_subject_index этого же листа"""
+        if subject_index is None:
+            subject_index = self.build_subject_index(df)
+        
+        search_result = subject_index.get((subject_code, subject_name))
+        if search_result is not None:
+            logger.debug(f"Найден предмет: {subject_code} - {subject_name} на строке {search_result[0]}")
+            return search_result
         
-        print(f"Предмет не найден: {subject_code} - {subject_name}")
+        logger.warning(f"Предмет не найден: {subject_code} - {subject_name}")
         return None
     
-    def parse_subject_hours(self, df: pd.DataFrame, structure: List[Chapter]) -> List[Dict[str, Any]]:
+    def parse_subject_hours(
+        self, 
+        df: pd.DataFrame, 
+        structure: List[Chapter], 
+        subject_index: Optional[Dict[Tuple[str, str], Tuple[int, pd.Series]]] = None
+    ) -> List[Dict[str, Any]]:
         """Парсинг информации о часах для предметов"""
         # Извлекаем все дисциплины из структуры
         all_subjects = self.extract_all_subjects(structure)
-        print(f"Найдено {len(all_subjects)} предметов для поиска в Excel")
+        logger.info(f"Найдено {len(all_subjects)} предметов для поиска в Excel")
+        if subject_index is None:
+            subject_index = self.build_subject_index(df)
         
         # Находим колонки с семестрами
         semester_columns = self.find_semester_columns(df)
-        print(f"Найдено {len(semester_columns)} колонок с семестрами")
+        logger.info(f"Найдено {len(semester_columns)} колонок с семестрами")
         
         # Находим вторую строку с "Объём ОП"
         second_op_volume_row = self.find_second_op_volume_row(df)
-        print(f"Вторая строка 'Объём ОП' найдена на строке: {second_op_volume_row}")
+        logger.info(f"Вторая строка 'Объём ОП' найдена на строке: {second_op_volume_row}")
         
         subjects_with_info = []
         
         for subject in all_subjects:
-            search_result = self.find_subject_in_data(df, subject.code, subject.name)
+            search_result = self.find_subject_in_data(df, subject.code, subject.name, subject_index)
             
             semesters_info = []
             
@@ -609,15 +685,22 @@ class ParserService:
         
         return [s for s in semesters if s != 0]  # исключаем 0
     
-    def parse_subject_assessments(self, df: pd.DataFrame, structure: List[Chapter]) -> List[Dict[str, Any]]:
+    def parse_subject_assessments(
+        self, 
+        df: pd.DataFrame, 
+        structure: List[Chapter], 
+        subject_index: Optional[Dict[Tuple[str, str], Tuple[int, pd.Series]]] = None
+    ) -> List[Dict[str, Any]]:
         """Парсинг информации об оценках для предметов"""
         # Извлекаем все дисциплины из структуры
         all_subjects = self.extract_all_subjects(structure)
+        if subject_index is None:
+            subject_index = self.build_subject_index(df)
         
         subjects_with_assessments = []
         
         for subject in all_subjects:
-            search_result = self.find_subject_in_data(df, subject.code, subject.name)
+            search_result = self.find_subject_in_data(df, subject.code, subject.name, subject_index)
             
             semester_assessments = []
             
@@ -681,22 +764,26 @@ class ParserService:
         """Парсинг структуры учебного плана"""
         structure = []
         
-        # Собираем все строки с категориями
-        all_rows = []
-        for i in range(len(df)):
-            row = df.iloc[i]
-            if len(row) >= 2:
-                second_column_value = row.iloc[1] if 1 < len(row) else None
-                if pd.notna(second_column_value):
-                    all_rows.append({
-                        'row_index': i,
-                        'col1': row.iloc[0] if 0 < len(row) else None,
-                        'col2': row.iloc[1] if 1 < len(row) else None,
-                        'col3': row.iloc[2] if 2 < len(row) else None,
-                        'col4': row.iloc[3] if 3 < len(row) else None,
-                    })
-        
-        print(f"Найдено {len(all_rows)} строк для анализа структуры")
+        # Собираем все строки с категориями (непустая вторая колонка)
+        if len(df.columns) >= 2:
+            head = df.iloc[:, :4].to_numpy(dtype=object)
+            row_indexes = np.flatnonzero(df.iloc[:, 1].notna().to_numpy())
+        else:
+            head = np.empty((0, 4), dtype=object)
+            row_indexes = np.empty(0, dtype=int)
+        
+        all_rows = [
+            {
+                'row_index': int(i),
+                'col1': head[i, 0],
+                'col2': head[i, 1],
+                'col3': head[i, 2] if head.shape[1] > 2 else None,
+                'col4': head[i, 3] if head.shape[1] > 3 else None,
+            }
+            for i in row_indexes
+        ]
+        
+        logger.debug(f"Найдено {len(all_rows)} строк для анализа структуры")
         
         # Идентифицируем типы строк
         for row_data in all_rows:
@@ -704,7 +791,7 @@ class ParserService:
             
             if category in self.chapters:
                 # Это раздел (chapter)
-                print(f"Найден раздел: {category} - {row_data['col3']}")
+                logger.debug(f"Найден раздел: {category} - {row_data['col3']}")
                 structure.append(Chapter(
                     code=category,
                     name=row_data['col3'],  # название раздела
@@ -714,7 +801,7 @@ class ParserService:
                 # Это цикл - находим последний добавленный раздел
                 if structure:
                     parent_chapter = structure[-1]
-                    print(f"Найден цикл: {category} - {row_data['col3']} в разделе {parent_chapter.code}")
+                    logger.debug(f"Найден цикл: {category} - {row_data['col3']} в разделе {parent_chapter.code}")
                     parent_chapter.cycles.append(Cycle(
                         code=category,
                         name=row_data['col3'],  # название цикла
@@ -726,7 +813,7 @@ class ParserService:
                 if structure and structure[-1].cycles:
                     parent_chapter = structure[-1]
                     parent_cycle = parent_chapter.cycles[-1]
-                    print(f"Найден модуль: {category} - {row_data['col3']} в цикле {parent_cycle.code}")
+                    logger.debug(f"Найден модуль: {category} - {row_data['col3']} в цикле {parent_cycle.code}")
                     parent_cycle.modules.append(Module(
                         code=category,
                         name=row_data['col3'],  # название модуля
@@ -742,7 +829,7 @@ class ParserService:
                         parent_chapter = structure[-1]
                         parent_cycle = parent_chapter.cycles[-1]
                         parent_module = parent_cycle.modules[-1]
-                        print(f"Найден предмет в модуле: {category} - {row_data['col3']} в модуле {parent_module.code}")
+                        logger.debug(f"Найден предмет в модуле: {category} - {row_data['col3']} в модуле {parent_module.code}")
                         parent_module.subjects.append(Subject(
                             code=category,
                             name=row_data['col3']
@@ -751,13 +838,13 @@ class ParserService:
                         # Дисциплина в цикле (не в модуле)
                         parent_chapter = structure[-1]
                         parent_cycle = parent_chapter.cycles[-1]
-                        print(f"Найден предмет в цикле: {category} - {row_data['col3']} в цикле {parent_cycle.code}")
+                        logger.debug(f"Найден предмет в цикле: {category} - {row_data['col3']} в цикле {parent_cycle.code}")
                         parent_cycle.subjects.append(Subject(
                             code=category,
                             name=row_data['col3']
                         ))
         
-        print(f"Построена структура: {len(structure)} разделов")
+        logger.info(f"Построена структура: {len(structure)} разделов")
         return structure
     
     def clean_nan_values(self, obj):
@@ -773,61 +860,63 @@ class ParserService:
         else:
             return obj
     
-    def parse_excel_file(self, file_path: str) -> Dict[str, Any]:
-        """Парсинг Excel файла"""
-        # Отладочная печать структуры файла
-        self.debug_print_file_structure(file_path)
+    def parse_excel_file(
+        self, 
+        file_path: Union[str, bytes], 
+        file_name: Optional[str] = None, 
+        debug_structure: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Парсинг Excel файла (путь или содержимое файла, file_name - имя для содержимого).
+        Книга открывается один раз, все проходы работают с её разобранными листами.
+        debug_structure - вывести в лог структуру файла, по умолчанию PARSER_DEBUG_FILE_STRUCTURE
+        """
+        with PlanWorkbook(file_path, file_name) as workbook:
+            # Отладочная печать структуры файла, только по запросу
+            if PARSER_DEBUG_FILE_STRUCTURE if debug_structure is None else debug_structure:
+                self.debug_print_file_structure(workbook.file_name, workbook)
+
+            # Парсим титульный лист для извлечения года и специальности
+            logger.debug("Запуск парсера титульного листа (год и специальность)...")
+            year, speciality_code = self.parse_title_sheet(workbook.file_name, workbook)
+
+            df = workbook.plan_sheet(self.sheet_name)
 
-        # Парсим титульный лист для извлечения года и специальности
-        print("Запуск парсера титульного листа (год и специальность)...")
-        year, speciality_code = self.parse_title_sheet(file_path)
-        
         # Значения по умолчанию, если не найдены
         if year is None:
             year = 2023
-            print("Год не найден, используем значение по умолчанию: 2023")
+            logger.warning("Год не найден, используем значение по умолчанию: 2023")
         if not speciality_code:
             speciality_code = "09.02.07"
-            print("Код специальности не найден, используем значение по умолчанию: 09.02.07")
+            logger.warning("Код специальности не найден, используем значение по умолчанию: 09.02.07")
         
-        print(f"Извлечены данные: год={year}, специальность={speciality_code}")
-
-        try:
-            # Загружаем Excel файл с указанным листом
-            excel_file = pd.ExcelFile(file_path)
-            if self.sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(file_path, header=None, sheet_name=self.sheet_name)
-                print(f"Используем лист: {self.sheet_name}")
-            else:
-                print(f"Лист '{self.sheet_name}' не найден, используем первый лист: {excel_file.sheet_names[0]}")
-                df = pd.read_excel(file_path, header=None, sheet_name=excel_file.sheet_names[0])
-        except Exception as e:
-            print(f"Ошибка при загрузке Excel-файла: {e}")
-            # Пробуем с другим движком
-            try:
-                df = pd.read_excel(file_path, header=None, sheet_name=self.sheet_name, engine='openpyxl')
-                print(f"Успешно загружен с движком openpyxl, лист: {self.sheet_name}")
-            except:
-                df = pd.read_excel(file_path, header=None, engine='xlrd')
-                print(f"Успешно загружен с движком xlrd, первый лист")
+        logger.info(f"Извлечены данные: год={year}, специальность={speciality_code}")
 
-        print(f"Файл загружен, размер: {df.shape}")
+        logger.info(f"Файл загружен, размер: {df.shape}")
 
-        print("Запуск парсера недель по семестрам...")
+        logger.debug("Запуск парсера недель по семестрам...")
         semester_weeks = self.parse_semester_weeks(df)
-        print(f"Получено {len(semester_weeks)} записей о неделях")
+        logger.info(f"Получено {len(semester_weeks)} записей о неделях")
 
-        print("Запуск парсера структуры учебного плана...")
+        logger.debug("Запуск парсера структуры учебного плана...")
         structured_curriculum = self.parse_structure(df)
-        print(f"Получена структура с {len(structured_curriculum)} разделами")
+        logger.info(f"Получена структура с {len(structured_curriculum)} разделами")
+
+        # Один индекс строк предметов на все проходы
+        subject_index = self.build_subject_index(df)
+        logger.debug(f"Проиндексировано {len(subject_index)} строк предметов")
 
-        print("Запуск парсера информации по семестрам для предметов...")
-        subjects_with_hours = self.parse_subject_hours(df, structured_curriculum)
-        print(f"Получено {len(subjects_with_hours)} предметов с информацией о часах")
+        logger.debug("Запуск парсера информации по семестрам для предметов...")
+        subjects_with_hours = self.parse_subject_hours(df, structured_curriculum, subject_index)
+        logger.info(f"Получено {len(subjects_with_hours)} предметов с информацией о часах")
 
-        print("Запуск парсера оценок по семестрам...")
-        subjects_with_assessments = self.parse_subject_assessments(df, structured_curriculum)
-        print(f"Получено {len(subjects_with_assessments)} предметов с информацией об оценках")
+        logger.debug("Запуск парсера оценок по семестрам...")
+        subjects_with_assessments = self.parse_subject_assessments(df, structured_curriculum, subject_index)
+        logger.info(f"Получено {len(subjects_with_assessments)} предметов с информацией об оценках")
+
+        # Часы и оценки по (код, название) предмета
+        hours_by_subject = self._index_subject_records(subjects_with_hours, 'hours')
+        certifications_by_subject = self._index_subject_records(subjects_with_assessments, 'certifications')
 
         # Собираем всё в одну структуру
         complete_structure = {
@@ -869,8 +958,8 @@ class ParserService:
                                             'title': subject.name,  # используем атрибут объекта
                                             'module_in_cycle_id': module_idx + 1,
                                             'cycle_in_chapter_id': cycle_idx + 1,
-                                            'hours': self._get_subject_hours(subject.code, subject.name, subjects_with_hours),
-                                            'certifications': self._get_subject_certifications(subject.code, subject.name, subjects_with_assessments)
+                                            'hours': hours_by_subject.get((subject.code, subject.name), []),
+                                            'certifications': certifications_by_subject.get((subject.code, subject.name), [])
                                         }
                                         for subject_idx, subject in enumerate(module.subjects)
                                     ]
@@ -884,8 +973,8 @@ class ParserService:
                                     'title': subject.name,  # используем атрибут объекта
                                     'module_in_cycle_id': None,
                                     'cycle_in_chapter_id': cycle_idx + 1,
-                                    'hours': self._get_subject_hours(subject.code, subject.name, subjects_with_hours),
-                                    'certifications': self._get_subject_certifications(subject.code, subject.name, subjects_with_assessments)
+                                    'hours': hours_by_subject.get((subject.code, subject.name), []),
+                                    'certifications': certifications_by_subject.get((subject.code, subject.name), [])
                                 }
                                 for subject_idx, subject in enumerate(cycle.subjects)
                             ]
@@ -897,23 +986,49 @@ class ParserService:
             ]
         }
 
-        print(f"Полная структура построена: {len(complete_structure['chapters'])} разделов, {len(complete_structure['semesters'])} семестров")
+        logger.info(f"Полная структура построена: {len(complete_structure['chapters'])} разделов, {len(complete_structure['semesters'])} семестров")
 
         # Очищаем структуру от NaN значений перед возвратом
         cleaned_structure = self.clean_nan_values(complete_structure)
 
         return cleaned_structure
     
-    def _get_subject_hours(self, code: str, name: str, subjects_with_hours: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Получение часов для конкретного предмета"""
-        for subject in subjects_with_hours:
-            if subject['code'] == code and subject['name'] == name:
-                return subject.get('hours', [])
-        return []
-    
-    def _get_subject_certifications(self, code: str, name: str, subjects_with_assessments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Получение оценок для конкретного предмета"""
-        for subject in subjects_with_assessments:
-            if subject['code'] == code and subject['name'] == name:
-                return subject.get('certifications', [])
-        return []
\ No newline at end of file
+    def _index_subject_records(self, subjects: List[Dict[str, Any]], field: str) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Поле записей предметов по (код, название), для повторяющихся предметов берётся первая запись"""
+        records = {}
+        for subject in subjects:
+            records.setdefault((subject['code'], subject['name']), subject.get(field, []))
+        return records
+
+
+def parse_plan_file(
+    file_path: str, 
+    file_name: Optional[str], 
+    chapters: List[str], 
+    cycles: List[str], 
+    modules: List[str], 
+    sheet_name: str = "План"
+) -> Dict[str, Any]:
+    """Парсинг файла учебного плана в процессе пула, в api возвращается только словарь плана"""
+    parser = ParserService(chapters=chapters, cycles=cycles, modules=modules, sheet_name=sheet_name)
+    return parser.parse_excel_file(file_path, file_name)
+
+
+# Worker processes for parsing the plans, the parsing is CPU bound and would block the event loop.
+# Processes are started on the first upload, spawn is used because forking a process
+# with a running event loop and threads is not safe
+parser_executor = ProcessPoolExecutor(max_workers=PARSER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+async def parse_plan_file_in_worker(
+    file_path: str, 
+    file_name: Optional[str], 
+    chapters: List[str], 
+    cycles: List[str], 
+    modules: List[str], 
+    sheet_name: str = "План"
+) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        parser_executor, partial(parse_plan_file, file_path, file_name, chapters, cycles, modules, sheet_name)
+    )
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import PaymentForm
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 class PaymentFormDAL:
     """Data Access Layer for operating payment form info"""
@@ -26,14 +27,9 @@ class PaymentFormDAL:
         return deleted_payment_form
 
     @log_exceptions
-    async def get_all_payment_forms(self, page: int, limit: int) -> list[PaymentForm]:
-        if page == 0:
-            query = select(PaymentForm).order_by(PaymentForm.payment_name.asc())
-        else:
-            query = select(PaymentForm).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        payment_forms = list(result.scalars().all())
-        return payment_forms
+    async def get_all_payment_forms(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(PaymentForm)
+        return await fetch_page(self.db_session, query, (PaymentForm.payment_name,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_payment_form(self, payment_name: str) -> PaymentForm | None:
@@ -23,7 +23,7 @@ async def get_payment_form_by_name(payment_name: str, request: Request, db: Asyn
 
 @payment_form_router.get("/search", response_model=ShowPaymentFormListWithHATEOAS)
 async def get_all_payment_forms(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await payment_service._get_all_payment_forms(query_param.page, query_param.limit, request, db)
+    return await payment_service._get_all_payment_forms(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @payment_form_router.delete("/delete/{payment_name}", response_model=ShowPaymentFormWithHATEOAS, responses={404: {"description": "Форма оплаты не найдена"}})
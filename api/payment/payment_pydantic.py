@@ -23,4 +23,5 @@ class ShowPaymentFormWithHATEOAS(TunedModel):
 
 class ShowPaymentFormListWithHATEOAS(TunedModel):
     payment_forms: List[ShowPaymentFormWithHATEOAS]
-    links: dict[str, str] = {}
\ No newline at end of file
+    links: dict[str, str] = {}
+    next_cursor: str | None = None
\ No newline at end of file
@@ -2,12 +2,22 @@ from api.payment.payment_pydantic import *
 from api.services_helpers import ensure_payment_form_exists, ensure_payment_form_unique
 from api.payment.payment_DAL import PaymentFormDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+PAYMENT_FORM_LINKS = LinkSet(
+    self=Link("get_payment_form_by_name"),
+    update=Link("update_payment_form"),
+    delete=Link("delete_payment_form"),
+    payment_forms=Link("get_all_payment_forms")
+)
+
 
 class PaymentService:
     async def _create_new_payment_form(self, body: CreatePaymentForm, request: Request, db) -> ShowPaymentFormWithHATEOAS:
@@ -21,20 +31,11 @@ class PaymentService:
                     payment_form = await payment_form_dal.create_payment_form(
                         payment_name=body.payment_name
                     )
-                    payment_name = payment_form.payment_name
                     payment_form_pydantic = ShowPaymentForm.model_validate(payment_form, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/payment-forms/search/by_name/{payment_name}',
-                        "update": f'{api_base_url}/payment-forms/update',
-                        "delete": f'{api_base_url}/payment-forms/delete/{payment_name}',
-                        "payment_forms": f'{api_base_url}/payment-forms',
-                        "groups": f'{api_base_url}/groups/search/by_payment_form/{payment_name}'
-                    }
+                    hateoas_links = PAYMENT_FORM_LINKS.bind(api_base_url)(payment_form)
 
                     return ShowPaymentFormWithHATEOAS(payment_form=payment_form_pydantic, links=hateoas_links)
 
@@ -57,17 +58,9 @@ class PaymentService:
                         raise HTTPException(status_code=404, detail=f"Форма оплаты с именем '{payment_name}' не найдена")
                     payment_form_pydantic = ShowPaymentForm.model_validate(payment_form, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/payment-forms/search/by_name/{payment_name}',
-                        "update": f'{api_base_url}/payment-forms/update',
-                        "delete": f'{api_base_url}/payment-forms/delete/{payment_name}',
-                        "payment_forms": f'{api_base_url}/payment-forms',
-                        "groups": f'{api_base_url}/groups/search/by_payment_form/{payment_name}'
-                    }
+                    hateoas_links = PAYMENT_FORM_LINKS.bind(api_base_url)(payment_form)
 
                     return ShowPaymentFormWithHATEOAS(payment_form=payment_form_pydantic, links=hateoas_links)
 
@@ -78,37 +71,35 @@ class PaymentService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_payment_forms(self, page: int, limit: int, request: Request, db) -> ShowPaymentFormListWithHATEOAS:
+    async def _get_all_payment_forms(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowPaymentFormListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 payment_form_dal = PaymentFormDAL(session)
                 try:
-                    payment_forms = await payment_form_dal.get_all_payment_forms(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    payment_form_links = PAYMENT_FORM_LINKS.bind(api_base_url)
 
-                    payment_forms_with_hateoas = []
-                    for payment_form in payment_forms:
+                    def to_hateoas(payment_form) -> ShowPaymentFormWithHATEOAS:
                         payment_form_pydantic = ShowPaymentForm.model_validate(payment_form, from_attributes=True)
-                        payment_name = payment_form.payment_name
-                        payment_form_links = {
-                            "self": f'{api_base_url}/payment-forms/search/by_name/{payment_name}',
-                            "update": f'{api_base_url}/payment-forms/update',
-                            "delete": f'{api_base_url}/payment-forms/delete/{payment_name}',
-                            "payment_forms": f'{api_base_url}/payment-forms',
-                            "groups": f'{api_base_url}/groups/search/by_payment_form/{payment_name}'
-                        }
-                        payment_form_with_links = ShowPaymentFormWithHATEOAS(payment_form=payment_form_pydantic, links=payment_form_links)
-                        payment_forms_with_hateoas.append(payment_form_with_links)
+                        payment_form_with_links = ShowPaymentFormWithHATEOAS(payment_form=payment_form_pydantic, links=payment_form_links(payment_form))
+                        return payment_form_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: PaymentFormDAL(stream_session).get_all_payment_forms(page, limit, cursor, stream=True), to_hateoas)
+
+                    payment_forms = await payment_form_dal.get_all_payment_forms(page, limit, cursor)
+
+                    payment_forms_with_hateoas = [to_hateoas(payment_form) for payment_form in payment_forms]
 
                     collection_links = {
-                        "self": f'{api_base_url}/payment-forms/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/payment-forms/create'
+                        "self": route_url(api_base_url, "get_all_payment_forms", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_payment_forms", query=page_query(None, limit, payment_forms.next_cursor)) if payment_forms.next_cursor else None,
+                        "create": route_url(api_base_url, "create_payment_form")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowPaymentFormListWithHATEOAS(payment_forms=payment_forms_with_hateoas, links=collection_links)
+                    return ShowPaymentFormListWithHATEOAS(payment_forms=payment_forms_with_hateoas, links=collection_links, next_cursor=payment_forms.next_cursor)
 
                 except HTTPException:
                     raise
@@ -131,13 +122,11 @@ class PaymentService:
 
                     payment_form_pydantic = ShowPaymentForm.model_validate(payment_form, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "payment_forms": f'{api_base_url}/payment-forms',
-                        "create": f'{api_base_url}/payment-forms/create'
+                        "payment_forms": route_url(api_base_url, "get_all_payment_forms"),
+                        "create": route_url(api_base_url, "create_payment_form")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -175,20 +164,11 @@ class PaymentService:
                     if not payment_form:
                         raise HTTPException(status_code=404, detail=f"Форма оплаты с именем '{body.payment_name}' не найдена")
 
-                    payment_name = payment_form.payment_name 
                     payment_form_pydantic = ShowPaymentForm.model_validate(payment_form, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/payment-forms/search/by_name/{payment_name}',
-                        "update": f'{api_base_url}/payment-forms/update',
-                        "delete": f'{api_base_url}/payment-forms/delete/{payment_name}',
-                        "payment_forms": f'{api_base_url}/payment-forms',
-                        "groups": f'{api_base_url}/groups/search/by_payment_form/{payment_name}'
-                    }
+                    hateoas_links = PAYMENT_FORM_LINKS.bind(api_base_url)(payment_form)
 
                     return ShowPaymentFormWithHATEOAS(payment_form=payment_form_pydantic, links=hateoas_links)
 
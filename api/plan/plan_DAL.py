@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Chapter, Cycle, Module, Plan, SubjectsInCycle, SubjectsInCycleHours
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class PlanDAL:
@@ -28,14 +29,9 @@ class PlanDAL:
         return deleted_plan
 
     @log_exceptions
-    async def get_all_plans(self, page: int, limit: int) -> list[Plan]:
-        if page == 0:
-            query = select(Plan).order_by(Plan.id.asc())
-        else:
-            query = select(Plan).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        plans = list(result.scalars().all())
-        return plans
+    async def get_all_plans(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Plan)
+        return await fetch_page(self.db_session, query, (Plan.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_plan_by_year_and_speciality(self, year: int, speciality_code: str) -> Plan | None:
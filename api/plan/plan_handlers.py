@@ -33,7 +33,7 @@ async def get_plan_by_subject_hours_id(subject_hours_id: int, request: Request,
 
 @plan_router.get("/search", response_model=ShowPlanListWithHATEOAS)
 async def get_all_plans(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await plan_service._get_all_plans(query_param.page, query_param.limit, request, db)
+    return await plan_service._get_all_plans(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @plan_router.delete("/delete/{plan_id}", response_model=ShowPlanWithHATEOAS, responses={404: {"description": "Учебный план не найден"}})
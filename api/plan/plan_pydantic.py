@@ -28,4 +28,5 @@ class ShowPlanWithHATEOAS(TunedModel):
 class ShowPlanListWithHATEOAS(TunedModel):
     plans: List[ShowPlanWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
@@ -3,12 +3,24 @@ from api.services_helpers import ensure_plan_exists, ensure_speciality_exists
 from api.plan.plan_DAL import PlanDAL
 from api.speciality.speciality_DAL import SpecialityDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+PLAN_LINKS = LinkSet(
+    self=Link("get_plan_by_id", plan_id="id"),
+    update=Link("update_plan"),
+    delete=Link("delete_plan", plan_id="id"),
+    plans=Link("get_all_plans"),
+    speciality=Link("get_speciality_by_code"),
+    chapters=Link("get_chapters_by_plan", plan_id="id")
+)
+
 
 class PlanService:
     async def _create_new_plan(self, body: CreatePlan, request: Request, db) -> ShowPlanWithHATEOAS:
@@ -24,22 +36,11 @@ class PlanService:
                         year=body.year,
                         speciality_code=body.speciality_code
                     )
-                    plan_id = plan.id
                     plan_pydantic = ShowPlan.model_validate(plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/plans/search/by_id/{plan_id}',
-                        "update": f'{api_base_url}/plans/update',
-                        "delete": f'{api_base_url}/plans/delete/{plan_id}',
-                        "plans": f'{api_base_url}/plans',
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{body.speciality_code}',
-                        "chapters": f'{api_base_url}/chapters/search/by_plan/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters/search/by_plan/{plan_id}'
-                    }
+                    hateoas_links = PLAN_LINKS.bind(api_base_url)(plan)
 
                     return ShowPlanWithHATEOAS(plan=plan_pydantic, links=hateoas_links)
 
@@ -62,19 +63,9 @@ class PlanService:
                         raise HTTPException(status_code=404, detail=f"Учебный план с id {plan_id} не найден")
                     plan_pydantic = ShowPlan.model_validate(plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/plans/search/by_id/{plan_id}',
-                        "update": f'{api_base_url}/plans/update',
-                        "delete": f'{api_base_url}/plans/delete/{plan_id}',
-                        "plans": f'{api_base_url}/plans',
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{plan.speciality_code}',
-                        "chapters": f'{api_base_url}/chapters/search/by_plan/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters/search/by_plan/{plan_id}'
-                    }
+                    hateoas_links = PLAN_LINKS.bind(api_base_url)(plan)
 
                     return ShowPlanWithHATEOAS(plan=plan_pydantic, links=hateoas_links)
 
@@ -95,20 +86,10 @@ class PlanService:
                         raise HTTPException(status_code=404, detail=f"Учебный план для специальнсоти {speciality} в {year} году не найден")
                     plan_pydantic = ShowPlan.model_validate(plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
                     plan_id = plan.id
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/plans/search/by_id/{plan_id}',
-                        "update": f'{api_base_url}/plans/update',
-                        "delete": f'{api_base_url}/plans/delete/{plan_id}',
-                        "plans": f'{api_base_url}/plans',
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{plan.speciality_code}',
-                        "chapters": f'{api_base_url}/chapters/search/by_plan/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters/search/by_plan/{plan_id}'
-                    }
+                    hateoas_links = PLAN_LINKS.bind(api_base_url)(plan)
 
                     return ShowPlanWithHATEOAS(plan=plan_pydantic, links=hateoas_links)
 
@@ -119,39 +100,35 @@ class PlanService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_plans(self, page: int, limit: int, request: Request, db) -> ShowPlanListWithHATEOAS:
+    async def _get_all_plans(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowPlanListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 plan_dal = PlanDAL(session)
                 try:
-                    plans = await plan_dal.get_all_plans(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    plans_with_hateoas = []
-                    for plan in plans:
+                    plan_links = PLAN_LINKS.bind(api_base_url)
+
+                    def to_hateoas(plan) -> ShowPlanWithHATEOAS:
                         plan_pydantic = ShowPlan.model_validate(plan, from_attributes=True)
-                        plan_id = plan.id
-                        plan_links = {
-                            "self": f'{api_base_url}/plans/search/by_id/{plan_id}',
-                            "update": f'{api_base_url}/plans/update',
-                            "delete": f'{api_base_url}/plans/delete/{plan_id}',
-                            "plans": f'{api_base_url}/plans',
-                            "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{plan.speciality_code}',
-                            "chapters": f'{api_base_url}/chapters/search/by_plan/{plan_id}',
-                            "semesters": f'{api_base_url}/semesters/search/by_plan/{plan_id}'
-                        }
-                        plan_with_links = ShowPlanWithHATEOAS(plan=plan_pydantic, links=plan_links)
-                        plans_with_hateoas.append(plan_with_links)
+                        plan_with_links = ShowPlanWithHATEOAS(plan=plan_pydantic, links=plan_links(plan))
+                        return plan_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: PlanDAL(stream_session).get_all_plans(page, limit, cursor, stream=True), to_hateoas)
+
+                    plans = await plan_dal.get_all_plans(page, limit, cursor)
+
+                    plans_with_hateoas = [to_hateoas(plan) for plan in plans]
 
                     collection_links = {
-                        "self": f'{api_base_url}/plans/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/plans/create'
+                        "self": route_url(api_base_url, "get_all_plans", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_plans", query=page_query(None, limit, plans.next_cursor)) if plans.next_cursor else None,
+                        "create": route_url(api_base_url, "create_plan")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowPlanListWithHATEOAS(plans=plans_with_hateoas, links=collection_links)
+                    return ShowPlanListWithHATEOAS(plans=plans_with_hateoas, links=collection_links, next_cursor=plans.next_cursor)
 
                 except HTTPException:
                     raise
@@ -170,22 +147,10 @@ class PlanService:
                         raise HTTPException(status_code=404, detail=f"Учебный план, связанный с записью о часах предмета с id {subject_hours_id}, не найден")
 
                     plan_pydantic = ShowPlan.model_validate(plan, from_attributes=True)
-                    plan_id = plan.id
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/plans/search/by_id/{plan_id}',
-                        "update": f'{api_base_url}/plans/update',
-                        "delete": f'{api_base_url}/plans/delete/{plan_id}',
-                        "plans": f'{api_base_url}/plans',
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{plan.speciality_code}',
-                        "chapters": f'{api_base_url}/chapters/search/by_plan/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters/search/by_plan/{plan_id}',
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = PLAN_LINKS.bind(api_base_url)(plan)
 
                     return ShowPlanWithHATEOAS(plan=plan_pydantic, links=hateoas_links)
 
@@ -212,13 +177,11 @@ class PlanService:
 
                     plan_pydantic = ShowPlan.model_validate(plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "plans": f'{api_base_url}/plans',
-                        "create": f'{api_base_url}/plans/create'
+                        "plans": route_url(api_base_url, "get_all_plans"),
+                        "create": route_url(api_base_url, "create_plan")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -255,22 +218,11 @@ class PlanService:
                     if not plan:
                         raise HTTPException(status_code=404, detail=f"Учебный план с id {body.plan_id} не найден")
 
-                    plan_id = plan.id
                     plan_pydantic = ShowPlan.model_validate(plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/plans/search/by_id/{plan_id}',
-                        "update": f'{api_base_url}/plans/update',
-                        "delete": f'{api_base_url}/plans/delete/{plan_id}',
-                        "plans": f'{api_base_url}/plans',
-                        "speciality": f'{api_base_url}/specialities/search/by_speciality_code/{plan.speciality_code}',
-                        "chapters": f'{api_base_url}/chapters/search/by_plan/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters/search/by_plan/{plan_id}'
-                    }
+                    hateoas_links = PLAN_LINKS.bind(api_base_url)(plan)
 
                     return ShowPlanWithHATEOAS(plan=plan_pydantic, links=hateoas_links)
 
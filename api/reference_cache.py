@@ -0,0 +1,148 @@
+"""
+In-process cache of the keys of the small reference tables which almost never change:
+session types, payment forms, teacher categories, buildings, cabinets, specialities.
+The existence checks of api.loaders answer from it without a query.
+The tables are loaded at startup and reloaded by a periodic refresh (changes of other processes).
+A write of a cached table in a db session (flush, INSERT/UPDATE/DELETE or a text statement) is remembered
+in the session: the session itself checks the table in the database until the end of its transaction,
+the end of the transaction invalidates the table (and the tables changed by its db cascades),
+it is loaded again on the next check
+"""
+import asyncio
+from itertools import chain
+from typing import TYPE_CHECKING, Hashable
+
+from sqlalchemy import TextClause, event, select
+from sqlalchemy.orm import Session as SyncSession
+
+from config.settings import REFERENCE_CACHE_ENABLED
+from config.logging_config import configure_logging
+
+if TYPE_CHECKING:
+    from api.loaders import Key
+
+# Create logger object
+logger = configure_logging()
+
+WRITES_KEY = "reference_writes"
+
+
+class ReferenceCache:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        # Table name -> keys of the table
+        self.keys: dict[str, list["Key"]] = {}
+        # Key -> values of the key in the table, no entry until the table is loaded
+        self.values: dict["Key", frozenset] = {}
+        # Table name -> number of invalidations, a load started before an invalidation is not kept
+        self.generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def register(self, key: "Key") -> "Key":
+        self.keys.setdefault(key.model.__table__.name, []).append(key)
+        return key
+
+    def serves(self, db_session, key: "Key") -> bool:
+        """Whether the key is cached and the db session hasn't written its table"""
+        table_name = key.model.__table__.name
+        return (self.enabled and key in self.keys.get(table_name, ())
+                and table_name not in db_session.info.get(WRITES_KEY, ()))
+
+    def lookup(self, key: "Key", value: Hashable) -> bool | None:
+        """Whether the value exists, None if the table is not loaded"""
+        values = self.values.get(key)
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value in values
+
+    async def reload(self, db_session, key: "Key") -> frozenset:
+        table_name = key.model.__table__.name
+        generation = self.generations.get(table_name, 0)
+        res = await db_session.execute(select(*key.columns))
+        values = frozenset(key.value_of(row) for row in res)
+        self.reloads += 1
+        if self.generations.get(table_name, 0) == generation:
+            self.values[key] = values
+        return values
+
+    def invalidate(self, table_names: set[str]) -> None:
+        for table_name in table_names | self._cascades(table_names):
+            self.generations[table_name] = self.generations.get(table_name, 0) + 1
+            for key in self.keys.get(table_name, ()):
+                self.values.pop(key, None)
+
+    def _cascades(self, table_names: set[str]) -> set[str]:
+        """Cached tables whose rows are changed by the db cascades of writes of the tables (cabinets of a building)"""
+        return {key.model.__table__.name for keys in self.keys.values() for key in keys
+                for foreign_key in key.model.__table__.foreign_keys
+                if foreign_key.column.table.name in table_names
+                and "CASCADE" in (foreign_key.ondelete, foreign_key.onupdate)}
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "tables": {table_name: sum(len(self.values[key]) for key in keys if key in self.values)
+                       if all(key in self.values for key in keys) else None
+                       for table_name, keys in self.keys.items()},
+        }
+
+
+reference_cache = ReferenceCache(enabled=REFERENCE_CACHE_ENABLED)
+
+
+async def load_reference_cache(session_factory) -> bool:
+    """Load all cached tables, without them the checks are made in the database"""
+    try:
+        async with session_factory() as session:
+            for key in chain.from_iterable(reference_cache.keys.values()):
+                await reference_cache.reload(session, key)
+    except Exception as e:
+        logger.warning(f"Кэш справочников не загружен, проверки будут выполняться в базе данных (Ошибка: {e})")
+        return False
+    logger.info(f"Кэш справочников загружен: {', '.join(reference_cache.keys)}")
+    return True
+
+
+async def reference_cache_refresh_loop(session_factory, interval_seconds: int):
+    """Periodic full reload, catches the changes of other processes"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await load_reference_cache(session_factory)
+
+
+def _track_writes(sync_session, table_names: set[str]) -> None:
+    table_names &= reference_cache.keys.keys()
+    if table_names:
+        sync_session.info.setdefault(WRITES_KEY, set()).update(table_names)
+
+
+@event.listens_for(SyncSession, "after_flush")
+def _track_flushed_writes(sync_session, flush_context):
+    _track_writes(sync_session, {type(obj).__table__.name
+                                 for obj in chain(sync_session.new, sync_session.dirty, sync_session.deleted)})
+
+
+@event.listens_for(SyncSession, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _track_writes(orm_execute_state.session, {statement.table.name})
+    elif isinstance(statement, TextClause):
+        # TRUNCATE of the restore and the like, the tables are unknown
+        _track_writes(orm_execute_state.session, set(reference_cache.keys))
+
+
+@event.listens_for(SyncSession, "after_transaction_end")
+def _invalidate_written_tables(sync_session, transaction):
+    # A rollback invalidates as well: the engine runs in autocommit, the statements are already applied
+    if transaction.parent is not None:
+        return
+    table_names = sync_session.info.pop(WRITES_KEY, None)
+    if table_names:
+        reference_cache.invalidate(table_names)
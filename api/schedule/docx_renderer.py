@@ -0,0 +1,177 @@
+"""
+Rendering of schedule docx documents outside the event loop.
+
+The template is read from disk once and reloaded only when its mtime changes,
+rendering runs in a bounded pool, rendered documents are cached by key
+(e.g. group, week, schedule version) in memory and on disk, both are bounded
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from docxtpl import DocxTemplate
+
+from config.settings import (
+    ROOT_PATH, DOCX_RENDER_WORKERS, DOCX_CACHE_SIZE, DOCX_CACHE_DIR, DOCX_CACHE_DISK_SIZE, DOCX_EXPORT_WORKERS
+)
+from config.logging_config import configure_logging
+
+# Create logger object
+logger = configure_logging()
+
+TEMPLATE_PATH = f"{ROOT_PATH}/api/schedule/templates/template_schedule.docx"
+
+
+class TemplateCache:
+    """
+    Keeps the template file content in memory and reloads it when the file mtime changes.
+    docxtpl changes the document while rendering, so every render opens
+    the package from these bytes instead of the disk
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._content: bytes | None = None
+        self._mtime: float | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> bytes:
+        mtime = os.path.getmtime(self.path)
+        if self._content is None or mtime != self._mtime:
+            with self._lock:
+                if self._content is None or mtime != self._mtime:
+                    with open(self.path, "rb") as f:
+                        self._content = f.read()
+                    self._mtime = mtime
+                    logger.info(f"Шаблон {self.path} загружен в память")
+        return self._content
+
+
+# Every process has its own copy of the cache, so it also works in worker processes
+template_cache = TemplateCache(TEMPLATE_PATH)
+
+
+def render_docx(context: dict) -> bytes:
+    """Render the schedule template with the context. Blocking, runs in the pool"""
+    doc = DocxTemplate(BytesIO(template_cache.get()))
+    doc.render(context)
+
+    file_stream = BytesIO()
+    doc.save(file_stream)
+    return file_stream.getvalue()
+
+
+def context_version(context: dict) -> str:
+    """Fingerprint of the document data, changes whenever the schedule in the document changes"""
+    dumped = json.dumps(context, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(dumped.encode("utf-8")).hexdigest()
+
+
+class RenderedDocumentCache:
+    """
+    LRU cache of rendered documents in memory with an optional copy on disk.
+    The disk keeps at most max_files documents, the least recently used ones (by mtime,
+    which is renewed on every read) are deleted, files of earlier runs count too
+    """
+    def __init__(self, max_size: int, cache_dir: str | None = None, max_files: int = DOCX_CACHE_DISK_SIZE):
+        self.max_size = max_size
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_files = max_files
+        self._documents: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _file_path(self, key: tuple) -> Path:
+        name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{name}.docx"
+
+    def get(self, key: tuple) -> bytes | None:
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                return document
+
+        if self.cache_dir is not None:
+            file_path = self._file_path(key)
+            try:
+                document = file_path.read_bytes()
+                os.utime(file_path)
+            except OSError:
+                return None
+            self._remember(key, document)
+            return document
+        return None
+
+    def put(self, key: tuple, document: bytes):
+        self._remember(key, document)
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._file_path(key).write_bytes(document)
+                self._prune_files()
+            except OSError as e:
+                logger.warning(f"Не удалось сохранить документ в кэш на диске (Ошибка: {e})")
+
+    def _prune_files(self):
+        """Delete the least recently used files above max_files"""
+        files = []
+        for file_path in self.cache_dir.glob("*.docx"):
+            try:
+                files.append((file_path.stat().st_mtime, file_path))
+            except FileNotFoundError:
+                continue
+        if len(files) <= self.max_files:
+            return
+        files.sort()
+        for _, file_path in files[:len(files) - self.max_files]:
+            file_path.unlink(missing_ok=True)
+
+    def _remember(self, key: tuple, document: bytes):
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+
+
+class DocxRenderer:
+    """Renders documents in the executor so the event loop is not blocked"""
+    def __init__(self, executor: Executor, cache: RenderedDocumentCache):
+        self.executor = executor
+        self.cache = cache
+
+    async def render(self, context: dict, executor: Executor | None = None) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self.executor, render_docx, context)
+
+    async def render_cached(self, key: tuple, context: dict, executor: Executor | None = None) -> bytes:
+        """
+        key - what the document is about (e.g. group name and week start),
+        the version of the context is added to it, so a changed schedule is rendered again.
+        executor - where to render instead of the default pool (e.g. the export processes)
+        """
+        cache_key = (*key, context_version(context))
+        document = await asyncio.to_thread(self.cache.get, cache_key)
+        if document is not None:
+            return document
+
+        document = await self.render(context, executor)
+        await asyncio.to_thread(self.cache.put, cache_key, document)
+        return document
+
+
+docx_renderer = DocxRenderer(
+    executor=ThreadPoolExecutor(max_workers=DOCX_RENDER_WORKERS, thread_name_prefix="docx-render"),
+    cache=RenderedDocumentCache(max_size=DOCX_CACHE_SIZE, cache_dir=DOCX_CACHE_DIR or None)
+)
+
+# Worker processes for exporting many documents at once, processes are started on the first export.
+# spawn is used because forking a process with a running event loop and threads is not safe
+export_executor = ProcessPoolExecutor(max_workers=DOCX_EXPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
@@ -0,0 +1,118 @@
+"""
+Streaming of many schedule documents as one ZIP archive.
+
+Documents are rendered in the export worker processes with a bounded number
+of documents in flight, every finished document is written to the archive
+and sent to the client right away, so the archive is never kept in memory
+"""
+
+import asyncio
+import zipfile
+from collections import deque
+from datetime import date
+from itertools import groupby
+from typing import AsyncIterator, Iterable, Iterator
+
+from api.schedule.docx_renderer import docx_renderer, export_executor
+from api.schedule.generate_doc import build_schedule_context, format_teacher_fio
+from config.settings import DOCX_EXPORT_WORKERS
+from config.logging_config import configure_logging
+
+# Create logger object
+logger = configure_logging()
+
+
+class ZipChunkBuffer:
+    """
+    Write-only file object for ZipFile. It is not seekable, so ZipFile writes
+    sizes in data descriptors after every entry instead of going back in the file
+    """
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def safe_file_name(name: str) -> str:
+    return "".join("_" if char in '/\\:*?"<>|' else char for char in str(name)).strip() or "_"
+
+
+def iter_report_documents(sessions_rows, start_period_date: date, include_teachers: bool = False) -> Iterator[tuple]:
+    """
+    sessions_rows - rows from SessionDAL.get_sessions_report_rows for all groups.
+    Yields (file name in the archive, cache key, context) for every group and, if asked, every teacher
+    """
+    by_group = sorted(sessions_rows, key=lambda row: row.group_name)
+    for group_name, group_rows in groupby(by_group, key=lambda row: row.group_name):
+        context = build_schedule_context(group_name, list(group_rows), start_period_date)
+        yield f"groups/{safe_file_name(group_name)}.docx", ("group", group_name, start_period_date), context
+
+    if not include_teachers:
+        return
+
+    with_teacher = sorted((row for row in sessions_rows if row.teacher_id is not None), key=lambda row: row.teacher_id)
+    for teacher_id, teacher_rows in groupby(with_teacher, key=lambda row: row.teacher_id):
+        teacher_rows = list(teacher_rows)
+        first_row = teacher_rows[0]
+        teacher_fio = format_teacher_fio(first_row.teacher_surname, first_row.teacher_name, first_row.teacher_fathername)
+        context = build_schedule_context(teacher_fio, teacher_rows, start_period_date, for_teacher=True)
+        yield (f"teachers/{safe_file_name(teacher_fio)}_{teacher_id}.docx",
+               ("teacher", teacher_id, start_period_date), context)
+
+
+async def stream_documents_zip(documents: Iterable[tuple], max_in_flight: int = DOCX_EXPORT_WORKERS * 2) -> AsyncIterator[bytes]:
+    """
+    documents - (file name, cache key, context) tuples.
+    Documents are rendered in parallel, but written to the archive in the given order
+    """
+    documents = iter(documents)
+    in_flight: deque[tuple[str, asyncio.Task]] = deque()
+
+    def submit_next() -> bool:
+        document = next(documents, None)
+        if document is None:
+            return False
+        file_name, key, context = document
+        in_flight.append((file_name, asyncio.ensure_future(
+            docx_renderer.render_cached(key, context, executor=export_executor))))
+        return True
+
+    buffer = ZipChunkBuffer()
+    try:
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            while len(in_flight) < max(max_in_flight, 1) and submit_next():
+                pass
+
+            while in_flight:
+                file_name, task = in_flight.popleft()
+                content = await task
+                submit_next()
+
+                # docx is already a zip archive, compressing it once more gives almost nothing
+                archive.writestr(file_name, content)
+                yield buffer.pop()
+
+        # Central directory of the archive
+        yield buffer.pop()
+    except Exception as e:
+        logger.warning(f"Выгрузка архива с расписанием прервана (Ошибка: {e})")
+        raise
+    finally:
+        # The client may disconnect, the rest of the documents are not needed then
+        for _, task in in_flight:
+            task.cancel()
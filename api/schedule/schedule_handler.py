@@ -1,17 +1,33 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Query, Request
 from datetime import date
 from db.session import get_db
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from api.schedule.schedule_services import ScheduleService
+from api.session.schedule_versions import GROUP, versioned_response
 
 schedule_router = APIRouter()
 schedule_service = ScheduleService()
 
-@schedule_router.get("/search/sessions/report/for-group/{group_name}/{period_start_date}", status_code=200)
-async def get_sessions_report_by_group(group_name: str, period_start_date: date, AsyncSession = Depends(get_db)):
-    return await schedule_service._get_sessions_report_by_group(group_name, period_start_date, AsyncSession)
+@schedule_router.get("/search/sessions/report/for-group/{group_name}/{period_start_date}", status_code=200, responses={304: {"description": "Расписание не изменилось"}})
+async def get_sessions_report_by_group(group_name: str, period_start_date: date, request: Request, AsyncSession = Depends(get_db)):
+    return await versioned_response(request, GROUP, group_name, lambda: schedule_service._get_sessions_report_by_group(group_name, period_start_date, AsyncSession))
+
+@schedule_router.get("/report/all/{period_start_date}", status_code=200)
+async def get_all_sessions_reports(period_start_date: date,
+                                   include_teachers: bool = Query(False, description="Добавить в архив документы преподавателей"),
+                                   AsyncSession = Depends(get_db)):
+    return await schedule_service._get_all_sessions_reports(period_start_date, include_teachers, AsyncSession)
 
 @schedule_router.post("/copy/{start_copy_period_date}/{start_period_date}/{count_days}", status_code=200)
-async def copy_schedule_in_range(start_copy_period_date: date, start_period_date: date, count_days: int, AsyncSession = Depends(get_db)):
-    return await schedule_service._copy_all_schedule(start_copy_period_date, start_period_date, count_days, AsyncSession)
\ No newline at end of file
+async def copy_schedule_in_range(start_copy_period_date: date,
+                                 start_period_date: date,
+                                 count_days: int,
+                                 repeat: int = Query(1, ge=1, le=52, description="Сколько раз подряд скопировать диапазон"),
+                                 group_names: list[str] | None = Query(None, description="Копировать только занятия этих групп"),
+                                 teacher_id: int | None = Query(None, description="Копировать только занятия преподавателя"),
+                                 building_number: int | None = Query(None, description="Копировать только занятия в здании"),
+                                 AsyncSession = Depends(get_db)):
+    return await schedule_service._copy_all_schedule(start_copy_period_date, start_period_date, count_days, AsyncSession,
+                                                     repeat=repeat, group_names=group_names, teacher_id=teacher_id,
+                                                     building_number=building_number)
\ No newline at end of file
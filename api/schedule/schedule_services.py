@@ -1,13 +1,15 @@
 from api.services_helpers import ensure_group_exists
 from api.session.session_DAL import SessionDAL
 from api.group.group_DAL import GroupDAL
-from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
 from fastapi import HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
+from sqlalchemy.exc import IntegrityError
+from fastapi.responses import Response, StreamingResponse, JSONResponse
 
 from config.logging_config import configure_logging
 
-from api.schedule.generate_doc import generate_schedule
+from api.schedule.generate_doc import build_schedule_context
+from api.schedule.docx_renderer import docx_renderer
+from api.schedule.report_archive import iter_report_documents, stream_documents_zip
 
 from datetime import timedelta, date
 
@@ -28,32 +30,29 @@ class ScheduleService:
             async with session.begin():
                 try:
                     group_dal = GroupDAL(db)
-                    teacher_in_plan_dal = TeacherInPlanDAL(db)
                     session_dal = SessionDAL(db)
 
                     group = await ensure_group_exists(group_dal, group_name)
                     if not group:
                         raise HTTPException(status_code=404, detail=f"Группа с таким названием: {group_name} не существует")
 
-                    # Get all teacher_in_plan_id from group_name
-                    teachers_in_plan = await teacher_in_plan_dal.get_teachers_in_plans_by_group(group_name, page=0, limit=10)
-                    teachers_in_plan_ids = [teacher.teacher_id for teacher in teachers_in_plan]
-
                     # Give end range days
                     end_period_date = calculate_end_period_date(start_period_date, 6)
 
-                    # Get session
-                    sessions = await session_dal.get_sessions_by_teacher_in_plan_and_date(teachers_in_plan_ids,
-                                                                                          start_period_date,
-                                                                                          end_period_date)
-                    if not sessions:
+                    # Get sessions with teachers and subjects by one query
+                    sessions_rows = await session_dal.get_sessions_report_rows(start_period_date,
+                                                                               end_period_date,
+                                                                               group_name=group_name)
+                    if not sessions_rows:
                         raise HTTPException(status_code=404,
                                             detail=f"Для группы: {group_name} на неделю с начала даты: {start_period_date} не найдено учебных занятий")
 
-                    # Generate docx
-                    created_docx = await generate_schedule(group_name, sessions, start_period_date, db) # -> return stream
+                    # Generate docx in the pool, the same week with the same data is taken from the cache
+                    context = build_schedule_context(group_name, sessions_rows, start_period_date)
+                    created_docx = await docx_renderer.render_cached(("group", group_name, start_period_date), context)
 
-                    return StreamingResponse(
+                    # The document is in memory, a plain response can be kept by the schedule read cache
+                    return Response(
                         created_docx,
                         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                         headers={"Content-Disposition": f"attachment; filename=schedule.docx"}
@@ -65,32 +64,72 @@ class ScheduleService:
                     logger.warning(f"Получение документа отменено (Ошибка: {e})")
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
-    async def _copy_all_schedule(self, start_copy_period_date: date, start_period_date: date, count_days: int, db):
+    async def _get_all_sessions_reports(self, start_period_date: date, include_teachers: bool, db):
+        """
+        Documents for all groups (and teachers) for the week in one ZIP archive.
+        All sessions are loaded by one query, documents are rendered while the archive is sent
+        """
+        async with db as session:
+            async with session.begin():
+                try:
+                    session_dal = SessionDAL(db)
+
+                    # Give end range days
+                    end_period_date = calculate_end_period_date(start_period_date, 6)
+
+                    # Get sessions of all groups with teachers and subjects by one query
+                    sessions_rows = await session_dal.get_sessions_report_rows(start_period_date, end_period_date)
+                    if not sessions_rows:
+                        raise HTTPException(status_code=404,
+                                            detail=f"На неделю с начала даты: {start_period_date} не найдено учебных занятий")
+
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Получение архива документов отменено (Ошибка: {e})")
+                    raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
+
+        # Rows are already loaded, the archive is streamed after the database session is closed
+        documents = iter_report_documents(sessions_rows, start_period_date, include_teachers=include_teachers)
+        return StreamingResponse(
+            stream_documents_zip(documents),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename=schedule_{start_period_date}.zip"}
+        )
+
+    async def _copy_all_schedule(self, start_copy_period_date: date, start_period_date: date, count_days: int, db,
+                                 repeat: int = 1, group_names: list[str] | None = None, teacher_id: int | None = None,
+                                 building_number: int | None = None):
         """
         start_copy_period_date - первый день диапазона, с которого будем копировать расписание
         start_period_date - первый день диапазона, на который будем копировать расписание
         count_days - количество дней для копирования
+        repeat - сколько раз подряд скопировать диапазон (например, на N недель вперёд)
+        group_names, teacher_id, building_number - необязательные фильтры копируемых занятий
         """
         async with db as session:
             async with session.begin():
                 try:
                     session_dal = SessionDAL(db)
+                    filters = {"group_names": group_names, "teacher_id": teacher_id, "building_number": building_number}
 
                     # Рассчитываем конечные даты диапазонов
                     end_period_copy_date = calculate_end_period_date(start_copy_period_date, count_days)
-                    end_period_date = calculate_end_period_date(start_period_date, count_days)
+                    # Длина диапазона в днях, на неё сдвигается каждая следующая копия
+                    period_length = count_days + 1
+                    end_period_date = calculate_end_period_date(start_period_date, period_length * repeat - 1)
 
-                    # Получаем сессии, которые будем копировать
-                    copied_sessions = await session_dal.get_sessions_by_date_range(start_copy_period_date, end_period_copy_date)
-                    if not copied_sessions:
+                    # Проверяем, есть ли что копировать
+                    copied_count = await session_dal.count_sessions_by_date_range(start_copy_period_date, end_period_copy_date, **filters)
+                    if not copied_count:
                         raise HTTPException(
                             status_code=404,
                             detail=f"Расписание за период с {start_copy_period_date} по {end_period_copy_date} не найдено"
                         )
 
                     # Проверяем, есть ли уже расписание на новый период
-                    existing_sessions = await session_dal.get_sessions_by_date_range(start_period_date, end_period_date)
-                    if existing_sessions:
+                    existing_count = await session_dal.count_sessions_by_date_range(start_period_date, end_period_date, **filters)
+                    if existing_count:
                         raise HTTPException(
                             status_code=409,
                             detail=f"На период с {start_period_date} по {end_period_date} расписание уже существует"
@@ -99,19 +138,29 @@ class ScheduleService:
                     # Вычисляем разницу в днях для сдвига дат
                     days_diff = (start_period_date - start_copy_period_date).days
 
-                    # Копируем каждую сессию с новой датой
-                    for old_session in copied_sessions:
-                        new_date = old_session.date + timedelta(days=days_diff)
-                        await session_dal.create_session(
-                            session_number=old_session.session_number,
-                            session_date=new_date,
-                            teacher_in_plan=old_session.teacher_in_plan,
-                            session_type=old_session.session_type,
-                            cabinet_number=old_session.cabinet_number,
-                            building_number=old_session.building_number
+                    # Копируем все занятия одним запросом на стороне БД
+                    try:
+                        created_count = await session_dal.copy_sessions_by_date_range(
+                            start_copy_period_date,
+                            end_period_copy_date,
+                            days_shift=days_diff,
+                            repeat=repeat,
+                            repeat_step_days=period_length,
+                            **filters
+                        )
+                    except IntegrityError:
+                        raise HTTPException(
+                            status_code=409,
+                            detail=f"Копируемые занятия пересекаются с расписанием на период с {start_period_date} по {end_period_date}"
                         )
 
-                    return {"message": f"Расписание успешно скопировано с {start_copy_period_date} на {start_period_date}"}
+                    return {
+                        "message": f"Расписание успешно скопировано с {start_copy_period_date} на {start_period_date}",
+                        "source_sessions_count": copied_count,
+                        "created_sessions_count": created_count,
+                        "repeat": repeat,
+                        "end_period_date": end_period_date
+                    }
 
                 except HTTPException:
                     raise
@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Semester
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class SemesterDAL:
@@ -22,6 +23,16 @@ class SemesterDAL:
         await self.db_session.flush()
         return new_semester
 
+    @log_exceptions
+    async def create_semesters(self, semesters_data: list[dict]) -> None:
+        """
+        Insert many rows with one statement.
+        semesters_data - list of dicts with keys: semester, weeks, practice_weeks, plan_id
+        """
+        if not semesters_data:
+            return
+        await self.db_session.execute(insert(Semester), semesters_data)
+
     @log_exceptions
     async def delete_semester(self, semester: int, plan_id: int) -> Semester | None:
         query = delete(Semester).where((Semester.semester == semester) & (Semester.plan_id == plan_id)).returning(Semester)
@@ -30,14 +41,9 @@ class SemesterDAL:
         return deleted_semester
 
     @log_exceptions
-    async def get_all_semesters(self, page: int, limit: int) -> list[Semester]:
-        if page == 0:
-            query = select(Semester).order_by(Semester.semester.asc())
-        else:
-            query = select(Semester).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        semesters = list(result.scalars().all())
-        return semesters
+    async def get_all_semesters(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Semester)
+        return await fetch_page(self.db_session, query, (Semester.semester, Semester.plan_id), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_semester_by_semester_and_plan(self, semester: int, plan_id: int) -> Semester | None:
@@ -23,7 +23,7 @@ async def get_semester_by_semester_and_plan(semester: int, plan_id: int, request
 
 @semester_router.get("/search", response_model=ShowSemesterListWithHATEOAS)
 async def get_all_semesters(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await semester_service._get_all_semesters(query_param.page, query_param.limit, request, db)
+    return await semester_service._get_all_semesters(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @semester_router.delete("/delete/{semester}/{plan_id}", response_model=ShowSemesterWithHATEOAS, responses={404: {"description": "Семестр не найден"}})
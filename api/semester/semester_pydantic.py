@@ -34,4 +34,5 @@ class ShowSemesterWithHATEOAS(TunedModel):
 class ShowSemesterListWithHATEOAS(TunedModel):
     semesters: List[ShowSemesterWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
@@ -3,12 +3,23 @@ from api.services_helpers import ensure_plan_exists, ensure_semester_exists, ens
 from api.semester.semester_DAL import SemesterDAL 
 from api.plan.plan_DAL import PlanDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+SEMESTER_LINKS = LinkSet(
+    self=Link("get_semester_by_semester_and_plan"),
+    update=Link("update_semester"),
+    delete=Link("delete_semester"),
+    semesters=Link("get_all_semesters"),
+    plan=Link("get_plan_by_id")
+)
+
 
 class SemesterService:
     async def _create_new_semester(self, body: CreateSemester, request: Request, db) -> ShowSemesterWithHATEOAS:
@@ -28,21 +39,11 @@ class SemesterService:
                         practice_weeks=body.practice_weeks,
                         plan_id=body.plan_id
                     )
-                    semester_number = semester_obj.semester
-                    plan_id = semester_obj.plan_id
                     semester_pydantic = ShowSemester.model_validate(semester_obj, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/semesters/search/by_semester_and_plan/{semester_number}/{plan_id}',
-                        "update": f'{api_base_url}/semesters/update',
-                        "delete": f'{api_base_url}/semesters/delete/{semester_number}/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters',
-                        "plan": f'{api_base_url}/plans/search/by_id/{plan_id}'
-                    }
+                    hateoas_links = SEMESTER_LINKS.bind(api_base_url)(semester_obj)
 
                     return ShowSemesterWithHATEOAS(semester=semester_pydantic, links=hateoas_links)
 
@@ -65,17 +66,9 @@ class SemesterService:
                         raise HTTPException(status_code=404, detail=f"Семестр {semester} для плана {plan_id} не найден")
                     semester_pydantic = ShowSemester.model_validate(semester_obj, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/semesters/search/by_semester_and_plan/{semester}/{plan_id}',
-                        "update": f'{api_base_url}/semesters/update',
-                        "delete": f'{api_base_url}/semesters/delete/{semester}/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters',
-                        "plan": f'{api_base_url}/plans/search/by_id/{plan_id}'
-                    }
+                    hateoas_links = SEMESTER_LINKS.bind(api_base_url)(semester_obj)
 
                     return ShowSemesterWithHATEOAS(semester=semester_pydantic, links=hateoas_links)
 
@@ -86,38 +79,35 @@ class SemesterService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_semesters(self, page: int, limit: int, request: Request, db) -> ShowSemesterListWithHATEOAS:
+    async def _get_all_semesters(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSemesterListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 semester_dal = SemesterDAL(session)
                 try:
-                    semesters = await semester_dal.get_all_semesters(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    semester_links = SEMESTER_LINKS.bind(api_base_url)
 
-                    semesters_with_hateoas = []
-                    for semester_obj in semesters:
+                    def to_hateoas(semester_obj) -> ShowSemesterWithHATEOAS:
                         semester_pydantic = ShowSemester.model_validate(semester_obj, from_attributes=True)
-                        semester_number = semester_obj.semester
-                        plan_id = semester_obj.plan_id
-                        semester_links = {
-                            "self": f'{api_base_url}/semesters/search/by_semester_and_plan/{semester_number}/{plan_id}',
-                            "update": f'{api_base_url}/semesters/update',
-                            "delete": f'{api_base_url}/semesters/delete/{semester_number}/{plan_id}',
-                            "semesters": f'{api_base_url}/semesters',
-                            "plan": f'{api_base_url}/plans/search/by_id/{plan_id}'
-                        }
-                        semester_with_links = ShowSemesterWithHATEOAS(semester=semester_pydantic, links=semester_links)
-                        semesters_with_hateoas.append(semester_with_links)
+                        semester_with_links = ShowSemesterWithHATEOAS(semester=semester_pydantic, links=semester_links(semester_obj))
+                        return semester_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SemesterDAL(stream_session).get_all_semesters(page, limit, cursor, stream=True), to_hateoas)
+
+                    semesters = await semester_dal.get_all_semesters(page, limit, cursor)
+
+                    semesters_with_hateoas = [to_hateoas(semester_obj) for semester_obj in semesters]
 
                     collection_links = {
-                        "self": f'{api_base_url}/semesters/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/semesters/create'
+                        "self": route_url(api_base_url, "get_all_semesters", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_semesters", query=page_query(None, limit, semesters.next_cursor)) if semesters.next_cursor else None,
+                        "create": route_url(api_base_url, "create_semester")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSemesterListWithHATEOAS(semesters=semesters_with_hateoas, links=collection_links)
+                    return ShowSemesterListWithHATEOAS(semesters=semesters_with_hateoas, links=collection_links, next_cursor=semesters.next_cursor)
 
                 except HTTPException:
                     raise
@@ -140,14 +130,12 @@ class SemesterService:
 
                     semester_pydantic = ShowSemester.model_validate(semester_obj, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "semesters": f'{api_base_url}/semesters',
-                        "create": f'{api_base_url}/semesters/create',
-                        "plan": f'{api_base_url}/plans/search/by_id/{plan_id}'
+                        "semesters": route_url(api_base_url, "get_all_semesters"),
+                        "create": route_url(api_base_url, "create_semester"),
+                        "plan": route_url(api_base_url, "get_plan_by_id", plan_id=plan_id)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -197,21 +185,11 @@ class SemesterService:
                     if not semester_obj:
                         raise HTTPException(status_code=404, detail=f"Семестр {body.semester} для плана {body.plan_id} не найден")
 
-                    semester_number = semester_obj.semester 
-                    plan_id = semester_obj.plan_id
                     semester_pydantic = ShowSemester.model_validate(semester_obj, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/semesters/search/by_semester_and_plan/{semester_number}/{plan_id}',
-                        "update": f'{api_base_url}/semesters/update',
-                        "delete": f'{api_base_url}/semesters/delete/{semester_number}/{plan_id}',
-                        "semesters": f'{api_base_url}/semesters',
-                        "plan": f'{api_base_url}/plans/search/by_id/{plan_id}'
-                    }
+                    hateoas_links = SEMESTER_LINKS.bind(api_base_url)(semester_obj)
 
                     return ShowSemesterWithHATEOAS(semester=semester_pydantic, links=hateoas_links)
 
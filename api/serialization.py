@@ -0,0 +1,24 @@
+"""
+Lean serialization of the big responses.
+The data (ORM rows are read straight from the attributes) is validated once
+by a TypeAdapter built once per schema and rendered by orjson.
+FastAPI sends a returned Response as is, so response_model doesn't validate and encode it again
+"""
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def schema_adapter(schema: type) -> TypeAdapter:
+    """TypeAdapter of the schema, built on the first use"""
+    return TypeAdapter(schema)
+
+
+def orjson_response(schema: type, data: Any, status_code: int = 200, exclude: dict | None = None) -> ORJSONResponse:
+    """Response of the data validated by the schema, exclude - the fields left out (as in model_dump)"""
+    adapter = schema_adapter(schema)
+    model = adapter.validate_python(data, from_attributes=True)
+    return ORJSONResponse(adapter.dump_python(model, exclude=exclude), status_code=status_code)
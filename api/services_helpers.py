@@ -1,13 +1,43 @@
 from fastapi import HTTPException
 
 from db.dals import BuildingDAL, CabinetDAL, TeacherDAL, SpecialityDAL, GroupDAL, SessionDAL
+from db.models import (Building, Cabinet, Certification, Chapter, Cycle, Group, Module, PaymentForm, Plan, Semester,
+                       Session, SessionType, Speciality, Stream, SubjectsInCycle, SubjectsInCycleHours, Teacher,
+                       TeacherBuilding, TeacherCategory, TeacherInPlan)
+from api.loaders import Key, request_loader
+from api.reference_cache import reference_cache
 from config.logging_config import configure_logging
 
 from sqlalchemy import Date
+from sqlalchemy.exc import IntegrityError
 from datetime import date
+import re
 
 logger = configure_logging()
 
+# Keys the checks look the rows up by, the rows are shared in the request through api.loaders,
+# the keys of the reference tables are kept in api.reference_cache
+BUILDING_KEY = reference_cache.register(Key(Building.building_number))
+CABINET_KEY = reference_cache.register(Key(Cabinet.building_number, Cabinet.cabinet_number))
+SPECIALITY_KEY = reference_cache.register(Key(Speciality.speciality_code))
+GROUP_KEY = Key(Group.group_name)
+PLAN_KEY = Key(Plan.id)
+CATEGORY_KEY = reference_cache.register(Key(TeacherCategory.teacher_category))
+TEACHER_KEY = Key(Teacher.id)
+SESSION_TYPE_KEY = reference_cache.register(Key(SessionType.name))
+SEMESTER_KEY = Key(Semester.semester, Semester.plan_id)
+CHAPTER_KEY = Key(Chapter.id)
+CYCLE_KEY = Key(Cycle.id)
+MODULE_KEY = Key(Module.id)
+SUBJECT_IN_CYCLE_KEY = Key(SubjectsInCycle.id)
+SUBJECT_IN_CYCLE_HOURS_KEY = Key(SubjectsInCycleHours.id)
+CERTIFICATION_KEY = Key(Certification.id)
+TEACHER_IN_PLAN_KEY = Key(TeacherInPlan.id)
+TEACHER_BUILDING_KEY = Key(TeacherBuilding.id)
+SESSION_KEY = Key(Session.session_number, Session.date, Session.teacher_in_plan)
+STREAM_KEY = Key(Stream.stream_id, Stream.group_name, Stream.subject_id)
+PAYMENT_FORM_KEY = reference_cache.register(Key(PaymentForm.payment_name))
+
 
 '''
 =====
@@ -16,28 +46,23 @@ Exits
 '''
 
 # Building
-async def ensure_building_exists(building_dal: BuildingDAL, building_number: int):
-    building = await building_dal.get_building_by_number(building_number)
-    return building
+async def ensure_building_exists(building_dal, building_number: int) -> bool:
+    return await request_loader(building_dal.db_session).exists(BUILDING_KEY, building_number)
 
 # Cabinet
-async def ensure_cabinet_exists(cabinet_dal, cabinet_number: int, building_number: int) -> bool:
-    cabinet = await cabinet_dal.get_cabinet_by_number_and_building(cabinet_number, building_number) 
-    return cabinet is not None
+async def ensure_cabinet_exists(cabinet_dal, building_number: int, cabinet_number: int) -> bool:
+    return await request_loader(cabinet_dal.db_session).exists(CABINET_KEY, (building_number, cabinet_number))
 
 # Speciality
 async def ensure_speciality_exists(speciality_dal, speciality_code: str) -> bool:
-    speciality = await speciality_dal.get_speciality(speciality_code)
-    return speciality is not None
+    return await request_loader(speciality_dal.db_session).exists(SPECIALITY_KEY, speciality_code)
 
 # Group
 async def ensure_group_exists(group_dal, group_name: str) -> bool:
-    group = await group_dal.get_group_by_name(group_name)
-    return group is not None
+    return await request_loader(group_dal.db_session).exists(GROUP_KEY, group_name)
 
 async def ensure_plan_exists(plan_dal, plan_id: int) -> bool:
-    plan = await plan_dal.get_plan_by_id(plan_id)
-    return plan is not None
+    return await request_loader(plan_dal.db_session).exists(PLAN_KEY, plan_id)
 
 # # Subject
 # async def ensure_subject_exists(subject_dal: SubjectDAL, subject_code: str):
@@ -46,78 +71,63 @@ async def ensure_plan_exists(plan_dal, plan_id: int) -> bool:
 
 # Category
 async def ensure_category_exists(category_dal, category_name: str) -> bool:
-    category = await category_dal.get_teacher_category(category_name)
-    return category is not None
+    return await request_loader(category_dal.db_session).exists(CATEGORY_KEY, category_name)
 
 # Teacher
 async def ensure_teacher_exists(teacher_dal, teacher_id: int) -> bool:
-    teacher = await teacher_dal.get_teacher_by_id(teacher_id)
-    return teacher is not None
+    return await request_loader(teacher_dal.db_session).exists(TEACHER_KEY, teacher_id)
 
 # SessionType
 async def ensure_session_type_exists(session_type_dal, name: str) -> bool:
-    session_type = await session_type_dal.get_session_type(name)
-    return session_type is not None
+    return await request_loader(session_type_dal.db_session).exists(SESSION_TYPE_KEY, name)
 
 # Semester
 async def ensure_semester_exists(semester_dal, semester: int, plan_id: int) -> bool:
-    semester_obj = await semester_dal.get_semester_by_semester_and_plan(semester, plan_id)
-    return semester_obj is not None
+    return await request_loader(semester_dal.db_session).exists(SEMESTER_KEY, (semester, plan_id))
 
 # Chapter
 async def ensure_chapter_exists(chapter_dal, chapter_id: int) -> bool:
-    chapter = await chapter_dal.get_chapter_by_id(chapter_id)
-    return chapter is not None
+    return await request_loader(chapter_dal.db_session).exists(CHAPTER_KEY, chapter_id)
 
 # Cycle
 async def ensure_cycle_exists(cycle_dal, cycle_id: int) -> bool:
-    cycle = await cycle_dal.get_cycle_by_id(cycle_id)
-    return cycle is not None
+    return await request_loader(cycle_dal.db_session).exists(CYCLE_KEY, cycle_id)
 
 # Module
 async def ensure_module_exists(module_dal, module_id: int) -> bool:
-    module = await module_dal.get_module_by_id(module_id)
-    return module is not None
+    return await request_loader(module_dal.db_session).exists(MODULE_KEY, module_id)
 
 # Subject
 async def ensure_subject_in_cycle_exists(subject_in_cycle_dal, subject_in_cycle_id: int) -> bool:
-    subject_in_cycle = await subject_in_cycle_dal.get_subject_in_cycle_by_id(subject_in_cycle_id)
-    return subject_in_cycle is not None
+    return await request_loader(subject_in_cycle_dal.db_session).exists(SUBJECT_IN_CYCLE_KEY, subject_in_cycle_id)
 
 # Hours for Subject
 async def ensure_subject_in_cycle_hours_exists(subject_in_cycle_hours_dal, hours_id: int) -> bool:
-    subject_in_cycle_hours = await subject_in_cycle_hours_dal.get_subject_in_cycle_hours_by_id(hours_id)
-    return subject_in_cycle_hours is not None
+    return await request_loader(subject_in_cycle_hours_dal.db_session).exists(SUBJECT_IN_CYCLE_HOURS_KEY, hours_id)
 
 # Certification
 async def ensure_certification_exists(certification_dal, certification_id: int) -> bool:
-    certification = await certification_dal.get_certification_by_id(certification_id)
-    return certification is not None
+    return await request_loader(certification_dal.db_session).exists(CERTIFICATION_KEY, certification_id)
 
 # TeacherInPlan
 async def ensure_teacher_in_plan_exists(teacher_in_plan_dal, teacher_in_plan_id: int) -> bool:
-    teacher_in_plan = await teacher_in_plan_dal.get_teacher_in_plan_by_id(teacher_in_plan_id)
-    return teacher_in_plan is not None
+    return await request_loader(teacher_in_plan_dal.db_session).exists(TEACHER_IN_PLAN_KEY, teacher_in_plan_id)
 
 #TeacherBuilding
 async def ensure_teacher_building_exists(teacher_building_dal, teacher_building_id: int) -> bool:
-    teacher_building = await teacher_building_dal.get_teacher_building_by_id(teacher_building_id)
-    return teacher_building is not None
+    return await request_loader(teacher_building_dal.db_session).exists(TEACHER_BUILDING_KEY, teacher_building_id)
 
 # Session
 async def ensure_session_exists(session_dal, session_number: int, session_date: date, teacher_in_plan: int) -> bool:
-    session = await session_dal.get_session_by_composite_key(session_number, session_date, teacher_in_plan)
-    return session is not None
+    return await request_loader(session_dal.db_session).exists(SESSION_KEY, (session_number, session_date, teacher_in_plan))
 
 # Stream
 async def ensure_stream_exists(stream_dal, stream_id: int, group_name: str, subject_id: int) -> bool:
-    stream = await stream_dal.get_stream_by_composite_key(stream_id, group_name, subject_id)
-    return stream is not None
+    return await request_loader(stream_dal.db_session).exists(STREAM_KEY, (stream_id, group_name, subject_id))
 
 #Payment
 async def ensure_payment_form_exists(payment_form_dal, payment_name: str) -> bool:
-    payment_form = await payment_form_dal.get_payment_form(payment_name)
-    return payment_form is not None
+    return await request_loader(payment_form_dal.db_session).exists(PAYMENT_FORM_KEY, payment_name)
 
 
 '''
@@ -127,13 +137,11 @@ Unique
 '''
 # Group
 async def ensure_group_unique(group_dal, group_name: str) -> bool:
-    group = await group_dal.get_group_by_name(group_name)
-    return group is None
+    return not await request_loader(group_dal.db_session).exists(GROUP_KEY, group_name)
     
 # Cabinet
-async def ensure_cabinet_unique(cabinet_dal, cabinet_number: int, building_number: int) -> bool:
-    cabinet = await cabinet_dal.get_cabinet_by_number_and_building(cabinet_number, building_number) 
-    return cabinet is None
+async def ensure_cabinet_unique(cabinet_dal, building_number: int, cabinet_number: int) -> bool:
+    return not await request_loader(cabinet_dal.db_session).exists(CABINET_KEY, (building_number, cabinet_number))
 
 # # Curriculum
 # async def ensure_curriculum_unique(curriculum_dal: CurriculumDAL,
@@ -175,8 +183,7 @@ async def ensure_session_unique(session_dal: SessionDAL, session_number: int, da
 
 # Category
 async def ensure_category_unique(category_dal, category_name: str) -> bool:
-    category = await category_dal.get_teacher_category(category_name)
-    return category is None
+    return not await request_loader(category_dal.db_session).exists(CATEGORY_KEY, category_name)
 
 async def ensure_teacher_phone_unique(teacher_dal, phone_number: str, exclude_id: int = None) -> bool:
     teacher = await teacher_dal.get_teacher_by_phone_number(phone_number)
@@ -187,68 +194,52 @@ async def ensure_teacher_email_unique(teacher_dal, email: str, exclude_id: int =
     return teacher is None or teacher.id == exclude_id
 
 async def ensure_building_unique(building_dal, building_number: int) -> bool:
-    building = await building_dal.get_building_by_number(building_number)
-    return building is None
+    return not await request_loader(building_dal.db_session).exists(BUILDING_KEY, building_number)
 
 async def ensure_session_type_unique(session_type_dal, name: str) -> bool:
-    session_type = await session_type_dal.get_session_type(name)
-    return session_type is None
+    return not await request_loader(session_type_dal.db_session).exists(SESSION_TYPE_KEY, name)
 
 async def ensure_semester_unique(semester_dal, semester: int, plan_id: int) -> bool:
-    semester_obj = await semester_dal.get_semester_by_semester_and_plan(semester, plan_id)
-    return semester_obj is None
+    return not await request_loader(semester_dal.db_session).exists(SEMESTER_KEY, (semester, plan_id))
 
 async def ensure_plan_unique(plan_dal, plan_id: int) -> bool:
-    plan = await plan_dal.get_plan_by_id(plan_id)
-    return plan is None
+    return not await request_loader(plan_dal.db_session).exists(PLAN_KEY, plan_id)
 
 async def ensure_speciality_unique(speciality_dal, speciality_code: str) -> bool:
-    speciality = await speciality_dal.get_speciality(speciality_code)
-    return speciality is None
+    return not await request_loader(speciality_dal.db_session).exists(SPECIALITY_KEY, speciality_code)
 
 async def ensure_chapter_unique(chapter_dal, chapter_id: int) -> bool:
-    chapter = await chapter_dal.get_chapter_by_id(chapter_id)
-    return chapter is None
+    return not await request_loader(chapter_dal.db_session).exists(CHAPTER_KEY, chapter_id)
 
 async def ensure_cycle_unique(cycle_dal, cycle_id: int) -> bool:
-    cycle = await cycle_dal.get_cycle_by_id(cycle_id)
-    return cycle is None
+    return not await request_loader(cycle_dal.db_session).exists(CYCLE_KEY, cycle_id)
 
 async def ensure_module_unique(module_dal, module_id: int) -> bool:
-    module = await module_dal.get_module_by_id(module_id)
-    return module is None
+    return not await request_loader(module_dal.db_session).exists(MODULE_KEY, module_id)
 
 async def ensure_subject_in_cycle_unique(subject_in_cycle_dal, subject_in_cycle_id: int) -> bool:
-    subject_in_cycle = await subject_in_cycle_dal.get_subject_in_cycle_by_id(subject_in_cycle_id)
-    return subject_in_cycle is None
+    return not await request_loader(subject_in_cycle_dal.db_session).exists(SUBJECT_IN_CYCLE_KEY, subject_in_cycle_id)
 
 async def ensure_subject_in_cycle_hours_unique(subject_in_cycle_hours_dal, hours_id: int) -> bool:
-    subject_in_cycle_hours = await subject_in_cycle_hours_dal.get_subject_in_cycle_hours_by_id(hours_id)
-    return subject_in_cycle_hours is None
+    return not await request_loader(subject_in_cycle_hours_dal.db_session).exists(SUBJECT_IN_CYCLE_HOURS_KEY, hours_id)
 
 async def ensure_certification_unique(certification_dal, certification_id: int) -> bool:
-    certification = await certification_dal.get_certification_by_id(certification_id)
-    return certification is None
+    return not await request_loader(certification_dal.db_session).exists(CERTIFICATION_KEY, certification_id)
 
 async def ensure_teacher_in_plan_unique(teacher_in_plan_dal, teacher_in_plan_id: int) -> bool:
-    teacher_in_plan = await teacher_in_plan_dal.get_teacher_in_plan_by_id(teacher_in_plan_id)
-    return teacher_in_plan is None
+    return not await request_loader(teacher_in_plan_dal.db_session).exists(TEACHER_IN_PLAN_KEY, teacher_in_plan_id)
 
 async def ensure_teacher_building_unique(teacher_building_dal, teacher_building_id: int) -> bool:
-    teacher_building = await teacher_building_dal.get_teacher_building_by_id(teacher_building_id)
-    return teacher_building is None
+    return not await request_loader(teacher_building_dal.db_session).exists(TEACHER_BUILDING_KEY, teacher_building_id)
 
 async def ensure_session_unique(session_dal, session_number: int, session_date: date, teacher_in_plan: int) -> bool:
-    session = await session_dal.get_session_by_composite_key(session_number, session_date, teacher_in_plan)
-    return session is None
+    return not await request_loader(session_dal.db_session).exists(SESSION_KEY, (session_number, session_date, teacher_in_plan))
 
 async def ensure_stream_unique(stream_dal, stream_id: int, group_name: str, subject_id: int) -> bool:
-    stream = await stream_dal.get_stream_by_composite_key(stream_id, group_name, subject_id)
-    return stream is None
+    return not await request_loader(stream_dal.db_session).exists(STREAM_KEY, (stream_id, group_name, subject_id))
 
 async def ensure_payment_form_unique(payment_form_dal, payment_name: str) -> bool:
-    payment_form = await payment_form_dal.get_payment_form(payment_name)
-    return payment_form is None
+    return not await request_loader(payment_form_dal.db_session).exists(PAYMENT_FORM_KEY, payment_name)
 
 
 '''
@@ -257,5 +248,33 @@ Other
 
 async def ensure_cycle_contains_modules(cycle_dal, cycle_id: int) -> bool:
     """Checks whether a cycle is allowed to contain modules (contains_modules = True)."""
-    cycle = await cycle_dal.get_cycle_by_id(cycle_id)
-    return cycle.contains_modules if cycle else False
\ No newline at end of file
+    cycle = await request_loader(cycle_dal.db_session).load(CYCLE_KEY, cycle_id)
+    return cycle.contains_modules if cycle else False
+
+
+'''
+====
+Load
+====
+'''
+# The row itself instead of a check followed by a read of the same key
+
+async def load_module(module_dal, module_id: int) -> Module | None:
+    return await request_loader(module_dal.db_session).load(MODULE_KEY, module_id)
+
+async def load_teacher_in_plan(teacher_in_plan_dal, teacher_in_plan_id: int) -> TeacherInPlan | None:
+    return await request_loader(teacher_in_plan_dal.db_session).load(TEACHER_IN_PLAN_KEY, teacher_in_plan_id)
+
+async def load_teacher_building(teacher_building_dal, teacher_building_id: int) -> TeacherBuilding | None:
+    return await request_loader(teacher_building_dal.db_session).load(TEACHER_BUILDING_KEY, teacher_building_id)
+
+
+def violated_constraint_name(error: IntegrityError) -> str | None:
+    """Name of the constraint violated by the statement (asyncpg and psycopg drivers)"""
+    original = error.orig
+    for candidate in (original, getattr(original, "__cause__", None)):
+        name = getattr(candidate, "constraint_name", None) or getattr(getattr(candidate, "diag", None), "constraint_name", None)
+        if name:
+            return name
+    match = re.search(r'constraint "([^"]+)"', str(original))
+    return match.group(1) if match else None
@@ -0,0 +1,327 @@
+"""
+In-memory occupancy of time slots by groups, teachers and cabinets.
+
+For every slot (date, session_number) the index keeps a bitset per kind of resource,
+every group, teacher and (building, cabinet) gets its own bit. Reference counts next
+to the bitsets allow removing sessions and detecting stream sessions: one teacher
+with several groups in the same cabinet at the same time is not a conflict.
+
+The index is loaded at startup (see api/session/occupancy_loader.py) and kept in sync by
+SessionDAL and TeacherInPlanDAL: they record changes in the db session, the changes are
+applied only after the transaction is committed. Changes committed while the index is being
+reloaded are recorded and replayed onto the new index before it replaces the old one
+"""
+
+from datetime import date
+from typing import Any, Hashable, Iterable, NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SyncSession
+
+from config.logging_config import configure_logging
+
+# Create logger object
+logger = configure_logging()
+
+GROUP = "group"
+TEACHER = "teacher"
+CABINET = "cabinet"
+
+CHANGES_KEY = "occupancy_changes"
+
+
+class SlotConflict(NamedTuple):
+    kind: str  # GROUP, TEACHER or CABINET
+    key: Hashable  # group name, teacher id or (building_number, cabinet_number)
+
+
+class _Slot:
+    __slots__ = ("masks", "group_counts", "teacher_cabinets", "cabinet_teachers")
+
+    def __init__(self):
+        self.masks = {GROUP: 0, TEACHER: 0, CABINET: 0}
+        self.group_counts: dict[int, int] = {}
+        # teacher bit -> {cabinet bit or None: count}
+        self.teacher_cabinets: dict[int, dict[int | None, int]] = {}
+        # cabinet bit -> {teacher bit or None: count}
+        self.cabinet_teachers: dict[int, dict[int | None, int]] = {}
+
+
+def _change_count(counts: dict, key, delta: int) -> bool:
+    """Change the counter, return True if the key is still present"""
+    count = counts.get(key, 0) + delta
+    if count > 0:
+        counts[key] = count
+        return True
+    counts.pop(key, None)
+    return False
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self.loaded = False
+        self.start_date: date | None = None
+        self._bits: dict[str, dict[Hashable, int]] = {GROUP: {}, TEACHER: {}, CABINET: {}}
+        self._keys: dict[str, list[Hashable]] = {GROUP: [], TEACHER: [], CABINET: []}
+        self._slots: dict[tuple[date, int], _Slot] = {}
+        # session id -> (slot, teacher_in_plan, group bit, teacher bit, cabinet bit)
+        self._sessions: dict[int, tuple] = {}
+        # teacher_in_plan id -> (group_name, teacher_id)
+        self._plans: dict[int, tuple[str | None, int | None]] = {}
+        self._plan_sessions: dict[int, set[int]] = {}
+        # Changes committed since the reload started, None when no reload is running
+        self._reload_changes: list[tuple[str, Any]] | None = None
+
+    @classmethod
+    def from_rows(cls, sessions_rows: Iterable, plans_rows: Iterable = (), start_date: date | None = None) -> "OccupancyIndex":
+        """
+        sessions_rows - rows with id, date, session_number, teacher_in_plan, building_number, cabinet_number
+        and optionally group_name and teacher_id, plans_rows - rows with id, group_name, teacher_id
+        """
+        index = cls()
+        for plan in plans_rows:
+            index._plans[plan.id] = (plan.group_name, plan.teacher_id)
+        for row in sessions_rows:
+            if hasattr(row, "group_name") and row.teacher_in_plan not in index._plans:
+                index._plans[row.teacher_in_plan] = (row.group_name, row.teacher_id)
+            index.add_session(row.id, row.date, row.session_number, row.teacher_in_plan,
+                              row.building_number, row.cabinet_number)
+        index.start_date = start_date
+        index.loaded = True
+        return index
+
+    def begin_reload(self):
+        """Start recording the committed changes, the snapshot of the reload may miss them"""
+        self._reload_changes = []
+
+    def end_reload(self) -> list[tuple[str, Any]]:
+        """Stop recording, return the changes committed since begin_reload"""
+        changes, self._reload_changes = self._reload_changes or [], None
+        return changes
+
+    def record(self, changes: list[tuple[str, Any]]):
+        if self._reload_changes is not None:
+            self._reload_changes.extend(changes)
+
+    def replace_with(self, other: "OccupancyIndex"):
+        """
+        Take the data of a freshly loaded index, the object itself stays the same for the importers.
+        The changes committed since begin_reload are replayed onto it first, applying a change
+        the snapshot already has is harmless
+        """
+        changes = self.end_reload()
+        if changes and not other.apply(changes):
+            other.loaded = False
+            logger.warning("Индекс занятости рассинхронизирован с базой данных и будет перезагружен")
+        self.__dict__.update(other.__dict__)
+
+    def covers(self, session_date: date) -> bool:
+        return self.loaded and (self.start_date is None or session_date >= self.start_date)
+
+    def bit(self, kind: str, key: Hashable) -> int | None:
+        return self._bits[kind].get(key)
+
+    def key_of(self, kind: str, bit: int) -> Hashable:
+        return self._keys[kind][bit]
+
+    def _bit_for(self, kind: str, key: Hashable) -> int | None:
+        if key is None:
+            return None
+        bits = self._bits[kind]
+        bit = bits.get(key)
+        if bit is None:
+            bit = bits[key] = len(self._keys[kind])
+            self._keys[kind].append(key)
+        return bit
+
+    def busy_mask(self, kind: str, session_date: date, session_number: int) -> int:
+        slot = self._slots.get((session_date, session_number))
+        return slot.masks[kind] if slot is not None else 0
+
+    def is_free(self, kind: str, key: Hashable, session_date: date, session_number: int) -> bool:
+        bit = self.bit(kind, key)
+        return bit is None or not (self.busy_mask(kind, session_date, session_number) >> bit) & 1
+
+    def plan(self, teacher_in_plan: int) -> tuple[str | None, int | None] | None:
+        return self._plans.get(teacher_in_plan)
+
+    def add_session(self, session_id: int, session_date: date, session_number: int, teacher_in_plan: int,
+                    building_number: int | None = None, cabinet_number: int | None = None) -> bool:
+        """Return False if the teacher_in_plan is unknown to the index"""
+        if session_id in self._sessions:
+            self.remove_session(session_id)
+        plan = self._plans.get(teacher_in_plan)
+        if plan is None:
+            return False
+        group_name, teacher_id = plan
+        cabinet = (building_number, cabinet_number) if building_number is not None and cabinet_number is not None else None
+
+        slot_key = (session_date, session_number)
+        record = (slot_key, teacher_in_plan, self._bit_for(GROUP, group_name),
+                  self._bit_for(TEACHER, teacher_id), self._bit_for(CABINET, cabinet))
+        self._sessions[session_id] = record
+        self._plan_sessions.setdefault(teacher_in_plan, set()).add(session_id)
+        self._count(record, 1)
+        return True
+
+    def remove_session(self, session_id: int):
+        record = self._sessions.pop(session_id, None)
+        if record is None:
+            return
+        self._plan_sessions.get(record[1], set()).discard(session_id)
+        self._count(record, -1)
+
+    def _count(self, record: tuple, delta: int):
+        slot_key, _, group_bit, teacher_bit, cabinet_bit = record
+        slot = self._slots.get(slot_key)
+        if slot is None:
+            slot = self._slots[slot_key] = _Slot()
+
+        if group_bit is not None:
+            present = _change_count(slot.group_counts, group_bit, delta)
+            self._set_bit(slot, GROUP, group_bit, present)
+        if teacher_bit is not None:
+            cabinets = slot.teacher_cabinets.setdefault(teacher_bit, {})
+            _change_count(cabinets, cabinet_bit, delta)
+            if not cabinets:
+                del slot.teacher_cabinets[teacher_bit]
+            self._set_bit(slot, TEACHER, teacher_bit, bool(cabinets))
+        if cabinet_bit is not None:
+            teachers = slot.cabinet_teachers.setdefault(cabinet_bit, {})
+            _change_count(teachers, teacher_bit, delta)
+            if not teachers:
+                del slot.cabinet_teachers[cabinet_bit]
+            self._set_bit(slot, CABINET, cabinet_bit, bool(teachers))
+
+        if not any(slot.masks.values()):
+            del self._slots[slot_key]
+
+    @staticmethod
+    def _set_bit(slot: _Slot, kind: str, bit: int, present: bool):
+        if present:
+            slot.masks[kind] |= 1 << bit
+        else:
+            slot.masks[kind] &= ~(1 << bit)
+
+    def set_teacher_in_plan(self, teacher_in_plan: int, group_name: str | None, teacher_id: int | None):
+        """Add or change a teacher in plan, its sessions are moved to the new group and teacher"""
+        if self._plans.get(teacher_in_plan) == (group_name, teacher_id):
+            return
+        session_ids = list(self._plan_sessions.get(teacher_in_plan, ()))
+        records = [(session_id, self._sessions[session_id]) for session_id in session_ids]
+        for session_id in session_ids:
+            self.remove_session(session_id)
+        self._plans[teacher_in_plan] = (group_name, teacher_id)
+        for session_id, ((session_date, session_number), _, _, _, cabinet_bit) in records:
+            cabinet = self.key_of(CABINET, cabinet_bit) if cabinet_bit is not None else (None, None)
+            self.add_session(session_id, session_date, session_number, teacher_in_plan, *cabinet)
+
+    def remove_teacher_in_plan(self, teacher_in_plan: int):
+        """Sessions of the teacher in plan are deleted by the db cascade"""
+        for session_id in list(self._plan_sessions.pop(teacher_in_plan, ())):
+            self.remove_session(session_id)
+        self._plans.pop(teacher_in_plan, None)
+
+    def find_conflicts(self, session_date: date, session_number: int, group_name: str | None, teacher_id: int | None,
+                       building_number: int | None = None, cabinet_number: int | None = None,
+                       ignore_session_id: int | None = None, ignore_session_ids: Iterable[int] = ()) -> list[SlotConflict]:
+        """
+        All conflicts of a proposed session with the sessions in the index:
+        the group already has a session, the teacher has a session in another cabinet,
+        the cabinet is taken by another teacher.
+        ignore_session_id(s) - sessions being changed, they do not conflict with themselves
+        """
+        slot_key = (session_date, session_number)
+        slot = self._slots.get(slot_key)
+        if slot is None:
+            return []
+
+        group_bit = self.bit(GROUP, group_name) if group_name is not None else None
+        teacher_bit = self.bit(TEACHER, teacher_id) if teacher_id is not None else None
+        cabinet = (building_number, cabinet_number) if building_number is not None and cabinet_number is not None else None
+        cabinet_bit = self.bit(CABINET, cabinet) if cabinet is not None else None
+
+        ignored = set(ignore_session_ids)
+        if ignore_session_id is not None:
+            ignored.add(ignore_session_id)
+        own = [record for record in (self._sessions.get(session_id) for session_id in ignored)
+               if record is not None and record[0] == slot_key]
+
+        def own_count(group=None, teacher=None, cabinet=None) -> int:
+            if group is not None:
+                return sum(record[2] == group for record in own)
+            return sum(record[3] == teacher and record[4] == cabinet for record in own)
+
+        conflicts = []
+        if group_bit is not None and slot.group_counts.get(group_bit, 0) - own_count(group=group_bit) > 0:
+            conflicts.append(SlotConflict(GROUP, group_name))
+
+        if teacher_bit is not None:
+            for other_cabinet, count in slot.teacher_cabinets.get(teacher_bit, {}).items():
+                if count - own_count(teacher=teacher_bit, cabinet=other_cabinet) > 0 and (cabinet is None or other_cabinet != cabinet_bit):
+                    conflicts.append(SlotConflict(TEACHER, teacher_id))
+                    break
+
+        if cabinet_bit is not None:
+            for other_teacher, count in slot.cabinet_teachers.get(cabinet_bit, {}).items():
+                if count - own_count(teacher=other_teacher, cabinet=cabinet_bit) > 0 and (teacher_bit is None or other_teacher != teacher_bit):
+                    conflicts.append(SlotConflict(CABINET, cabinet))
+                    break
+
+        return conflicts
+
+    def apply(self, changes: list[tuple[str, Any]]) -> bool:
+        """Apply committed changes, return False if the index can not follow them and must be reloaded"""
+        for change, data in changes:
+            if change == "add":
+                if not self.add_session(**data):
+                    return False
+            elif change == "remove":
+                self.remove_session(data)
+            elif change == "set_plan":
+                self.set_teacher_in_plan(**data)
+            elif change == "remove_plan":
+                self.remove_teacher_in_plan(data)
+        return True
+
+
+occupancy_index = OccupancyIndex()
+
+
+def track_change(db_session, change: str, data: Any):
+    """Remember the change in the db session, the index gets it after the commit"""
+    db_session.info.setdefault(CHANGES_KEY, []).append((change, data))
+
+
+def track_session_added(db_session, session_obj):
+    track_change(db_session, "add", {
+        "session_id": session_obj.id,
+        "session_date": session_obj.date,
+        "session_number": session_obj.session_number,
+        "teacher_in_plan": session_obj.teacher_in_plan,
+        "building_number": session_obj.building_number,
+        "cabinet_number": session_obj.cabinet_number,
+    })
+
+
+def track_session_removed(db_session, session_id: int):
+    track_change(db_session, "remove", session_id)
+
+
+@event.listens_for(SyncSession, "after_commit")
+def _apply_committed_changes(sync_session):
+    changes = sync_session.info.pop(CHANGES_KEY, None)
+    if not changes:
+        return
+    occupancy_index.record(changes)
+    if not occupancy_index.loaded:
+        return
+    if not occupancy_index.apply(changes):
+        # An unknown teacher in plan, the index will be loaded again by the refresh task
+        occupancy_index.loaded = False
+        logger.warning("Индекс занятости рассинхронизирован с базой данных и будет перезагружен")
+
+
+@event.listens_for(SyncSession, "after_soft_rollback")
+def _drop_rolled_back_changes(sync_session, previous_transaction):
+    sync_session.info.pop(CHANGES_KEY, None)
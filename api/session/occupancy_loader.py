@@ -0,0 +1,53 @@
+"""
+Loading of the occupancy index from the database and choosing where to check slots:
+in the loaded index or, when it does not cover the dates, in a small index built
+from the sessions of these slots only
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+from api.session.occupancy_index import OccupancyIndex, occupancy_index
+from api.session.session_DAL import SessionDAL
+from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
+from config.settings import OCCUPANCY_INDEX_DAYS_BACK
+from config.logging_config import configure_logging
+
+# Create logger object
+logger = configure_logging()
+
+
+async def load_occupancy_index(session_factory) -> bool:
+    """Load sessions from OCCUPANCY_INDEX_DAYS_BACK days ago and all teachers in plans"""
+    start_date = date.today() - timedelta(days=OCCUPANCY_INDEX_DAYS_BACK)
+    occupancy_index.begin_reload()
+    try:
+        async with session_factory() as session:
+            sessions_rows = await SessionDAL(session).get_occupancy_rows(start_date)
+            plans_rows = await TeacherInPlanDAL(session).get_teachers_in_plans_assignments()
+    except Exception as e:
+        occupancy_index.end_reload()
+        logger.warning(f"Индекс занятости не загружен, проверки будут выполняться в базе данных (Ошибка: {e})")
+        return False
+
+    occupancy_index.replace_with(OccupancyIndex.from_rows(sessions_rows, plans_rows, start_date=start_date))
+    logger.info(f"Индекс занятости загружен: {len(sessions_rows)} занятий с {start_date}")
+    return True
+
+
+async def occupancy_refresh_loop(session_factory, interval_seconds: int):
+    """
+    Periodic full reload. Changes made through the DAL are applied right after the commit,
+    the reload catches the rest (db cascades, changes from other processes)
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await load_occupancy_index(session_factory)
+
+
+async def get_slots_occupancy(session_dal: SessionDAL, slots: list[tuple[date, int]]) -> OccupancyIndex:
+    """Index which can answer for the slots (date, session_number)"""
+    if all(occupancy_index.covers(session_date) for session_date, _ in slots):
+        return occupancy_index
+    sessions_rows = await session_dal.get_slots_occupancy_rows(list(set(slots))) if slots else []
+    return OccupancyIndex.from_rows(sessions_rows)
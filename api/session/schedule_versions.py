@@ -0,0 +1,166 @@
+"""
+Version counters of the schedule reads and the cache of their serialized responses.
+Every scope of a read - a date, a group, a teacher - has a counter, the writes of SessionDAL bump
+the counters of the dates, groups and teachers of the written sessions when the transaction ends.
+A write which doesn't tell its scopes (an update of a session, a write of the plans, teachers, cabinets...
+which the responses show) bumps the global counter, a move of sessions bumps all dates.
+The version of a read is read before the query, so a cached response is never older than its version:
+    If-None-Match with the current ETag -> 304 without SQL and serialization;
+    the same url at the same version -> the cached body.
+Counters are kept in the process, SCHEDULE_CACHE_MAX_AGE_SECONDS bounds how long the writes
+of other processes may be missed
+"""
+import secrets
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+from sqlalchemy import TextClause, event
+from sqlalchemy.orm import Session as SyncSession
+
+from config.settings import SCHEDULE_CACHE_SIZE, SCHEDULE_CACHE_MAX_AGE_SECONDS
+
+CHANGES_KEY = "schedule_changes"
+
+DATE, GROUP, TEACHER = "date", "group", "teacher"
+
+# Tables shown in the session responses besides sessions, their writes bump the global counter
+SHOWN_TABLES = frozenset({"teachers_in_plans", "teachers", "groups", "cabinets", "buildings", "session_types",
+                          "subjects_in_cycle_hours", "subjects_in_cycle"})
+
+# ETags of another process (or of the process before a restart) never match
+_PROCESS_TOKEN = secrets.token_hex(4)
+
+
+class ScheduleVersions:
+    def __init__(self):
+        self.global_version = 0
+        # Scope kind -> counter of the whole kind (all dates after a move of sessions)
+        self.kind_versions: dict[str, int] = {DATE: 0, GROUP: 0, TEACHER: 0}
+        # Scope kind -> key -> counter
+        self.versions: dict[str, dict[Hashable, int]] = {DATE: {}, GROUP: {}, TEACHER: {}}
+
+    def version(self, kind: str, key: Hashable) -> str:
+        epoch = int(time.monotonic() // SCHEDULE_CACHE_MAX_AGE_SECONDS) if SCHEDULE_CACHE_MAX_AGE_SECONDS else 0
+        return (f"{_PROCESS_TOKEN}.{epoch}.{self.global_version}."
+                f"{self.kind_versions[kind]}.{self.versions[kind].get(key, 0)}")
+
+    def bump(self, changes: dict[str, Any]) -> None:
+        if changes.get("all"):
+            self.global_version += 1
+            return
+        for kind in changes.get("kinds", ()):
+            self.kind_versions[kind] += 1
+        for kind in (DATE, GROUP, TEACHER):
+            versions = self.versions[kind]
+            for key in changes.get(kind, ()):
+                versions[key] = versions.get(key, 0) + 1
+
+
+schedule_versions = ScheduleVersions()
+
+
+def _changes(db_session) -> dict[str, Any]:
+    return db_session.info.setdefault(CHANGES_KEY, {"all": False, "kinds": set(), DATE: set(), GROUP: set(), TEACHER: set()})
+
+
+def track_schedule_change(db_session, session_row=None, *, kinds: tuple[str, ...] = ()) -> None:
+    """
+    Remember the scopes of a written session in the db session, they are bumped when the transaction ends.
+    Without a row (or when the row doesn't tell its group or teacher) everything is bumped,
+    kinds - scopes which change as a whole (the old dates of moved sessions)
+    """
+    changes = _changes(db_session)
+    group_name = _loaded(session_row, "group_name")
+    teacher_id = _loaded(session_row, "teacher_id")
+    if session_row is None or group_name is None or teacher_id is None:
+        changes["all"] = True
+        return
+    changes[DATE].add(session_row.date)
+    changes[GROUP].add(group_name)
+    changes[TEACHER].add(teacher_id)
+    changes["kinds"].update(kinds)
+
+
+def _loaded(row, name: str) -> Any:
+    """Attribute of a row, an attribute of an ORM object which isn't loaded is None (no lazy load in async)"""
+    if hasattr(row, "_sa_instance_state"):
+        return row.__dict__.get(name)
+    return getattr(row, name, None)
+
+
+@event.listens_for(SyncSession, "after_flush")
+def _track_flushed_writes(sync_session, flush_context):
+    if any(type(obj).__table__.name in SHOWN_TABLES
+           for obj in chain(sync_session.new, sync_session.dirty, sync_session.deleted)):
+        _changes(sync_session)["all"] = True
+
+
+@event.listens_for(SyncSession, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if statement.table.name in SHOWN_TABLES:
+            _changes(orm_execute_state.session)["all"] = True
+    elif isinstance(statement, TextClause):
+        # TRUNCATE of the restore and the like, the tables are unknown
+        _changes(orm_execute_state.session)["all"] = True
+
+
+@event.listens_for(SyncSession, "after_transaction_end")
+def _bump_written_scopes(sync_session, transaction):
+    # A rollback bumps as well: the engine runs in autocommit, the statements are already applied
+    if transaction.parent is not None:
+        return
+    changes = sync_session.info.pop(CHANGES_KEY, None)
+    if changes:
+        schedule_versions.bump(changes)
+
+
+class ScheduleResponseCache:
+    """Serialized responses (body, media type, headers) by url, Accept and version, least recently used are dropped"""
+    def __init__(self, size: int):
+        self.size = size
+        self.responses: OrderedDict[tuple, tuple[bytes, str | None, dict[str, str]]] = OrderedDict()
+
+    def get(self, key: tuple) -> tuple[bytes, str | None, dict[str, str]] | None:
+        cached = self.responses.get(key)
+        if cached is not None:
+            self.responses.move_to_end(key)
+        return cached
+
+    def put(self, key: tuple, body: bytes, media_type: str | None, headers: dict[str, str]) -> None:
+        self.responses[key] = (body, media_type, headers)
+        self.responses.move_to_end(key)
+        while len(self.responses) > self.size:
+            self.responses.popitem(last=False)
+
+
+schedule_response_cache = ScheduleResponseCache(SCHEDULE_CACHE_SIZE)
+
+
+async def versioned_response(request: Request, kind: str, key: Hashable,
+                             build: Callable[[], Awaitable[Response]]) -> Response:
+    """Response of a schedule read: 304 for the current ETag, the cached body or the built one"""
+    etag = f'W/"{schedule_versions.version(kind, key)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+
+    cache_key = (str(request.url), request.headers.get("accept"), etag)
+    cached = schedule_response_cache.get(cache_key)
+    if cached is not None:
+        body, media_type, response_headers = cached
+        return Response(content=body, media_type=media_type, headers={**response_headers, **headers})
+
+    response = await build()
+    # Streamed responses (NDJSON) have no body to keep
+    body = getattr(response, "body", None)
+    if response.status_code == 200 and body is not None:
+        schedule_response_cache.put(cache_key, body, response.media_type,
+                                    {name: value for name, value in response.headers.items()
+                                     if name not in ("content-length", "content-type")})
+    response.headers.update(headers)
+    return response
@@ -1,8 +1,14 @@
-from sqlalchemy import Date, select, delete, update
+from typing import Sequence
+
+from sqlalchemy import Date, Integer, select, delete, update, insert, tuple_, func, literal_column, column, values, cast
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ExecutableOption
 
-from db.models import Session, TeacherInPlan
+from db.models import Session, TeacherInPlan, Teacher, SubjectsInCycleHours, SubjectsInCycle
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
+from api.session.occupancy_index import track_session_added, track_session_removed
+from api.session.schedule_versions import DATE, track_schedule_change
 
 from datetime import date, timedelta
 
@@ -32,8 +38,25 @@ class SessionDAL:
         )
         self.db_session.add(new_session)
         await self.db_session.flush()
+        track_session_added(self.db_session, new_session)
+        track_schedule_change(self.db_session, new_session)
         return new_session
 
+    @log_exceptions
+    async def create_sessions(self, sessions_data: list[dict]) -> list[Session]:
+        """
+        Insert many sessions with one statement.
+        sessions_data - list of dicts with keys: session_number, date, teacher_in_plan,
+        session_type, cabinet_number, building_number
+        """
+        query = insert(Session).returning(Session, sort_by_parameter_order=True)
+        result = await self.db_session.scalars(query, sessions_data)
+        sessions = list(result.all())
+        for session_obj in sessions:
+            track_session_added(self.db_session, session_obj)
+            track_schedule_change(self.db_session, session_obj)
+        return sessions
+
     @log_exceptions
     async def delete_session(self, session_number: int, session_date: Date, teacher_in_plan: int) -> Session | None:
         query = delete(Session).where(
@@ -43,6 +66,9 @@ class SessionDAL:
         ).returning(Session)
         res = await self.db_session.execute(query)
         deleted_session = res.scalar_one_or_none()
+        if deleted_session is not None:
+            track_session_removed(self.db_session, deleted_session.id)
+            track_schedule_change(self.db_session, deleted_session)
         return deleted_session
 
     @log_exceptions
@@ -50,17 +76,15 @@ class SessionDAL:
         query = delete(Session).where((Session.id == session_id)).returning(Session)
         res = await self.db_session.execute(query)
         deleted_session = res.scalar_one_or_none()
+        if deleted_session is not None:
+            track_session_removed(self.db_session, deleted_session.id)
+            track_schedule_change(self.db_session, deleted_session)
         return deleted_session
 
     @log_exceptions
-    async def get_all_sessions(self, page: int, limit: int) -> list[Session]:
-        if page == 0:
-            query = select(Session).order_by(Session.date.asc(), Session.session_number.asc()) 
-        else:
-            query = select(Session).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        sessions = list(result.scalars().all())
-        return sessions
+    async def get_all_sessions(self, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Session).options(*options)
+        return await fetch_page(self.db_session, query, (Session.date, Session.session_number, Session.id), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_session_by_composite_key(self, session_number: int, session_date: Date, teacher_in_plan: int) -> Session | None: 
@@ -81,71 +105,128 @@ class SessionDAL:
         return session_row
 
     @log_exceptions
-    async def get_sessions_by_plan(self, teacher_in_plan_id: int, page: int, limit: int) -> list[Session]:
-        if page == 0:
-            query = select(Session).where(Session.teacher_in_plan == teacher_in_plan_id).order_by(Session.date.asc(), Session.session_number.asc()) 
-        else:
-            query = select(Session).where(Session.teacher_in_plan == teacher_in_plan_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        sessions = list(result.scalars().all())
-        return sessions if sessions is not None else []
+    async def get_sessions_by_plan(self, teacher_in_plan_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Session).options(*options).where(Session.teacher_in_plan == teacher_in_plan_id)
+        return await fetch_page(self.db_session, query, (Session.date, Session.session_number, Session.id), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_sessions_by_date(self, session_date: Date, page: int = 0, limit: int = 1000) -> list[Session]: 
-        if page == 0:
-            query = select(Session).where(Session.date == session_date).order_by(Session.session_number.asc()) 
-        else:
-            query = select(Session).where(Session.date == session_date).offset((page - 1) * limit).limit(limit) 
-        result = await self.db_session.execute(query)
-        sessions = list(result.scalars().all())
-        return sessions if sessions is not None else []
-    
+    async def get_sessions_by_date(self, session_date: Date, page: int = 0, limit: int = 1000, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Session).options(*options).where(Session.date == session_date)
+        return await fetch_page(self.db_session, query, (Session.date, Session.session_number, Session.id), page, limit, cursor, stream)
+
+    @staticmethod
+    def filter_conditions(date_from: date | None = None, date_to: date | None = None,
+                          group_names: list[str] | None = None, teacher_ids: list[int] | None = None,
+                          building_numbers: list[int] | None = None, cabinet_numbers: list[int] | None = None,
+                          session_types: list[str] | None = None, subject_ids: list[int] | None = None) -> list:
+        """
+        Conditions of the session filter, a filter which is None is not applied.
+        Groups and teachers are read from the columns of the sessions filled by the trigger,
+        so each filter is served by the indexes of the sessions table without joins
+        (group - sessions_group_slot_key, teacher - sessions_teacher_slot_excl,
+        cabinet - ix_sessions_building_number_cabinet_number_date, period - ix_sessions_date_session_number_id),
+        subjects - by the teachers in plans of their hours
+        """
+        conditions = []
+        if date_from is not None:
+            conditions.append(Session.date >= date_from)
+        if date_to is not None:
+            conditions.append(Session.date <= date_to)
+        if group_names is not None:
+            conditions.append(Session.group_name.in_(group_names))
+        if teacher_ids is not None:
+            conditions.append(Session.teacher_id.in_(teacher_ids))
+        if building_numbers is not None:
+            conditions.append(Session.building_number.in_(building_numbers))
+        if cabinet_numbers is not None:
+            conditions.append(Session.cabinet_number.in_(cabinet_numbers))
+        if session_types is not None:
+            conditions.append(Session.session_type.in_(session_types))
+        if subject_ids is not None:
+            conditions.append(Session.teacher_in_plan.in_(
+                select(TeacherInPlan.id)
+                .join(SubjectsInCycleHours, TeacherInPlan.subject_in_cycle_hours_id == SubjectsInCycleHours.id)
+                .where(SubjectsInCycleHours.subject_in_cycle_id.in_(subject_ids))
+            ))
+        return conditions
+
+    @log_exceptions
+    async def get_sessions_by_filter(self, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = (), **filters) -> Page | RowStream:
+        """Sessions matching all the given filters (filter_conditions) in one query"""
+        query = select(Session).options(*options).where(*self.filter_conditions(**filters))
+        return await fetch_page(self.db_session, query, (Session.date, Session.session_number, Session.id), page, limit, cursor, stream)
+
     @log_exceptions
     async def get_sessions_by_date_and_group(
         self, 
         session_date: Date, 
         group_name: str,
         page: int = 0, 
-        limit: int = 1000
-    ) -> list[Session]:
+        limit: int = 1000,
+        cursor: str | None = None,
+        stream: bool = False
+    ) -> Page | RowStream:
         """
         Получить все сессии на дату для указанной группы
         """
-        if page == 0:
-            query = (
-                select(Session)
-                .join(Session.plan)
-                .where(
-                    (Session.date == session_date) &
-                    (TeacherInPlan.group_name == group_name)
-                )
-                .order_by(Session.session_number.asc())
+        query = (
+            select(Session)
+            .join(Session.plan)
+            .where(
+                (Session.date == session_date) &
+                (TeacherInPlan.group_name == group_name)
             )
-        else:
-            query = (
-                select(Session)
-                .join(Session.plan)
-                .where(
-                    (Session.date == session_date) &
-                    (TeacherInPlan.group_name == group_name)
-                )
-                .offset((page - 1) * limit)
-                .limit(limit)
+        )
+        return await fetch_page(self.db_session, query, (Session.date, Session.session_number, Session.id), page, limit, cursor, stream)
+
+    @log_exceptions
+    async def get_occupancy_rows(self, start_date: date | None = None, end_date: date | None = None) -> list:
+        """Sessions from the date (and till the date) with group and teacher, used for loading the occupancy index"""
+        query = (
+            select(
+                Session.id,
+                Session.date,
+                Session.session_number,
+                Session.teacher_in_plan,
+                Session.building_number,
+                Session.cabinet_number,
+                TeacherInPlan.group_name,
+                TeacherInPlan.teacher_id
             )
+            .join(Session.plan)
+        )
+        if start_date is not None:
+            query = query.where(Session.date >= start_date)
+        if end_date is not None:
+            query = query.where(Session.date <= end_date)
         result = await self.db_session.execute(query)
-        sessions = list(result.scalars().all())
-        return sessions if sessions is not None else []
+        return list(result.all())
 
     @log_exceptions
-    async def get_sessions_by_type(self, session_type: str, page: int, limit: int) -> list[Session]:
-        if page == 0:
-            query = select(Session).where(Session.session_type == session_type).order_by(Session.date.asc(), Session.session_number.asc()) 
-        else:
-            query = select(Session).where(Session.session_type == session_type).offset((page - 1) * limit).limit(limit)
+    async def get_slots_occupancy_rows(self, slots: list[tuple[date, int]]) -> list:
+        """The same rows as get_occupancy_rows, but only for the slots (date, session_number)"""
+        query = (
+            select(
+                Session.id,
+                Session.date,
+                Session.session_number,
+                Session.teacher_in_plan,
+                Session.building_number,
+                Session.cabinet_number,
+                TeacherInPlan.group_name,
+                TeacherInPlan.teacher_id
+            )
+            .join(Session.plan)
+            .where(tuple_(Session.date, Session.session_number).in_(slots))
+        )
         result = await self.db_session.execute(query)
-        sessions = list(result.scalars().all())
-        return sessions if sessions is not None else []
-    
+        return list(result.all())
+
+    @log_exceptions
+    async def get_sessions_by_type(self, session_type: str, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Session).options(*options).where(Session.session_type == session_type)
+        return await fetch_page(self.db_session, query, (Session.date, Session.session_number, Session.id), page, limit, cursor, stream)
+
     @log_exceptions
     async def get_session_by_cabinet_and_time(self, cabinet_number: int, building_number: int, session_date: Date, session_number: int) -> Session | None:
         query = select(Session).where(
@@ -159,28 +240,21 @@ class SessionDAL:
         return session_row
 
     @log_exceptions
-    async def get_sessions_by_cabinet(self, cabinet_number: int, building_number: int, page: int, limit: int) -> list[Session]:
-        if page == 0:
-            query = select(Session).where(
-                (Session.cabinet_number == cabinet_number) &
-                (Session.building_number == building_number)
-            ).order_by(Session.date.asc(), Session.session_number.asc()) 
-        else:
-            query = select(Session).where(
-                (Session.cabinet_number == cabinet_number) &
-                (Session.building_number == building_number)
-            ).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        sessions = list(result.scalars().all())
-        return sessions if sessions is not None else []
+    async def get_sessions_by_cabinet(self, cabinet_number: int, building_number: int, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(Session).options(*options).where(
+            (Session.cabinet_number == cabinet_number) &
+            (Session.building_number == building_number)
+        )
+        return await fetch_page(self.db_session, query, (Session.date, Session.session_number, Session.id), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_sessions_by_teacher_in_plan_and_date(self,
                                                        teacher_in_plan_ids: list[int],
                                                        start_period_date: date,
-                                                       end_period_date: date) -> list[Session]:
+                                                       end_period_date: date,
+                                                       options: Sequence[ExecutableOption] = ()) -> list[Session]:
 
-        query = select(Session).where(
+        query = select(Session).options(*options).where(
             (Session.teacher_in_plan.in_(teacher_in_plan_ids)) &
             (Session.date.between(start_period_date, end_period_date))
         ).order_by(Session.date).order_by(Session.session_number)
@@ -189,6 +263,46 @@ class SessionDAL:
         sessions = list(result.scalars().all())
         return sessions if sessions is not None else []
 
+    @log_exceptions
+    async def get_sessions_report_rows(
+        self,
+        start_period_date: date,
+        end_period_date: date,
+        group_name: str | None = None
+    ) -> list:
+        """
+        Get sessions for the period together with group, teacher and subject data in one query:
+        Session -> TeacherInPlan -> Teacher -> SubjectsInCycleHours -> SubjectsInCycle.
+        Used for building schedule documents
+        """
+        query = (
+            select(
+                Session.id,
+                Session.date,
+                Session.session_number,
+                Session.session_type,
+                Session.cabinet_number,
+                Session.building_number,
+                TeacherInPlan.group_name,
+                Teacher.id.label("teacher_id"),
+                Teacher.surname.label("teacher_surname"),
+                Teacher.name.label("teacher_name"),
+                Teacher.fathername.label("teacher_fathername"),
+                Teacher.teacher_category,
+                SubjectsInCycle.title.label("subject_title")
+            )
+            .join(Session.plan)
+            .outerjoin(TeacherInPlan.teacher)
+            .outerjoin(TeacherInPlan.subjects_hours)
+            .outerjoin(SubjectsInCycleHours.subjects_in_cycle)
+            .where(Session.date.between(start_period_date, end_period_date))
+            .order_by(Session.date.asc(), Session.session_number.asc())
+        )
+        if group_name is not None:
+            query = query.where(TeacherInPlan.group_name == group_name)
+        result = await self.db_session.execute(query)
+        return list(result.all())
+
     @log_exceptions
     async def get_sessions_by_date_range(
         self,
@@ -206,9 +320,120 @@ class SessionDAL:
         sessions = list(result.scalars().all())
         return sessions if sessions is not None else []
 
+    @staticmethod
+    def _filter_sessions_query(query, group_names: list[str] | None = None, teacher_id: int | None = None,
+                               building_number: int | None = None):
+        """Add optional filters by groups, teacher and building to the sessions query"""
+        if group_names or teacher_id is not None:
+            query = query.join(Session.plan)
+            if group_names:
+                query = query.where(TeacherInPlan.group_name.in_(group_names))
+            if teacher_id is not None:
+                query = query.where(TeacherInPlan.teacher_id == teacher_id)
+        if building_number is not None:
+            query = query.where(Session.building_number == building_number)
+        return query
+
+    @log_exceptions
+    async def count_sessions_by_date_range(
+        self,
+        start_period_date: date,
+        end_period_date: date,
+        group_names: list[str] | None = None,
+        teacher_id: int | None = None,
+        building_number: int | None = None
+    ) -> int:
+        query = select(func.count(Session.id)).where(Session.date.between(start_period_date, end_period_date))
+        query = self._filter_sessions_query(query, group_names, teacher_id, building_number)
+        result = await self.db_session.execute(query)
+        return result.scalar_one()
+
+    @log_exceptions
+    async def copy_sessions_by_date_range(
+        self,
+        start_period_date: date,
+        end_period_date: date,
+        days_shift: int,
+        repeat: int = 1,
+        repeat_step_days: int = 7,
+        group_names: list[str] | None = None,
+        teacher_id: int | None = None,
+        building_number: int | None = None
+    ) -> int:
+        """
+        Copy sessions from the date range with one INSERT ... SELECT executed by the db.
+        Every copy is shifted by days_shift, the copy number k (from 0 to repeat - 1)
+        is shifted by additional k * repeat_step_days days.
+        Return count of created sessions
+        """
+        copy_number = func.generate_series(0, repeat - 1).table_valued(column("value", Integer)).alias("copy_number")
+        new_date = Session.date + days_shift + copy_number.c.value * repeat_step_days
+
+        source_query = select(
+            Session.session_number,
+            new_date,
+            Session.teacher_in_plan,
+            Session.session_type,
+            Session.cabinet_number,
+            Session.building_number
+        ).select_from(Session).join(copy_number, literal_column("true")).where(
+            Session.date.between(start_period_date, end_period_date)
+        )
+        source_query = self._filter_sessions_query(source_query, group_names, teacher_id, building_number)
+
+        query = insert(Session).from_select(
+            ["session_number", "date", "teacher_in_plan", "session_type", "cabinet_number", "building_number"],
+            source_query
+        ).returning(Session.id, Session.date, Session.session_number, Session.teacher_in_plan,
+                    Session.building_number, Session.cabinet_number, Session.group_name, Session.teacher_id)
+        result = await self.db_session.execute(query)
+        created_rows = result.all()
+        for row in created_rows:
+            track_session_added(self.db_session, row)
+            track_schedule_change(self.db_session, row)
+        return len(created_rows)
+
     @log_exceptions
     async def update_session(self, session_id: int, **kwargs) -> Session | None: 
         query = update(Session).where(Session.id == session_id).values(**kwargs).returning(Session)
         res = await self.db_session.execute(query)
         updated_session = res.scalar_one_or_none()
+        if updated_session is not None:
+            track_session_added(self.db_session, updated_session)
+            # The old plan and date of the session are not known
+            track_schedule_change(self.db_session)
         return updated_session
+
+    @log_exceptions
+    async def move_sessions(self, moves: list[dict]) -> list:
+        """
+        Move many sessions with one UPDATE ... FROM (VALUES ...).
+        The slot constraints are checked after the statement, so the sessions may take the slots freed by each other.
+        moves - list of dicts with keys: id, date, session_number, building_number, cabinet_number
+        """
+        new_slots = values(
+            column("id", Integer), column("date", Date), column("session_number", Integer),
+            column("building_number", Integer), column("cabinet_number", Integer),
+            name="new_slots"
+        ).data([(move["id"], move["date"], move["session_number"], move["building_number"], move["cabinet_number"])
+                for move in moves])
+        query = (
+            update(Session)
+            .where(Session.id == new_slots.c.id)
+            .values(
+                date=cast(new_slots.c.date, Date),
+                session_number=cast(new_slots.c.session_number, Integer),
+                building_number=cast(new_slots.c.building_number, Integer),
+                cabinet_number=cast(new_slots.c.cabinet_number, Integer)
+            )
+            .returning(Session.id, Session.date, Session.session_number, Session.teacher_in_plan,
+                       Session.building_number, Session.cabinet_number, Session.group_name, Session.teacher_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db_session.execute(query)
+        moved_rows = result.all()
+        for row in moved_rows:
+            track_session_added(self.db_session, row)
+            # The group and the teacher stay, the old dates are not known
+            track_schedule_change(self.db_session, row, kinds=(DATE,))
+        return moved_rows
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 from api.session.session_pydantic import *
 from api.models import QueryParams
+from api.links import LinksQuery
 from db.session import get_db
-from api.session.session_services import SessionService
+from api.session.session_services import SessionService, SESSION_EXPANSION
+from api.expansion import Projection
+from api.session.schedule_versions import DATE, TEACHER, versioned_response
 
 session_router = APIRouter()
 
@@ -16,43 +19,69 @@ async def create_session(body: CreateSession, request: Request, db: AsyncSession
     return await session_service._create_new_session(body, request, db)
 
 
+@session_router.post("/bulk_create", response_model=ShowSessionBulkResult, status_code=201, responses={409: {"description": "Расписание изменилось во время создания занятий"}})
+async def create_sessions_bulk(body: CreateSessionsBulk, request: Request, db: AsyncSession = Depends(get_db)):
+    return await session_service._create_sessions_bulk(body, request, db)
+
+
 @session_router.get("/search/by_composite_key/{session_number}/{session_date}/{teacher_in_plan}", response_model=ShowSessionWithHATEOAS, responses={404: {"description": "Занятие не найдено"}})
 async def get_session_by_composite_key(session_number: int, session_date: date, teacher_in_plan: int, request: Request, db: AsyncSession = Depends(get_db)):
     return await session_service._get_session_by_composite_key(session_number, session_date, teacher_in_plan, request, db)
 
 
 @session_router.get("/search/by_plan/{teacher_in_plan_id}", response_model=ShowSessionListWithHATEOAS, responses={404: {"description": "Занятия не найдены"}})
-async def get_sessions_by_plan(teacher_in_plan_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await session_service._get_sessions_by_plan(teacher_in_plan_id, query_param.page, query_param.limit, request, db)
+async def get_sessions_by_plan(teacher_in_plan_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(SESSION_EXPANSION)], links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await session_service._get_sessions_by_plan(teacher_in_plan_id, query_param.page, query_param.limit, query_param.cursor, links, projection, request, db)
 
 
-@session_router.get("/search/by_teacher_id/{teacher_id}/{start_period_date}/{end_period_date}", response_model=ShowSessionListWithHATEOAS, responses={404: {"description": "Занятия не найдены"}})
+@session_router.get("/search/by_teacher_id/{teacher_id}/{start_period_date}/{end_period_date}", response_model=ShowSessionListWithHATEOAS, responses={304: {"description": "Расписание не изменилось"}, 404: {"description": "Занятия не найдены"}})
 async def get_sessions_by_teacher_and_date(teacher_id: int,
                                                     start_period_date: date,
                                                     end_period_date: date,
                                                     request: Request,
+                                                    projection: Annotated[Projection, Depends(SESSION_EXPANSION)],
+                                                    links: LinksQuery = "full",
                                                     db: AsyncSession = Depends(get_db)):
-    return await session_service._get_sessions_by_teacher_and_date(teacher_id, start_period_date,end_period_date, request, db)
+    return await versioned_response(request, TEACHER, teacher_id, lambda: session_service._get_sessions_by_teacher_and_date(teacher_id, start_period_date, end_period_date, links, projection, request, db))
 
 
-@session_router.get("/search/by_date/{session_date}", response_model=ShowSessionListWithHATEOAS, responses={404: {"description": "Занятия не найдены"}})
-async def get_sessions_by_date(session_date: date, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await session_service._get_sessions_by_date(session_date, query_param.page, query_param.limit, request, db)
+@session_router.get("/search/by_date/{session_date}", response_model=ShowSessionListWithHATEOAS, responses={304: {"description": "Расписание не изменилось"}, 404: {"description": "Занятия не найдены"}})
+async def get_sessions_by_date(session_date: date, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(SESSION_EXPANSION)], links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await versioned_response(request, DATE, session_date, lambda: session_service._get_sessions_by_date(session_date, query_param.page, query_param.limit, query_param.cursor, links, projection, request, db))
 
 
 @session_router.get("/search/by_type/{session_type}", response_model=ShowSessionListWithHATEOAS, responses={404: {"description": "Занятия не найдены"}})
-async def get_sessions_by_type(session_type: str, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await session_service._get_sessions_by_type(session_type, query_param.page, query_param.limit, request, db)
+async def get_sessions_by_type(session_type: str, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(SESSION_EXPANSION)], links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await session_service._get_sessions_by_type(session_type, query_param.page, query_param.limit, query_param.cursor, links, projection, request, db)
 
 
 @session_router.get("/search/by_cabinet/{building_number}/{cabinet_number}", response_model=ShowSessionListWithHATEOAS, responses={404: {"description": "Занятия не найдены"}})
-async def get_sessions_by_cabinet(building_number: int, cabinet_number: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await session_service._get_sessions_by_cabinet(cabinet_number, building_number, query_param.page, query_param.limit, request, db)
+async def get_sessions_by_cabinet(building_number: int, cabinet_number: int, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(SESSION_EXPANSION)], links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await session_service._get_sessions_by_cabinet(cabinet_number, building_number, query_param.page, query_param.limit, query_param.cursor, links, projection, request, db)
 
 
 @session_router.get("/search", response_model=ShowSessionListWithHATEOAS)
-async def get_all_sessions(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await session_service._get_all_sessions(query_param.page, query_param.limit, request, db)
+async def get_all_sessions(query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(SESSION_EXPANSION)], links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await session_service._get_all_sessions(query_param.page, query_param.limit, query_param.cursor, links, projection, request, db)
+
+
+def session_filter_query(date_from: date | None = None,
+                         date_to: date | None = None,
+                         group_names: Annotated[list[str] | None, Query(max_length=100)] = None,
+                         teacher_ids: Annotated[list[int] | None, Query(max_length=100)] = None,
+                         building_numbers: Annotated[list[int] | None, Query(max_length=100)] = None,
+                         cabinet_numbers: Annotated[list[int] | None, Query(max_length=100)] = None,
+                         session_types: Annotated[list[str] | None, Query(max_length=100)] = None,
+                         subject_ids: Annotated[list[int] | None, Query(max_length=100)] = None) -> SessionFilter:
+    """Filters of the session search, lists are repeated parameters: group_names=ИС-21&group_names=ИС-22"""
+    return SessionFilter(date_from=date_from, date_to=date_to, group_names=group_names, teacher_ids=teacher_ids,
+                         building_numbers=building_numbers, cabinet_numbers=cabinet_numbers,
+                         session_types=session_types, subject_ids=subject_ids)
+
+
+@session_router.get("/query", response_model=ShowSessionListWithHATEOAS, responses={400: {"description": "Некорректный фильтр"}})
+async def get_sessions_by_filter(session_filter: Annotated[SessionFilter, Depends(session_filter_query)], query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(SESSION_EXPANSION)], links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await session_service._get_sessions_by_filter(session_filter, query_param.page, query_param.limit, query_param.cursor, links, projection, request, db)
 
 
 @session_router.delete("/delete/{session_number}/{session_date}/{teacher_in_plan}", response_model=ShowSessionWithHATEOAS, responses={404: {"description": "Занятие не найдено"}})
@@ -65,6 +94,6 @@ async def delete_session_by_id(session_id: int, db: AsyncSession = Depends(get_d
     return await session_service._delete_session_by_id(session_id, db)
 
 
-@session_router.put("/update", response_model=ShowSessionWithHATEOAS, responses={404: {"description": "Занятие не найдено"}})
+@session_router.put("/update", response_model=ShowSessionWithHATEOAS, responses={400: {"description": "Группа, преподаватель или кабинет заняты"}, 404: {"description": "Занятие не найдено"}})
 async def update_session(body: UpdateSession, request: Request, db: AsyncSession = Depends(get_db)):
     return await session_service._update_session(body, request, db)
@@ -1,13 +1,15 @@
 from datetime import date
 from api.models import TunedModel
-from typing import List
+from fastapi import HTTPException
+from pydantic import Field, AliasChoices, model_validator
+from typing import Any, List
 
 
 class ShowSession(TunedModel):
-    """Class for get session info"""
+    """Class for get session info, validated straight from the ORM row (its column is date)"""
     id: int
     session_number: int
-    session_date: date
+    session_date: date = Field(validation_alias=AliasChoices("session_date", "date"))
     teacher_in_plan: int
     session_type: str
     cabinet_number: int | None = None
@@ -36,8 +38,51 @@ class UpdateSession(TunedModel):
 class ShowSessionWithHATEOAS(TunedModel):
     session: ShowSession
     links: dict[str, str] = {}
+    # Related rows asked by ?expand=, sent only with it
+    embedded: dict[str, Any] | None = None
 
 
 class ShowSessionListWithHATEOAS(TunedModel):
     sessions: List[ShowSessionWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
+
+
+class SessionFilter(TunedModel):
+    """
+    Filters of GET /sessions/query, every given filter narrows the sessions,
+    the lists are repeated query parameters: group_names=ИС-21&group_names=ИС-22
+    """
+    date_from: date | None = None
+    date_to: date | None = None
+    group_names: List[str] | None = Field(default=None, max_length=100)
+    teacher_ids: List[int] | None = Field(default=None, max_length=100)
+    building_numbers: List[int] | None = Field(default=None, max_length=100)
+    cabinet_numbers: List[int] | None = Field(default=None, max_length=100)
+    session_types: List[str] | None = Field(default=None, max_length=100)
+    subject_ids: List[int] | None = Field(default=None, max_length=100)
+
+    @model_validator(mode="after")
+    def check_period(self) -> "SessionFilter":
+        if self.date_from is not None and self.date_to is not None and self.date_from > self.date_to:
+            raise HTTPException(status_code=400, detail="Дата начала периода позже даты его конца")
+        return self
+
+
+class CreateSessionsBulk(TunedModel):
+    sessions: List[CreateSession] = Field(min_length=1, max_length=1000)
+
+
+class ShowSessionBulkItem(TunedModel):
+    """Result of creating one session from the bulk request"""
+    index: int
+    created: bool
+    detail: str | None = None
+    session: ShowSession | None = None
+
+
+class ShowSessionBulkResult(TunedModel):
+    created_count: int
+    failed_count: int
+    items: List[ShowSessionBulkItem]
+    links: dict[str, str] = {}
@@ -1,19 +1,152 @@
+import asyncio
+
 from api.session.session_pydantic import *
-from api.services_helpers import ensure_cabinet_exists, ensure_session_type_exists, ensure_teacher_in_plan_exists
+from api.services_helpers import (ensure_cabinet_exists, ensure_session_type_exists, ensure_teacher_in_plan_exists,
+                                  violated_constraint_name)
 from api.session.session_DAL import SessionDAL
 from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
 from api.session_type.session_type_DAL import SessionTypeDAL
 from api.cabinet.cabinet_DAL import CabinetDAL
-from fastapi import HTTPException, Request
+from api.session.occupancy_index import OccupancyIndex, SlotConflict, GROUP, TEACHER, CABINET
+from api.session.occupancy_loader import get_slots_occupancy
+from fastapi import HTTPException, Request, Response
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
+from api.serialization import orjson_response
+from api.links import Link, LinkSet, LinksMode, request_base_url, route_url
+from api.expansion import Embed, Expansion, Projection
+from api.teacher_in_plan.teacher_in_plan_pydantic import ShowTeacherInPlan
+from api.teacher.teacher_pydantic import ShowTeacher
+from api.group.group_pydantic import ShowGroup
+from api.subject_in_cycle_hours.subject_in_cycle_hours_pydantic import ShowSubjectsInCycleHours
+from api.subject_in_cycle.subject_in_cycle_pydantic import ShowSubjectsInCycle
+from api.session_type.session_type_pydantic import ShowSessionType
+from api.cabinet.cabinet_pydantic import ShowCabinet
+from db.models import Session
+from sqlalchemy.exc import IntegrityError
+from urllib.parse import urlencode
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+SESSION_LINKS = LinkSet(
+    self=Link("get_session_by_composite_key", session_date="date"),
+    update=Link("update_session"),
+    delete=Link("delete_session", session_date="date"),
+    sessions=Link("get_all_sessions"),
+    plan=Link("get_teacher_in_plan_by_id", teacher_in_plan_id="teacher_in_plan"),
+    type=Link("get_session_type_by_name", name="session_type"),
+    cabinet=Link("get_cabinet_by_number_and_building", when=("cabinet_number", "building_number"))
+)
+
+SESSION_EXPANSION = Expansion(
+    Session, ShowSession,
+    plan=Embed(ShowTeacherInPlan,
+               teacher=Embed(ShowTeacher),
+               group=Embed(ShowGroup),
+               subjects_hours=Embed(ShowSubjectsInCycleHours, subjects_in_cycle=Embed(ShowSubjectsInCycle))),
+    type=Embed(ShowSessionType),
+    cabinet=Embed(ShowCabinet)
+)
+
+
+def conflict_detail(conflict: SlotConflict, session_number: int) -> str:
+    if conflict.kind == GROUP:
+        return f"У группы: {conflict.key} уже есть {session_number} пара"
+    if conflict.kind == TEACHER:
+        return f"У преподавателя с id {conflict.key} уже есть {session_number} пара в другом кабинете"
+    building_number, cabinet_number = conflict.key
+    return f"В кабинете: {building_number}-{cabinet_number} уже есть {session_number} пара"
+
+
+# Constraints of the sessions table and the slot conflicts they enforce
+SLOT_CONSTRAINTS = {
+    "sessions_group_slot_key": GROUP,
+    "sessions_teacher_slot_excl": TEACHER,
+    "sessions_cabinet_slot_excl": CABINET,
+}
+
+
+async def session_write_error(db_session, error: IntegrityError, session_number: int, teacher_in_plan: int,
+                              session_type: str | None, building_number: int | None,
+                              cabinet_number: int | None) -> HTTPException:
+    """
+    Translate a constraint violated by an insert or update of a session into the error of the service.
+    The failed transaction must be already rolled back, db_session must be in a new one
+    """
+    constraint = violated_constraint_name(error)
+    kind = SLOT_CONSTRAINTS.get(constraint)
+    if kind == CABINET:
+        return HTTPException(status_code=400, detail=conflict_detail(SlotConflict(CABINET, (building_number, cabinet_number)), session_number))
+    if kind is not None:
+        # The messages name the group or the teacher, they are loaded only on this path
+        plan = await TeacherInPlanDAL(db_session).get_teacher_in_plan_by_id(teacher_in_plan)
+        if plan is None:
+            key = teacher_in_plan
+        else:
+            key = plan.group_name if kind == GROUP else plan.teacher_id
+        return HTTPException(status_code=400, detail=conflict_detail(SlotConflict(kind, key), session_number))
+    if constraint == "sessions_teacher_in_plan_fkey":
+        return HTTPException(status_code=404, detail=f"Запись в расписании преподавателя с id {teacher_in_plan} не найдена")
+    if constraint == "sessions_session_type_fkey":
+        return HTTPException(status_code=404, detail=f"Тип занятия {session_type} не найден")
+    if constraint == "sessions_cabinet_number_building_number_fkey":
+        return HTTPException(status_code=404, detail=f"Кабинет {cabinet_number} в здании {building_number} не найден")
+    raise error
+
 
 class SessionService:
     async def _create_new_session(self, body: CreateSession, request: Request, db) -> ShowSessionWithHATEOAS:
+        """
+        Create a session with one insert.
+        Busy slots of the group, the teacher and the cabinet and the referenced rows
+        are checked by the constraints of the sessions table
+        """
+        async with db as session:
+            try:
+                async with session.begin():
+                    session_dal = SessionDAL(session)
+                    try:
+                        session_obj = await session_dal.create_session(
+                            session_number=body.session_number,
+                            session_date=body.session_date,
+                            teacher_in_plan=body.teacher_in_plan,
+                            session_type=body.session_type,
+                            cabinet_number=body.cabinet_number,
+                            building_number=body.building_number
+                        )
+
+                        session_pydantic = ShowSession.model_validate(session_obj)
+
+                        api_base_url = request_base_url(request)
+
+                        hateoas_links = SESSION_LINKS.bind(api_base_url)(session_obj)
+
+                        return ShowSessionWithHATEOAS(session=session_pydantic, links=hateoas_links)
+
+                    except (HTTPException, IntegrityError):
+                        raise
+                    except Exception as e:
+                        await session.rollback()
+                        logger.error(f"Неожиданная ошибка при создании занятия: {e}", exc_info=True)
+                        raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
+            except IntegrityError as e:
+                # session.begin() has rolled the insert back, the message is built in a new transaction
+                async with session.begin():
+                    raise await session_write_error(session, e, body.session_number, body.teacher_in_plan,
+                                                    body.session_type, body.building_number, body.cabinet_number)
+
+
+    async def _create_sessions_bulk(self, body: CreateSessionsBulk, request: Request, db) -> ShowSessionBulkResult:
+        """
+        Create many sessions at once.
+        All referenced keys are checked with one query per table (none for the cached session types and cabinets),
+        slots of groups, teachers and cabinets are checked inside the batch and against the occupancy index,
+        the valid sessions are written with one insert. Invalid sessions are skipped
+        and described in the report
+        """
         async with db as session:
             async with session.begin():
                 session_dal = SessionDAL(session)
@@ -21,80 +154,107 @@ class SessionService:
                 session_type_dal = SessionTypeDAL(session)
                 cabinet_dal = CabinetDAL(session)
                 try:
-                    if not await ensure_teacher_in_plan_exists(teacher_in_plan_dal, body.teacher_in_plan):
-                        raise HTTPException(status_code=404, detail=f"Запись в расписании преподавателя с id {body.teacher_in_plan} не найдена")
-                    if not await ensure_session_type_exists(session_type_dal, body.session_type):
-                        raise HTTPException(status_code=404, detail=f"Тип занятия {body.session_type} не найден")
-                    
-                    if body.cabinet_number is not None and body.building_number is not None:
-                        cabinet_exists = await cabinet_dal.get_cabinet_by_number_and_building(body.building_number, body.cabinet_number)
-                        if not cabinet_exists:
-                            raise HTTPException(status_code=404, detail=f"Кабинет {body.cabinet_number} в здании {body.building_number} не найден")
-
-                    # Получаем группу из плана
-                    teacher_in_plan = await teacher_in_plan_dal.get_teacher_in_plan_by_id(body.teacher_in_plan)
-                    group = teacher_in_plan.group_name
-
-                    # Получаем все пары на текущую дату для текущей группы
-                    today_sessions = await session_dal.get_sessions_by_date_and_group(body.session_date, group)
-                    # Получаем список номеров пар группы
-                    today_sessions_numbers = [session.session_number for session in today_sessions]
-
-                    # Проверяем, есть ли у группы пара с таким номером
-                    if body.session_number in today_sessions_numbers:
-                        raise HTTPException(status_code=400, detail=f"У группы: {group} уже есть {body.session_number} пара")
-
-                    # # Проверяем, занят ли кабинет
-                    # is_cabinet_busy = await session_dal.get_session_by_cabinet_and_time(body.cabinet_number, body.building_number, body.session_date, body.session_number)
-                    # if is_cabinet_busy is not None:
-                    #     raise HTTPException(status_code=400, detail=f"В кабинете: {body.building_number}-{body.cabinet_number} уже есть пара")
-
-                    session_obj = await session_dal.create_session(
-                        session_number=body.session_number,
-                        session_date=body.session_date,
-                        teacher_in_plan=body.teacher_in_plan,
-                        session_type=body.session_type,
-                        cabinet_number=body.cabinet_number,
-                        building_number=body.building_number
-                    )
-                    session_number = session_obj.session_number
-                    session_date = session_obj.date 
-                    teacher_in_plan_id = session_obj.teacher_in_plan
-                    
-                    session_dict = {
-                        "id": session_obj.id,
-                        "session_number": session_obj.session_number,
-                        "session_date": session_obj.date,
-                        "teacher_in_plan": session_obj.teacher_in_plan,
-                        "session_type": session_obj.session_type,
-                        "cabinet_number": session_obj.cabinet_number,
-                        "building_number": session_obj.building_number,
-                    }
-                    session_pydantic = ShowSession.model_validate(session_dict)
-
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    items = body.sessions
+
+                    # Load all referenced rows with one query per table
+                    teacher_in_plan_ids = list({item.teacher_in_plan for item in items})
+                    session_type_names = list({item.session_type for item in items})
+                    cabinet_keys = list({(item.building_number, item.cabinet_number) for item in items
+                                         if item.cabinet_number is not None and item.building_number is not None})
+
+                    teachers_in_plans = {tip.id: tip for tip in await teacher_in_plan_dal.get_teachers_in_plans_by_ids(teacher_in_plan_ids)}
+                    # Session types and cabinets are answered by the reference cache, one query per table on a miss
+                    session_types_found = await asyncio.gather(*(ensure_session_type_exists(session_type_dal, name)
+                                                                 for name in session_type_names))
+                    session_types = {name for name, found in zip(session_type_names, session_types_found) if found}
+                    cabinets_found = await asyncio.gather(*(ensure_cabinet_exists(cabinet_dal, *cabinet_key)
+                                                            for cabinet_key in cabinet_keys))
+                    cabinets = {cabinet_key for cabinet_key, found in zip(cabinet_keys, cabinets_found) if found}
+
+                    errors = {}
+                    slots = {}
+                    for index, item in enumerate(items):
+                        if item.teacher_in_plan not in teachers_in_plans:
+                            errors[index] = f"Запись в расписании преподавателя с id {item.teacher_in_plan} не найдена"
+                        elif item.session_type not in session_types:
+                            errors[index] = f"Тип занятия {item.session_type} не найден"
+                        elif (item.cabinet_number is not None and item.building_number is not None
+                              and (item.building_number, item.cabinet_number) not in cabinets):
+                            errors[index] = f"Кабинет {item.cabinet_number} в здании {item.building_number} не найден"
+                        else:
+                            slots[index] = (item.session_date, item.session_number)
+
+                    # Check slots of groups, teachers and cabinets against the schedule and inside the batch
+                    occupancy = await get_slots_occupancy(session_dal, list(slots.values()))
+                    batch_occupancy = OccupancyIndex()
+                    valid_indexes = []
+                    for index in slots:
+                        item = items[index]
+                        plan = teachers_in_plans[item.teacher_in_plan]
+                        conflict_args = (item.session_date, item.session_number, plan.group_name, plan.teacher_id,
+                                         item.building_number, item.cabinet_number)
+                        conflicts = occupancy.find_conflicts(*conflict_args)
+                        batch_conflicts = batch_occupancy.find_conflicts(*conflict_args)
+                        if conflicts:
+                            errors[index] = conflict_detail(conflicts[0], item.session_number)
+                        elif batch_conflicts:
+                            errors[index] = f"{conflict_detail(batch_conflicts[0], item.session_number)} (занятие в этом же запросе)"
+                        else:
+                            batch_occupancy.set_teacher_in_plan(plan.id, plan.group_name, plan.teacher_id)
+                            batch_occupancy.add_session(index, item.session_date, item.session_number, plan.id,
+                                                        item.building_number, item.cabinet_number)
+                            valid_indexes.append(index)
+
+                    created_sessions = {}
+                    if valid_indexes:
+                        try:
+                            new_sessions = await session_dal.create_sessions([
+                                {
+                                    "session_number": items[index].session_number,
+                                    "date": items[index].session_date,
+                                    "teacher_in_plan": items[index].teacher_in_plan,
+                                    "session_type": items[index].session_type,
+                                    "cabinet_number": items[index].cabinet_number,
+                                    "building_number": items[index].building_number,
+                                }
+                                for index in valid_indexes
+                            ])
+                        except IntegrityError:
+                            # The slots were taken by a concurrent request after the check
+                            raise HTTPException(status_code=409, detail="Расписание изменилось во время создания занятий, повторите запрос")
+                        created_sessions = dict(zip(valid_indexes, new_sessions))
+
+                    result_items = []
+                    for index in range(len(items)):
+                        session_obj = created_sessions.get(index)
+                        if session_obj is None:
+                            result_items.append(ShowSessionBulkItem(index=index, created=False, detail=errors.get(index)))
+                            continue
+
+                        session_pydantic = ShowSession.model_validate(session_obj)
+                        result_items.append(ShowSessionBulkItem(index=index, created=True, session=session_pydantic))
+
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{teacher_in_plan_id}',
-                        "update": f'{api_base_url}/sessions/update',
-                        "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{teacher_in_plan_id}',
-                        "sessions": f'{api_base_url}/sessions',
-                        "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{body.teacher_in_plan}',
-                        "type": f'{api_base_url}/session-types/search/by_name/{body.session_type}',
-                        "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{body.building_number}/{body.cabinet_number}' if body.cabinet_number and body.building_number else None
+                        "self": route_url(api_base_url, "create_sessions_bulk"),
+                        "create": route_url(api_base_url, "create_session"),
+                        "sessions": route_url(api_base_url, "get_all_sessions")
                     }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
-                    return ShowSessionWithHATEOAS(session=session_pydantic, links=hateoas_links)
+                    return ShowSessionBulkResult(
+                        created_count=len(created_sessions),
+                        failed_count=len(items) - len(created_sessions),
+                        items=result_items,
+                        links=hateoas_links
+                    )
 
                 except HTTPException:
                     await session.rollback()
                     raise
                 except Exception as e:
                     await session.rollback()
-                    logger.error(f"Неожиданная ошибка при создании занятия: {e}", exc_info=True)
+                    logger.error(f"Неожиданная ошибка при массовом создании занятий: {e}", exc_info=True)
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
@@ -107,31 +267,11 @@ class SessionService:
                     if not session_obj:
                         raise HTTPException(status_code=404, detail=f"Занятие с номером {session_number}, датой {session_date} и записью в расписании преподавателя {teacher_in_plan} не найдено")
 
-                    session_dict = {
-                        "id": session_obj.id,
-                        "session_number": session_obj.session_number,
-                        "session_date": session_obj.date,
-                        "teacher_in_plan": session_obj.teacher_in_plan,
-                        "session_type": session_obj.session_type,
-                        "cabinet_number": session_obj.cabinet_number,
-                        "building_number": session_obj.building_number,
-                    }
-                    session_pydantic = ShowSession.model_validate(session_dict)
+                    session_pydantic = ShowSession.model_validate(session_obj)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{teacher_in_plan}',
-                        "update": f'{api_base_url}/sessions/update',
-                        "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{teacher_in_plan}',
-                        "sessions": f'{api_base_url}/sessions',
-                        "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{session_obj.teacher_in_plan}',
-                        "type": f'{api_base_url}/session-types/search/by_name/{session_obj.session_type}',
-                        "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{session_obj.building_number}/{session_obj.cabinet_number}' if session_obj.cabinet_number and session_obj.building_number else None
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = SESSION_LINKS.bind(api_base_url)(session_obj)
 
                     return ShowSessionWithHATEOAS(session=session_pydantic, links=hateoas_links)
 
@@ -146,8 +286,10 @@ class SessionService:
                                                 teacher_id: int,
                                                 start_period_date,
                                                 end_period_date,
+                                                links: LinksMode,
+                                                projection: Projection,
                                                 request: Request,
-                                                db):
+                                                db) -> Response:
         async with db as session:
             async with session.begin():
                 session_dal = SessionDAL(session)
@@ -164,7 +306,8 @@ class SessionService:
 
                     sessions = await session_dal.get_sessions_by_teacher_in_plan_and_date(teachers_in_plan_ids,
                                                                                     start_period_date,
-                                                                                    end_period_date
+                                                                                    end_period_date,
+                                                                                    options=projection.options
                                                                                     )
 
                     if not session:
@@ -172,45 +315,20 @@ class SessionService:
                                             detail=f"Не найдено занятий на неделю в периоде: с {start_period_date}"
                                                    f"по {end_period_date} для данного учителя")
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
-
-                    sessions_with_hateoas = []
-                    for session_obj in sessions:
-                        session_dict = {
-                            "id": session_obj.id,
-                            "session_number": session_obj.session_number,
-                            "session_date": session_obj.date,
-                            "teacher_in_plan": session_obj.teacher_in_plan,
-                            "session_type": session_obj.session_type,
-                            "cabinet_number": session_obj.cabinet_number,
-                            "building_number": session_obj.building_number,
-                        }
-                        session_pydantic = ShowSession.model_validate(session_dict)
-                        session_number = session_obj.session_number
-                        session_date = session_obj.date
-                        plan_id = session_obj.teacher_in_plan
-                        session_links = {
-                            "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{plan_id}',
-                            "update": f'{api_base_url}/sessions/update',
-                            "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{plan_id}',
-                            "sessions": f'{api_base_url}/sessions',
-                            "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{plan_id}',
-                            "type": f'{api_base_url}/session-types/search/by_name/{session_obj.session_type}',
-                            "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{session_obj.building_number}/{session_obj.cabinet_number}' if session_obj.cabinet_number and session_obj.building_number else None
-                        }
-                        session_links = {k: v for k, v in session_links.items() if v is not None}
-                        session_with_links = ShowSessionWithHATEOAS(session=session_pydantic, links=session_links)
-                        sessions_with_hateoas.append(session_with_links)
+                    api_base_url = request_base_url(request)
+
+                    session_links = SESSION_LINKS.bind(api_base_url, links)
+                    sessions_with_hateoas = [{"session": session_obj, "links": session_links(session_obj),
+                                              "embedded": projection.embed(session_obj)} for session_obj in sessions]
 
                     collection_links = {
-                        "self": f'{api_base_url}/sessions/search/by_teacher_id/{teacher_id}/{start_period_date}/{end_period_date}',
-                        "create": f'{api_base_url}/sessions/create'
+                        "self": route_url(api_base_url, "get_sessions_by_teacher_and_date", teacher_id=teacher_id, start_period_date=start_period_date, end_period_date=end_period_date),
+                        "create": route_url(api_base_url, "create_session")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSessionListWithHATEOAS(sessions=sessions_with_hateoas, links=collection_links)
+                    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas, "links": collection_links},
+                                           exclude=projection.list_exclude("sessions", "session"))
 
 
                 except HTTPException:
@@ -220,7 +338,7 @@ class SessionService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_sessions_by_plan(self, teacher_in_plan_id: int, page: int, limit: int, request: Request, db) -> ShowSessionListWithHATEOAS:
+    async def _get_sessions_by_plan(self, teacher_in_plan_id: int, page: int, limit: int, cursor: str | None, links: LinksMode, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 teacher_in_plan_dal = TeacherInPlanDAL(session)
@@ -229,47 +347,33 @@ class SessionService:
                     if not await ensure_teacher_in_plan_exists(teacher_in_plan_dal, teacher_in_plan_id):
                         raise HTTPException(status_code=404, detail=f"Запись в расписании преподавателя с id {teacher_in_plan_id} не найдена")
 
-                    sessions = await session_dal.get_sessions_by_plan(teacher_in_plan_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
-
-                    sessions_with_hateoas = []
-                    for session_obj in sessions:
-                        session_dict = {
-                            "id": session_obj.id,
-                            "session_number": session_obj.session_number,
-                            "session_date": session_obj.date,
-                            "teacher_in_plan": session_obj.teacher_in_plan,
-                            "session_type": session_obj.session_type,
-                            "cabinet_number": session_obj.cabinet_number,
-                            "building_number": session_obj.building_number,
-                        }
-                        session_pydantic = ShowSession.model_validate(session_dict)
-                        session_number = session_obj.session_number
-                        session_date = session_obj.date
-                        plan_id = session_obj.teacher_in_plan
-                        session_links = {
-                            "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{plan_id}',
-                            "update": f'{api_base_url}/sessions/update',
-                            "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{plan_id}',
-                            "sessions": f'{api_base_url}/sessions',
-                            "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{plan_id}',
-                            "type": f'{api_base_url}/session-types/search/by_name/{session_obj.session_type}',
-                            "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{session_obj.building_number}/{session_obj.cabinet_number}' if session_obj.cabinet_number and session_obj.building_number else None
-                        }
-                        session_links = {k: v for k, v in session_links.items() if v is not None}
-                        session_with_links = ShowSessionWithHATEOAS(session=session_pydantic, links=session_links)
-                        sessions_with_hateoas.append(session_with_links)
+                    api_base_url = request_base_url(request)
+
+                    session_links = SESSION_LINKS.bind(api_base_url, links)
+
+                    def to_hateoas(session_obj) -> dict:
+                        return {"session": session_obj, "links": session_links(session_obj), "embedded": projection.embed(session_obj)}
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SessionDAL(stream_session).get_sessions_by_plan(teacher_in_plan_id, page, limit, cursor, stream=True, options=projection.options),
+                                               lambda session_obj: ShowSessionWithHATEOAS.model_validate(to_hateoas(session_obj)),
+                                               exclude=projection.item_exclude("session"))
+
+                    sessions = await session_dal.get_sessions_by_plan(teacher_in_plan_id, page, limit, cursor, options=projection.options)
+
+                    sessions_with_hateoas = [to_hateoas(session_obj) for session_obj in sessions]
 
                     collection_links = {
-                        "self": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/sessions/create',
-                        "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}'
+                        "self": route_url(api_base_url, "get_sessions_by_plan", query=page_query(page, limit, cursor), teacher_in_plan_id=teacher_in_plan_id),
+                        "next": route_url(api_base_url, "get_sessions_by_plan", query=page_query(None, limit, sessions.next_cursor), teacher_in_plan_id=teacher_in_plan_id) if sessions.next_cursor else None,
+                        "create": route_url(api_base_url, "create_session"),
+                        "plan": route_url(api_base_url, "get_teacher_in_plan_by_id", teacher_in_plan_id=teacher_in_plan_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSessionListWithHATEOAS(sessions=sessions_with_hateoas, links=collection_links)
+                    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas, "links": collection_links,
+                                                                         "next_cursor": sessions.next_cursor},
+                                           exclude=projection.list_exclude("sessions", "session"))
 
                 except HTTPException:
                     raise
@@ -278,50 +382,37 @@ class SessionService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_sessions_by_date(self, session_date: date, page: int, limit: int, request: Request, db) -> ShowSessionListWithHATEOAS:
+    async def _get_sessions_by_date(self, session_date: date, page: int, limit: int, cursor: str | None, links: LinksMode, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 session_dal = SessionDAL(session)
                 try:
-                    sessions = await session_dal.get_sessions_by_date(session_date, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
-
-                    sessions_with_hateoas = []
-                    for session_obj in sessions:
-                        session_dict = {
-                            "id": session_obj.id,
-                            "session_number": session_obj.session_number,
-                            "session_date": session_obj.date,
-                            "teacher_in_plan": session_obj.teacher_in_plan,
-                            "session_type": session_obj.session_type,
-                            "cabinet_number": session_obj.cabinet_number,
-                            "building_number": session_obj.building_number,
-                        }
-                        session_pydantic = ShowSession.model_validate(session_dict)
-                        session_number = session_obj.session_number
-                        plan_id = session_obj.teacher_in_plan
-                        session_links = {
-                            "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{plan_id}',
-                            "update": f'{api_base_url}/sessions/update',
-                            "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{plan_id}',
-                            "sessions": f'{api_base_url}/sessions',
-                            "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{plan_id}',
-                            "type": f'{api_base_url}/session-types/search/by_name/{session_obj.session_type}',
-                            "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{session_obj.building_number}/{session_obj.cabinet_number}' if session_obj.cabinet_number and session_obj.building_number else None
-                        }
-                        session_links = {k: v for k, v in session_links.items() if v is not None}
-                        session_with_links = ShowSessionWithHATEOAS(session=session_pydantic, links=session_links)
-                        sessions_with_hateoas.append(session_with_links)
+                    api_base_url = request_base_url(request)
+
+                    session_links = SESSION_LINKS.bind(api_base_url, links)
+
+                    def to_hateoas(session_obj) -> dict:
+                        return {"session": session_obj, "links": session_links(session_obj), "embedded": projection.embed(session_obj)}
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SessionDAL(stream_session).get_sessions_by_date(session_date, page, limit, cursor, stream=True, options=projection.options),
+                                               lambda session_obj: ShowSessionWithHATEOAS.model_validate(to_hateoas(session_obj)),
+                                               exclude=projection.item_exclude("session"))
+
+                    sessions = await session_dal.get_sessions_by_date(session_date, page, limit, cursor, options=projection.options)
+
+                    sessions_with_hateoas = [to_hateoas(session_obj) for session_obj in sessions]
 
                     collection_links = {
-                        "self": f'{api_base_url}/sessions/search/by_date/{session_date}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/sessions/create'
+                        "self": route_url(api_base_url, "get_sessions_by_date", query=page_query(page, limit, cursor), session_date=session_date),
+                        "next": route_url(api_base_url, "get_sessions_by_date", query=page_query(None, limit, sessions.next_cursor), session_date=session_date) if sessions.next_cursor else None,
+                        "create": route_url(api_base_url, "create_session")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSessionListWithHATEOAS(sessions=sessions_with_hateoas, links=collection_links)
+                    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas, "links": collection_links,
+                                                                         "next_cursor": sessions.next_cursor},
+                                           exclude=projection.list_exclude("sessions", "session"))
 
                 except HTTPException:
                     raise
@@ -330,7 +421,7 @@ class SessionService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_sessions_by_type(self, session_type: str, page: int, limit: int, request: Request, db) -> ShowSessionListWithHATEOAS:
+    async def _get_sessions_by_type(self, session_type: str, page: int, limit: int, cursor: str | None, links: LinksMode, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 session_type_dal = SessionTypeDAL(session)
@@ -339,47 +430,33 @@ class SessionService:
                     if not await ensure_session_type_exists(session_type_dal, session_type):
                         raise HTTPException(status_code=404, detail=f"Тип занятия {session_type} не найден")
 
-                    sessions = await session_dal.get_sessions_by_type(session_type, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
-
-                    sessions_with_hateoas = []
-                    for session_obj in sessions:
-                        session_dict = {
-                            "id": session_obj.id,
-                            "session_number": session_obj.session_number,
-                            "session_date": session_obj.date,
-                            "teacher_in_plan": session_obj.teacher_in_plan,
-                            "session_type": session_obj.session_type,
-                            "cabinet_number": session_obj.cabinet_number,
-                            "building_number": session_obj.building_number,
-                        }
-                        session_pydantic = ShowSession.model_validate(session_dict)
-                        session_number = session_obj.session_number
-                        session_date = session_obj.date
-                        plan_id = session_obj.teacher_in_plan
-                        session_links = {
-                            "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{plan_id}',
-                            "update": f'{api_base_url}/sessions/update',
-                            "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{plan_id}',
-                            "sessions": f'{api_base_url}/sessions',
-                            "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{plan_id}',
-                            "type": f'{api_base_url}/session-types/search/by_name/{session_type}',
-                            "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{session_obj.building_number}/{session_obj.cabinet_number}' if session_obj.cabinet_number and session_obj.building_number else None
-                        }
-                        session_links = {k: v for k, v in session_links.items() if v is not None}
-                        session_with_links = ShowSessionWithHATEOAS(session=session_pydantic, links=session_links)
-                        sessions_with_hateoas.append(session_with_links)
+                    api_base_url = request_base_url(request)
+
+                    session_links = SESSION_LINKS.bind(api_base_url, links)
+
+                    def to_hateoas(session_obj) -> dict:
+                        return {"session": session_obj, "links": session_links(session_obj), "embedded": projection.embed(session_obj)}
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SessionDAL(stream_session).get_sessions_by_type(session_type, page, limit, cursor, stream=True, options=projection.options),
+                                               lambda session_obj: ShowSessionWithHATEOAS.model_validate(to_hateoas(session_obj)),
+                                               exclude=projection.item_exclude("session"))
+
+                    sessions = await session_dal.get_sessions_by_type(session_type, page, limit, cursor, options=projection.options)
+
+                    sessions_with_hateoas = [to_hateoas(session_obj) for session_obj in sessions]
 
                     collection_links = {
-                        "self": f'{api_base_url}/sessions/search/by_type/{session_type}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/sessions/create',
-                        "type": f'{api_base_url}/session-types/search/by_name/{session_type}'
+                        "self": route_url(api_base_url, "get_sessions_by_type", query=page_query(page, limit, cursor), session_type=session_type),
+                        "next": route_url(api_base_url, "get_sessions_by_type", query=page_query(None, limit, sessions.next_cursor), session_type=session_type) if sessions.next_cursor else None,
+                        "create": route_url(api_base_url, "create_session"),
+                        "type": route_url(api_base_url, "get_session_type_by_name", name=session_type)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSessionListWithHATEOAS(sessions=sessions_with_hateoas, links=collection_links)
+                    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas, "links": collection_links,
+                                                                         "next_cursor": sessions.next_cursor},
+                                           exclude=projection.list_exclude("sessions", "session"))
 
                 except HTTPException:
                     raise
@@ -388,7 +465,7 @@ class SessionService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_sessions_by_cabinet(self, cabinet_number: int, building_number: int, page: int, limit: int, request: Request, db) -> ShowSessionListWithHATEOAS:
+    async def _get_sessions_by_cabinet(self, cabinet_number: int, building_number: int, page: int, limit: int, cursor: str | None, links: LinksMode, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 cabinet_dal = CabinetDAL(session)
@@ -397,46 +474,33 @@ class SessionService:
                     if not await ensure_cabinet_exists(cabinet_dal, building_number, cabinet_number):
                         raise HTTPException(status_code=404, detail=f"Кабинет {cabinet_number} в здании {building_number} не найден")
 
-                    sessions = await session_dal.get_sessions_by_cabinet(cabinet_number, building_number, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
-
-                    sessions_with_hateoas = []
-                    for session_obj in sessions:
-                        session_dict = {
-                            "id": session_obj.id,
-                            "session_number": session_obj.session_number,
-                            "session_date": session_obj.date,
-                            "teacher_in_plan": session_obj.teacher_in_plan,
-                            "session_type": session_obj.session_type,
-                            "cabinet_number": session_obj.cabinet_number,
-                            "building_number": session_obj.building_number,
-                        }
-                        session_pydantic = ShowSession.model_validate(session_dict)
-                        session_number = session_obj.session_number
-                        session_date = session_obj.date
-                        plan_id = session_obj.teacher_in_plan
-                        session_links = {
-                            "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{plan_id}',
-                            "update": f'{api_base_url}/sessions/update',
-                            "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{plan_id}',
-                            "sessions": f'{api_base_url}/sessions',
-                            "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{plan_id}',
-                            "type": f'{api_base_url}/session-types/search/by_name/{session_obj.session_type}',
-                            "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{building_number}/{cabinet_number}'
-                        }
-                        session_with_links = ShowSessionWithHATEOAS(session=session_pydantic, links=session_links)
-                        sessions_with_hateoas.append(session_with_links)
+                    api_base_url = request_base_url(request)
+
+                    session_links = SESSION_LINKS.bind(api_base_url, links)
+
+                    def to_hateoas(session_obj) -> dict:
+                        return {"session": session_obj, "links": session_links(session_obj), "embedded": projection.embed(session_obj)}
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SessionDAL(stream_session).get_sessions_by_cabinet(cabinet_number, building_number, page, limit, cursor, stream=True, options=projection.options),
+                                               lambda session_obj: ShowSessionWithHATEOAS.model_validate(to_hateoas(session_obj)),
+                                               exclude=projection.item_exclude("session"))
+
+                    sessions = await session_dal.get_sessions_by_cabinet(cabinet_number, building_number, page, limit, cursor, options=projection.options)
+
+                    sessions_with_hateoas = [to_hateoas(session_obj) for session_obj in sessions]
 
                     collection_links = {
-                        "self": f'{api_base_url}/sessions/search/by_cabinet/{building_number}/{cabinet_number}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/sessions/create',
-                        "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{building_number}/{cabinet_number}'
+                        "self": route_url(api_base_url, "get_sessions_by_cabinet", query=page_query(page, limit, cursor), building_number=building_number, cabinet_number=cabinet_number),
+                        "next": route_url(api_base_url, "get_sessions_by_cabinet", query=page_query(None, limit, sessions.next_cursor), building_number=building_number, cabinet_number=cabinet_number) if sessions.next_cursor else None,
+                        "create": route_url(api_base_url, "create_session"),
+                        "cabinet": route_url(api_base_url, "get_cabinet_by_number_and_building", building_number=building_number, cabinet_number=cabinet_number)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSessionListWithHATEOAS(sessions=sessions_with_hateoas, links=collection_links)
+                    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas, "links": collection_links,
+                                                                         "next_cursor": sessions.next_cursor},
+                                           exclude=projection.list_exclude("sessions", "session"))
 
                 except HTTPException:
                     raise
@@ -445,51 +509,37 @@ class SessionService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_sessions(self, page: int, limit: int, request: Request, db) -> ShowSessionListWithHATEOAS:
+    async def _get_all_sessions(self, page: int, limit: int, cursor: str | None, links: LinksMode, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 session_dal = SessionDAL(session)
                 try:
-                    sessions = await session_dal.get_all_sessions(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
-
-                    sessions_with_hateoas = []
-                    for session_obj in sessions:
-                        session_dict = {
-                            "id": session_obj.id,
-                            "session_number": session_obj.session_number,
-                            "session_date": session_obj.date,
-                            "teacher_in_plan": session_obj.teacher_in_plan,
-                            "session_type": session_obj.session_type,
-                            "cabinet_number": session_obj.cabinet_number,
-                            "building_number": session_obj.building_number,
-                        }
-                        session_pydantic = ShowSession.model_validate(session_dict)
-                        session_number = session_obj.session_number
-                        session_date = session_obj.date
-                        plan_id = session_obj.teacher_in_plan
-                        session_links = {
-                            "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{plan_id}',
-                            "update": f'{api_base_url}/sessions/update',
-                            "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{plan_id}',
-                            "sessions": f'{api_base_url}/sessions',
-                            "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{plan_id}',
-                            "type": f'{api_base_url}/session-types/search/by_name/{session_obj.session_type}',
-                            "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{session_obj.building_number}/{session_obj.cabinet_number}' if session_obj.cabinet_number and session_obj.building_number else None
-                        }
-                        session_links = {k: v for k, v in session_links.items() if v is not None}
-                        session_with_links = ShowSessionWithHATEOAS(session=session_pydantic, links=session_links)
-                        sessions_with_hateoas.append(session_with_links)
+                    api_base_url = request_base_url(request)
+
+                    session_links = SESSION_LINKS.bind(api_base_url, links)
+
+                    def to_hateoas(session_obj) -> dict:
+                        return {"session": session_obj, "links": session_links(session_obj), "embedded": projection.embed(session_obj)}
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SessionDAL(stream_session).get_all_sessions(page, limit, cursor, stream=True, options=projection.options),
+                                               lambda session_obj: ShowSessionWithHATEOAS.model_validate(to_hateoas(session_obj)),
+                                               exclude=projection.item_exclude("session"))
+
+                    sessions = await session_dal.get_all_sessions(page, limit, cursor, options=projection.options)
+
+                    sessions_with_hateoas = [to_hateoas(session_obj) for session_obj in sessions]
 
                     collection_links = {
-                        "self": f'{api_base_url}/sessions/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/sessions/create'
+                        "self": route_url(api_base_url, "get_all_sessions", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_sessions", query=page_query(None, limit, sessions.next_cursor)) if sessions.next_cursor else None,
+                        "create": route_url(api_base_url, "create_session")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSessionListWithHATEOAS(sessions=sessions_with_hateoas, links=collection_links)
+                    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas, "links": collection_links,
+                                                                         "next_cursor": sessions.next_cursor},
+                                           exclude=projection.list_exclude("sessions", "session"))
 
                 except HTTPException:
                     raise
@@ -498,6 +548,48 @@ class SessionService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
+    async def _get_sessions_by_filter(self, session_filter: SessionFilter, page: int, limit: int, cursor: str | None, links: LinksMode, projection: Projection, request: Request, db) -> Response:
+        async with db as session:
+            async with session.begin():
+                session_dal = SessionDAL(session)
+                try:
+                    filters = session_filter.model_dump()
+
+                    api_base_url = request_base_url(request)
+
+                    session_links = SESSION_LINKS.bind(api_base_url, links)
+
+                    def to_hateoas(session_obj) -> dict:
+                        return {"session": session_obj, "links": session_links(session_obj), "embedded": projection.embed(session_obj)}
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SessionDAL(stream_session).get_sessions_by_filter(page, limit, cursor, stream=True, options=projection.options, **filters),
+                                               lambda session_obj: ShowSessionWithHATEOAS.model_validate(to_hateoas(session_obj)),
+                                               exclude=projection.item_exclude("session"))
+
+                    sessions = await session_dal.get_sessions_by_filter(page, limit, cursor, options=projection.options, **filters)
+
+                    sessions_with_hateoas = [to_hateoas(session_obj) for session_obj in sessions]
+
+                    filter_query = urlencode(session_filter.model_dump(exclude_none=True), doseq=True)
+                    collection_links = {
+                        "self": route_url(api_base_url, "get_sessions_by_filter", query=f"{filter_query}&{page_query(page, limit, cursor)}"),
+                        "next": route_url(api_base_url, "get_sessions_by_filter", query=f"{filter_query}&{page_query(None, limit, sessions.next_cursor)}") if sessions.next_cursor else None,
+                        "create": route_url(api_base_url, "create_session")
+                    }
+                    collection_links = {k: v for k, v in collection_links.items() if v is not None}
+
+                    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas, "links": collection_links,
+                                                                         "next_cursor": sessions.next_cursor},
+                                           exclude=projection.list_exclude("sessions", "session"))
+
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Поиск занятий по фильтру {session_filter} отменен (Ошибка: {e})")
+                    raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
+
+
     async def _delete_session(self, session_number: int, session_date: date, teacher_in_plan: int, request: Request, db) -> ShowSessionWithHATEOAS:
         async with db as session:
             try:
@@ -512,24 +604,13 @@ class SessionService:
                     if not deleted_session_obj:
                         raise HTTPException(status_code=404, detail=f"Занятие с номером {session_number}, датой {session_date} и записью в расписании преподавателя {teacher_in_plan} не найдено")
 
-                    session_dict = {
-                        "id": session_obj.id,
-                        "session_number": deleted_session_obj.session_number,
-                        "session_date": deleted_session_obj.date,
-                        "teacher_in_plan": deleted_session_obj.teacher_in_plan,
-                        "session_type": deleted_session_obj.session_type,
-                        "cabinet_number": deleted_session_obj.cabinet_number,
-                        "building_number": deleted_session_obj.building_number,
-                    }
-                    session_pydantic = ShowSession.model_validate(session_dict)
+                    session_pydantic = ShowSession.model_validate(deleted_session_obj)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "sessions": f'{api_base_url}/sessions',
-                        "create": f'{api_base_url}/sessions/create'
+                        "sessions": route_url(api_base_url, "get_all_sessions"),
+                        "create": route_url(api_base_url, "create_session")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -558,18 +639,7 @@ class SessionService:
                     if not deleted_session_obj:
                         raise HTTPException(status_code=400, detail=f"Не удалось удалить занятие с id: {session_id}")
 
-                    session_dict = {
-                        "id": session_obj.id,
-                        "session_number": deleted_session_obj.session_number,
-                        "session_date": deleted_session_obj.date,
-                        "teacher_in_plan": deleted_session_obj.teacher_in_plan,
-                        "session_type": deleted_session_obj.session_type,
-                        "cabinet_number": deleted_session_obj.cabinet_number,
-                        "building_number": deleted_session_obj.building_number,
-                    }
-                    session = ShowSession.model_validate(session_dict)
-                    
-                    return session
+                    return ShowSession.model_validate(deleted_session_obj)
 
             except HTTPException:
                 await session.rollback()
@@ -591,85 +661,42 @@ class SessionService:
 
                     session_dal = SessionDAL(session)
 
-                    session_obj = await session_dal.get_session_by_id(body.session_id)
-                    if not session_obj:
-                        raise HTTPException(status_code=404, detail=f"Занятие с номером {body.session_number}, датой {body.session_date} и записью в расписании преподавателя {body.teacher_in_plan} не найдено")
-                    
-                    target_session_number = session_obj.session_number
-                    target_session_date = session_obj.date
-                    target_teacher_in_plan = session_obj.teacher_in_plan
                     if body.new_session_number is not None:
                         update_data["session_number"] = body.new_session_number
-                        target_session_number = body.new_session_number
                     if body.new_session_date is not None:
-                        update_data["date"] = body.new_session_date 
-                        target_session_date = body.new_session_date
+                        update_data["date"] = body.new_session_date
                     if body.new_teacher_in_plan is not None:
                         update_data["teacher_in_plan"] = body.new_teacher_in_plan
-                        target_teacher_in_plan = body.new_teacher_in_plan
-                        
+
                     if body.new_cabinet_number is not None:
                         update_data["cabinet_number"] = body.new_cabinet_number
                     if body.new_building_number is not None:
                         update_data["building_number"] = body.new_building_number
 
-                    if "session_type" in update_data:
-                        session_type_dal = SessionTypeDAL(session)
-                        if not await ensure_session_type_exists(session_type_dal, update_data["session_type"]):
-                            raise HTTPException(status_code=404, detail=f"Тип занятия {update_data['session_type']} не найден")
-                        
-                    if "cabinet_number" in update_data or "building_number" in update_data:
-                        cabinet_number_to_check = update_data.get("cabinet_number")
-                        building_number_to_check = update_data.get("building_number")
-                        
-                        if cabinet_number_to_check is not None and building_number_to_check is not None:
-                            cabinet_dal = CabinetDAL(session)
-                            
-                            cabinet_exists = await cabinet_dal.get_cabinet_by_number_and_building(building_number_to_check, cabinet_number_to_check)
-                            if not cabinet_exists:
-                                raise HTTPException(status_code=404, detail=f"Кабинет {cabinet_number_to_check} в здании {building_number_to_check} не найден")
-
-                    if (target_session_number, target_session_date, target_teacher_in_plan) != (body.new_session_number, body.new_session_date, body.new_teacher_in_plan):
-                        existing_new_session = await session_dal.get_session_by_composite_key(target_session_number, target_session_date, target_teacher_in_plan)
-                        if existing_new_session:
-                            raise HTTPException(status_code=400, detail=f"Занятие с номером {target_session_number}, датой {target_session_date} и записью в расписании преподавателя {target_teacher_in_plan} уже существует")
-
+                    # One update, busy slots and the referenced rows are checked by the constraints
                     updated_session_obj = await session_dal.update_session(body.session_id, **update_data)
                     if not updated_session_obj:
-                        raise HTTPException(status_code=404, detail=f"Занятие с номером {body.new_session_number}, датой {body.new_session_date} и записью в расписании преподавателя {body.new_teacher_in_plan} не найдено")
+                        raise HTTPException(status_code=404, detail=f"Занятие с id {body.session_id} не найдено")
 
-                    session_number = updated_session_obj.session_number
-                    session_date = updated_session_obj.date
-                    teacher_in_plan_id = updated_session_obj.teacher_in_plan
-                    
-                    session_dict = {
-                        "id": updated_session_obj.id,
-                        "session_number": updated_session_obj.session_number,
-                        "session_date": updated_session_obj.date,
-                        "teacher_in_plan": updated_session_obj.teacher_in_plan,
-                        "session_type": updated_session_obj.session_type,
-                        "cabinet_number": updated_session_obj.cabinet_number,
-                        "building_number": updated_session_obj.building_number,
-                    }
-                    session_pydantic = ShowSession.model_validate(session_dict)
+                    session_pydantic = ShowSession.model_validate(updated_session_obj)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/sessions/search/by_composite_key/{session_number}/{session_date}/{teacher_in_plan_id}',
-                        "update": f'{api_base_url}/sessions/update',
-                        "delete": f'{api_base_url}/sessions/delete/{session_number}/{session_date}/{teacher_in_plan_id}',
-                        "sessions": f'{api_base_url}/sessions',
-                        "plan": f'{api_base_url}/teachers_in_plans/search/by_id/{updated_session_obj.teacher_in_plan}',
-                        "type": f'{api_base_url}/session-types/search/by_name/{updated_session_obj.session_type}',
-                        "cabinet": f'{api_base_url}/cabinets/search/by_building_and_number/{updated_session_obj.building_number}/{updated_session_obj.cabinet_number}' if updated_session_obj.cabinet_number and updated_session_obj.building_number else None
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = SESSION_LINKS.bind(api_base_url)(updated_session_obj)
 
                     return ShowSessionWithHATEOAS(session=session_pydantic, links=hateoas_links)
 
+            except IntegrityError as e:
+                # session.begin() has rolled the update back, the current values of the session
+                # fill in the fields missing from the body, they are read in a new transaction
+                async with session.begin():
+                    session_obj = await session_dal.get_session_by_id(body.session_id)
+                    raise await session_write_error(session, e,
+                                                    update_data.get("session_number", session_obj.session_number),
+                                                    update_data.get("teacher_in_plan", session_obj.teacher_in_plan),
+                                                    update_data.get("session_type", session_obj.session_type),
+                                                    update_data.get("building_number", session_obj.building_number),
+                                                    update_data.get("cabinet_number", session_obj.cabinet_number))
             except HTTPException:
                 await session.rollback()
                 raise
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import SessionType
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class SessionTypeDAL:
@@ -27,14 +28,9 @@ class SessionTypeDAL:
         return deleted_type
 
     @log_exceptions
-    async def get_all_session_types(self, page: int, limit: int) -> list[SessionType]:
-        if page == 0:
-            query = select(SessionType).order_by(SessionType.name.asc())
-        else:
-            query = select(SessionType).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        types = list(result.scalars().all())
-        return types
+    async def get_all_session_types(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(SessionType)
+        return await fetch_page(self.db_session, query, (SessionType.name,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_session_type(self, name: str) -> SessionType | None:
@@ -23,7 +23,7 @@ async def get_session_type_by_name(name: str, request: Request, db: AsyncSession
 
 @session_type_router.get("/search", response_model=ShowSessionTypeListWithHATEOAS)
 async def get_all_session_types(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await session_type_service._get_all_session_types(query_param.page, query_param.limit, request, db)
+    return await session_type_service._get_all_session_types(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @session_type_router.delete("/delete/{name}", response_model=ShowSessionTypeWithHATEOAS, responses={404: {"description": "Тип сессии не найден"}})
@@ -24,3 +24,4 @@ class ShowSessionTypeWithHATEOAS(TunedModel):
 class ShowSessionTypeListWithHATEOAS(TunedModel):
     session_types: List[ShowSessionTypeWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
@@ -2,12 +2,23 @@ from api.session_type.session_type_pydantic import *
 from api.services_helpers import ensure_session_type_exists, ensure_session_type_unique
 from api.session_type.session_type_DAL import SessionTypeDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+SESSION_TYPE_LINKS = LinkSet(
+    self=Link("get_session_type_by_name"),
+    update=Link("update_session_type"),
+    delete=Link("delete_session_type"),
+    session_types=Link("get_all_session_types"),
+    sessions=Link("get_sessions_by_type", session_type="name")
+)
+
 
 class SessionTypeService:
     async def _create_new_session_type(self, body: CreateSessionType, request: Request, db) -> ShowSessionTypeWithHATEOAS:
@@ -21,20 +32,11 @@ class SessionTypeService:
                     session_type = await session_type_dal.create_session_type(
                         name=body.name
                     )
-                    session_type_name = session_type.name
                     session_type_pydantic = ShowSessionType.model_validate(session_type, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/session-types/search/by_name/{session_type_name}',
-                        "update": f'{api_base_url}/session-types/update',
-                        "delete": f'{api_base_url}/session-types/delete/{session_type_name}',
-                        "session_types": f'{api_base_url}/session-types',
-                        "sessions": f'{api_base_url}/sessions/search/by_type/{session_type_name}'
-                    }
+                    hateoas_links = SESSION_TYPE_LINKS.bind(api_base_url)(session_type)
 
                     return ShowSessionTypeWithHATEOAS(session_type=session_type_pydantic, links=hateoas_links)
 
@@ -57,17 +59,9 @@ class SessionTypeService:
                         raise HTTPException(status_code=404, detail=f"Тип сессии с именем '{name}' не найден")
                     session_type_pydantic = ShowSessionType.model_validate(session_type, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/session-types/search/by_name/{name}',
-                        "update": f'{api_base_url}/session-types/update',
-                        "delete": f'{api_base_url}/session-types/delete/{name}',
-                        "session_types": f'{api_base_url}/session-types',
-                        "sessions": f'{api_base_url}/sessions/search/by_type/{name}'
-                    }
+                    hateoas_links = SESSION_TYPE_LINKS.bind(api_base_url)(session_type)
 
                     return ShowSessionTypeWithHATEOAS(session_type=session_type_pydantic, links=hateoas_links)
 
@@ -78,37 +72,35 @@ class SessionTypeService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_session_types(self, page: int, limit: int, request: Request, db) -> ShowSessionTypeListWithHATEOAS:
+    async def _get_all_session_types(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSessionTypeListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 session_type_dal = SessionTypeDAL(session)
                 try:
-                    session_types = await session_type_dal.get_all_session_types(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    session_type_links = SESSION_TYPE_LINKS.bind(api_base_url)
 
-                    session_types_with_hateoas = []
-                    for session_type in session_types:
+                    def to_hateoas(session_type) -> ShowSessionTypeWithHATEOAS:
                         session_type_pydantic = ShowSessionType.model_validate(session_type, from_attributes=True)
-                        session_type_name = session_type.name
-                        session_type_links = {
-                            "self": f'{api_base_url}/session-types/search/by_name/{session_type_name}',
-                            "update": f'{api_base_url}/session-types/update',
-                            "delete": f'{api_base_url}/session-types/delete/{session_type_name}',
-                            "session_types": f'{api_base_url}/session-types',
-                            "sessions": f'{api_base_url}/sessions/search/by_type/{session_type_name}'
-                        }
-                        session_type_with_links = ShowSessionTypeWithHATEOAS(session_type=session_type_pydantic, links=session_type_links)
-                        session_types_with_hateoas.append(session_type_with_links)
+                        session_type_with_links = ShowSessionTypeWithHATEOAS(session_type=session_type_pydantic, links=session_type_links(session_type))
+                        return session_type_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SessionTypeDAL(stream_session).get_all_session_types(page, limit, cursor, stream=True), to_hateoas)
+
+                    session_types = await session_type_dal.get_all_session_types(page, limit, cursor)
+
+                    session_types_with_hateoas = [to_hateoas(session_type) for session_type in session_types]
 
                     collection_links = {
-                        "self": f'{api_base_url}/session-types/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/session-types/create'
+                        "self": route_url(api_base_url, "get_all_session_types", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_session_types", query=page_query(None, limit, session_types.next_cursor)) if session_types.next_cursor else None,
+                        "create": route_url(api_base_url, "create_session_type")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSessionTypeListWithHATEOAS(session_types=session_types_with_hateoas, links=collection_links)
+                    return ShowSessionTypeListWithHATEOAS(session_types=session_types_with_hateoas, links=collection_links, next_cursor=session_types.next_cursor)
 
                 except HTTPException:
                     raise
@@ -131,13 +123,11 @@ class SessionTypeService:
 
                     session_type_pydantic = ShowSessionType.model_validate(session_type, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "session_types": f'{api_base_url}/session-types',
-                        "create": f'{api_base_url}/session-types/create'
+                        "session_types": route_url(api_base_url, "get_all_session_types"),
+                        "create": route_url(api_base_url, "create_session_type")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -169,20 +159,11 @@ class SessionTypeService:
                     if not session_type:
                         raise HTTPException(status_code=404, detail=f"Тип сессии с именем '{body.name}' не найден")
 
-                    session_type_name = session_type.name
                     session_type_pydantic = ShowSessionType.model_validate(session_type, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/session-types/search/by_name/{session_type_name}',
-                        "update": f'{api_base_url}/session-types/update',
-                        "delete": f'{api_base_url}/session-types/delete/{session_type_name}',
-                        "session_types": f'{api_base_url}/session-types',
-                        "sessions": f'{api_base_url}/sessions/search/by_type/{session_type_name}'
-                    }
+                    hateoas_links = SESSION_TYPE_LINKS.bind(api_base_url)(session_type)
 
                     return ShowSessionTypeWithHATEOAS(session_type=session_type_pydantic, links=hateoas_links)
 
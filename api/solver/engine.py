@@ -0,0 +1,381 @@
+"""
+Weekly timetable solver.
+
+A week is a grid of slots: day 0..days-1, pair 1..pairs_per_day. Occupancy of every group,
+teacher and cabinet is an int bitmask over the slots, so checking that a slot is free for
+a group and a teacher is one bit operation. Cabinets of one slot are a bitmask too, cabinets
+are numbered by capacity, so the lowest free bit is the smallest fitting cabinet.
+
+The search is a randomized greedy placement (the hardest sessions first, the cheapest slot
+by soft rules) followed by a local search which moves already placed sessions to free
+a slot for the sessions left unplaced. Different seeds give different solutions,
+restarts are run in worker processes and the best solution is taken.
+
+The module does not touch the database, problems and solutions are plain picklable data
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+
+# Soft rules weights
+DAY_LOAD_COST = 3
+OVERLOAD_COST = 100
+EARLY_PAIR_COST = 1
+GAP_COST = 5
+SAME_SUBJECT_DAY_COST = 20
+TEACHER_DAY_LOAD_COST = 1
+NO_CABINET_COST = 100
+OTHER_BUILDING_COST = 10
+
+
+@dataclass(frozen=True)
+class SessionDemand:
+    """How many sessions of a teacher in plan must be in the week"""
+    teacher_in_plan: int
+    group_name: str
+    teacher_id: int | None
+    session_type: str | None
+    count: int
+    subject_id: int | None = None
+
+
+@dataclass(frozen=True)
+class SolverCabinet:
+    building_number: int
+    cabinet_number: int
+    capacity: int | None = None
+
+
+@dataclass
+class ScheduleProblem:
+    demands: list[SessionDemand]
+    days: int = 6
+    pairs_per_day: int = 6
+    cabinets: list[SolverCabinet] = field(default_factory=list)
+    group_sizes: dict[str, int | None] = field(default_factory=dict)
+    # teacher id -> buildings where the teacher works
+    teacher_buildings: dict[int, set[int]] = field(default_factory=dict)
+    # Slots already taken by the sessions which stay in the schedule, bit number = day * pairs_per_day + pair - 1
+    busy_groups: dict[str, int] = field(default_factory=dict)
+    busy_teachers: dict[int, int] = field(default_factory=dict)
+    busy_cabinets: dict[tuple[int, int], int] = field(default_factory=dict)
+    max_pairs_per_day: int = 4
+
+    @property
+    def slots_count(self) -> int:
+        return self.days * self.pairs_per_day
+
+    def slot(self, day: int, session_number: int) -> int:
+        return day * self.pairs_per_day + session_number - 1
+
+
+@dataclass(frozen=True)
+class PlacedSession:
+    teacher_in_plan: int
+    group_name: str
+    teacher_id: int | None
+    session_type: str | None
+    day: int
+    session_number: int
+    building_number: int | None = None
+    cabinet_number: int | None = None
+
+
+@dataclass
+class ScheduleSolution:
+    placed: list[PlacedSession]
+    unplaced: list[SessionDemand]
+    cost: int
+    seed: int
+    elapsed_seconds: float = 0.0
+
+    @property
+    def unplaced_count(self) -> int:
+        return sum(demand.count for demand in self.unplaced)
+
+    @property
+    def score(self) -> tuple[int, int]:
+        return self.unplaced_count, self.cost
+
+
+def iter_bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class _Solver:
+    def __init__(self, problem: ScheduleProblem, seed: int):
+        self.problem = problem
+        self.rng = random.Random(seed)
+        self.seed = seed
+        pairs = problem.pairs_per_day
+        self.all_slots = (1 << problem.slots_count) - 1
+        self.day_masks = [((1 << pairs) - 1) << (day * pairs) for day in range(problem.days)]
+
+        # Cabinets are numbered from the smallest, unknown capacity goes last
+        self.cabinets = sorted(problem.cabinets, key=lambda cabinet: (cabinet.capacity is None, cabinet.capacity or 0,
+                                                                      cabinet.building_number, cabinet.cabinet_number))
+        cabinet_index = {(cabinet.building_number, cabinet.cabinet_number): index
+                         for index, cabinet in enumerate(self.cabinets)}
+        self.cabinet_busy = [0] * problem.slots_count
+        for key, mask in problem.busy_cabinets.items():
+            index = cabinet_index.get(key)
+            if index is None:
+                continue
+            for slot in iter_bits(mask & self.all_slots):
+                self.cabinet_busy[slot] |= 1 << index
+
+        self.group_busy = dict(problem.busy_groups)
+        self.teacher_busy = dict(problem.busy_teachers)
+        self.plan_busy: dict[int, int] = {}
+        self._fit_masks: dict[str, int] = {}
+        self._building_masks: dict[int, int] = {}
+        # slot -> {unit index}
+        self.slot_units: dict[int, set[int]] = {}
+
+        self.units = [demand for demand in problem.demands for _ in range(demand.count)]
+        # unit index -> (slot, cabinet index or None)
+        self.placement: dict[int, tuple[int, int | None]] = {}
+
+    def fit_mask(self, group_name: str) -> int:
+        mask = self._fit_masks.get(group_name)
+        if mask is None:
+            size = self.problem.group_sizes.get(group_name)
+            mask = 0
+            for index, cabinet in enumerate(self.cabinets):
+                if size is None or cabinet.capacity is None or cabinet.capacity >= size:
+                    mask |= 1 << index
+            self._fit_masks[group_name] = mask
+        return mask
+
+    def building_mask(self, teacher_id: int | None) -> int:
+        if teacher_id is None:
+            return 0
+        mask = self._building_masks.get(teacher_id)
+        if mask is None:
+            buildings = self.problem.teacher_buildings.get(teacher_id, set())
+            mask = 0
+            for index, cabinet in enumerate(self.cabinets):
+                if cabinet.building_number in buildings:
+                    mask |= 1 << index
+            self._building_masks[teacher_id] = mask
+        return mask
+
+    def pick_cabinet(self, demand: SessionDemand, slot: int) -> tuple[int | None, int]:
+        """The smallest free fitting cabinet, in the teacher's building if possible, and its cost"""
+        if not self.cabinets:
+            return None, 0
+        free = self.fit_mask(demand.group_name) & ~self.cabinet_busy[slot]
+        if not free:
+            return None, NO_CABINET_COST
+        in_building = free & self.building_mask(demand.teacher_id)
+        if in_building:
+            return (in_building & -in_building).bit_length() - 1, 0
+        cost = OTHER_BUILDING_COST if self.problem.teacher_buildings.get(demand.teacher_id) else 0
+        return (free & -free).bit_length() - 1, cost
+
+    def free_slots(self, demand: SessionDemand) -> int:
+        busy = self.group_busy.get(demand.group_name, 0)
+        if demand.teacher_id is not None:
+            busy |= self.teacher_busy.get(demand.teacher_id, 0)
+        return self.all_slots & ~busy
+
+    def slot_cost(self, demand: SessionDemand, slot: int) -> int:
+        pairs = self.problem.pairs_per_day
+        day, pair = divmod(slot, pairs)
+        day_mask = self.day_masks[day]
+
+        group_day = self.group_busy.get(demand.group_name, 0) & day_mask
+        taken = group_day.bit_count()
+        cost = taken * DAY_LOAD_COST
+        if taken >= self.problem.max_pairs_per_day:
+            cost += OVERLOAD_COST
+        if taken == 0:
+            cost += pair * EARLY_PAIR_COST
+        else:
+            distance = min(abs(slot - other) for other in iter_bits(group_day))
+            cost += (distance - 1) * GAP_COST
+
+        if self.plan_busy.get(demand.teacher_in_plan, 0) & day_mask:
+            cost += SAME_SUBJECT_DAY_COST
+        if demand.teacher_id is not None:
+            cost += (self.teacher_busy.get(demand.teacher_id, 0) & day_mask).bit_count() * TEACHER_DAY_LOAD_COST
+        return cost
+
+    def best_slot(self, demand: SessionDemand, allowed: int | None = None) -> tuple[int, int | None, int] | None:
+        """(slot, cabinet index, cost) of the cheapest free slot"""
+        free = self.free_slots(demand)
+        if allowed is not None:
+            free &= allowed
+        best = None
+        for slot in iter_bits(free):
+            cabinet, cabinet_cost = self.pick_cabinet(demand, slot)
+            cost = self.slot_cost(demand, slot) + cabinet_cost
+            # Noise only breaks ties, so different seeds give different solutions
+            key = (cost, self.rng.random())
+            if best is None or key < best[0]:
+                best = (key, slot, cabinet, cost)
+        if best is None:
+            return None
+        return best[1], best[2], best[3]
+
+    def place(self, unit: int, slot: int, cabinet: int | None):
+        demand = self.units[unit]
+        bit = 1 << slot
+        self.group_busy[demand.group_name] = self.group_busy.get(demand.group_name, 0) | bit
+        if demand.teacher_id is not None:
+            self.teacher_busy[demand.teacher_id] = self.teacher_busy.get(demand.teacher_id, 0) | bit
+        self.plan_busy[demand.teacher_in_plan] = self.plan_busy.get(demand.teacher_in_plan, 0) | bit
+        if cabinet is not None:
+            self.cabinet_busy[slot] |= 1 << cabinet
+        self.placement[unit] = (slot, cabinet)
+        self.slot_units.setdefault(slot, set()).add(unit)
+
+    def unplace(self, unit: int):
+        slot, cabinet = self.placement.pop(unit)
+        demand = self.units[unit]
+        bit = ~(1 << slot)
+        self.group_busy[demand.group_name] &= bit
+        if demand.teacher_id is not None:
+            self.teacher_busy[demand.teacher_id] &= bit
+        self.plan_busy[demand.teacher_in_plan] &= bit
+        if cabinet is not None:
+            self.cabinet_busy[slot] &= ~(1 << cabinet)
+        self.slot_units[slot].discard(unit)
+
+    def blockers(self, demand: SessionDemand, slot: int) -> list[int]:
+        """Placed units which take the group or the teacher of the demand in the slot"""
+        return [unit for unit in self.slot_units.get(slot, ())
+                if self.units[unit].group_name == demand.group_name
+                or (demand.teacher_id is not None and self.units[unit].teacher_id == demand.teacher_id)]
+
+    def greedy(self) -> list[int]:
+        group_load: dict[str, int] = {}
+        teacher_load: dict[int, int] = {}
+        for demand in self.units:
+            group_load[demand.group_name] = group_load.get(demand.group_name, 0) + 1
+            if demand.teacher_id is not None:
+                teacher_load[demand.teacher_id] = teacher_load.get(demand.teacher_id, 0) + 1
+
+        def difficulty(unit: int):
+            demand = self.units[unit]
+            return (-(teacher_load.get(demand.teacher_id, 0) + group_load[demand.group_name]), self.rng.random())
+
+        unplaced = []
+        for unit in sorted(range(len(self.units)), key=difficulty):
+            choice = self.best_slot(self.units[unit])
+            if choice is None:
+                unplaced.append(unit)
+            else:
+                self.place(unit, choice[0], choice[1])
+        return unplaced
+
+    def repair_unplaced(self, unplaced: list[int], deadline: float) -> list[int]:
+        """Move one blocking session to another slot to free a slot for an unplaced session"""
+        still_unplaced = []
+        for unit in unplaced:
+            demand = self.units[unit]
+            placed = False
+            slots = list(range(self.problem.slots_count))
+            self.rng.shuffle(slots)
+            for slot in slots:
+                if time.monotonic() > deadline:
+                    break
+                blockers = self.blockers(demand, slot)
+                if len(blockers) != 1:
+                    continue
+                blocker = blockers[0]
+                old_slot, old_cabinet = self.placement[blocker]
+                self.unplace(blocker)
+                if not (self.free_slots(demand) >> slot) & 1:
+                    self.place(blocker, old_slot, old_cabinet)
+                    continue
+                cabinet, _ = self.pick_cabinet(demand, slot)
+                self.place(unit, slot, cabinet)
+                move = self.best_slot(self.units[blocker], allowed=self.all_slots & ~(1 << slot))
+                if move is None:
+                    self.unplace(unit)
+                    self.place(blocker, old_slot, old_cabinet)
+                    continue
+                self.place(blocker, move[0], move[1])
+                placed = True
+                break
+            if not placed:
+                still_unplaced.append(unit)
+        return still_unplaced
+
+    def improve(self, deadline: float):
+        """Move single sessions to cheaper slots while it gives something"""
+        units = list(self.placement)
+        self.rng.shuffle(units)
+        for unit in units:
+            if time.monotonic() > deadline:
+                return
+            slot, cabinet = self.placement[unit]
+            demand = self.units[unit]
+            self.unplace(unit)
+            current_cabinet, cabinet_cost = self.pick_cabinet(demand, slot)
+            current_cost = self.slot_cost(demand, slot) + cabinet_cost
+            move = self.best_slot(demand)
+            if move is not None and move[2] < current_cost:
+                self.place(unit, move[0], move[1])
+            else:
+                self.place(unit, slot, current_cabinet if cabinet is None else cabinet)
+
+    def total_cost(self) -> int:
+        cost = 0
+        for unit, (slot, cabinet) in list(self.placement.items()):
+            demand = self.units[unit]
+            self.unplace(unit)
+            cost += self.slot_cost(demand, slot)
+            if self.cabinets and cabinet is None:
+                cost += NO_CABINET_COST
+            self.place(unit, slot, cabinet)
+        return cost
+
+    def solution(self, unplaced: list[int], started: float) -> ScheduleSolution:
+        placed = []
+        pairs = self.problem.pairs_per_day
+        for unit, (slot, cabinet) in sorted(self.placement.items(), key=lambda item: item[1][0]):
+            demand = self.units[unit]
+            day, pair = divmod(slot, pairs)
+            cabinet_obj = self.cabinets[cabinet] if cabinet is not None else None
+            placed.append(PlacedSession(
+                teacher_in_plan=demand.teacher_in_plan,
+                group_name=demand.group_name,
+                teacher_id=demand.teacher_id,
+                session_type=demand.session_type,
+                day=day,
+                session_number=pair + 1,
+                building_number=cabinet_obj.building_number if cabinet_obj else None,
+                cabinet_number=cabinet_obj.cabinet_number if cabinet_obj else None
+            ))
+
+        left: dict[SessionDemand, int] = {}
+        for unit in unplaced:
+            left[self.units[unit]] = left.get(self.units[unit], 0) + 1
+        unplaced_demands = [SessionDemand(**{**demand.__dict__, "count": count}) for demand, count in left.items()]
+        return ScheduleSolution(placed=placed, unplaced=unplaced_demands, cost=self.total_cost(),
+                                seed=self.seed, elapsed_seconds=round(time.monotonic() - started, 3))
+
+
+def solve(problem: ScheduleProblem, seed: int = 0, time_limit: float = 30.0) -> ScheduleSolution:
+    """One run of the search. Blocking, runs in a worker process"""
+    started = time.monotonic()
+    deadline = started + time_limit
+    solver = _Solver(problem, seed)
+    unplaced = solver.greedy()
+    while unplaced and time.monotonic() < deadline:
+        still_unplaced = solver.repair_unplaced(unplaced, deadline)
+        if len(still_unplaced) == len(unplaced):
+            break
+        unplaced = still_unplaced
+    solver.improve(deadline)
+    return solver.solution(unplaced, started)
+
+
+def best_solution(solutions: list[ScheduleSolution]) -> ScheduleSolution:
+    return min(solutions, key=lambda solution: solution.score)
@@ -0,0 +1,97 @@
+"""
+Background jobs of the timetable solver.
+
+A job keeps the loaded problem and, when the search is finished, the best solution.
+Restarts of the search with different seeds run in parallel in worker processes.
+Jobs live in memory of the api process, the oldest finished jobs are dropped
+"""
+
+import asyncio
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from api.solver.engine import ScheduleProblem, ScheduleSolution, SessionDemand, solve, best_solution
+from config.settings import SOLVER_WORKERS, SOLVER_MAX_JOBS
+from config.logging_config import configure_logging
+
+# Create logger object
+logger = configure_logging()
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+APPLIED = "applied"
+
+# spawn is used because forking a process with a running event loop and threads is not safe
+solver_executor = ProcessPoolExecutor(max_workers=SOLVER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+@dataclass
+class SolverJob:
+    problem: ScheduleProblem
+    week_start: date
+    restarts: int
+    time_limit: float
+    # Demands which can not be planned, e.g. the semester has no weeks: (demand, reason)
+    skipped: list[tuple[SessionDemand, str]] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = PENDING
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+    solution: ScheduleSolution | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, APPLIED)
+
+
+class SolverJobs:
+    def __init__(self, executor, max_jobs: int):
+        self.executor = executor
+        self.max_jobs = max_jobs
+        self._jobs: dict[str, SolverJob] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def get(self, job_id: str) -> SolverJob | None:
+        return self._jobs.get(job_id)
+
+    def start(self, job: SolverJob) -> SolverJob:
+        self._drop_old_jobs()
+        self._jobs[job.id] = job
+        task = asyncio.create_task(self._run(job))
+        # Keep a reference, otherwise the task may be collected before it is finished
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _drop_old_jobs(self):
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.created_at)
+        while len(self._jobs) >= self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0).id)
+
+    async def _run(self, job: SolverJob):
+        job.status = RUNNING
+        loop = asyncio.get_running_loop()
+        try:
+            solutions = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, solve, job.problem, seed, job.time_limit)
+                for seed in range(job.restarts)
+            ))
+            job.solution = best_solution(solutions)
+            job.status = DONE
+            logger.info(f"Задача составления расписания {job.id} выполнена: размещено {len(job.solution.placed)}, "
+                        f"не размещено {job.solution.unplaced_count}")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"Задача составления расписания {job.id} завершилась ошибкой: {e}", exc_info=True)
+        finally:
+            job.finished_at = datetime.now()
+
+
+solver_jobs = SolverJobs(solver_executor, SOLVER_MAX_JOBS)
@@ -0,0 +1,153 @@
+"""
+Incremental repair of the schedule after a single change.
+
+Only the affected sessions (of an unavailable teacher or in a cabinet under repair)
+are moved, the rest of the week stays fixed and is read from the occupancy index.
+For every affected session the smallest change is chosen: another cabinet in the same
+slot, then another pair on the same day, then another day
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable
+
+from api.session.occupancy_index import OccupancyIndex
+
+# Cost of the changes, the cheapest proposal wins
+CABINET_CHANGE_COST = 1
+OTHER_BUILDING_COST = 2
+PAIR_SHIFT_COST = 3
+DAY_SHIFT_COST = 20
+
+
+@dataclass(frozen=True)
+class RepairSession:
+    id: int
+    date: date
+    session_number: int
+    teacher_in_plan: int
+    group_name: str | None
+    teacher_id: int | None
+    building_number: int | None = None
+    cabinet_number: int | None = None
+
+    @property
+    def cabinet(self) -> tuple[int, int] | None:
+        if self.building_number is None or self.cabinet_number is None:
+            return None
+        return self.building_number, self.cabinet_number
+
+
+@dataclass(frozen=True)
+class RepairMove:
+    session: RepairSession
+    new_date: date
+    new_session_number: int
+    new_building_number: int | None = None
+    new_cabinet_number: int | None = None
+    cost: int = 0
+
+
+@dataclass
+class RepairCabinet:
+    building_number: int
+    cabinet_number: int
+    capacity: int | None = None
+
+
+def propose_repair(
+    affected: list[RepairSession],
+    occupancy: OccupancyIndex,
+    days: list[date],
+    pairs_per_day: int,
+    cabinets: list[RepairCabinet],
+    slot_allowed: Callable[[RepairSession, date, int], bool],
+    cabinet_allowed: Callable[[tuple[int, int], date, int], bool],
+    group_sizes: dict[str, int | None] | None = None,
+    teacher_buildings: dict[int, set[int]] | None = None,
+) -> tuple[list[RepairMove], list[RepairSession]]:
+    """
+    slot_allowed - can the session take the slot (e.g. the teacher is available then),
+    cabinet_allowed - can the cabinet be used in the slot (e.g. it is not under repair).
+    Return moves and sessions which can not be placed
+    """
+    group_sizes = group_sizes or {}
+    teacher_buildings = teacher_buildings or {}
+    affected_ids = [session.id for session in affected]
+    cabinets = sorted(cabinets, key=lambda cabinet: (cabinet.capacity is None, cabinet.capacity or 0,
+                                                     cabinet.building_number, cabinet.cabinet_number))
+
+    # Moves accepted so far, so the affected sessions do not take the same slot
+    moved = OccupancyIndex()
+    moves = []
+    unplaced = []
+
+    def is_free(session: RepairSession, slot_date: date, session_number: int, cabinet: tuple[int, int] | None) -> bool:
+        building_number, cabinet_number = cabinet or (None, None)
+        args = (slot_date, session_number, session.group_name, session.teacher_id, building_number, cabinet_number)
+        return (not occupancy.find_conflicts(*args, ignore_session_ids=affected_ids)
+                and not moved.find_conflicts(*args))
+
+    def cabinet_is_free(cabinet: tuple[int, int], slot_date: date, session_number: int) -> bool:
+        # Any other session in the cabinet is a conflict, joining a stream is not a repair
+        return (cabinet_allowed(cabinet, slot_date, session_number)
+                and not occupancy.find_conflicts(slot_date, session_number, None, None, *cabinet, ignore_session_ids=affected_ids)
+                and not moved.find_conflicts(slot_date, session_number, None, None, *cabinet))
+
+    def choose_cabinet(session: RepairSession, slot_date: date, session_number: int) -> tuple[tuple[int, int] | None, int] | None:
+        current = session.cabinet
+        if current is None:
+            return None, 0
+        if cabinet_is_free(current, slot_date, session_number):
+            return current, 0
+        size = group_sizes.get(session.group_name)
+        buildings = teacher_buildings.get(session.teacher_id) or {session.building_number}
+        best = None
+        for cabinet in cabinets:
+            if size is not None and cabinet.capacity is not None and cabinet.capacity < size:
+                continue
+            key = (cabinet.building_number, cabinet.cabinet_number)
+            if key == current or not cabinet_is_free(key, slot_date, session_number):
+                continue
+            cost = CABINET_CHANGE_COST + (0 if cabinet.building_number in buildings else OTHER_BUILDING_COST)
+            if best is None or cost < best[1]:
+                best = (key, cost)
+                if cost == CABINET_CHANGE_COST:
+                    break
+        return best
+
+    for session in sorted(affected, key=lambda item: (item.date, item.session_number)):
+        # Slots from the cheapest shift, the same slot goes first
+        day_index = days.index(session.date) if session.date in days else 0
+        candidates = sorted(
+            ((abs(index - day_index) * DAY_SHIFT_COST + abs(number - session.session_number) * PAIR_SHIFT_COST, slot_date, number)
+             for index, slot_date in enumerate(days) for number in range(1, pairs_per_day + 1)),
+            key=lambda candidate: candidate[0]
+        )
+
+        best = None
+        for slot_cost, slot_date, number in candidates:
+            if best is not None and slot_cost >= best.cost:
+                break
+            if not slot_allowed(session, slot_date, number) or not is_free(session, slot_date, number, None):
+                continue
+            choice = choose_cabinet(session, slot_date, number)
+            if choice is None:
+                continue
+            cabinet, cabinet_cost = choice
+            cost = slot_cost + cabinet_cost
+            if best is None or cost < best.cost:
+                building_number, cabinet_number = cabinet or (None, None)
+                best = RepairMove(session, slot_date, number, building_number, cabinet_number, cost)
+
+        if best is None:
+            unplaced.append(session)
+            continue
+        moved.set_teacher_in_plan(session.teacher_in_plan, session.group_name, session.teacher_id)
+        moved.add_session(session.id, best.new_date, best.new_session_number, session.teacher_in_plan,
+                          best.new_building_number, best.new_cabinet_number)
+        if (best.new_date, best.new_session_number, best.new_building_number, best.new_cabinet_number) != \
+                (session.date, session.session_number, session.building_number, session.cabinet_number):
+            moves.append(best)
+
+    return moves, unplaced
@@ -0,0 +1,107 @@
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import (TeacherInPlan, SubjectsInCycleHours, SubjectsInCycle, Module, Cycle, Chapter, Semester,
+                       TeacherBuilding, Session)
+from config.decorators import log_exceptions
+
+from datetime import date
+
+
+class SolverDAL:
+    """Data Access Layer for loading the data of the timetable solver"""
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    @log_exceptions
+    async def get_demand_rows(self, group_names: list[str], semester: int) -> list:
+        """
+        Teachers in plans of the groups for the semester with their hours and the semester weeks:
+        TeacherInPlan -> SubjectsInCycleHours -> SubjectsInCycle -> (Module) -> Cycle -> Chapter -> Semester
+        """
+        cycle_id = func.coalesce(SubjectsInCycle.cycle_in_chapter_id, Module.cycle_in_chapter_id)
+        query = (
+            select(
+                TeacherInPlan.id,
+                TeacherInPlan.group_name,
+                TeacherInPlan.teacher_id,
+                TeacherInPlan.session_type,
+                SubjectsInCycleHours.subject_in_cycle_id,
+                SubjectsInCycleHours.lectures_hours,
+                SubjectsInCycleHours.laboratory_hours,
+                SubjectsInCycleHours.practical_hours,
+                SubjectsInCycleHours.consultation_hours,
+                SubjectsInCycleHours.course_project_hours,
+                Semester.weeks
+            )
+            .join(TeacherInPlan.subjects_hours)
+            .join(SubjectsInCycleHours.subjects_in_cycle)
+            .outerjoin(Module, SubjectsInCycle.module_in_cycle_id == Module.id)
+            .outerjoin(Cycle, Cycle.id == cycle_id)
+            .outerjoin(Chapter, Chapter.id == Cycle.chapter_in_plan_id)
+            .outerjoin(Semester, (Semester.plan_id == Chapter.plan_id) & (Semester.semester == SubjectsInCycleHours.semester))
+            .where(TeacherInPlan.group_name.in_(group_names))
+            .where(SubjectsInCycleHours.semester == semester)
+            .order_by(TeacherInPlan.id)
+        )
+        result = await self.db_session.execute(query)
+        return list(result.all())
+
+    @log_exceptions
+    async def count_sessions_by_plans(self, teacher_in_plan_ids: list[int], start_period_date: date,
+                                      end_period_date: date) -> dict[int, int]:
+        """teacher_in_plan id -> count of its sessions in the period"""
+        query = (
+            select(Session.teacher_in_plan, func.count(Session.id))
+            .where(Session.teacher_in_plan.in_(teacher_in_plan_ids))
+            .where(Session.date.between(start_period_date, end_period_date))
+            .group_by(Session.teacher_in_plan)
+        )
+        result = await self.db_session.execute(query)
+        return {teacher_in_plan: count for teacher_in_plan, count in result.all()}
+
+    @log_exceptions
+    async def get_teachers_buildings(self, teacher_ids: list[int]) -> dict[int, set[int]]:
+        query = select(TeacherBuilding.teacher_id, TeacherBuilding.building_number).where(
+            TeacherBuilding.teacher_id.in_(teacher_ids))
+        result = await self.db_session.execute(query)
+        teachers_buildings = {}
+        for teacher_id, building_number in result.all():
+            teachers_buildings.setdefault(teacher_id, set()).add(building_number)
+        return teachers_buildings
+
+    @log_exceptions
+    async def get_sessions_for_repair(
+        self,
+        dates: list[date],
+        session_numbers: list[int] | None = None,
+        teacher_id: int | None = None,
+        building_number: int | None = None,
+        cabinet_number: int | None = None
+    ) -> list:
+        """Sessions of the teacher or in the cabinet in the given dates and pairs, with group and teacher"""
+        conditions = []
+        if teacher_id is not None:
+            conditions.append(TeacherInPlan.teacher_id == teacher_id)
+        if building_number is not None and cabinet_number is not None:
+            conditions.append((Session.building_number == building_number) & (Session.cabinet_number == cabinet_number))
+        query = (
+            select(
+                Session.id,
+                Session.date,
+                Session.session_number,
+                Session.teacher_in_plan,
+                Session.building_number,
+                Session.cabinet_number,
+                TeacherInPlan.group_name,
+                TeacherInPlan.teacher_id
+            )
+            .join(Session.plan)
+            .where(Session.date.in_(dates))
+            .where(or_(*conditions))
+            .order_by(Session.date, Session.session_number)
+        )
+        if session_numbers:
+            query = query.where(Session.session_number.in_(session_numbers))
+        result = await self.db_session.execute(query)
+        return list(result.all())
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.solver.solver_pydantic import *
+from db.session import get_db
+from api.solver.solver_services import SolverService
+
+solver_router = APIRouter()
+
+solver_service = SolverService()
+
+
+@solver_router.post("/jobs", response_model=ShowSolverJobWithHATEOAS, status_code=202, responses={404: {"description": "Группы или записи в расписании преподавателей не найдены"}})
+async def create_solver_job(body: CreateSolverJob, request: Request, db: AsyncSession = Depends(get_db)):
+    return await solver_service._create_job(body, request, db)
+
+
+@solver_router.get("/jobs/{job_id}", response_model=ShowSolverJobWithHATEOAS, responses={404: {"description": "Задача не найдена"}})
+async def get_solver_job(job_id: str, request: Request, include_sessions: bool = Query(False, description="Вернуть размещённые занятия")):
+    return await solver_service._get_job(job_id, include_sessions, request)
+
+
+@solver_router.post("/jobs/{job_id}/apply", response_model=ShowSolverApplyResult, status_code=201, responses={404: {"description": "Задача не найдена"}, 409: {"description": "Задача не выполнена, уже применена или расписание изменилось"}})
+async def apply_solver_job(job_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    return await solver_service._apply_job(job_id, request, db)
+
+
+@solver_router.post("/repair", response_model=ShowRepairResult, responses={409: {"description": "Расписание изменилось во время переноса занятий"}})
+async def repair_schedule(body: RepairSchedule, request: Request, db: AsyncSession = Depends(get_db)):
+    return await solver_service._repair(body, request, db)
@@ -0,0 +1,111 @@
+from api.models import TunedModel
+from pydantic import Field
+from typing import List
+from datetime import date, datetime
+
+from config.settings import SOLVER_RESTARTS
+
+
+class CreateSolverJob(TunedModel):
+    group_names: List[str] = Field(min_length=1, max_length=500)
+    week_start: date
+    semester: int
+    days: int = Field(6, ge=1, le=7)
+    pairs_per_day: int = Field(6, ge=1, le=8)
+    max_pairs_per_day: int = Field(4, ge=1, le=8)
+    weeks: float | None = Field(None, gt=0, description="Количество недель семестра, если оно не задано в плане")
+    building_numbers: List[int] | None = None
+    restarts: int = Field(SOLVER_RESTARTS, ge=1, le=32)
+    time_limit_seconds: float = Field(30, gt=0, le=300)
+
+
+class ShowSolverSession(TunedModel):
+    teacher_in_plan: int
+    group_name: str
+    teacher_id: int | None = None
+    session_type: str | None = None
+    session_date: date
+    session_number: int
+    building_number: int | None = None
+    cabinet_number: int | None = None
+
+
+class ShowSolverUnplaced(TunedModel):
+    teacher_in_plan: int
+    group_name: str
+    teacher_id: int | None = None
+    count: int
+    detail: str
+
+
+class ShowSolverJob(TunedModel):
+    job_id: str
+    status: str
+    week_start: date
+    created_at: datetime
+    finished_at: datetime | None = None
+    placed_count: int | None = None
+    unplaced_count: int | None = None
+    cost: int | None = None
+    error: str | None = None
+
+
+class ShowSolverJobWithHATEOAS(TunedModel):
+    job: ShowSolverJob
+    sessions: List[ShowSolverSession] | None = None
+    unplaced: List[ShowSolverUnplaced] = []
+    links: dict[str, str] = {}
+
+
+class ShowSolverSkippedSession(TunedModel):
+    session: ShowSolverSession
+    detail: str
+
+
+class ShowSolverApplyResult(TunedModel):
+    created_count: int
+    skipped: List[ShowSolverSkippedSession] = []
+    links: dict[str, str] = {}
+
+
+class RepairSchedule(TunedModel):
+    week_start: date
+    days: int = Field(6, ge=1, le=7)
+    pairs_per_day: int = Field(6, ge=1, le=8)
+    teacher_id: int | None = Field(None, description="Преподаватель, который не может вести занятия")
+    building_number: int | None = Field(None, description="Здание кабинета на ремонте")
+    cabinet_number: int | None = Field(None, description="Кабинет на ремонте")
+    unavailable_dates: List[date] | None = Field(None, description="Дни недоступности, по умолчанию вся неделя")
+    unavailable_session_numbers: List[int] | None = Field(None, description="Номера пар недоступности, по умолчанию все")
+    apply: bool = Field(False, description="Сразу перенести занятия")
+
+
+class ShowRepairMove(TunedModel):
+    session_id: int
+    group_name: str | None = None
+    teacher_id: int | None = None
+    session_date: date
+    session_number: int
+    building_number: int | None = None
+    cabinet_number: int | None = None
+    new_session_date: date
+    new_session_number: int
+    new_building_number: int | None = None
+    new_cabinet_number: int | None = None
+
+
+class ShowRepairUnplaced(TunedModel):
+    session_id: int
+    group_name: str | None = None
+    teacher_id: int | None = None
+    session_date: date
+    session_number: int
+    detail: str
+
+
+class ShowRepairResult(TunedModel):
+    affected_count: int
+    moves: List[ShowRepairMove] = []
+    unplaced: List[ShowRepairUnplaced] = []
+    applied: bool = False
+    links: dict[str, str] = {}
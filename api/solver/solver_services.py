@@ -0,0 +1,371 @@
+from api.solver.solver_pydantic import *
+from api.solver.solver_DAL import SolverDAL
+from api.solver.engine import ScheduleProblem, SessionDemand, SolverCabinet
+from api.solver.jobs import SolverJob, solver_jobs, DONE, APPLIED
+from api.solver.repair import RepairSession, RepairCabinet, propose_repair
+from api.group.group_DAL import GroupDAL
+from api.cabinet.cabinet_DAL import CabinetDAL
+from api.session.session_DAL import SessionDAL
+from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
+from api.session.occupancy_index import occupancy_index
+from api.session.occupancy_loader import get_slots_occupancy
+from api.session.session_services import conflict_detail
+from fastapi import HTTPException, Request
+from api.links import request_base_url, route_url
+from sqlalchemy.exc import IntegrityError
+
+from config.settings import CABINET_UNAVAILABLE_STATES
+from config.logging_config import configure_logging
+
+from datetime import timedelta
+
+# Create logger object
+logger = configure_logging()
+
+# Academic hours in one pair
+PAIR_HOURS = 2
+
+# Which hours of the subject are given by the teacher in plan, by the beginning of the session type name
+SESSION_TYPE_HOURS = (
+    ("лаб", ("laboratory_hours",)),
+    ("пр", ("practical_hours",)),
+    ("конс", ("consultation_hours",)),
+    ("курс", ("course_project_hours",)),
+    ("лек", ("lectures_hours",)),
+    ("лк", ("lectures_hours",)),
+)
+DEFAULT_SESSION_HOURS = ("lectures_hours", "laboratory_hours", "practical_hours")
+
+
+def weekly_sessions_count(row, weeks: float) -> int:
+    """Sessions a week for the teacher in plan: its hours for the semester / weeks / hours in a pair"""
+    session_type = (row.session_type or "").strip().lower()
+    columns = next((columns for prefix, columns in SESSION_TYPE_HOURS if session_type.startswith(prefix)),
+                   DEFAULT_SESSION_HOURS)
+    hours = sum(getattr(row, column) or 0 for column in columns)
+    if hours <= 0:
+        return 0
+    return max(1, round(hours / weeks / PAIR_HOURS))
+
+
+def build_job_response(job: SolverJob, request: Request, include_sessions: bool = False) -> ShowSolverJobWithHATEOAS:
+    solution = job.solution
+    job_pydantic = ShowSolverJob(
+        job_id=job.id,
+        status=job.status,
+        week_start=job.week_start,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        placed_count=len(solution.placed) if solution else None,
+        unplaced_count=solution.unplaced_count if solution else None,
+        cost=solution.cost if solution else None,
+        error=job.error
+    )
+
+    unplaced = [ShowSolverUnplaced(teacher_in_plan=demand.teacher_in_plan, group_name=demand.group_name,
+                                   teacher_id=demand.teacher_id, count=demand.count, detail=reason)
+                for demand, reason in job.skipped]
+    sessions = None
+    if solution:
+        unplaced.extend(ShowSolverUnplaced(teacher_in_plan=demand.teacher_in_plan, group_name=demand.group_name,
+                                           teacher_id=demand.teacher_id, count=demand.count,
+                                           detail="Не найдено свободное время для группы и преподавателя")
+                        for demand in solution.unplaced)
+        if include_sessions:
+            sessions = [solver_session(job, placed) for placed in solution.placed]
+
+    api_base_url = request_base_url(request)
+
+    hateoas_links = {
+        "self": route_url(api_base_url, "get_solver_job", job_id=job.id),
+        "sessions": route_url(api_base_url, "get_solver_job", query="include_sessions=true", job_id=job.id),
+        "apply": route_url(api_base_url, "apply_solver_job", job_id=job.id) if job.status == DONE else None
+    }
+    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+
+    return ShowSolverJobWithHATEOAS(job=job_pydantic, sessions=sessions, unplaced=unplaced, links=hateoas_links)
+
+
+def solver_session(job: SolverJob, placed) -> ShowSolverSession:
+    return ShowSolverSession(
+        teacher_in_plan=placed.teacher_in_plan,
+        group_name=placed.group_name,
+        teacher_id=placed.teacher_id,
+        session_type=placed.session_type,
+        session_date=job.week_start + timedelta(days=placed.day),
+        session_number=placed.session_number,
+        building_number=placed.building_number,
+        cabinet_number=placed.cabinet_number
+    )
+
+
+class SolverService:
+    async def _create_job(self, body: CreateSolverJob, request: Request, db) -> ShowSolverJobWithHATEOAS:
+        """
+        Load everything the solver needs with a few queries and start the search in the background.
+        Sessions which are already in the week stay in place, only the missing ones are planned
+        """
+        async with db as session:
+            async with session.begin():
+                solver_dal = SolverDAL(session)
+                session_dal = SessionDAL(session)
+                try:
+                    group_names = list(dict.fromkeys(body.group_names))
+                    groups = await GroupDAL(session).get_groups_by_names(group_names, 0, 0)
+                    missing_groups = set(group_names) - {group.group_name for group in groups}
+                    if missing_groups:
+                        raise HTTPException(status_code=404, detail=f"Группы не найдены: {', '.join(sorted(missing_groups))}")
+
+                    rows = await solver_dal.get_demand_rows(group_names, body.semester)
+                    if not rows:
+                        raise HTTPException(status_code=404,
+                                            detail=f"Для групп не найдены записи в расписании преподавателей на {body.semester} семестр")
+
+                    end_period_date = body.week_start + timedelta(days=body.days - 1)
+                    already_planned = await solver_dal.count_sessions_by_plans([row.id for row in rows], body.week_start, end_period_date)
+
+                    demands = []
+                    skipped = []
+                    for row in rows:
+                        weeks = body.weeks or row.weeks
+                        if not weeks:
+                            demand = SessionDemand(row.id, row.group_name, row.teacher_id, row.session_type, 0, row.subject_in_cycle_id)
+                            skipped.append((demand, "Не задано количество недель семестра"))
+                            continue
+                        count = weekly_sessions_count(row, weeks) - already_planned.get(row.id, 0)
+                        if count > 0:
+                            demands.append(SessionDemand(row.id, row.group_name, row.teacher_id, row.session_type,
+                                                         count, row.subject_in_cycle_id))
+
+                    cabinets = await CabinetDAL(session).get_available_cabinets(excluded_states=CABINET_UNAVAILABLE_STATES)
+                    if body.building_numbers:
+                        cabinets = [cabinet for cabinet in cabinets if cabinet.building_number in body.building_numbers]
+                    teacher_ids = list({demand.teacher_id for demand in demands if demand.teacher_id is not None})
+                    teacher_buildings = await solver_dal.get_teachers_buildings(teacher_ids) if teacher_ids else {}
+
+                    problem = ScheduleProblem(
+                        demands=demands,
+                        days=body.days,
+                        pairs_per_day=body.pairs_per_day,
+                        cabinets=[SolverCabinet(cabinet.building_number, cabinet.cabinet_number, cabinet.capacity)
+                                  for cabinet in cabinets],
+                        group_sizes={group.group_name: group.quantity_students for group in groups},
+                        teacher_buildings=teacher_buildings,
+                        max_pairs_per_day=body.max_pairs_per_day
+                    )
+
+                    # Sessions of the week (of all groups) stay where they are
+                    for row in await session_dal.get_occupancy_rows(body.week_start, end_period_date):
+                        if not 1 <= row.session_number <= body.pairs_per_day:
+                            continue
+                        bit = 1 << problem.slot((row.date - body.week_start).days, row.session_number)
+                        problem.busy_groups[row.group_name] = problem.busy_groups.get(row.group_name, 0) | bit
+                        if row.teacher_id is not None:
+                            problem.busy_teachers[row.teacher_id] = problem.busy_teachers.get(row.teacher_id, 0) | bit
+                        if row.building_number is not None and row.cabinet_number is not None:
+                            cabinet_key = (row.building_number, row.cabinet_number)
+                            problem.busy_cabinets[cabinet_key] = problem.busy_cabinets.get(cabinet_key, 0) | bit
+
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    logger.error(f"Неожиданная ошибка при создании задачи составления расписания: {e}", exc_info=True)
+                    raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
+
+        job = solver_jobs.start(SolverJob(problem=problem, week_start=body.week_start, restarts=body.restarts,
+                                          time_limit=body.time_limit_seconds, skipped=skipped))
+        return build_job_response(job, request)
+
+
+    async def _get_job(self, job_id: str, include_sessions: bool, request: Request) -> ShowSolverJobWithHATEOAS:
+        job = solver_jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Задача составления расписания {job_id} не найдена")
+        return build_job_response(job, request, include_sessions)
+
+
+    async def _apply_job(self, job_id: str, request: Request, db) -> ShowSolverApplyResult:
+        """
+        Write the draft into the schedule with one insert.
+        The schedule may change while the job is running, so sessions are checked once more
+        and the conflicting ones are skipped
+        """
+        job = solver_jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Задача составления расписания {job_id} не найдена")
+        if job.status == APPLIED:
+            raise HTTPException(status_code=409, detail=f"Задача составления расписания {job_id} уже применена")
+        if job.status != DONE:
+            raise HTTPException(status_code=409, detail=f"Задача составления расписания {job_id} ещё не выполнена")
+
+        async with db as session:
+            async with session.begin():
+                session_dal = SessionDAL(session)
+                try:
+                    sessions = [solver_session(job, placed) for placed in job.solution.placed]
+                    existing_plans = {teacher_in_plan.id for teacher_in_plan in
+                                      await TeacherInPlanDAL(session).get_teachers_in_plans_by_ids(
+                                          list({item.teacher_in_plan for item in sessions}))}
+                    occupancy = await get_slots_occupancy(session_dal, [(item.session_date, item.session_number) for item in sessions])
+
+                    skipped = []
+                    new_sessions = []
+                    for item in sessions:
+                        if item.teacher_in_plan not in existing_plans:
+                            skipped.append(ShowSolverSkippedSession(session=item, detail=f"Запись в расписании преподавателя с id {item.teacher_in_plan} не найдена"))
+                            continue
+                        conflicts = occupancy.find_conflicts(item.session_date, item.session_number, item.group_name,
+                                                             item.teacher_id, item.building_number, item.cabinet_number)
+                        if conflicts:
+                            skipped.append(ShowSolverSkippedSession(session=item, detail=conflict_detail(conflicts[0], item.session_number)))
+                            continue
+                        new_sessions.append({
+                            "session_number": item.session_number,
+                            "date": item.session_date,
+                            "teacher_in_plan": item.teacher_in_plan,
+                            "session_type": item.session_type,
+                            "cabinet_number": item.cabinet_number,
+                            "building_number": item.building_number,
+                        })
+
+                    try:
+                        created_sessions = await session_dal.create_sessions(new_sessions) if new_sessions else []
+                    except IntegrityError:
+                        # The slots were taken by a concurrent request after the check
+                        raise HTTPException(status_code=409, detail="Расписание изменилось во время применения задачи, повторите запрос")
+                    job.status = APPLIED
+
+                    api_base_url = request_base_url(request)
+
+                    hateoas_links = {
+                        "job": route_url(api_base_url, "get_solver_job", job_id=job.id),
+                        "sessions": route_url(api_base_url, "get_sessions_by_date", session_date=job.week_start)
+                    }
+
+                    return ShowSolverApplyResult(created_count=len(created_sessions), skipped=skipped, links=hateoas_links)
+
+                except HTTPException:
+                    await session.rollback()
+                    raise
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(f"Неожиданная ошибка при применении задачи составления расписания: {e}", exc_info=True)
+                    raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
+
+
+    async def _repair(self, body: RepairSchedule, request: Request, db) -> ShowRepairResult:
+        """
+        Move only the sessions of an unavailable teacher or in a cabinet under repair.
+        Only the affected sessions are loaded, the rest of the week is taken from the occupancy index
+        """
+        repaired_cabinet = None
+        if body.building_number is not None and body.cabinet_number is not None:
+            repaired_cabinet = (body.building_number, body.cabinet_number)
+        if body.teacher_id is None and repaired_cabinet is None:
+            raise HTTPException(status_code=400, detail="Укажите преподавателя или кабинет (здание и номер кабинета)")
+
+        days = [body.week_start + timedelta(days=day) for day in range(body.days)]
+        unavailable_dates = set(body.unavailable_dates or days)
+        unavailable_numbers = set(body.unavailable_session_numbers or range(1, body.pairs_per_day + 1))
+
+        def is_unavailable(slot_date, session_number) -> bool:
+            return slot_date in unavailable_dates and session_number in unavailable_numbers
+
+        def slot_allowed(repair_session: RepairSession, slot_date, session_number) -> bool:
+            return not (body.teacher_id is not None and repair_session.teacher_id == body.teacher_id
+                        and is_unavailable(slot_date, session_number))
+
+        def cabinet_allowed(cabinet, slot_date, session_number) -> bool:
+            return not (cabinet == repaired_cabinet and is_unavailable(slot_date, session_number))
+
+        async with db as session:
+            async with session.begin():
+                solver_dal = SolverDAL(session)
+                session_dal = SessionDAL(session)
+                try:
+                    rows = await solver_dal.get_sessions_for_repair(sorted(unavailable_dates), body.unavailable_session_numbers,
+                                                                    body.teacher_id, body.building_number, body.cabinet_number)
+                    affected = [RepairSession(row.id, row.date, row.session_number, row.teacher_in_plan, row.group_name,
+                                              row.teacher_id, row.building_number, row.cabinet_number) for row in rows]
+
+                    moves, unplaced = [], []
+                    if affected:
+                        if all(occupancy_index.covers(day) for day in days):
+                            occupancy = occupancy_index
+                        else:
+                            occupancy = await get_slots_occupancy(session_dal, [(day, number) for day in days
+                                                                                for number in range(1, body.pairs_per_day + 1)])
+
+                        cabinets = []
+                        group_sizes = {}
+                        teacher_buildings = {}
+                        if any(item.cabinet is not None for item in affected):
+                            cabinets = [RepairCabinet(cabinet.building_number, cabinet.cabinet_number, cabinet.capacity)
+                                        for cabinet in await CabinetDAL(session).get_available_cabinets(excluded_states=CABINET_UNAVAILABLE_STATES)]
+                            groups = await GroupDAL(session).get_groups_by_names(list({item.group_name for item in affected}), 0, 0)
+                            group_sizes = {group.group_name: group.quantity_students for group in groups}
+                            teacher_ids = list({item.teacher_id for item in affected if item.teacher_id is not None})
+                            teacher_buildings = await solver_dal.get_teachers_buildings(teacher_ids) if teacher_ids else {}
+
+                        moves, unplaced = propose_repair(affected, occupancy, days, body.pairs_per_day, cabinets,
+                                                         slot_allowed, cabinet_allowed, group_sizes, teacher_buildings)
+
+                    if body.apply and moves:
+                        try:
+                            await session_dal.move_sessions([
+                                {
+                                    "id": move.session.id,
+                                    "date": move.new_date,
+                                    "session_number": move.new_session_number,
+                                    "building_number": move.new_building_number,
+                                    "cabinet_number": move.new_cabinet_number,
+                                }
+                                for move in moves
+                            ])
+                        except IntegrityError:
+                            raise HTTPException(status_code=409, detail="Расписание изменилось во время переноса занятий, повторите запрос")
+
+                    api_base_url = request_base_url(request)
+
+                    hateoas_links = {
+                        "self": route_url(api_base_url, "repair_schedule"),
+                        "sessions": route_url(api_base_url, "get_sessions_by_date", session_date=body.week_start),
+                        "teacher_sessions": route_url(api_base_url, "get_sessions_by_teacher_and_date", teacher_id=body.teacher_id, start_period_date=days[0], end_period_date=days[-1]) if body.teacher_id is not None else None,
+                        "cabinet_sessions": route_url(api_base_url, "get_sessions_by_cabinet", building_number=body.building_number, cabinet_number=body.cabinet_number) if repaired_cabinet else None
+                    }
+                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+
+                    return ShowRepairResult(
+                        affected_count=len(affected),
+                        moves=[ShowRepairMove(
+                            session_id=move.session.id,
+                            group_name=move.session.group_name,
+                            teacher_id=move.session.teacher_id,
+                            session_date=move.session.date,
+                            session_number=move.session.session_number,
+                            building_number=move.session.building_number,
+                            cabinet_number=move.session.cabinet_number,
+                            new_session_date=move.new_date,
+                            new_session_number=move.new_session_number,
+                            new_building_number=move.new_building_number,
+                            new_cabinet_number=move.new_cabinet_number
+                        ) for move in moves],
+                        unplaced=[ShowRepairUnplaced(
+                            session_id=item.id,
+                            group_name=item.group_name,
+                            teacher_id=item.teacher_id,
+                            session_date=item.date,
+                            session_number=item.session_number,
+                            detail="Не найдено свободное время или кабинет на этой неделе"
+                        ) for item in unplaced],
+                        applied=body.apply,
+                        links=hateoas_links
+                    )
+
+                except HTTPException:
+                    await session.rollback()
+                    raise
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(f"Неожиданная ошибка при исправлении расписания: {e}", exc_info=True)
+                    raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Speciality
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class SpecialityDAL:
@@ -27,14 +28,9 @@ class SpecialityDAL:
         return deleted_speciality
 
     @log_exceptions
-    async def get_all_specialities(self, page: int, limit: int) -> list[Speciality]:
-        if page == 0:
-            query = select(Speciality).order_by(Speciality.speciality_code.asc())
-        else:
-            query = select(Speciality).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        specialities = list(result.scalars().all())
-        return specialities
+    async def get_all_specialities(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Speciality)
+        return await fetch_page(self.db_session, query, (Speciality.speciality_code,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_speciality(self, speciality_code: str) -> Speciality | None:
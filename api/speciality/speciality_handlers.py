@@ -23,7 +23,7 @@ async def get_speciality_by_code(speciality_code: str, request: Request, db: Asy
 
 @speciality_router.get("/search", response_model=ShowSpecialityListWithHATEOAS)
 async def get_all_specialities(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await speciality_service._get_all_specialities(query_param.page, query_param.limit, request, db)
+    return await speciality_service._get_all_specialities(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @speciality_router.delete("/delete/{speciality_code}", response_model=ShowSpecialityWithHATEOAS, responses={404: {"description": "Специальность не найдена"}})
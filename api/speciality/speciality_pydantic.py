@@ -24,3 +24,4 @@ class ShowSpecialityWithHATEOAS(TunedModel):
 class ShowSpecialityListWithHATEOAS(TunedModel):
     specialities: List[ShowSpecialityWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
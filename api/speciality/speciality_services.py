@@ -2,12 +2,23 @@ from api.speciality.speciality_pydantic import *
 from api.services_helpers import ensure_speciality_exists, ensure_speciality_unique 
 from api.speciality.speciality_DAL import SpecialityDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+SPECIALITY_LINKS = LinkSet(
+    self=Link("get_speciality_by_code"),
+    update=Link("update_speciality"),
+    delete=Link("delete_speciality"),
+    specialities=Link("get_all_specialities"),
+    groups=Link("get_groups_by_speciality")
+)
+
 
 class SpecialityService:
     async def _create_new_speciality(self, body: CreateSpeciality, request: Request, db) -> ShowSpecialityWithHATEOAS:
@@ -21,21 +32,11 @@ class SpecialityService:
                     speciality = await speciality_dal.create_speciality(
                         speciality_code=body.speciality_code
                     )
-                    speciality_code = speciality.speciality_code
                     speciality_pydantic = ShowSpeciality.model_validate(speciality, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/specialities/search/by_speciality_code/{speciality_code}',
-                        "update": f'{api_base_url}/specialities/update',
-                        "delete": f'{api_base_url}/specialities/delete/{speciality_code}',
-                        "specialities": f'{api_base_url}/specialities',
-                        "groups": f'{api_base_url}/groups/search/by_speciality/{speciality_code}',
-                        "plans": f'{api_base_url}/plans/search/by_speciality/{speciality_code}'
-                    }
+                    hateoas_links = SPECIALITY_LINKS.bind(api_base_url)(speciality)
 
                     return ShowSpecialityWithHATEOAS(speciality=speciality_pydantic, links=hateoas_links)
 
@@ -58,18 +59,9 @@ class SpecialityService:
                         raise HTTPException(status_code=404, detail=f"Специальность с кодом '{speciality_code}' не найдена")
                     speciality_pydantic = ShowSpeciality.model_validate(speciality, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/specialities/search/by_speciality_code/{speciality_code}',
-                        "update": f'{api_base_url}/specialities/update',
-                        "delete": f'{api_base_url}/specialities/delete/{speciality_code}',
-                        "specialities": f'{api_base_url}/specialities',
-                        "groups": f'{api_base_url}/groups/search/by_speciality/{speciality_code}',
-                        "plans": f'{api_base_url}/plans/search/by_speciality/{speciality_code}'
-                    }
+                    hateoas_links = SPECIALITY_LINKS.bind(api_base_url)(speciality)
 
                     return ShowSpecialityWithHATEOAS(speciality=speciality_pydantic, links=hateoas_links)
 
@@ -80,38 +72,35 @@ class SpecialityService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_specialities(self, page: int, limit: int, request: Request, db) -> ShowSpecialityListWithHATEOAS:
+    async def _get_all_specialities(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSpecialityListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 speciality_dal = SpecialityDAL(session)
                 try:
-                    specialities = await speciality_dal.get_all_specialities(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    speciality_links = SPECIALITY_LINKS.bind(api_base_url)
 
-                    specialities_with_hateoas = []
-                    for speciality in specialities:
+                    def to_hateoas(speciality) -> ShowSpecialityWithHATEOAS:
                         speciality_pydantic = ShowSpeciality.model_validate(speciality, from_attributes=True)
-                        speciality_code = speciality.speciality_code
-                        speciality_links = {
-                            "self": f'{api_base_url}/specialities/search/by_speciality_code/{speciality_code}',
-                            "update": f'{api_base_url}/specialities/update',
-                            "delete": f'{api_base_url}/specialities/delete/{speciality_code}',
-                            "specialities": f'{api_base_url}/specialities',
-                            "groups": f'{api_base_url}/groups/search/by_speciality/{speciality_code}',
-                            "plans": f'{api_base_url}/plans/search/by_speciality/{speciality_code}'
-                        }
-                        speciality_with_links = ShowSpecialityWithHATEOAS(speciality=speciality_pydantic, links=speciality_links)
-                        specialities_with_hateoas.append(speciality_with_links)
+                        speciality_with_links = ShowSpecialityWithHATEOAS(speciality=speciality_pydantic, links=speciality_links(speciality))
+                        return speciality_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SpecialityDAL(stream_session).get_all_specialities(page, limit, cursor, stream=True), to_hateoas)
+
+                    specialities = await speciality_dal.get_all_specialities(page, limit, cursor)
+
+                    specialities_with_hateoas = [to_hateoas(speciality) for speciality in specialities]
 
                     collection_links = {
-                        "self": f'{api_base_url}/specialities/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/specialities/create'
+                        "self": route_url(api_base_url, "get_all_specialities", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_specialities", query=page_query(None, limit, specialities.next_cursor)) if specialities.next_cursor else None,
+                        "create": route_url(api_base_url, "create_speciality")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSpecialityListWithHATEOAS(specialities=specialities_with_hateoas, links=collection_links)
+                    return ShowSpecialityListWithHATEOAS(specialities=specialities_with_hateoas, links=collection_links, next_cursor=specialities.next_cursor)
 
                 except HTTPException:
                     raise
@@ -136,13 +125,11 @@ class SpecialityService:
 
                     speciality_pydantic = ShowSpeciality.model_validate(speciality, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "specialities": f'{api_base_url}/specialities',
-                        "create": f'{api_base_url}/specialities/create'
+                        "specialities": route_url(api_base_url, "get_all_specialities"),
+                        "create": route_url(api_base_url, "create_speciality")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -179,21 +166,11 @@ class SpecialityService:
                     if not speciality:
                         raise HTTPException(status_code=404, detail=f"Специальность с кодом '{body.speciality_code}' не найдена")
 
-                    speciality_code = speciality.speciality_code 
                     speciality_pydantic = ShowSpeciality.model_validate(speciality, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/specialities/search/by_speciality_code/{speciality_code}',
-                        "update": f'{api_base_url}/specialities/update',
-                        "delete": f'{api_base_url}/specialities/delete/{speciality_code}',
-                        "specialities": f'{api_base_url}/specialities',
-                        "groups": f'{api_base_url}/groups/search/by_speciality/{speciality_code}',
-                        "plans": f'{api_base_url}/plans/search/by_speciality/{speciality_code}'
-                    }
+                    hateoas_links = SPECIALITY_LINKS.bind(api_base_url)(speciality)
 
                     return ShowSpecialityWithHATEOAS(speciality=speciality_pydantic, links=hateoas_links)
 
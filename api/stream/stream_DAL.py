@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Stream
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class StreamDAL:
@@ -33,14 +34,9 @@ class StreamDAL:
         return deleted_stream
 
     @log_exceptions
-    async def get_all_streams(self, page: int, limit: int) -> list[Stream]:
-        if page == 0:
-            query = select(Stream).order_by(Stream.stream_id.asc())
-        else:
-            query = select(Stream).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        streams = list(result.scalars().all())
-        return streams
+    async def get_all_streams(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Stream)
+        return await fetch_page(self.db_session, query, (Stream.stream_id, Stream.group_name, Stream.subject_id), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_stream_by_composite_key(self, stream_id: int, group_name: str, subject_id: int) -> Stream | None:
@@ -54,24 +50,14 @@ class StreamDAL:
         return stream_row
 
     @log_exceptions
-    async def get_streams_by_group(self, group_name: str, page: int, limit: int) -> list[Stream]:
-        if page == 0:
-            query = select(Stream).where(Stream.group_name == group_name).order_by(Stream.stream_id.asc())
-        else:
-            query = select(Stream).where(Stream.group_name == group_name).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        streams = list(result.scalars().all())
-        return streams if streams is not None else []
+    async def get_streams_by_group(self, group_name: str, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Stream).where(Stream.group_name == group_name)
+        return await fetch_page(self.db_session, query, (Stream.stream_id, Stream.group_name, Stream.subject_id), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_streams_by_subject(self, subject_id: int, page: int, limit: int) -> list[Stream]:
-        if page == 0:
-            query = select(Stream).where(Stream.subject_id == subject_id).order_by(Stream.stream_id.asc())
-        else:
-            query = select(Stream).where(Stream.subject_id == subject_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        streams = list(result.scalars().all())
-        return streams if streams is not None else []
+    async def get_streams_by_subject(self, subject_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Stream).where(Stream.subject_id == subject_id)
+        return await fetch_page(self.db_session, query, (Stream.stream_id, Stream.group_name, Stream.subject_id), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_stream(self, target_stream_id: int, target_group_name: str, target_subject_id: int, **kwargs) -> Stream | None:
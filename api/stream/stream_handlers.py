@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 from api.stream.stream_pydantic  import *
 from api.models import QueryParams
+from api.links import LinksQuery
 from db.session import get_db
 from api.stream.stream_services import StreamService
 
@@ -22,18 +23,18 @@ async def get_stream_by_composite_key(stream_id: int, group_name: str, subject_i
 
 
 @stream_router.get("/search/by_group/{group_name}", response_model=ShowStreamListWithHATEOAS, responses={404: {"description": "Потоки не найдены"}})
-async def get_streams_by_group(group_name: str, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await stream_service._get_streams_by_group(group_name, query_param.page, query_param.limit, request, db)
+async def get_streams_by_group(group_name: str, query_param: Annotated[QueryParams, Depends()], request: Request, links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await stream_service._get_streams_by_group(group_name, query_param.page, query_param.limit, query_param.cursor, links, request, db)
 
 
 @stream_router.get("/search/by_subject/{subject_id}", response_model=ShowStreamListWithHATEOAS, responses={404: {"description": "Потоки не найдены"}})
-async def get_streams_by_subject(subject_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await stream_service._get_streams_by_subject(subject_id, query_param.page, query_param.limit, request, db)
+async def get_streams_by_subject(subject_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await stream_service._get_streams_by_subject(subject_id, query_param.page, query_param.limit, query_param.cursor, links, request, db)
 
 
 @stream_router.get("/search", response_model=ShowStreamListWithHATEOAS)
-async def get_all_streams(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await stream_service._get_all_streams(query_param.page, query_param.limit, request, db)
+async def get_all_streams(query_param: Annotated[QueryParams, Depends()], request: Request, links: LinksQuery = "full", db: AsyncSession = Depends(get_db)):
+    return await stream_service._get_all_streams(query_param.page, query_param.limit, query_param.cursor, links, request, db)
 
 
 @stream_router.delete("/delete/{stream_id}/{group_name}/{subject_id}", response_model=ShowStreamWithHATEOAS, responses={404: {"description": "Поток не найден"}})
@@ -32,4 +32,5 @@ class ShowStreamWithHATEOAS(TunedModel):
 class ShowStreamListWithHATEOAS(TunedModel):
     streams: List[ShowStreamWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
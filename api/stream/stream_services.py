@@ -4,12 +4,24 @@ from api.stream.stream_DAL import StreamDAL
 from api.subject_in_cycle.subject_in_cycle_DAL import SubjectsInCycleDAL
 from api.group.group_DAL import GroupDAL
 from fastapi import HTTPException, Request
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
+from api.links import Link, LinkSet, LinksMode, request_base_url, route_url
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+STREAM_LINKS = LinkSet(
+    self=Link("get_stream_by_composite_key"),
+    update=Link("update_stream"),
+    delete=Link("delete_stream"),
+    streams=Link("get_all_streams"),
+    group=Link("get_group_by_name"),
+    subject=Link("get_subject_in_cycle_by_id", subject_in_cycle_id="subject_id")
+)
+
 
 class StreamService:
     async def _create_new_stream(self, body: CreateStream, request: Request, db) -> ShowStreamWithHATEOAS:
@@ -32,10 +44,6 @@ class StreamService:
                         group_name=body.group_name,
                         subject_id=body.subject_id
                     )
-                    stream_id = stream.stream_id
-                    group_name = stream.group_name
-                    subject_id = stream.subject_id
-                    
                     stream_dict = {
                         "stream_id": stream.stream_id,
                         "group_name": stream.group_name,
@@ -43,19 +51,9 @@ class StreamService:
                     }
                     stream_pydantic = ShowStream.model_validate(stream_dict)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/streams/search/by_composite_key/{stream_id}/{group_name}/{subject_id}',
-                        "update": f'{api_base_url}/streams/update',
-                        "delete": f'{api_base_url}/streams/delete/{stream_id}/{group_name}/{subject_id}',
-                        "streams": f'{api_base_url}/streams',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                        "subject": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_id}',
-                        "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}' 
-                    }
+                    hateoas_links = STREAM_LINKS.bind(api_base_url)(stream)
 
                     return ShowStreamWithHATEOAS(stream=stream_pydantic, links=hateoas_links)
 
@@ -84,19 +82,9 @@ class StreamService:
                     }
                     stream_pydantic = ShowStream.model_validate(stream_dict)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/streams/search/by_composite_key/{stream_id}/{group_name}/{subject_id}',
-                        "update": f'{api_base_url}/streams/update',
-                        "delete": f'{api_base_url}/streams/delete/{stream_id}/{group_name}/{subject_id}',
-                        "streams": f'{api_base_url}/streams',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                        "subject": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_id}',
-                        "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}'
-                    }
+                    hateoas_links = STREAM_LINKS.bind(api_base_url)(stream)
 
                     return ShowStreamWithHATEOAS(stream=stream_pydantic, links=hateoas_links)
 
@@ -107,7 +95,7 @@ class StreamService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_streams_by_group(self, group_name: str, page: int, limit: int, request: Request, db) -> ShowStreamListWithHATEOAS:
+    async def _get_streams_by_group(self, group_name: str, page: int, limit: int, cursor: str | None, links: LinksMode, request: Request, db) -> ShowStreamListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 group_dal = GroupDAL(session)
@@ -116,41 +104,36 @@ class StreamService:
                     if not await ensure_group_exists(group_dal, group_name):
                         raise HTTPException(status_code=404, detail=f"Группа с названием {group_name} не найдена")
 
-                    streams = await stream_dal.get_streams_by_group(group_name, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    streams_with_hateoas = []
-                    for stream in streams:
+                    stream_links = STREAM_LINKS.bind(api_base_url, links)
+
+                    def to_hateoas(stream) -> ShowStreamWithHATEOAS:
                         stream_dict = {
                             "stream_id": stream.stream_id,
                             "group_name": stream.group_name,
                             "subject_id": stream.subject_id,
                         }
                         stream_pydantic = ShowStream.model_validate(stream_dict)
-                        stream_id = stream.stream_id
-                        subject_id = stream.subject_id
-                        stream_links = {
-                            "self": f'{api_base_url}/streams/search/by_composite_key/{stream_id}/{group_name}/{subject_id}',
-                            "update": f'{api_base_url}/streams/update',
-                            "delete": f'{api_base_url}/streams/delete/{stream_id}/{group_name}/{subject_id}',
-                            "streams": f'{api_base_url}/streams',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "subject": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_id}',
-                            "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}'
-                        }
-                        stream_with_links = ShowStreamWithHATEOAS(stream=stream_pydantic, links=stream_links)
-                        streams_with_hateoas.append(stream_with_links)
+                        stream_with_links = ShowStreamWithHATEOAS(stream=stream_pydantic, links=stream_links(stream))
+                        return stream_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: StreamDAL(stream_session).get_streams_by_group(group_name, page, limit, cursor, stream=True), to_hateoas)
+
+                    streams = await stream_dal.get_streams_by_group(group_name, page, limit, cursor)
+
+                    streams_with_hateoas = [to_hateoas(stream) for stream in streams]
 
                     collection_links = {
-                        "self": f'{api_base_url}/streams/search/by_group/{group_name}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/streams/create',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{group_name}'
+                        "self": route_url(api_base_url, "get_streams_by_group", query=page_query(page, limit, cursor), group_name=group_name),
+                        "next": route_url(api_base_url, "get_streams_by_group", query=page_query(None, limit, streams.next_cursor), group_name=group_name) if streams.next_cursor else None,
+                        "create": route_url(api_base_url, "create_stream"),
+                        "group": route_url(api_base_url, "get_group_by_name", group_name=group_name)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowStreamListWithHATEOAS(streams=streams_with_hateoas, links=collection_links)
+                    return ShowStreamListWithHATEOAS(streams=streams_with_hateoas, links=collection_links, next_cursor=streams.next_cursor)
 
                 except HTTPException:
                     raise
@@ -159,7 +142,7 @@ class StreamService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_streams_by_subject(self, subject_id: int, page: int, limit: int, request: Request, db) -> ShowStreamListWithHATEOAS:
+    async def _get_streams_by_subject(self, subject_id: int, page: int, limit: int, cursor: str | None, links: LinksMode, request: Request, db) -> ShowStreamListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 subject_in_cycle_dal = SubjectsInCycleDAL(session)
@@ -168,41 +151,36 @@ class StreamService:
                     if not await ensure_subject_in_cycle_exists(subject_in_cycle_dal, subject_id):
                         raise HTTPException(status_code=404, detail=f"Предмет в цикле с id {subject_id} не найден")
 
-                    streams = await stream_dal.get_streams_by_subject(subject_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    stream_links = STREAM_LINKS.bind(api_base_url, links)
 
-                    streams_with_hateoas = []
-                    for stream in streams:
+                    def to_hateoas(stream) -> ShowStreamWithHATEOAS:
                         stream_dict = {
                             "stream_id": stream.stream_id,
                             "group_name": stream.group_name,
                             "subject_id": stream.subject_id,
                         }
                         stream_pydantic = ShowStream.model_validate(stream_dict)
-                        stream_id = stream.stream_id
-                        group_name = stream.group_name
-                        stream_links = {
-                            "self": f'{api_base_url}/streams/search/by_composite_key/{stream_id}/{group_name}/{subject_id}',
-                            "update": f'{api_base_url}/streams/update',
-                            "delete": f'{api_base_url}/streams/delete/{stream_id}/{group_name}/{subject_id}',
-                            "streams": f'{api_base_url}/streams',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "subject": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_id}',
-                            "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}'
-                        }
-                        stream_with_links = ShowStreamWithHATEOAS(stream=stream_pydantic, links=stream_links)
-                        streams_with_hateoas.append(stream_with_links)
+                        stream_with_links = ShowStreamWithHATEOAS(stream=stream_pydantic, links=stream_links(stream))
+                        return stream_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: StreamDAL(stream_session).get_streams_by_subject(subject_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    streams = await stream_dal.get_streams_by_subject(subject_id, page, limit, cursor)
+
+                    streams_with_hateoas = [to_hateoas(stream) for stream in streams]
 
                     collection_links = {
-                        "self": f'{api_base_url}/streams/search/by_subject/{subject_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/streams/create',
-                        "subject": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_id}'
+                        "self": route_url(api_base_url, "get_streams_by_subject", query=page_query(page, limit, cursor), subject_id=subject_id),
+                        "next": route_url(api_base_url, "get_streams_by_subject", query=page_query(None, limit, streams.next_cursor), subject_id=subject_id) if streams.next_cursor else None,
+                        "create": route_url(api_base_url, "create_stream"),
+                        "subject": route_url(api_base_url, "get_subject_in_cycle_by_id", subject_in_cycle_id=subject_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowStreamListWithHATEOAS(streams=streams_with_hateoas, links=collection_links)
+                    return ShowStreamListWithHATEOAS(streams=streams_with_hateoas, links=collection_links, next_cursor=streams.next_cursor)
 
                 except HTTPException:
                     raise
@@ -211,46 +189,40 @@ class StreamService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_streams(self, page: int, limit: int, request: Request, db) -> ShowStreamListWithHATEOAS:
+    async def _get_all_streams(self, page: int, limit: int, cursor: str | None, links: LinksMode, request: Request, db) -> ShowStreamListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 stream_dal = StreamDAL(session)
                 try:
-                    streams = await stream_dal.get_all_streams(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    stream_links = STREAM_LINKS.bind(api_base_url, links)
 
-                    streams_with_hateoas = []
-                    for stream in streams:
+                    def to_hateoas(stream) -> ShowStreamWithHATEOAS:
                         stream_dict = {
                             "stream_id": stream.stream_id,
                             "group_name": stream.group_name,
                             "subject_id": stream.subject_id,
                         }
                         stream_pydantic = ShowStream.model_validate(stream_dict)
-                        stream_id = stream.stream_id
-                        group_name = stream.group_name
-                        subject_id = stream.subject_id
-                        stream_links = {
-                            "self": f'{api_base_url}/streams/search/by_composite_key/{stream_id}/{group_name}/{subject_id}',
-                            "update": f'{api_base_url}/streams/update',
-                            "delete": f'{api_base_url}/streams/delete/{stream_id}/{group_name}/{subject_id}',
-                            "streams": f'{api_base_url}/streams',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "subject": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_id}',
-                            "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}'
-                        }
-                        stream_with_links = ShowStreamWithHATEOAS(stream=stream_pydantic, links=stream_links)
-                        streams_with_hateoas.append(stream_with_links)
+                        stream_with_links = ShowStreamWithHATEOAS(stream=stream_pydantic, links=stream_links(stream))
+                        return stream_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: StreamDAL(stream_session).get_all_streams(page, limit, cursor, stream=True), to_hateoas)
+
+                    streams = await stream_dal.get_all_streams(page, limit, cursor)
+
+                    streams_with_hateoas = [to_hateoas(stream) for stream in streams]
 
                     collection_links = {
-                        "self": f'{api_base_url}/streams/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/streams/create'
+                        "self": route_url(api_base_url, "get_all_streams", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_streams", query=page_query(None, limit, streams.next_cursor)) if streams.next_cursor else None,
+                        "create": route_url(api_base_url, "create_stream")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowStreamListWithHATEOAS(streams=streams_with_hateoas, links=collection_links)
+                    return ShowStreamListWithHATEOAS(streams=streams_with_hateoas, links=collection_links, next_cursor=streams.next_cursor)
 
                 except HTTPException:
                     raise
@@ -281,13 +253,11 @@ class StreamService:
                     }
                     stream_pydantic = ShowStream.model_validate(stream_dict)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "streams": f'{api_base_url}/streams',
-                        "create": f'{api_base_url}/streams/create'
+                        "streams": route_url(api_base_url, "get_all_streams"),
+                        "create": route_url(api_base_url, "create_stream")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -355,19 +325,9 @@ class StreamService:
                     }
                     stream_pydantic = ShowStream.model_validate(stream_dict)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/streams/search/by_composite_key/{stream_id}/{group_name}/{subject_id}',
-                        "update": f'{api_base_url}/streams/update',
-                        "delete": f'{api_base_url}/streams/delete/{stream_id}/{group_name}/{subject_id}',
-                        "streams": f'{api_base_url}/streams',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                        "subject": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_id}',
-                        "sessions": f'{api_base_url}/sessions/search/by_group/{group_name}'
-                    }
+                    hateoas_links = STREAM_LINKS.bind(api_base_url)(updated_stream)
 
                     return ShowStreamWithHATEOAS(stream=stream_pydantic, links=hateoas_links)
 
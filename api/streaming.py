@@ -0,0 +1,48 @@
+"""
+Streaming NDJSON mode of the list endpoints (Accept: application/x-ndjson).
+Rows are read by a server-side cursor and every row is serialized and sent as it arrives,
+so the memory of the worker doesn't grow with the size of the table
+"""
+from typing import Awaitable, Callable
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.pagination import RowStream
+from config.logging_config import configure_logging
+
+logger = configure_logging()
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Client asked for the streaming mode"""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(db: AsyncSession, fetch_rows: Callable[[AsyncSession], Awaitable[RowStream]],
+                    serialize: Callable[[object], BaseModel], exclude: dict | None = None) -> StreamingResponse:
+    """
+    Response with one serialized row per line.
+    The session of the request is closed before the body is sent,
+    so the rows are read in an own session on the same engine, in one REPEATABLE READ snapshot
+    (a server-side cursor lives inside a transaction).
+    exclude - the fields left out of every line (as in model_dump)
+    """
+    async def lines():
+        async with AsyncSession(bind=db.bind, expire_on_commit=False) as stream_session:
+            await stream_session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            try:
+                rows = await fetch_rows(stream_session)
+                async for row in rows:
+                    yield serialize(row).model_dump_json(exclude=exclude) + "\n"
+            except Exception as e:
+                # The status is already sent, the client gets a cut stream
+                logger.warning(f"Потоковая выдача прервана (Ошибка: {e})")
+                raise
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
@@ -1,9 +1,10 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
 from db.models import Chapter, Cycle, Module, Plan, SubjectsInCycle
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class SubjectsInCycleDAL:
@@ -23,6 +24,18 @@ class SubjectsInCycleDAL:
         await self.db_session.flush()
         return new_subject_in_cycle
 
+    @log_exceptions
+    async def create_subjects_in_cycle(self, subjects_data: list[dict]) -> list[int]:
+        """
+        Insert many rows with one statement, returns the ids in the order of the data.
+        subjects_data - list of dicts with keys: code, title, cycle_in_chapter_id, module_in_cycle_id
+        """
+        if not subjects_data:
+            return []
+        query = insert(SubjectsInCycle).returning(SubjectsInCycle.id, sort_by_parameter_order=True)
+        result = await self.db_session.scalars(query, subjects_data)
+        return list(result.all())
+
     @log_exceptions
     async def delete_subject_in_cycle(self, id: int) -> SubjectsInCycle | None:
         query = delete(SubjectsInCycle).where(SubjectsInCycle.id == id).returning(SubjectsInCycle)
@@ -31,14 +44,9 @@ class SubjectsInCycleDAL:
         return deleted_subject_in_cycle
 
     @log_exceptions
-    async def get_all_subjects_in_cycles(self, page: int, limit: int) -> list[SubjectsInCycle]:
-        if page == 0:
-            query = select(SubjectsInCycle).order_by(SubjectsInCycle.id.asc())
-        else:
-            query = select(SubjectsInCycle).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        subjects_in_cycles = list(result.scalars().all())
-        return subjects_in_cycles
+    async def get_all_subjects_in_cycles(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(SubjectsInCycle)
+        return await fetch_page(self.db_session, query, (SubjectsInCycle.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_subject_in_cycle_by_id(self, id: int) -> SubjectsInCycle | None:
@@ -48,37 +56,19 @@ class SubjectsInCycleDAL:
         return subject_in_cycle_row
 
     @log_exceptions
-    async def get_subjects_in_cycle_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int) -> list[SubjectsInCycle]:
-        if page == 0:
-            query = select(SubjectsInCycle).where(SubjectsInCycle.cycle_in_chapter_id == cycle_in_chapter_id).order_by(SubjectsInCycle.id.asc())
-        else:
-            query = select(SubjectsInCycle).where(SubjectsInCycle.cycle_in_chapter_id == cycle_in_chapter_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        subjects_in_cycles = list(result.scalars().all())
-        return subjects_in_cycles
+    async def get_subjects_in_cycle_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(SubjectsInCycle).where(SubjectsInCycle.cycle_in_chapter_id == cycle_in_chapter_id)
+        return await fetch_page(self.db_session, query, (SubjectsInCycle.id,), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_subjects_in_cycle_by_module(self, module_in_cycle_id: int, page: int, limit: int) -> list[SubjectsInCycle]:
-        if page == 0:
-            query = select(SubjectsInCycle).where(SubjectsInCycle.module_in_cycle_id == module_in_cycle_id).order_by(SubjectsInCycle.id.asc())
-        else:
-            query = select(SubjectsInCycle).where(SubjectsInCycle.module_in_cycle_id == module_in_cycle_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        subjects_in_cycles = list(result.scalars().all())
-        return subjects_in_cycles
-    
+    async def get_subjects_in_cycle_by_module(self, module_in_cycle_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(SubjectsInCycle).where(SubjectsInCycle.module_in_cycle_id == module_in_cycle_id)
+        return await fetch_page(self.db_session, query, (SubjectsInCycle.id,), page, limit, cursor, stream)
+
     @log_exceptions
-    async def get_subjects_in_cycle_by_ids(self, ids: list[int], page: int, limit: int) -> list[SubjectsInCycle]:
+    async def get_subjects_in_cycle_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
         query = select(SubjectsInCycle).where(SubjectsInCycle.id.in_(ids))
-
-        if page > 0:
-            offset_value = (page - 1) * limit
-            query = query.offset(offset_value).limit(limit)
-
-        result = await self.db_session.execute(query)
-        subjects_in_cycle = list(result.scalars().all())
-        return subjects_in_cycle if subjects_in_cycle is not None else []
-    
+        return await fetch_page(self.db_session, query, (SubjectsInCycle.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_subjects_in_plan(self, plan_id: int) -> list[SubjectsInCycle]:
@@ -23,12 +23,12 @@ async def get_subject_in_cycle_by_id(subject_in_cycle_id: int, request: Request,
 
 @subject_in_cycle_router.get("/search/by_cycle/{cycle_in_chapter_id}", response_model=ShowSubjectsInCycleListWithHATEOAS, responses={404: {"description": "Предметы в цикле не найдены"}})
 async def get_subjects_in_cycle_by_cycle(cycle_in_chapter_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service._get_subjects_in_cycle_by_cycle(cycle_in_chapter_id, query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service._get_subjects_in_cycle_by_cycle(cycle_in_chapter_id, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_router.get("/search/by_module/{module_in_cycle_id}", response_model=ShowSubjectsInCycleListWithHATEOAS, responses={404: {"description": "Предметы в цикле не найдены"}})
 async def get_subjects_in_cycle_by_module(module_in_cycle_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service._get_subjects_in_cycle_by_module(module_in_cycle_id, query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service._get_subjects_in_cycle_by_module(module_in_cycle_id, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_router.get("/search/by_plan/{plan_id}", response_model=ShowSubjectsInCycleListWithHATEOAS, responses={404: {"description": "Предметы в цикле не найдены"}})
@@ -38,12 +38,12 @@ async def get_subjects_in_plan(plan_id: int, request: Request, db: AsyncSession
 
 @subject_in_cycle_router.get("/search/by_ids", response_model=ShowSubjectsInCycleListWithHATEOAS, responses={404: {"description": "Предметы в цикле не найдены"}})
 async def get_subjects_in_cycle_by_ids(query_param: Annotated[QueryParams, Depends()], request: Request, ids: list[int] = Query(...), db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service._get_subjects_in_cycle_by_ids(ids, query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service._get_subjects_in_cycle_by_ids(ids, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_router.get("/search", response_model=ShowSubjectsInCycleListWithHATEOAS)
 async def get_all_subjects_in_cycles(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service._get_all_subjects_in_cycles(query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service._get_all_subjects_in_cycles(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_router.get("/search/info_for_create/{group_name}/{semester}")
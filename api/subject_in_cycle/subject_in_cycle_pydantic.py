@@ -34,4 +34,5 @@ class ShowSubjectsInCycleWithHATEOAS(TunedModel):
 class ShowSubjectsInCycleListWithHATEOAS(TunedModel):
     subjects_in_cycles: List[ShowSubjectsInCycleWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
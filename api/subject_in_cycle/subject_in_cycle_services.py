@@ -1,5 +1,5 @@
 from api.subject_in_cycle.subject_in_cycle_pydantic import *
-from api.services_helpers import ensure_cycle_exists, ensure_module_exists, ensure_subject_in_cycle_exists
+from api.services_helpers import ensure_cycle_exists, ensure_module_exists, ensure_subject_in_cycle_exists, load_module
 from api.subject_in_cycle.subject_in_cycle_DAL import SubjectsInCycleDAL
 from api.module.module_DAL import ModuleDAL
 from api.cycle.cycle_DAL import CycleDAL
@@ -9,6 +9,9 @@ from api.chapter.chapter_DAL import ChapterDAL
 from api.semester.semester_DAL import SemesterDAL
 from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from api.subject_in_cycle_hours.subject_in_cycle_hours_DAL import SubjectsInCycleHoursDAL
 from api.subject_in_cycle_hours.subject_in_cycle_hours_pydantic import ShowSubjectsInCycleHours
@@ -17,6 +20,17 @@ from config.logging_config import configure_logging
 # Create logger object
 logger = configure_logging()
 
+SUBJECT_IN_CYCLE_LINKS = LinkSet(
+    self=Link("get_subject_in_cycle_by_id", subject_in_cycle_id="id"),
+    update=Link("update_subject_in_cycle"),
+    delete=Link("delete_subject_in_cycle", subject_in_cycle_id="id"),
+    subjects_in_cycles=Link("get_all_subjects_in_cycles"),
+    cycle=Link("get_cycle_by_id", cycle_id="cycle_in_chapter_id"),
+    module=Link("get_module_by_id", module_id="module_in_cycle_id", when=("module_in_cycle_id",)),
+    hours=Link("get_subjects_in_cycle_hours_by_subject_in_cycle", subject_in_cycle_id="id"),
+    streams=Link("get_streams_by_subject", subject_id="id")
+)
+
 
 class SubjectInCycleService:
     async def _create_new_subject_in_cycle(self, body: CreateSubjectsInCycle, request: Request, db) -> ShowSubjectsInCycleWithHATEOAS:
@@ -31,10 +45,10 @@ class SubjectInCycleService:
                             raise HTTPException(status_code=404, detail=f"Цикл с id {body.cycle_in_chapter_id} не найден")
 
                     if body.module_in_cycle_id is not None:
-                        if not await ensure_module_exists(module_dal, body.module_in_cycle_id):
+                        module_obj = await load_module(module_dal, body.module_in_cycle_id)
+                        if module_obj is None:
                             raise HTTPException(status_code=404, detail=f"Модуль с id {body.module_in_cycle_id} не найден")
                         if body.cycle_in_chapter_id is not None:
-                            module_obj = await module_dal.get_module_by_id(body.module_in_cycle_id)
                             if module_obj.cycle_in_chapter_id != body.cycle_in_chapter_id:
                                 raise HTTPException(status_code=400, detail=f"Модуль с id {body.module_in_cycle_id} не принадлежит циклу с id {body.cycle_in_chapter_id}")
                     
@@ -44,24 +58,11 @@ class SubjectInCycleService:
                         cycle_in_chapter_id=body.cycle_in_chapter_id,
                         module_in_cycle_id=body.module_in_cycle_id
                     )
-                    subject_in_cycle_id = subject_in_cycle.id 
                     subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                        "update": f'{api_base_url}/subjects_in_cycles/update',
-                        "delete": f'{api_base_url}/subjects_in_cycles/delete/{subject_in_cycle_id}',
-                        "subjects_in_cycles": f'{api_base_url}/subjects_in_cycles',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{body.cycle_in_chapter_id}',
-                        "module": f'{api_base_url}/modules/search/by_id/{body.module_in_cycle_id}' if body.module_in_cycle_id else None,
-                        "hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_in_cycle/{subject_in_cycle_id}',
-                        "streams": f'{api_base_url}/streams/search/by_subject_in_cycle/{subject_in_cycle_id}'
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)(subject_in_cycle)
 
                     return ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=hateoas_links)
 
@@ -84,21 +85,9 @@ class SubjectInCycleService:
                         raise HTTPException(status_code=404, detail=f"Предмет в цикле с id {subject_in_cycle_id} не найден")
                     subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                        "update": f'{api_base_url}/subjects_in_cycles/update',
-                        "delete": f'{api_base_url}/subjects_in_cycles/delete/{subject_in_cycle_id}',
-                        "subjects_in_cycles": f'{api_base_url}/subjects_in_cycles',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{subject_in_cycle.cycle_in_chapter_id}',
-                        "module": f'{api_base_url}/modules/search/by_id/{subject_in_cycle.module_in_cycle_id}' if subject_in_cycle.module_in_cycle_id else None,
-                        "hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_in_cycle/{subject_in_cycle_id}',
-                        "streams": f'{api_base_url}/streams/search/by_subject_in_cycle/{subject_in_cycle_id}'
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)(subject_in_cycle)
 
                     return ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=hateoas_links)
 
@@ -109,7 +98,7 @@ class SubjectInCycleService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_subjects_in_cycle_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
+    async def _get_subjects_in_cycle_by_cycle(self, cycle_in_chapter_id: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 cycle_dal = CycleDAL(session)
@@ -118,37 +107,31 @@ class SubjectInCycleService:
                     if not await ensure_cycle_exists(cycle_dal, cycle_in_chapter_id):
                         raise HTTPException(status_code=404, detail=f"Цикл с id {cycle_in_chapter_id} не найден")
 
-                    subjects_in_cycles = await subject_in_cycle_dal.get_subjects_in_cycle_by_cycle(cycle_in_chapter_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    subject_in_cycle_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)
 
-                    subjects_in_cycles_with_hateoas = []
-                    for subject_in_cycle in subjects_in_cycles:
+                    def to_hateoas(subject_in_cycle) -> ShowSubjectsInCycleWithHATEOAS:
                         subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
-                        subject_in_cycle_id = subject_in_cycle.id
-                        subject_in_cycle_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                            "update": f'{api_base_url}/subjects_in_cycles/update',
-                            "delete": f'{api_base_url}/subjects_in_cycles/delete/{subject_in_cycle_id}',
-                            "subjects_in_cycles": f'{api_base_url}/subjects_in_cycles',
-                            "cycle": f'{api_base_url}/cycles/search/by_id/{cycle_in_chapter_id}',
-                            "module": f'{api_base_url}/modules/search/by_id/{subject_in_cycle.module_in_cycle_id}' if subject_in_cycle.module_in_cycle_id else None,
-                            "hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_in_cycle/{subject_in_cycle_id}',
-                            "streams": f'{api_base_url}/streams/search/by_subject_in_cycle/{subject_in_cycle_id}'
-                        }
-                        subject_in_cycle_links = {k: v for k, v in subject_in_cycle_links.items() if v is not None}
-                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links)
-                        subjects_in_cycles_with_hateoas.append(subject_in_cycle_with_links)
+                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links(subject_in_cycle))
+                        return subject_in_cycle_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleDAL(stream_session).get_subjects_in_cycle_by_cycle(cycle_in_chapter_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycles = await subject_in_cycle_dal.get_subjects_in_cycle_by_cycle(cycle_in_chapter_id, page, limit, cursor)
+
+                    subjects_in_cycles_with_hateoas = [to_hateoas(subject_in_cycle) for subject_in_cycle in subjects_in_cycles]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search/by_cycle/{cycle_in_chapter_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/subjects_in_cycles/create',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{cycle_in_chapter_id}'
+                        "self": route_url(api_base_url, "get_subjects_in_cycle_by_cycle", query=page_query(page, limit, cursor), cycle_in_chapter_id=cycle_in_chapter_id),
+                        "next": route_url(api_base_url, "get_subjects_in_cycle_by_cycle", query=page_query(None, limit, subjects_in_cycles.next_cursor), cycle_in_chapter_id=cycle_in_chapter_id) if subjects_in_cycles.next_cursor else None,
+                        "create": route_url(api_base_url, "create_subject_in_cycle"),
+                        "cycle": route_url(api_base_url, "get_cycle_by_id", cycle_id=cycle_in_chapter_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links, next_cursor=subjects_in_cycles.next_cursor)
 
                 except HTTPException:
                     raise
@@ -157,7 +140,7 @@ class SubjectInCycleService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_subjects_in_cycle_by_module(self, module_in_cycle_id: int, page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
+    async def _get_subjects_in_cycle_by_module(self, module_in_cycle_id: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 module_dal = ModuleDAL(session)
@@ -166,37 +149,31 @@ class SubjectInCycleService:
                     if not await ensure_module_exists(module_dal, module_in_cycle_id):
                         raise HTTPException(status_code=404, detail=f"Модуль с id {module_in_cycle_id} не найден")
 
-                    subjects_in_cycles = await subject_in_cycle_dal.get_subjects_in_cycle_by_module(module_in_cycle_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    subjects_in_cycles_with_hateoas = []
-                    for subject_in_cycle in subjects_in_cycles:
+                    subject_in_cycle_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)
+
+                    def to_hateoas(subject_in_cycle) -> ShowSubjectsInCycleWithHATEOAS:
                         subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
-                        subject_in_cycle_id = subject_in_cycle.id
-                        subject_in_cycle_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                            "update": f'{api_base_url}/subjects_in_cycles/update',
-                            "delete": f'{api_base_url}/subjects_in_cycles/delete/{subject_in_cycle_id}',
-                            "subjects_in_cycles": f'{api_base_url}/subjects_in_cycles',
-                            "cycle": f'{api_base_url}/cycles/search/by_id/{subject_in_cycle.cycle_in_chapter_id}',
-                            "module": f'{api_base_url}/modules/search/by_id/{module_in_cycle_id}',
-                            "hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_in_cycle/{subject_in_cycle_id}',
-                            "streams": f'{api_base_url}/streams/search/by_subject_in_cycle/{subject_in_cycle_id}'
-                        }
-                        subject_in_cycle_links = {k: v for k, v in subject_in_cycle_links.items() if v is not None}
-                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links)
-                        subjects_in_cycles_with_hateoas.append(subject_in_cycle_with_links)
+                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links(subject_in_cycle))
+                        return subject_in_cycle_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleDAL(stream_session).get_subjects_in_cycle_by_module(module_in_cycle_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycles = await subject_in_cycle_dal.get_subjects_in_cycle_by_module(module_in_cycle_id, page, limit, cursor)
+
+                    subjects_in_cycles_with_hateoas = [to_hateoas(subject_in_cycle) for subject_in_cycle in subjects_in_cycles]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search/by_module/{module_in_cycle_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/subjects_in_cycles/create',
-                        "module": f'{api_base_url}/modules/search/by_id/{module_in_cycle_id}'
+                        "self": route_url(api_base_url, "get_subjects_in_cycle_by_module", query=page_query(page, limit, cursor), module_in_cycle_id=module_in_cycle_id),
+                        "next": route_url(api_base_url, "get_subjects_in_cycle_by_module", query=page_query(None, limit, subjects_in_cycles.next_cursor), module_in_cycle_id=module_in_cycle_id) if subjects_in_cycles.next_cursor else None,
+                        "create": route_url(api_base_url, "create_subject_in_cycle"),
+                        "module": route_url(api_base_url, "get_module_by_id", module_id=module_in_cycle_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links, next_cursor=subjects_in_cycles.next_cursor)
 
                 except HTTPException:
                     raise
@@ -205,41 +182,35 @@ class SubjectInCycleService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_subjects_in_cycles(self, page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
+    async def _get_all_subjects_in_cycles(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 subject_in_cycle_dal = SubjectsInCycleDAL(session)
                 try:
-                    subjects_in_cycles = await subject_in_cycle_dal.get_all_subjects_in_cycles(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    subjects_in_cycles_with_hateoas = []
-                    for subject_in_cycle in subjects_in_cycles:
+                    subject_in_cycle_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)
+
+                    def to_hateoas(subject_in_cycle) -> ShowSubjectsInCycleWithHATEOAS:
                         subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
-                        subject_in_cycle_id = subject_in_cycle.id
-                        subject_in_cycle_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                            "update": f'{api_base_url}/subjects_in_cycles/update',
-                            "delete": f'{api_base_url}/subjects_in_cycles/delete/{subject_in_cycle_id}',
-                            "subjects_in_cycles": f'{api_base_url}/subjects_in_cycles',
-                            "cycle": f'{api_base_url}/cycles/search/by_id/{subject_in_cycle.cycle_in_chapter_id}',
-                            "module": f'{api_base_url}/modules/search/by_id/{subject_in_cycle.module_in_cycle_id}' if subject_in_cycle.module_in_cycle_id else None,
-                            "hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_in_cycle/{subject_in_cycle_id}',
-                            "streams": f'{api_base_url}/streams/search/by_subject_in_cycle/{subject_in_cycle_id}'
-                        }
-                        subject_in_cycle_links = {k: v for k, v in subject_in_cycle_links.items() if v is not None}
-                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links)
-                        subjects_in_cycles_with_hateoas.append(subject_in_cycle_with_links)
+                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links(subject_in_cycle))
+                        return subject_in_cycle_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleDAL(stream_session).get_all_subjects_in_cycles(page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycles = await subject_in_cycle_dal.get_all_subjects_in_cycles(page, limit, cursor)
+
+                    subjects_in_cycles_with_hateoas = [to_hateoas(subject_in_cycle) for subject_in_cycle in subjects_in_cycles]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/subjects_in_cycles/create'
+                        "self": route_url(api_base_url, "get_all_subjects_in_cycles", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_subjects_in_cycles", query=page_query(None, limit, subjects_in_cycles.next_cursor)) if subjects_in_cycles.next_cursor else None,
+                        "create": route_url(api_base_url, "create_subject_in_cycle")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links, next_cursor=subjects_in_cycles.next_cursor)
 
                 except HTTPException:
                     raise
@@ -351,15 +322,13 @@ class SubjectInCycleService:
 
                     subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "subjects_in_cycles": f'{api_base_url}/subjects_in_cycles',
-                        "create": f'{api_base_url}/subjects_in_cycles/create',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{subject_in_cycle.cycle_in_chapter_id}',
-                        "module": f'{api_base_url}/modules/search/by_id/{subject_in_cycle.module_in_cycle_id}' if subject_in_cycle.module_in_cycle_id else None
+                        "subjects_in_cycles": route_url(api_base_url, "get_all_subjects_in_cycles"),
+                        "create": route_url(api_base_url, "create_subject_in_cycle"),
+                        "cycle": route_url(api_base_url, "get_cycle_by_id", cycle_id=subject_in_cycle.cycle_in_chapter_id),
+                        "module": route_url(api_base_url, "get_module_by_id", module_id=subject_in_cycle.module_in_cycle_id) if subject_in_cycle.module_in_cycle_id else None
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -374,36 +343,34 @@ class SubjectInCycleService:
                 raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера при удалении предмета в цикле.")
 
 
-    async def _get_subjects_in_cycle_by_ids(self, ids: list[int], page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
+    async def _get_subjects_in_cycle_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 subject_in_cycle_dal = SubjectsInCycleDAL(session)
                 try:
-                    subjects_in_cycle_list = await subject_in_cycle_dal.get_subjects_in_cycle_by_ids(ids, page, limit)
+                    api_base_url = request_base_url(request)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    subject_in_cycle_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)
 
-                    subjects_in_cycles_with_hateoas = []
-                    for subject_in_cycle in subjects_in_cycle_list:
+                    def to_hateoas(subject_in_cycle) -> ShowSubjectsInCycleWithHATEOAS:
                         subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
-                        subject_in_cycle_id = subject_in_cycle.id
-                        subject_in_cycle_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                            "cycle": f'{api_base_url}/cycles/search/by_id/{subject_in_cycle.cycle_in_chapter_id}',
-                            "module": f'{api_base_url}/modules/search/by_id/{subject_in_cycle.module_in_cycle_id}' if subject_in_cycle.module_in_cycle_id else None,
-                        }
-                        subject_in_cycle_links = {k: v for k, v in subject_in_cycle_links.items() if v is not None}
-                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links)
-                        subjects_in_cycles_with_hateoas.append(subject_in_cycle_with_links)
+                        subject_in_cycle_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=subject_in_cycle_links(subject_in_cycle))
+                        return subject_in_cycle_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleDAL(stream_session).get_subjects_in_cycle_by_ids(ids, page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycle_list = await subject_in_cycle_dal.get_subjects_in_cycle_by_ids(ids, page, limit, cursor)
+
+                    subjects_in_cycles_with_hateoas = [to_hateoas(subject_in_cycle) for subject_in_cycle in subjects_in_cycle_list]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search/by_ids?page={page}&limit={limit}&ids={",".join(map(str, ids))}',
+                        "self": route_url(api_base_url, "get_subjects_in_cycle_by_ids", query=f'{page_query(page, limit, cursor)}&ids={",".join(map(str, ids))}'),
+                        "next": route_url(api_base_url, "get_subjects_in_cycle_by_ids", query=f'{page_query(None, limit, subjects_in_cycle_list.next_cursor)}&ids={",".join(map(str, ids))}') if subjects_in_cycle_list.next_cursor else None,
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleListWithHATEOAS(subjects_in_cycles=subjects_in_cycles_with_hateoas, links=collection_links, next_cursor=subjects_in_cycle_list.next_cursor)
 
                 except HTTPException:
                     raise
@@ -419,25 +386,17 @@ class SubjectInCycleService:
                 try:
                     subjects_in_plan_list = await subject_in_cycle_dal.get_subjects_in_plan(plan_id)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     subjects_in_plan_with_hateoas = []
+                    subject_in_plan_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)
                     for subject_in_plan in subjects_in_plan_list:
                         subject_in_plan_pydantic = ShowSubjectsInCycle.model_validate(subject_in_plan, from_attributes=True)
-                        subject_in_plan_id = subject_in_plan.id
-                        subject_in_plan_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_plan_id}',
-                            "cycle": f'{api_base_url}/cycles/search/by_id/{subject_in_plan.cycle_in_chapter_id}',
-                            "module": f'{api_base_url}/modules/search/by_id/{subject_in_plan.module_in_cycle_id}' if subject_in_plan.module_in_cycle_id else None,
-                        }
-                        subject_in_plan_links = {k: v for k, v in subject_in_plan_links.items() if v is not None}
-                        subject_in_plan_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_plan_pydantic, links=subject_in_plan_links)
+                        subject_in_plan_with_links = ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_plan_pydantic, links=subject_in_plan_links(subject_in_plan))
                         subjects_in_plan_with_hateoas.append(subject_in_plan_with_links)
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search/by_plan/{plan_id}',
+                        "self": route_url(api_base_url, "get_subjects_in_plan", plan_id=plan_id),
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
@@ -481,24 +440,11 @@ class SubjectInCycleService:
                     if not subject_in_cycle:
                         raise HTTPException(status_code=404, detail=f"Предмет в цикле с id {body.subject_in_cycle_id} не найден")
 
-                    subject_in_cycle_id = subject_in_cycle.id 
                     subject_in_cycle_pydantic = ShowSubjectsInCycle.model_validate(subject_in_cycle, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                        "update": f'{api_base_url}/subjects_in_cycles/update',
-                        "delete": f'{api_base_url}/subjects_in_cycles/delete/{subject_in_cycle_id}',
-                        "subjects_in_cycles": f'{api_base_url}/subjects_in_cycles',
-                        "cycle": f'{api_base_url}/cycles/search/by_id/{subject_in_cycle.cycle_in_chapter_id}',
-                        "module": f'{api_base_url}/modules/search/by_id/{subject_in_cycle.module_in_cycle_id}' if subject_in_cycle.module_in_cycle_id else None,
-                        "hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_in_cycle/{subject_in_cycle_id}',
-                        "streams": f'{api_base_url}/streams/search/by_subject_in_cycle/{subject_in_cycle_id}'
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = SUBJECT_IN_CYCLE_LINKS.bind(api_base_url)(subject_in_cycle)
 
                     return ShowSubjectsInCycleWithHATEOAS(subject_in_cycle=subject_in_cycle_pydantic, links=hateoas_links)
 
@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import SubjectsInCycleHours
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class SubjectsInCycleHoursDAL:
@@ -38,6 +39,19 @@ class SubjectsInCycleHoursDAL:
         await self.db_session.flush()
         return new_subject_in_cycle_hours
 
+    @log_exceptions
+    async def create_subjects_in_cycle_hours(self, hours_data: list[dict]) -> list[int]:
+        """
+        Insert many rows with one statement, returns the ids in the order of the data.
+        hours_data - list of dicts with keys: semester, self_study_hours, lectures_hours, laboratory_hours,
+        practical_hours, course_project_hours, consultation_hours, intermediate_assessment_hours, subject_in_cycle_id
+        """
+        if not hours_data:
+            return []
+        query = insert(SubjectsInCycleHours).returning(SubjectsInCycleHours.id, sort_by_parameter_order=True)
+        result = await self.db_session.scalars(query, hours_data)
+        return list(result.all())
+
     @log_exceptions
     async def delete_subject_in_cycle_hours(self, id: int) -> SubjectsInCycleHours | None:
         query = delete(SubjectsInCycleHours).where(SubjectsInCycleHours.id == id).returning(SubjectsInCycleHours)
@@ -46,14 +60,9 @@ class SubjectsInCycleHoursDAL:
         return deleted_subject_in_cycle_hours
 
     @log_exceptions
-    async def get_all_subjects_in_cycle_hours(self, page: int, limit: int) -> list[SubjectsInCycleHours]:
-        if page == 0:
-            query = select(SubjectsInCycleHours).order_by(SubjectsInCycleHours.id.asc())
-        else:
-            query = select(SubjectsInCycleHours).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        subjects_in_cycle_hours = list(result.scalars().all())
-        return subjects_in_cycle_hours
+    async def get_all_subjects_in_cycle_hours(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(SubjectsInCycleHours)
+        return await fetch_page(self.db_session, query, (SubjectsInCycleHours.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_subject_in_cycle_hours_by_id(self, id: int) -> SubjectsInCycleHours | None:
@@ -63,15 +72,10 @@ class SubjectsInCycleHoursDAL:
         return subject_in_cycle_hours_row
 
     @log_exceptions
-    async def get_subjects_in_cycle_hours_by_subject_in_cycle(self, subject_in_cycle_id: int, page: int, limit: int) -> list[SubjectsInCycleHours]:
-        if page == 0:
-            query = select(SubjectsInCycleHours).where(SubjectsInCycleHours.subject_in_cycle_id == subject_in_cycle_id).order_by(SubjectsInCycleHours.semester.asc(), SubjectsInCycleHours.id.asc())
-        else:
-            query = select(SubjectsInCycleHours).where(SubjectsInCycleHours.subject_in_cycle_id == subject_in_cycle_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        subjects_in_cycle_hours = list(result.scalars().all())
-        return subjects_in_cycle_hours if subjects_in_cycle_hours is not None else []
-    
+    async def get_subjects_in_cycle_hours_by_subject_in_cycle(self, subject_in_cycle_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(SubjectsInCycleHours).where(SubjectsInCycleHours.subject_in_cycle_id == subject_in_cycle_id)
+        return await fetch_page(self.db_session, query, (SubjectsInCycleHours.semester, SubjectsInCycleHours.id), page, limit, cursor, stream)
+
     @log_exceptions
     async def get_subjects_in_cycle_hours_by_subject_and_semester(self, subject_in_cycle_id: int, semester: int) -> list[SubjectsInCycleHours]:
         query = select(SubjectsInCycleHours).where(
@@ -83,26 +87,14 @@ class SubjectsInCycleHoursDAL:
         return subjects_in_cycle_hours if subjects_in_cycle_hours is not None else []
 
     @log_exceptions
-    async def get_subjects_in_cycle_hours_by_semester(self, semester: int, page: int, limit: int) -> list[SubjectsInCycleHours]:
-        if page == 0:
-            query = select(SubjectsInCycleHours).where(SubjectsInCycleHours.semester == semester).order_by(SubjectsInCycleHours.id.asc())
-        else:
-            query = select(SubjectsInCycleHours).where(SubjectsInCycleHours.semester == semester).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        subjects_in_cycle_hours = list(result.scalars().all())
-        return subjects_in_cycle_hours
-    
+    async def get_subjects_in_cycle_hours_by_semester(self, semester: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(SubjectsInCycleHours).where(SubjectsInCycleHours.semester == semester)
+        return await fetch_page(self.db_session, query, (SubjectsInCycleHours.id,), page, limit, cursor, stream)
+
     @log_exceptions
-    async def get_subjects_hours_by_ids(self, ids: list[int], page: int, limit: int) -> list[SubjectsInCycleHours]:
+    async def get_subjects_hours_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
         query = select(SubjectsInCycleHours).where(SubjectsInCycleHours.id.in_(ids))
-
-        if page > 0:
-            offset_value = (page - 1) * limit
-            query = query.offset(offset_value).limit(limit)
-
-        result = await self.db_session.execute(query)
-        subjects_in_cycle_hours = list(result.scalars().all())
-        return subjects_in_cycle_hours if subjects_in_cycle_hours is not None else []
+        return await fetch_page(self.db_session, query, (SubjectsInCycleHours.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_subject_in_cycle_hours(self, target_id: int, **kwargs) -> SubjectsInCycleHours | None:
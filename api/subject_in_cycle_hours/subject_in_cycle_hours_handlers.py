@@ -23,7 +23,7 @@ async def get_subject_in_cycle_hours_by_id(hours_id: int, request: Request, db:
 
 @subject_in_cycle_hours_router.get("/search/by_subject_in_cycle/{subject_in_cycle_id}", response_model=ShowSubjectsInCycleHoursListWithHATEOAS, responses={404: {"description": "Записи о часах для предмета не найдены"}})
 async def get_subjects_in_cycle_hours_by_subject_in_cycle(subject_in_cycle_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service_hours._get_subjects_in_cycle_hours_by_subject_in_cycle(subject_in_cycle_id, query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service_hours._get_subjects_in_cycle_hours_by_subject_in_cycle(subject_in_cycle_id, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_hours_router.get("/search/by_subject_and_semester/{subject_in_cycle_id}/{semester}", response_model=ShowSubjectsInCycleHoursListWithHATEOAS, responses={404: {"description": "Записи о часах для предмета в цикле по семестру не найдены"}})
@@ -33,17 +33,17 @@ async def get_subjects_in_cycle_hours_by_subject_and_semester(subject_in_cycle_i
 
 @subject_in_cycle_hours_router.get("/search/by_semester/{semester}", response_model=ShowSubjectsInCycleHoursListWithHATEOAS, responses={404: {"description": "Записи о часах для семестра не найдены"}})
 async def get_subjects_in_cycle_hours_by_semester(semester: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service_hours._get_subjects_in_cycle_hours_by_semester(semester, query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service_hours._get_subjects_in_cycle_hours_by_semester(semester, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_hours_router.get("/search/by_ids", response_model=ShowSubjectsInCycleHoursListWithHATEOAS, responses={404: {"description": "Записи о часах не найдены"}})
 async def get_subjects_hours_by_ids( query_param: Annotated[QueryParams, Depends()], request: Request, ids: list[int] = Query(...), db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service_hours._get_subjects_hours_by_ids(ids, query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service_hours._get_subjects_hours_by_ids(ids, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_hours_router.get("/search", response_model=ShowSubjectsInCycleHoursListWithHATEOAS)
 async def get_all_subjects_in_cycle_hours(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await subject_in_cycle_service_hours._get_all_subjects_in_cycle_hours(query_param.page, query_param.limit, request, db)
+    return await subject_in_cycle_service_hours._get_all_subjects_in_cycle_hours(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @subject_in_cycle_hours_router.delete("/delete/{hours_id}", response_model=ShowSubjectsInCycleHoursWithHATEOAS, responses={404: {"description": "Запись о часах для предмета не найдена"}})
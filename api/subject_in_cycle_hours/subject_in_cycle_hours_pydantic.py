@@ -49,4 +49,5 @@ class ShowSubjectsInCycleHoursWithHATEOAS(TunedModel):
 class ShowSubjectsInCycleHoursListWithHATEOAS(TunedModel):
     subjects_in_cycle_hours: List[ShowSubjectsInCycleHoursWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
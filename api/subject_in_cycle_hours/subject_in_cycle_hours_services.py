@@ -3,12 +3,24 @@ from api.services_helpers import ensure_subject_in_cycle_exists, ensure_subject_
 from api.subject_in_cycle_hours.subject_in_cycle_hours_DAL import SubjectsInCycleHoursDAL
 from api.subject_in_cycle.subject_in_cycle_DAL import SubjectsInCycleDAL
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+SUBJECT_IN_CYCLE_HOURS_LINKS = LinkSet(
+    self=Link("get_subject_in_cycle_hours_by_id", hours_id="id"),
+    update=Link("update_subject_in_cycle_hours"),
+    delete=Link("delete_subject_in_cycle_hours", hours_id="id"),
+    subjects_in_cycles_hours=Link("get_all_subjects_in_cycle_hours"),
+    subject_in_cycle=Link("get_subject_in_cycle_by_id"),
+    teachers_in_plans=Link("get_teachers_in_plans_by_subject_hours", subject_hours_id="id")
+)
+
 
 class SubjectInCycleHoursService:
     async def _create_new_subject_in_cycle_hours(self, body: CreateSubjectsInCycleHours, request: Request, db) -> ShowSubjectsInCycleHoursWithHATEOAS:
@@ -31,22 +43,11 @@ class SubjectInCycleHoursService:
                         intermediate_assessment_hours=body.intermediate_assessment_hours,
                         subject_in_cycle_id=body.subject_in_cycle_id
                     )
-                    hours_id = subject_in_cycle_hours.id 
                     subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{hours_id}',
-                        "update": f'{api_base_url}/subjects_in_cycles_hours/update',
-                        "delete": f'{api_base_url}/subjects_in_cycles_hours/delete/{hours_id}',
-                        "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                        "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{body.subject_in_cycle_id}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{hours_id}',
-                        "certifications": f'{api_base_url}/certifications/search/by_subject_hours/{hours_id}'
-                    }
+                    hateoas_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)(subject_in_cycle_hours)
 
                     return ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=hateoas_links)
 
@@ -69,19 +70,9 @@ class SubjectInCycleHoursService:
                         raise HTTPException(status_code=404, detail=f"Запись о часах для предмета с id {hours_id} не найдена")
                     subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{hours_id}',
-                        "update": f'{api_base_url}/subjects_in_cycles_hours/update',
-                        "delete": f'{api_base_url}/subjects_in_cycles_hours/delete/{hours_id}',
-                        "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                        "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_hours.subject_in_cycle_id}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{hours_id}',
-                        "certifications": f'{api_base_url}/certifications/search/by_subject_hours/{hours_id}'
-                    }
+                    hateoas_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)(subject_in_cycle_hours)
 
                     return ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=hateoas_links)
 
@@ -92,7 +83,7 @@ class SubjectInCycleHoursService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_subjects_in_cycle_hours_by_subject_in_cycle(self, subject_in_cycle_id: int, page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
+    async def _get_subjects_in_cycle_hours_by_subject_in_cycle(self, subject_in_cycle_id: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 subject_in_cycle_dal = SubjectsInCycleDAL(session)
@@ -101,39 +92,34 @@ class SubjectInCycleHoursService:
                     if not await ensure_subject_in_cycle_exists(subject_in_cycle_dal, subject_in_cycle_id):
                         raise HTTPException(status_code=404, detail=f"Предмет в цикле с id {subject_in_cycle_id} не найден")
 
-                    subjects_in_cycle_hours = await subject_in_cycle_hours_dal.get_subjects_in_cycle_hours_by_subject_in_cycle(subject_in_cycle_id, page, limit)
+                    api_base_url = request_base_url(request)
+
+                    subject_in_cycle_hours_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)
+
+                    def to_hateoas(subject_in_cycle_hours) -> ShowSubjectsInCycleHoursWithHATEOAS:
+                        subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
+                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links(subject_in_cycle_hours))
+                        return subject_in_cycle_hours_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleHoursDAL(stream_session).get_subjects_in_cycle_hours_by_subject_in_cycle(subject_in_cycle_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycle_hours = await subject_in_cycle_hours_dal.get_subjects_in_cycle_hours_by_subject_in_cycle(subject_in_cycle_id, page, limit, cursor)
                     
                     if subjects_in_cycle_hours is None:
                         subjects_in_cycle_hours = []
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
-
-                    subjects_in_cycles_hours_with_hateoas = []
-                    for subject_in_cycle_hours in subjects_in_cycle_hours:
-                        subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
-                        hours_id = subject_in_cycle_hours.id
-                        subject_in_cycle_hours_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{hours_id}',
-                            "update": f'{api_base_url}/subjects_in_cycles_hours/update',
-                            "delete": f'{api_base_url}/subjects_in_cycles_hours/delete/{hours_id}',
-                            "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                            "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{hours_id}',
-                            "certifications": f'{api_base_url}/certifications/search/by_subject_hours/{hours_id}'
-                        }
-                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links)
-                        subjects_in_cycles_hours_with_hateoas.append(subject_in_cycle_hours_with_links)
+                    subjects_in_cycles_hours_with_hateoas = [to_hateoas(subject_in_cycle_hours) for subject_in_cycle_hours in subjects_in_cycle_hours]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_in_cycle/{subject_in_cycle_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/subjects_in_cycles_hours/create',
-                        "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}'
+                        "self": route_url(api_base_url, "get_subjects_in_cycle_hours_by_subject_in_cycle", query=page_query(page, limit, cursor), subject_in_cycle_id=subject_in_cycle_id),
+                        "next": route_url(api_base_url, "get_subjects_in_cycle_hours_by_subject_in_cycle", query=page_query(None, limit, subjects_in_cycle_hours.next_cursor), subject_in_cycle_id=subject_in_cycle_id) if subjects_in_cycle_hours.next_cursor else None,
+                        "create": route_url(api_base_url, "create_subject_in_cycle_hours"),
+                        "subject_in_cycle": route_url(api_base_url, "get_subject_in_cycle_by_id", subject_in_cycle_id=subject_in_cycle_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links, next_cursor=subjects_in_cycle_hours.next_cursor)
 
                 except HTTPException:
                     raise
@@ -156,31 +142,20 @@ class SubjectInCycleHoursService:
                     if subjects_in_cycle_hours is None:
                         subjects_in_cycle_hours = []
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     subjects_in_cycles_hours_with_hateoas = []
+                    subject_in_cycle_hours_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)
                     for subject_in_cycle_hours in subjects_in_cycle_hours:
                         subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
-                        hours_id = subject_in_cycle_hours.id
-                        subject_in_cycle_hours_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{hours_id}',
-                            "update": f'{api_base_url}/subjects_in_cycles_hours/update',
-                            "delete": f'{api_base_url}/subjects_in_cycles_hours/delete/{hours_id}',
-                            "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                            "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{hours_id}',
-                            "certifications": f'{api_base_url}/certifications/search/by_subject_hours/{hours_id}'
-                        }
-                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links)
+                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links(subject_in_cycle_hours))
                         subjects_in_cycles_hours_with_hateoas.append(subject_in_cycle_hours_with_links)
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_subject_and_semester/{subject_in_cycle_id}/{semester}',
-                        "create": f'{api_base_url}/subjects_in_cycles_hours/create',
-                        "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_id}',
-                        "subjects_in_cycles_by_semester": f'{api_base_url}/subjects_in_cycles_hours/search/by_semester/{semester}'
+                        "self": route_url(api_base_url, "get_subjects_in_cycle_hours_by_subject_and_semester", subject_in_cycle_id=subject_in_cycle_id, semester=semester),
+                        "create": route_url(api_base_url, "create_subject_in_cycle_hours"),
+                        "subject_in_cycle": route_url(api_base_url, "get_subject_in_cycle_by_id", subject_in_cycle_id=subject_in_cycle_id),
+                        "subjects_in_cycles_by_semester": route_url(api_base_url, "get_subjects_in_cycle_hours_by_semester", semester=semester)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
                     
@@ -193,39 +168,35 @@ class SubjectInCycleHoursService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_subjects_in_cycle_hours_by_semester(self, semester: int, page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
+    async def _get_subjects_in_cycle_hours_by_semester(self, semester: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 subject_in_cycle_hours_dal = SubjectsInCycleHoursDAL(session)
                 try:
-                    subjects_in_cycle_hours = await subject_in_cycle_hours_dal.get_subjects_in_cycle_hours_by_semester(semester, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    subjects_in_cycles_hours_with_hateoas = []
-                    for subject_in_cycle_hours in subjects_in_cycle_hours:
+                    subject_in_cycle_hours_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)
+
+                    def to_hateoas(subject_in_cycle_hours) -> ShowSubjectsInCycleHoursWithHATEOAS:
                         subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
-                        hours_id = subject_in_cycle_hours.id
-                        subject_in_cycle_hours_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{hours_id}',
-                            "update": f'{api_base_url}/subjects_in_cycles_hours/update',
-                            "delete": f'{api_base_url}/subjects_in_cycles_hours/delete/{hours_id}',
-                            "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                            "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_hours.subject_in_cycle_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{hours_id}',
-                            "certifications": f'{api_base_url}/certifications/search/by_subject_hours/{hours_id}'
-                        }
-                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links)
-                        subjects_in_cycles_hours_with_hateoas.append(subject_in_cycle_hours_with_links)
+                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links(subject_in_cycle_hours))
+                        return subject_in_cycle_hours_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleHoursDAL(stream_session).get_subjects_in_cycle_hours_by_semester(semester, page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycle_hours = await subject_in_cycle_hours_dal.get_subjects_in_cycle_hours_by_semester(semester, page, limit, cursor)
+
+                    subjects_in_cycles_hours_with_hateoas = [to_hateoas(subject_in_cycle_hours) for subject_in_cycle_hours in subjects_in_cycle_hours]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_semester/{semester}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/subjects_in_cycles_hours/create'
+                        "self": route_url(api_base_url, "get_subjects_in_cycle_hours_by_semester", query=page_query(page, limit, cursor), semester=semester),
+                        "next": route_url(api_base_url, "get_subjects_in_cycle_hours_by_semester", query=page_query(None, limit, subjects_in_cycle_hours.next_cursor), semester=semester) if subjects_in_cycle_hours.next_cursor else None,
+                        "create": route_url(api_base_url, "create_subject_in_cycle_hours")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links, next_cursor=subjects_in_cycle_hours.next_cursor)
 
                 except HTTPException:
                     raise
@@ -234,39 +205,35 @@ class SubjectInCycleHoursService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_subjects_in_cycle_hours(self, page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
+    async def _get_all_subjects_in_cycle_hours(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 subject_in_cycle_hours_dal = SubjectsInCycleHoursDAL(session)
                 try:
-                    subjects_in_cycle_hours = await subject_in_cycle_hours_dal.get_all_subjects_in_cycle_hours(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    subjects_in_cycles_hours_with_hateoas = []
-                    for subject_in_cycle_hours in subjects_in_cycle_hours:
+                    subject_in_cycle_hours_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)
+
+                    def to_hateoas(subject_in_cycle_hours) -> ShowSubjectsInCycleHoursWithHATEOAS:
                         subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
-                        hours_id = subject_in_cycle_hours.id
-                        subject_in_cycle_hours_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{hours_id}',
-                            "update": f'{api_base_url}/subjects_in_cycles_hours/update',
-                            "delete": f'{api_base_url}/subjects_in_cycles_hours/delete/{hours_id}',
-                            "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                            "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_hours.subject_in_cycle_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{hours_id}',
-                            "certifications": f'{api_base_url}/certifications/search/by_subject_hours/{hours_id}'
-                        }
-                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links)
-                        subjects_in_cycles_hours_with_hateoas.append(subject_in_cycle_hours_with_links)
+                        subject_in_cycle_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=subject_in_cycle_hours_links(subject_in_cycle_hours))
+                        return subject_in_cycle_hours_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleHoursDAL(stream_session).get_all_subjects_in_cycle_hours(page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycle_hours = await subject_in_cycle_hours_dal.get_all_subjects_in_cycle_hours(page, limit, cursor)
+
+                    subjects_in_cycles_hours_with_hateoas = [to_hateoas(subject_in_cycle_hours) for subject_in_cycle_hours in subjects_in_cycle_hours]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/subjects_in_cycles_hours/create'
+                        "self": route_url(api_base_url, "get_all_subjects_in_cycle_hours", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_subjects_in_cycle_hours", query=page_query(None, limit, subjects_in_cycle_hours.next_cursor)) if subjects_in_cycle_hours.next_cursor else None,
+                        "create": route_url(api_base_url, "create_subject_in_cycle_hours")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links, next_cursor=subjects_in_cycle_hours.next_cursor)
 
                 except HTTPException:
                     raise
@@ -275,33 +242,34 @@ class SubjectInCycleHoursService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
                 
                 
-    async def _get_subjects_hours_by_ids(self, ids: list[int], page: int, limit: int, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
+    async def _get_subjects_hours_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None, request: Request, db) -> ShowSubjectsInCycleHoursListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 subjects_in_cycle_hours_dal = SubjectsInCycleHoursDAL(session)
                 try:
-                    subjects_in_cycle_hours_list = await subjects_in_cycle_hours_dal.get_subjects_hours_by_ids(ids, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    subjects_in_cycles_hours_with_hateoas = []
-                    for subject_hours in subjects_in_cycle_hours_list:
+                    subject_hours_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)
+
+                    def to_hateoas(subject_hours) -> ShowSubjectsInCycleHoursWithHATEOAS:
                         subject_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_hours, from_attributes=True)
-                        subject_hours_id = subject_hours.id
-                        subject_hours_links = {
-                            "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{subject_hours_id}',
-                            "subjects_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_hours.subject_in_cycle_id}',
-                        }
-                        subject_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_hours_pydantic, links=subject_hours_links)
-                        subjects_in_cycles_hours_with_hateoas.append(subject_hours_with_links)
+                        subject_hours_with_links = ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_hours_pydantic, links=subject_hours_links(subject_hours))
+                        return subject_hours_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: SubjectsInCycleHoursDAL(stream_session).get_subjects_hours_by_ids(ids, page, limit, cursor, stream=True), to_hateoas)
+
+                    subjects_in_cycle_hours_list = await subjects_in_cycle_hours_dal.get_subjects_hours_by_ids(ids, page, limit, cursor)
+
+                    subjects_in_cycles_hours_with_hateoas = [to_hateoas(subject_hours) for subject_hours in subjects_in_cycle_hours_list]
 
                     collection_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_ids?page={page}&limit={limit}&ids={",".join(map(str, ids))}',
+                        "self": route_url(api_base_url, "get_subjects_hours_by_ids", query=f'{page_query(page, limit, cursor)}&ids={",".join(map(str, ids))}'),
+                        "next": route_url(api_base_url, "get_subjects_hours_by_ids", query=f'{page_query(None, limit, subjects_in_cycle_hours_list.next_cursor)}&ids={",".join(map(str, ids))}') if subjects_in_cycle_hours_list.next_cursor else None,
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links)
+                    return ShowSubjectsInCycleHoursListWithHATEOAS(subjects_in_cycle_hours=subjects_in_cycles_hours_with_hateoas, links=collection_links, next_cursor=subjects_in_cycle_hours_list.next_cursor)
 
                 except HTTPException:
                     raise
@@ -326,14 +294,12 @@ class SubjectInCycleHoursService:
 
                     subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                        "create": f'{api_base_url}/subjects_in_cycles_hours/create',
-                        "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_hours.subject_in_cycle_id}'
+                        "subjects_in_cycles_hours": route_url(api_base_url, "get_all_subjects_in_cycle_hours"),
+                        "create": route_url(api_base_url, "create_subject_in_cycle_hours"),
+                        "subject_in_cycle": route_url(api_base_url, "get_subject_in_cycle_by_id", subject_in_cycle_id=subject_in_cycle_hours.subject_in_cycle_id)
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -369,22 +335,11 @@ class SubjectInCycleHoursService:
                     if not subject_in_cycle_hours:
                         raise HTTPException(status_code=404, detail=f"Запись о часах для предмета с id {body.hours_id} не найдена")
 
-                    hours_id = subject_in_cycle_hours.id 
                     subject_in_cycle_hours_pydantic = ShowSubjectsInCycleHours.model_validate(subject_in_cycle_hours, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{hours_id}',
-                        "update": f'{api_base_url}/subjects_in_cycles_hours/update',
-                        "delete": f'{api_base_url}/subjects_in_cycles_hours/delete/{hours_id}',
-                        "subjects_in_cycles_hours": f'{api_base_url}/subjects_in_cycles_hours',
-                        "subject_in_cycle": f'{api_base_url}/subjects_in_cycles/search/by_id/{subject_in_cycle_hours.subject_in_cycle_id}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{hours_id}',
-                        "certifications": f'{api_base_url}/certifications/search/by_subject_hours/{hours_id}'
-                    }
+                    hateoas_links = SUBJECT_IN_CYCLE_HOURS_LINKS.bind(api_base_url)(subject_in_cycle_hours)
 
                     return ShowSubjectsInCycleHoursWithHATEOAS(subject_in_cycle_hours=subject_in_cycle_hours_pydantic, links=hateoas_links)
 
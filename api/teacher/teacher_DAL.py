@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Teacher
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class TeacherDAL:
@@ -37,12 +38,9 @@ class TeacherDAL:
         return teacher
 
     @log_exceptions
-    async def get_all_teachers(self, page: int, limit: int) -> list[Teacher]:
-        query = select(Teacher).order_by(Teacher.surname.asc())
-        if page > 0:
-            query = query.offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        return list(result.scalars().all())
+    async def get_all_teachers(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Teacher)
+        return await fetch_page(self.db_session, query, (Teacher.surname, Teacher.id), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_teacher_by_id(self, id: int) -> Teacher | None:
@@ -76,21 +74,11 @@ class TeacherDAL:
         return res.scalar_one_or_none()
 
     @log_exceptions
-    async def get_all_teachers_by_category(self, category: str, page: int, limit: int) -> list[Teacher]:
-        query = select(Teacher).where(Teacher.teacher_category == category).order_by(Teacher.id.asc())
-        if page > 0:
-            query = query.offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        return list(result.scalars().all())
-    
+    async def get_all_teachers_by_category(self, category: str, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(Teacher).where(Teacher.teacher_category == category)
+        return await fetch_page(self.db_session, query, (Teacher.id,), page, limit, cursor, stream)
+
     @log_exceptions
-    async def get_teachers_by_ids(self, ids: list[int], page: int, limit: int) -> list[Teacher]:
+    async def get_teachers_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
         query = select(Teacher).where(Teacher.id.in_(ids))
-        if page > 0:
-            offset_value = (page - 1) * limit
-            query = query.offset(offset_value).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers = list(result.scalars().all())
-        return teachers if teachers is not None else []
-    
-    
+        return await fetch_page(self.db_session, query, (Teacher.id,), page, limit, cursor, stream)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Query, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
+from datetime import date
 from api.teacher.teacher_pydantic import *
 from api.models import QueryParams
 from db.session import get_db
@@ -25,7 +26,17 @@ async def get_teacher_by_id(teacher_id: int, request: Request, db: AsyncSession
 
 @teacher_router.get("/search/by_ids", response_model=ShowTeacherListWithHATEOAS, responses={404: {"description": "Преподаватели не найдены"}})
 async def get_teachers_by_ids( query_param: Annotated[QueryParams, Depends()], request: Request, ids: list[int] = Query(...), db: AsyncSession = Depends(get_db)):
-    return await teacher_service._get_teachers_by_ids(ids, query_param.page, query_param.limit, request, db)
+    return await teacher_service._get_teachers_by_ids(ids, query_param.page, query_param.limit, query_param.cursor, request, db)
+
+
+@teacher_router.get("/free", response_model=ShowFreeTeacherListWithHATEOAS)
+async def get_free_teachers(request: Request,
+                            session_date: date = Query(..., alias="date"),
+                            session_number: int = Query(..., ge=1),
+                            subject_id: int | None = Query(None, description="Сначала преподаватели, которые ведут этот предмет"),
+                            building_number: int | None = Query(None, alias="building", description="Сначала преподаватели, работающие в здании"),
+                            db: AsyncSession = Depends(get_db)):
+    return await teacher_service._get_free_teachers(session_date, session_number, subject_id, building_number, request, db)
 
 
 @teacher_router.get("/search", response_model=ShowTeacherListWithHATEOAS, responses={404: {"description": "Преподаватели не найдены"}})
@@ -35,7 +46,7 @@ async def get_all_teachers(
     db: AsyncSession = Depends(get_db)
 ):
     # current_user: User = Depends(require_role(["admin", "string"]))
-    return await teacher_service._get_all_teachers(query_param.page, query_param.limit, request, db)
+    return await teacher_service._get_all_teachers(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @teacher_router.delete("/delete/{teacher_id}", response_model=ShowTeacherWithHATEOAS, responses={404: {"description": "Преподаватель не найден"}})
@@ -41,3 +41,16 @@ class ShowTeacherWithHATEOAS(TunedModel):
 class ShowTeacherListWithHATEOAS(TunedModel):
     teachers: List[ShowTeacherWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
+
+
+class ShowFreeTeacherWithHATEOAS(TunedModel):
+    teacher: ShowTeacher
+    teaches_subject: bool | None = None
+    works_in_building: bool | None = None
+    links: dict[str, str] = {}
+
+
+class ShowFreeTeacherListWithHATEOAS(TunedModel):
+    teachers: List[ShowFreeTeacherWithHATEOAS]
+    links: dict[str, str] = {}
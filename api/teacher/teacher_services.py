@@ -2,13 +2,30 @@ from api.teacher.teacher_pydantic import *
 from api.services_helpers import ensure_category_exists, ensure_teacher_email_unique, ensure_teacher_exists, ensure_teacher_phone_unique
 from api.teacher.teacher_DAL import TeacherDAL
 from api.teacher_category.teacher_category_DAL import TeacherCategoryDAL
+from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
+from api.teacher_building.teacher_building_DAL import TeacherBuildingDAL
+from api.session.session_DAL import SessionDAL
+from api.session.occupancy_index import TEACHER
+from api.session.occupancy_loader import get_slots_occupancy
 from fastapi import HTTPException, status, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
+from datetime import date
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+TEACHER_LINKS = LinkSet(
+    self=Link("get_teacher_by_id", teacher_id="id"),
+    update=Link("update_teacher"),
+    delete=Link("delete_teacher", teacher_id="id"),
+    teachers=Link("get_all_teachers"),
+    category=Link("get_category", when=("teacher_category",))
+)
+
 
 class TeacherService:
     async def _create_new_teacher(self, body: CreateTeacher, request: Request, db) -> ShowTeacherWithHATEOAS:
@@ -35,18 +52,9 @@ class TeacherService:
                     )
                     new_teacher_pydantic = ShowTeacher.model_validate(new_teacher_orm, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers/search/by_id/{new_teacher_orm.id}',
-                        "update": f'{api_base_url}/teachers/update',
-                        "delete": f'{api_base_url}/teachers/delete/{new_teacher_orm.id}',
-                        "teachers": f'{api_base_url}/teachers',
-                        "category": f'{api_base_url}/categories/search/{new_teacher_orm.teacher_category}' if new_teacher_orm.teacher_category else None
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = TEACHER_LINKS.bind(api_base_url)(new_teacher_orm)
 
                     return ShowTeacherWithHATEOAS(teacher=new_teacher_pydantic, links=hateoas_links)
 
@@ -70,18 +78,9 @@ class TeacherService:
 
                     teacher_pydantic = ShowTeacher.model_validate(teacher_orm, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers/search/by_id/{teacher_id}',
-                        "update": f'{api_base_url}/teachers/update',
-                        "delete": f'{api_base_url}/teachers/delete/{teacher_id}',
-                        "teachers": f'{api_base_url}/teachers',
-                        "category": f'{api_base_url}/categories/search/{teacher_orm.teacher_category}' if teacher_orm.teacher_category else None
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = TEACHER_LINKS.bind(api_base_url)(teacher_orm)
 
                     return ShowTeacherWithHATEOAS(teacher=teacher_pydantic, links=hateoas_links)
 
@@ -92,74 +91,133 @@ class TeacherService:
                     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Внутренняя ошибка сервера при получении преподавателя.")
 
 
-    async def _get_all_teachers(self, page: int, limit: int, request: Request, db) -> ShowTeacherListWithHATEOAS:
+    async def _get_all_teachers(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowTeacherListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 teacher_dal = TeacherDAL(session)
                 try:
-                    teachers_orm_list = await teacher_dal.get_all_teachers(page, limit)
-                    if teachers_orm_list is None:
-                        teachers_orm_list = []
+                    api_base_url = request_base_url(request)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    teacher_links = TEACHER_LINKS.bind(api_base_url)
 
-                    teachers_with_hateoas = []
-                    for teacher_orm in teachers_orm_list:
+                    def to_hateoas(teacher_orm) -> ShowTeacherWithHATEOAS:
                         teacher_pydantic = ShowTeacher.model_validate(teacher_orm, from_attributes=True)
-                        teacher_links = {
-                            "self": f'{api_base_url}/teachers/search/by_id/{teacher_orm.id}',
-                            "update": f'{api_base_url}/teachers/update',
-                            "delete": f'{api_base_url}/teachers/delete/{teacher_orm.id}',
-                            "teachers": f'{api_base_url}/teachers',
-                            "category": f'{api_base_url}/categories/search/{teacher_orm.teacher_category}' if teacher_orm.teacher_category else None
-                        }
-                        teacher_links = {k: v for k, v in teacher_links.items() if v is not None}
-                        teacher_with_links = ShowTeacherWithHATEOAS(teacher=teacher_pydantic, links=teacher_links)
-                        teachers_with_hateoas.append(teacher_with_links)
+                        teacher_with_links = ShowTeacherWithHATEOAS(teacher=teacher_pydantic, links=teacher_links(teacher_orm))
+                        return teacher_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherDAL(stream_session).get_all_teachers(page, limit, cursor, stream=True), to_hateoas)
+
+                    teachers_orm_list = await teacher_dal.get_all_teachers(page, limit, cursor)
+                    if teachers_orm_list is None:
+                        teachers_orm_list = []
+
+                    teachers_with_hateoas = [to_hateoas(teacher_orm) for teacher_orm in teachers_orm_list]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers/create',
+                        "self": route_url(api_base_url, "get_all_teachers", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_teachers", query=page_query(None, limit, teachers_orm_list.next_cursor)) if teachers_orm_list.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher"),
                     }
+                    collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherListWithHATEOAS(teachers=teachers_with_hateoas, links=collection_links)
+                    return ShowTeacherListWithHATEOAS(teachers=teachers_with_hateoas, links=collection_links, next_cursor=teachers_orm_list.next_cursor)
 
+                except HTTPException:
+                    raise
                 except Exception as e:
                     logger.error(f"Неожиданная ошибка при получении списка преподавателей (page={page}, limit={limit}): {e}", exc_info=True)
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера при получении списка преподавателей.")
                 
                 
-    async def _get_teachers_by_ids(self, ids: list[int], page: int, limit: int, request: Request, db) -> ShowTeacherListWithHATEOAS:
+    async def _get_free_teachers(self, session_date: date, session_number: int, subject_id: int | None,
+                                 building_number: int | None, request: Request, db) -> ShowFreeTeacherListWithHATEOAS:
+        """
+        Teachers without a session in the slot. First go teachers who already teach the subject,
+        then teachers who work in the building. Busy teachers are taken from the occupancy index
+        """
         async with db as session:
             async with session.begin():
                 teacher_dal = TeacherDAL(session)
+                session_dal = SessionDAL(session)
                 try:
-                    teachers_list = await teacher_dal.get_teachers_by_ids(ids, page, limit)
+                    teachers_orm_list = await teacher_dal.get_all_teachers(0, 0)
+                    occupancy = await get_slots_occupancy(session_dal, [(session_date, session_number)])
+
+                    subject_teacher_ids = None
+                    if subject_id is not None:
+                        subject_teacher_ids = await TeacherInPlanDAL(session).get_teacher_ids_by_subject(subject_id)
+                    building_teacher_ids = None
+                    if building_number is not None:
+                        teachers_buildings = await TeacherBuildingDAL(session).get_teachers_buildings_by_building(building_number, 0, 0)
+                        building_teacher_ids = {teacher_building.teacher_id for teacher_building in teachers_buildings}
+
+                    free_teachers = []
+                    for teacher_orm in teachers_orm_list:
+                        if not occupancy.is_free(TEACHER, teacher_orm.id, session_date, session_number):
+                            continue
+                        teaches_subject = teacher_orm.id in subject_teacher_ids if subject_teacher_ids is not None else None
+                        works_in_building = teacher_orm.id in building_teacher_ids if building_teacher_ids is not None else None
+                        free_teachers.append((teacher_orm, teaches_subject, works_in_building))
+                    free_teachers.sort(key=lambda item: (not item[1], not item[2], item[0].surname, item[0].name))
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
+                    teacher_links = TEACHER_LINKS.bind(api_base_url)
                     teachers_with_hateoas = []
-                    for teacher in teachers_list:
+                    for teacher_orm, teaches_subject, works_in_building in free_teachers:
+                        teacher_pydantic = ShowTeacher.model_validate(teacher_orm, from_attributes=True)
+                        # Sessions of the teacher on the day of the slot
+                        sessions_link = route_url(api_base_url, "get_sessions_by_teacher_and_date", teacher_id=teacher_orm.id,
+                                                  start_period_date=session_date, end_period_date=session_date)
+                        teachers_with_hateoas.append(ShowFreeTeacherWithHATEOAS(teacher=teacher_pydantic,
+                                                                                teaches_subject=teaches_subject,
+                                                                                works_in_building=works_in_building,
+                                                                                links={**teacher_links(teacher_orm), "sessions": sessions_link}))
+
+                    collection_links = {
+                        "self": route_url(api_base_url, "get_free_teachers", query=f"date={session_date}&session_number={session_number}"),
+                        "teachers": route_url(api_base_url, "get_all_teachers"),
+                        "sessions": route_url(api_base_url, "get_sessions_by_date", session_date=session_date)
+                    }
+
+                    return ShowFreeTeacherListWithHATEOAS(teachers=teachers_with_hateoas, links=collection_links)
+
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    logger.error(f"Неожиданная ошибка при поиске свободных преподавателей: {e}", exc_info=True)
+                    raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера при поиске свободных преподавателей.")
+
+
+    async def _get_teachers_by_ids(self, ids: list[int], page: int, limit: int, cursor: str | None, request: Request, db) -> ShowTeacherListWithHATEOAS:
+        async with db as session:
+            async with session.begin():
+                teacher_dal = TeacherDAL(session)
+                try:
+                    api_base_url = request_base_url(request)
+
+                    teacher_links = TEACHER_LINKS.bind(api_base_url)
+
+                    def to_hateoas(teacher) -> ShowTeacherWithHATEOAS:
                         teacher_pydantic = ShowTeacher.model_validate(teacher, from_attributes=True)
-                        teacher_id = teacher.id
-                        teacher_links = {
-                            "self": f'{api_base_url}/teachers/search/by_id/{teacher_id}',
-                            "category": f'{api_base_url}/categories/search/{teacher.teacher_category}' if teacher.teacher_category else None,
-                        }
-                        teacher_links = {k: v for k, v in teacher_links.items() if v is not None}
-                        teacher_with_links = ShowTeacherWithHATEOAS(teacher=teacher_pydantic, links=teacher_links)
-                        teachers_with_hateoas.append(teacher_with_links)
+                        teacher_with_links = ShowTeacherWithHATEOAS(teacher=teacher_pydantic, links=teacher_links(teacher))
+                        return teacher_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherDAL(stream_session).get_teachers_by_ids(ids, page, limit, cursor, stream=True), to_hateoas)
+
+                    teachers_list = await teacher_dal.get_teachers_by_ids(ids, page, limit, cursor)
+
+                    teachers_with_hateoas = [to_hateoas(teacher) for teacher in teachers_list]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers/search/by_ids?page={page}&limit={limit}&ids={",".join(map(str, ids))}',
+                        "self": route_url(api_base_url, "get_teachers_by_ids", query=f'{page_query(page, limit, cursor)}&ids={",".join(map(str, ids))}'),
+                        "next": route_url(api_base_url, "get_teachers_by_ids", query=f'{page_query(None, limit, teachers_list.next_cursor)}&ids={",".join(map(str, ids))}') if teachers_list.next_cursor else None,
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherListWithHATEOAS(teachers=teachers_with_hateoas, links=collection_links)
+                    return ShowTeacherListWithHATEOAS(teachers=teachers_with_hateoas, links=collection_links, next_cursor=teachers_list.next_cursor)
 
                 except HTTPException:
                     raise
@@ -179,12 +237,10 @@ class TeacherService:
 
                     deleted_teacher_pydantic = ShowTeacher.model_validate(deleted_teacher_orm, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "teachers": f'{api_base_url}/teachers',
+                        "teachers": route_url(api_base_url, "get_all_teachers"),
                     }
 
                     return ShowTeacherWithHATEOAS(teacher=deleted_teacher_pydantic, links=hateoas_links)
@@ -227,17 +283,9 @@ class TeacherService:
 
                     updated_teacher_pydantic = ShowTeacher.model_validate(updated_teacher_orm, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers/search/by_id/{updated_teacher_orm.id}',
-                        "delete": f'{api_base_url}/teachers/delete/{updated_teacher_orm.id}',
-                        "teachers": f'{api_base_url}/teachers',
-                        "category": f'{api_base_url}/categories/search/{updated_teacher_orm.teacher_category}' if updated_teacher_orm.teacher_category else None
-                    }
-                    hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
+                    hateoas_links = TEACHER_LINKS.bind(api_base_url)(updated_teacher_orm)
 
                     return ShowTeacherWithHATEOAS(teacher=updated_teacher_pydantic, links=hateoas_links)
 
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import TeacherBuilding
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class TeacherBuildingDAL:
@@ -28,14 +29,9 @@ class TeacherBuildingDAL:
         return deleted_teacher_building
 
     @log_exceptions
-    async def get_all_teachers_buildings(self, page: int, limit: int) -> list[TeacherBuilding]:
-        if page == 0:
-            query = select(TeacherBuilding).order_by(TeacherBuilding.id.asc())
-        else:
-            query = select(TeacherBuilding).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_buildings = list(result.scalars().all())
-        return teachers_buildings
+    async def get_all_teachers_buildings(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(TeacherBuilding)
+        return await fetch_page(self.db_session, query, (TeacherBuilding.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_teacher_building_by_id(self, id: int) -> TeacherBuilding | None:
@@ -45,24 +41,14 @@ class TeacherBuildingDAL:
         return teacher_building_row
 
     @log_exceptions
-    async def get_teachers_buildings_by_teacher(self, teacher_id: int, page: int, limit: int) -> list[TeacherBuilding]:
-        if page == 0:
-            query = select(TeacherBuilding).where(TeacherBuilding.teacher_id == teacher_id).order_by(TeacherBuilding.id.asc())
-        else:
-            query = select(TeacherBuilding).where(TeacherBuilding.teacher_id == teacher_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_buildings = list(result.scalars().all())
-        return teachers_buildings if teachers_buildings is not None else []
+    async def get_teachers_buildings_by_teacher(self, teacher_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(TeacherBuilding).where(TeacherBuilding.teacher_id == teacher_id)
+        return await fetch_page(self.db_session, query, (TeacherBuilding.id,), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_teachers_buildings_by_building(self, building_number: int, page: int, limit: int) -> list[TeacherBuilding]:
-        if page == 0:
-            query = select(TeacherBuilding).where(TeacherBuilding.building_number == building_number).order_by(TeacherBuilding.id.asc())
-        else:
-            query = select(TeacherBuilding).where(TeacherBuilding.building_number == building_number).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_buildings = list(result.scalars().all())
-        return teachers_buildings if teachers_buildings is not None else []
+    async def get_teachers_buildings_by_building(self, building_number: int, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(TeacherBuilding).where(TeacherBuilding.building_number == building_number)
+        return await fetch_page(self.db_session, query, (TeacherBuilding.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_teacher_building(self, target_id: int, **kwargs) -> TeacherBuilding | None:
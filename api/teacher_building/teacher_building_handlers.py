@@ -23,17 +23,17 @@ async def get_teacher_building_by_id(teacher_building_id: int, request: Request,
 
 @teacher_building_router.get("/search/by_teacher/{teacher_id}", response_model=ShowTeacherBuildingListWithHATEOAS, responses={404: {"description": "Связи преподавателя и зданий не найдены"}})
 async def get_teachers_buildings_by_teacher(teacher_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_building_service._get_teachers_buildings_by_teacher(teacher_id, query_param.page, query_param.limit, request, db)
+    return await teacher_building_service._get_teachers_buildings_by_teacher(teacher_id, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @teacher_building_router.get("/search/by_building/{building_number}", response_model=ShowTeacherBuildingListWithHATEOAS, responses={404: {"description": "Связи преподавателей и здания не найдены"}})
 async def get_teachers_buildings_by_building(building_number: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_building_service._get_teachers_buildings_by_building(building_number, query_param.page, query_param.limit, request, db)
+    return await teacher_building_service._get_teachers_buildings_by_building(building_number, query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @teacher_building_router.get("/search", response_model=ShowTeacherBuildingListWithHATEOAS)
 async def get_all_teachers_buildings(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_building_service._get_all_teachers_buildings(query_param.page, query_param.limit, request, db)
+    return await teacher_building_service._get_all_teachers_buildings(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @teacher_building_router.delete("/delete/{teacher_building_id}", response_model=ShowTeacherBuildingWithHATEOAS, responses={404: {"description": "Связь преподавателя и здания не найдена"}})
@@ -28,4 +28,5 @@ class ShowTeacherBuildingWithHATEOAS(TunedModel):
 class ShowTeacherBuildingListWithHATEOAS(TunedModel):
     teacher_buildings: List[ShowTeacherBuildingWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
     
\ No newline at end of file
@@ -1,15 +1,27 @@
 from api.teacher_building.teacher_building_pydantic import *
-from api.services_helpers import  ensure_building_exists, ensure_teacher_building_exists, ensure_teacher_exists
+from api.services_helpers import  ensure_building_exists, ensure_teacher_building_exists, ensure_teacher_exists, load_teacher_building
 from api.teacher_building.teacher_building_DAL import TeacherBuildingDAL
 from api.teacher.teacher_DAL import TeacherDAL
 from api.building.building_DAL import BuildingDAL 
 from fastapi import HTTPException, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+TEACHER_BUILDING_LINKS = LinkSet(
+    self=Link("get_teacher_building_by_id", teacher_building_id="id"),
+    update=Link("update_teacher_building"),
+    delete=Link("delete_teacher_building", teacher_building_id="id"),
+    teachers_buildings=Link("get_all_teachers_buildings"),
+    teacher=Link("get_teacher_by_id"),
+    building=Link("get_building_by_number")
+)
+
 
 class TeacherBuildingService:
     async def _create_new_teacher_building(self, body: CreateTeacherBuilding, request: Request, db) -> ShowTeacherBuildingWithHATEOAS:
@@ -28,21 +40,11 @@ class TeacherBuildingService:
                         teacher_id=body.teacher_id,
                         building_number=body.building_number
                     )
-                    teacher_building_id = teacher_building.id
                     teacher_building_pydantic = ShowTeacherBuilding.model_validate(teacher_building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers_buildings/search/by_id/{teacher_building_id}',
-                        "update": f'{api_base_url}/teachers_buildings/update',
-                        "delete": f'{api_base_url}/teachers_buildings/delete/{teacher_building_id}',
-                        "teachers_buildings": f'{api_base_url}/teachers_buildings',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{body.teacher_id}',
-                        "building": f'{api_base_url}/buildings/search/by_number/{body.building_number}'
-                    }
+                    hateoas_links = TEACHER_BUILDING_LINKS.bind(api_base_url)(teacher_building)
 
                     return ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=hateoas_links)
 
@@ -60,24 +62,15 @@ class TeacherBuildingService:
             async with session.begin():
                 teacher_building_dal = TeacherBuildingDAL(session)
                 try:
-                    if not await ensure_teacher_building_exists(teacher_building_dal, teacher_building_id):
+                    teacher_building = await load_teacher_building(teacher_building_dal, teacher_building_id)
+                    if teacher_building is None:
                         raise HTTPException(status_code=404, detail=f"Связь преподавателя и здания с id {teacher_building_id} не найдена")
 
-                    teacher_building = await teacher_building_dal.get_teacher_building_by_id(teacher_building_id)
                     teacher_building_pydantic = ShowTeacherBuilding.model_validate(teacher_building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers_buildings/search/by_id/{teacher_building_id}',
-                        "update": f'{api_base_url}/teachers_buildings/update',
-                        "delete": f'{api_base_url}/teachers_buildings/delete/{teacher_building_id}',
-                        "teachers_buildings": f'{api_base_url}/teachers_buildings',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_building.teacher_id}',
-                        "building": f'{api_base_url}/buildings/search/by_number/{teacher_building.building_number}'
-                    }
+                    hateoas_links = TEACHER_BUILDING_LINKS.bind(api_base_url)(teacher_building)
 
                     return ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=hateoas_links)
 
@@ -88,7 +81,7 @@ class TeacherBuildingService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_teachers_buildings_by_teacher(self, teacher_id: int, page: int, limit: int, request: Request, db) -> ShowTeacherBuildingListWithHATEOAS:
+    async def _get_teachers_buildings_by_teacher(self, teacher_id: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowTeacherBuildingListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 teacher_dal = TeacherDAL(session)
@@ -97,34 +90,31 @@ class TeacherBuildingService:
                     if not await ensure_teacher_exists(teacher_dal, teacher_id):
                         raise HTTPException(status_code=404, detail=f"Преподаватель с id {teacher_id} не найден")
 
-                    teacher_buildings = await teacher_building_dal.get_teachers_buildings_by_teacher(teacher_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    teacher_building_links = TEACHER_BUILDING_LINKS.bind(api_base_url)
 
-                    teacher_buildings_with_hateoas = []
-                    for teacher_building in teacher_buildings:
+                    def to_hateoas(teacher_building) -> ShowTeacherBuildingWithHATEOAS:
                         teacher_building_pydantic = ShowTeacherBuilding.model_validate(teacher_building, from_attributes=True)
-                        teacher_building_id = teacher_building.id
-                        teacher_building_links = {
-                            "self": f'{api_base_url}/teachers_buildings/search/by_id/{teacher_building_id}',
-                            "update": f'{api_base_url}/teachers_buildings/update',
-                            "delete": f'{api_base_url}/teachers_buildings/delete/{teacher_building_id}',
-                            "teachers_buildings": f'{api_base_url}/teachers_buildings',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_id}',
-                            "building": f'{api_base_url}/buildings/search/by_number/{teacher_building.building_number}'
-                        }
-                        teacher_building_with_links = ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=teacher_building_links)
-                        teacher_buildings_with_hateoas.append(teacher_building_with_links)
+                        teacher_building_with_links = ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=teacher_building_links(teacher_building))
+                        return teacher_building_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherBuildingDAL(stream_session).get_teachers_buildings_by_teacher(teacher_id, page, limit, cursor, stream=True), to_hateoas)
+
+                    teacher_buildings = await teacher_building_dal.get_teachers_buildings_by_teacher(teacher_id, page, limit, cursor)
+
+                    teacher_buildings_with_hateoas = [to_hateoas(teacher_building) for teacher_building in teacher_buildings]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_buildings/search/by_teacher/{teacher_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_buildings/create',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_id}'
+                        "self": route_url(api_base_url, "get_teachers_buildings_by_teacher", query=page_query(page, limit, cursor), teacher_id=teacher_id),
+                        "next": route_url(api_base_url, "get_teachers_buildings_by_teacher", query=page_query(None, limit, teacher_buildings.next_cursor), teacher_id=teacher_id) if teacher_buildings.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_building"),
+                        "teacher": route_url(api_base_url, "get_teacher_by_id", teacher_id=teacher_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherBuildingListWithHATEOAS(teacher_buildings=teacher_buildings_with_hateoas, links=collection_links)
+                    return ShowTeacherBuildingListWithHATEOAS(teacher_buildings=teacher_buildings_with_hateoas, links=collection_links, next_cursor=teacher_buildings.next_cursor)
 
                 except HTTPException:
                     raise
@@ -133,7 +123,7 @@ class TeacherBuildingService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_teachers_buildings_by_building(self, building_number: int, page: int, limit: int, request: Request, db) -> ShowTeacherBuildingListWithHATEOAS:
+    async def _get_teachers_buildings_by_building(self, building_number: int, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowTeacherBuildingListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 building_dal = BuildingDAL(session)
@@ -142,34 +132,31 @@ class TeacherBuildingService:
                     if not await ensure_building_exists(building_dal, building_number):
                         raise HTTPException(status_code=404, detail=f"Здание с номером {building_number} не найдено")
 
-                    teacher_buildings = await teacher_building_dal.get_teachers_buildings_by_building(building_number, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    teacher_buildings_with_hateoas = []
-                    for teacher_building in teacher_buildings:
+                    teacher_building_links = TEACHER_BUILDING_LINKS.bind(api_base_url)
+
+                    def to_hateoas(teacher_building) -> ShowTeacherBuildingWithHATEOAS:
                         teacher_building_pydantic = ShowTeacherBuilding.model_validate(teacher_building, from_attributes=True)
-                        teacher_building_id = teacher_building.id
-                        teacher_building_links = {
-                            "self": f'{api_base_url}/teachers_buildings/search/by_id/{teacher_building_id}',
-                            "update": f'{api_base_url}/teachers_buildings/update',
-                            "delete": f'{api_base_url}/teachers_buildings/delete/{teacher_building_id}',
-                            "teachers_buildings": f'{api_base_url}/teachers_buildings',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_building.teacher_id}',
-                            "building": f'{api_base_url}/buildings/search/by_number/{building_number}'
-                        }
-                        teacher_building_with_links = ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=teacher_building_links)
-                        teacher_buildings_with_hateoas.append(teacher_building_with_links)
+                        teacher_building_with_links = ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=teacher_building_links(teacher_building))
+                        return teacher_building_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherBuildingDAL(stream_session).get_teachers_buildings_by_building(building_number, page, limit, cursor, stream=True), to_hateoas)
+
+                    teacher_buildings = await teacher_building_dal.get_teachers_buildings_by_building(building_number, page, limit, cursor)
+
+                    teacher_buildings_with_hateoas = [to_hateoas(teacher_building) for teacher_building in teacher_buildings]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_buildings/search/by_building/{building_number}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_buildings/create',
-                        "building": f'{api_base_url}/buildings/search/by_number/{building_number}'
+                        "self": route_url(api_base_url, "get_teachers_buildings_by_building", query=page_query(page, limit, cursor), building_number=building_number),
+                        "next": route_url(api_base_url, "get_teachers_buildings_by_building", query=page_query(None, limit, teacher_buildings.next_cursor), building_number=building_number) if teacher_buildings.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_building"),
+                        "building": route_url(api_base_url, "get_building_by_number", building_number=building_number)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherBuildingListWithHATEOAS(teacher_buildings=teacher_buildings_with_hateoas, links=collection_links)
+                    return ShowTeacherBuildingListWithHATEOAS(teacher_buildings=teacher_buildings_with_hateoas, links=collection_links, next_cursor=teacher_buildings.next_cursor)
 
                 except HTTPException:
                     raise
@@ -178,38 +165,35 @@ class TeacherBuildingService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_teachers_buildings(self, page: int, limit: int, request: Request, db) -> ShowTeacherBuildingListWithHATEOAS:
+    async def _get_all_teachers_buildings(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowTeacherBuildingListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 teacher_building_dal = TeacherBuildingDAL(session)
                 try:
-                    teacher_buildings = await teacher_building_dal.get_all_teachers_buildings(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    teacher_building_links = TEACHER_BUILDING_LINKS.bind(api_base_url)
 
-                    teacher_buildings_with_hateoas = []
-                    for teacher_building in teacher_buildings:
+                    def to_hateoas(teacher_building) -> ShowTeacherBuildingWithHATEOAS:
                         teacher_building_pydantic = ShowTeacherBuilding.model_validate(teacher_building, from_attributes=True)
-                        teacher_building_id = teacher_building.id
-                        teacher_building_links = {
-                            "self": f'{api_base_url}/teachers_buildings/search/by_id/{teacher_building_id}',
-                            "update": f'{api_base_url}/teachers_buildings/update',
-                            "delete": f'{api_base_url}/teachers_buildings/delete/{teacher_building_id}',
-                            "teachers_buildings": f'{api_base_url}/teachers_buildings',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_building.teacher_id}',
-                            "building": f'{api_base_url}/buildings/search/by_number/{teacher_building.building_number}'
-                        }
-                        teacher_building_with_links = ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=teacher_building_links)
-                        teacher_buildings_with_hateoas.append(teacher_building_with_links)
+                        teacher_building_with_links = ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=teacher_building_links(teacher_building))
+                        return teacher_building_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherBuildingDAL(stream_session).get_all_teachers_buildings(page, limit, cursor, stream=True), to_hateoas)
+
+                    teacher_buildings = await teacher_building_dal.get_all_teachers_buildings(page, limit, cursor)
+
+                    teacher_buildings_with_hateoas = [to_hateoas(teacher_building) for teacher_building in teacher_buildings]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_buildings/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_buildings/create'
+                        "self": route_url(api_base_url, "get_all_teachers_buildings", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_teachers_buildings", query=page_query(None, limit, teacher_buildings.next_cursor)) if teacher_buildings.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_building")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherBuildingListWithHATEOAS(teacher_buildings=teacher_buildings_with_hateoas, links=collection_links)
+                    return ShowTeacherBuildingListWithHATEOAS(teacher_buildings=teacher_buildings_with_hateoas, links=collection_links, next_cursor=teacher_buildings.next_cursor)
 
                 except HTTPException:
                     raise
@@ -234,13 +218,11 @@ class TeacherBuildingService:
 
                     teacher_building_pydantic = ShowTeacherBuilding.model_validate(teacher_building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "teachers_buildings": f'{api_base_url}/teachers_buildings',
-                        "create": f'{api_base_url}/teachers_buildings/create'
+                        "teachers_buildings": route_url(api_base_url, "get_all_teachers_buildings"),
+                        "create": route_url(api_base_url, "create_teacher_building")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -279,21 +261,11 @@ class TeacherBuildingService:
                     if not teacher_building:
                         raise HTTPException(status_code=404, detail=f"Связь преподавателя и здания с id {body.teacher_building_id} не найдена")
 
-                    teacher_building_id = teacher_building.id
                     teacher_building_pydantic = ShowTeacherBuilding.model_validate(teacher_building, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers_buildings/search/by_id/{teacher_building_id}',
-                        "update": f'{api_base_url}/teachers_buildings/update',
-                        "delete": f'{api_base_url}/teachers_buildings/delete/{teacher_building_id}',
-                        "teachers_buildings": f'{api_base_url}/teachers_buildings',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_building.teacher_id}',
-                        "building": f'{api_base_url}/buildings/search/by_number/{teacher_building.building_number}'
-                    }
+                    hateoas_links = TEACHER_BUILDING_LINKS.bind(api_base_url)(teacher_building)
 
                     return ShowTeacherBuildingWithHATEOAS(teacher_building=teacher_building_pydantic, links=hateoas_links)
 
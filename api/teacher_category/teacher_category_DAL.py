@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import TeacherCategory
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
 
 
 class TeacherCategoryDAL:
@@ -31,14 +32,9 @@ class TeacherCategoryDAL:
         return deleted_category
 
     @log_exceptions
-    async def get_all_teacher_categories(self, page: int, limit: int) -> list[TeacherCategory]:
-        if page == 0:
-            query = select(TeacherCategory).order_by(TeacherCategory.teacher_category.asc())
-        else:
-            query = select(TeacherCategory).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        categories = list(result.scalars().all())
-        return categories
+    async def get_all_teacher_categories(self, page: int, limit: int, cursor: str | None = None, stream: bool = False) -> Page | RowStream:
+        query = select(TeacherCategory)
+        return await fetch_page(self.db_session, query, (TeacherCategory.teacher_category,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_teacher_category(self, teacher_category: str) -> TeacherCategory | None:
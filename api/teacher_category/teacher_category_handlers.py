@@ -27,7 +27,7 @@ async def get_category(teacher_category: str, request: Request, db: AsyncSession
                      responses={404: {"description": "Категории преподавателей не найдены"}})
 async def get_all_categories(query_param: Annotated[QueryParams, Depends()], request: Request,
                              db: AsyncSession = Depends(get_db)):
-    return await teacher_category_service._get_all_categories(query_param.page, query_param.limit, request, db)
+    return await teacher_category_service._get_all_categories(query_param.page, query_param.limit, query_param.cursor, request, db)
 
 
 @category_router.delete("/delete/{teacher_category}", response_model=ShowTeacherCategoryWithHATEOAS,
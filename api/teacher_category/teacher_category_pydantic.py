@@ -23,3 +23,4 @@ class ShowTeacherCategoryWithHATEOAS(TunedModel):
 class ShowTeacherCategoryListWithHATEOAS(TunedModel):
     categories: List[ShowTeacherCategoryWithHATEOAS]
     links: dict[str, str]
+    next_cursor: str | None = None
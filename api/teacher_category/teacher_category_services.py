@@ -2,12 +2,22 @@ from api.teacher_category.teacher_category_pydantic import *
 from api.services_helpers import ensure_category_unique
 from api.teacher_category.teacher_category_DAL import TeacherCategoryDAL
 from fastapi import HTTPException, status, Request
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+TEACHER_CATEGORY_LINKS = LinkSet(
+    self=Link("get_category"),
+    update=Link("update_category"),
+    delete=Link("delete_category"),
+    categories=Link("get_all_categories")
+)
+
 
 class TeacherCategoryService:
     async def _create_new_category(self, body: CreateTeacherCategory, request: Request, db) -> ShowTeacherCategoryWithHATEOAS:
@@ -24,16 +34,9 @@ class TeacherCategoryService:
                     )
                     new_category_pydantic = ShowTeacherCategory.model_validate(new_category_orm, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/categories/search/{new_category_orm.teacher_category}',
-                        "update": f'{api_base_url}/categories/update',
-                        "delete": f'{api_base_url}/categories/delete/{new_category_orm.teacher_category}',
-                        "categories": f'{api_base_url}/categories',
-                    }
+                    hateoas_links = TEACHER_CATEGORY_LINKS.bind(api_base_url)(new_category_orm)
 
                     return ShowTeacherCategoryWithHATEOAS(category=new_category_pydantic, links=hateoas_links)
 
@@ -60,16 +63,9 @@ class TeacherCategoryService:
 
                     category_pydantic = ShowTeacherCategory.model_validate(category_orm, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/categories/search/{teacher_category}',
-                        "update": f'{api_base_url}/categories/update',
-                        "delete": f'{api_base_url}/categories/delete/{teacher_category}',
-                        "categories": f'{api_base_url}/categories',
-                    }
+                    hateoas_links = TEACHER_CATEGORY_LINKS.bind(api_base_url)(category_orm)
 
                     return ShowTeacherCategoryWithHATEOAS(category=category_pydantic, links=hateoas_links)
 
@@ -81,40 +77,42 @@ class TeacherCategoryService:
                     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                         detail="Внутренняя ошибка сервера при получении категории преподавателя.")
 
-    async def _get_all_categories(self, page: int, limit: int, request: Request, db) -> ShowTeacherCategoryListWithHATEOAS:
+    async def _get_all_categories(self, page: int, limit: int, cursor: str | None, request: Request, db) -> ShowTeacherCategoryListWithHATEOAS:
         async with db as session:
             async with session.begin():
                 category_dal = TeacherCategoryDAL(session)
                 try:
-                    categories_orm_list = await category_dal.get_all_teacher_categories(page, limit)
-                    if categories_orm_list is None:
-                        categories_orm_list = []
+                    api_base_url = request_base_url(request)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    category_links = TEACHER_CATEGORY_LINKS.bind(api_base_url)
 
-                    categories_with_hateoas = []
-                    for category_orm in categories_orm_list:
+                    def to_hateoas(category_orm) -> ShowTeacherCategoryWithHATEOAS:
                         category_pydantic = ShowTeacherCategory.model_validate(category_orm, from_attributes=True)
-                        category_links = {
-                            "self": f'{api_base_url}/categories/search/{category_orm.teacher_category}',
-                            "update": f'{api_base_url}/categories/update',
-                            "delete": f'{api_base_url}/categories/delete/{category_orm.teacher_category}',
-                            "categories": f'{api_base_url}/categories',
-                        }
                         category_with_links = ShowTeacherCategoryWithHATEOAS(category=category_pydantic,
-                                                                             links=category_links)
-                        categories_with_hateoas.append(category_with_links)
+                                                                             links=category_links(category_orm))
+                        return category_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherCategoryDAL(stream_session).get_all_teacher_categories(page, limit, cursor, stream=True), to_hateoas)
+
+                    categories_orm_list = await category_dal.get_all_teacher_categories(page, limit, cursor)
+                    if categories_orm_list is None:
+                        categories_orm_list = []
+
+                    categories_with_hateoas = [to_hateoas(category_orm) for category_orm in categories_orm_list]
 
                     collection_links = {
-                        "self": f'{api_base_url}/categories/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/categories/create',
+                        "self": route_url(api_base_url, "get_all_categories", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_categories", query=page_query(None, limit, categories_orm_list.next_cursor)) if categories_orm_list.next_cursor else None,
+                        "create": route_url(api_base_url, "create_category"),
                     }
+                    collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
                     return ShowTeacherCategoryListWithHATEOAS(categories=categories_with_hateoas,
-                                                              links=collection_links)
+                                                              links=collection_links, next_cursor=categories_orm_list.next_cursor)
 
+                except HTTPException:
+                    raise
                 except Exception as e:
                     logger.error(
                         f"Неожиданная ошибка при получении списка категорий преподавателей (page={page}, limit={limit}): {e}",
@@ -135,12 +133,10 @@ class TeacherCategoryService:
                     deleted_category_pydantic = ShowTeacherCategory.model_validate(deleted_category_orm,
                                                                                    from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "categories": f'{api_base_url}/categories',
+                        "categories": route_url(api_base_url, "get_all_categories"),
                     }
 
                     return ShowTeacherCategoryWithHATEOAS(category=deleted_category_pydantic, links=hateoas_links)
@@ -181,15 +177,9 @@ class TeacherCategoryService:
                     updated_category_pydantic = ShowTeacherCategory.model_validate(updated_category_orm,
                                                                                    from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/categories/search/{updated_category_orm.teacher_category}',
-                        "delete": f'{api_base_url}/categories/delete/{updated_category_orm.teacher_category}',
-                        "categories": f'{api_base_url}/categories',
-                    }
+                    hateoas_links = TEACHER_CATEGORY_LINKS.bind(api_base_url)(updated_category_orm)
 
                     return ShowTeacherCategoryWithHATEOAS(category=updated_category_pydantic, links=hateoas_links)
 
@@ -1,8 +1,13 @@
+from typing import Sequence
+
 from sqlalchemy import select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ExecutableOption
 
-from db.models import TeacherInPlan
+from db.models import TeacherInPlan, SubjectsInCycleHours
 from config.decorators import log_exceptions
+from api.pagination import Page, RowStream, fetch_page
+from api.session.occupancy_index import track_change
 
 
 class TeacherInPlanDAL:
@@ -20,6 +25,8 @@ class TeacherInPlanDAL:
         )
         self.db_session.add(new_teacher_in_plan)
         await self.db_session.flush()
+        track_change(self.db_session, "set_plan", {"teacher_in_plan": new_teacher_in_plan.id,
+                                                   "group_name": group_name, "teacher_id": teacher_id})
         return new_teacher_in_plan
 
     @log_exceptions
@@ -27,17 +34,14 @@ class TeacherInPlanDAL:
         query = delete(TeacherInPlan).where(TeacherInPlan.id == id).returning(TeacherInPlan)
         res = await self.db_session.execute(query)
         deleted_teacher_in_plan = res.scalar_one_or_none()
+        if deleted_teacher_in_plan is not None:
+            track_change(self.db_session, "remove_plan", deleted_teacher_in_plan.id)
         return deleted_teacher_in_plan
 
     @log_exceptions
-    async def get_all_teachers_in_plans(self, page: int, limit: int) -> list[TeacherInPlan]:
-        if page == 0:
-            query = select(TeacherInPlan).order_by(TeacherInPlan.id.asc())
-        else:
-            query = select(TeacherInPlan).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_in_plans = list(result.scalars().all())
-        return teachers_in_plans
+    async def get_all_teachers_in_plans(self, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(TeacherInPlan).options(*options)
+        return await fetch_page(self.db_session, query, (TeacherInPlan.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def get_teacher_in_plan_by_id(self, id: int) -> TeacherInPlan | None:
@@ -46,6 +50,32 @@ class TeacherInPlanDAL:
         teacher_in_plan_row = res.scalar_one_or_none()
         return teacher_in_plan_row
 
+    @log_exceptions
+    async def get_teachers_in_plans_by_ids(self, ids: list[int]) -> list[TeacherInPlan]:
+        query = select(TeacherInPlan).where(TeacherInPlan.id.in_(ids))
+        result = await self.db_session.execute(query)
+        teachers_in_plans = list(result.scalars().all())
+        return teachers_in_plans
+
+    @log_exceptions
+    async def get_teachers_in_plans_assignments(self) -> list:
+        """Rows (id, group_name, teacher_id) of all teachers in plans"""
+        query = select(TeacherInPlan.id, TeacherInPlan.group_name, TeacherInPlan.teacher_id)
+        result = await self.db_session.execute(query)
+        return list(result.all())
+
+    @log_exceptions
+    async def get_teacher_ids_by_subject(self, subject_in_cycle_id: int) -> set[int]:
+        """Ids of teachers who have this subject in some plan"""
+        query = (
+            select(TeacherInPlan.teacher_id)
+            .join(TeacherInPlan.subjects_hours)
+            .where(SubjectsInCycleHours.subject_in_cycle_id == subject_in_cycle_id)
+            .distinct()
+        )
+        result = await self.db_session.execute(query)
+        return set(result.scalars().all())
+
     @log_exceptions
     async def get_teacher_in_plan_by_group_and_subject_in_cycle_hours(
             self, group_name: str, subject_in_cycle_hours_id: int) -> TeacherInPlan | None:
@@ -59,49 +89,33 @@ class TeacherInPlanDAL:
         return teacher_in_plan_row
 
     @log_exceptions
-    async def get_teachers_in_plans_by_teacher(self, teacher_id: int, page: int = 0, limit: int = 0) -> list[TeacherInPlan]:
-        if page == 0:
-            query = select(TeacherInPlan).where(TeacherInPlan.teacher_id == teacher_id).order_by(TeacherInPlan.id.asc())
-        else:
-            query = select(TeacherInPlan).where(TeacherInPlan.teacher_id == teacher_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_in_plans = list(result.scalars().all())
-        return teachers_in_plans if teachers_in_plans is not None else []
+    async def get_teachers_in_plans_by_teacher(self, teacher_id: int, page: int = 0, limit: int = 0, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(TeacherInPlan).options(*options).where(TeacherInPlan.teacher_id == teacher_id)
+        return await fetch_page(self.db_session, query, (TeacherInPlan.id,), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_teachers_in_plans_by_group(self, group_name: str, page: int, limit: int) -> list[TeacherInPlan]:
-        if page == 0:
-            query = select(TeacherInPlan).where(TeacherInPlan.group_name == group_name).order_by(TeacherInPlan.id.asc())
-        else:
-            query = select(TeacherInPlan).where(TeacherInPlan.group_name == group_name).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_in_plans = list(result.scalars().all())
-        return teachers_in_plans if teachers_in_plans is not None else []
+    async def get_teachers_in_plans_by_group(self, group_name: str, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(TeacherInPlan).options(*options).where(TeacherInPlan.group_name == group_name)
+        return await fetch_page(self.db_session, query, (TeacherInPlan.id,), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_teachers_in_plans_by_subject_hours(self, subject_in_cycle_hours_id: int, page: int, limit: int) -> list[TeacherInPlan]:
-        if page == 0:
-            query = select(TeacherInPlan).where(TeacherInPlan.subject_in_cycle_hours_id == subject_in_cycle_hours_id).order_by(TeacherInPlan.id.asc())
-        else:
-            query = select(TeacherInPlan).where(TeacherInPlan.subject_in_cycle_hours_id == subject_in_cycle_hours_id).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_in_plans = list(result.scalars().all())
-        return teachers_in_plans if teachers_in_plans is not None else []
+    async def get_teachers_in_plans_by_subject_hours(self, subject_in_cycle_hours_id: int, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(TeacherInPlan).options(*options).where(TeacherInPlan.subject_in_cycle_hours_id == subject_in_cycle_hours_id)
+        return await fetch_page(self.db_session, query, (TeacherInPlan.id,), page, limit, cursor, stream)
 
     @log_exceptions
-    async def get_teachers_in_plans_by_session_type(self, session_type: str, page: int, limit: int) -> list[TeacherInPlan]:
-        if page == 0:
-            query = select(TeacherInPlan).where(TeacherInPlan.session_type == session_type).order_by(TeacherInPlan.id.asc())
-        else:
-            query = select(TeacherInPlan).where(TeacherInPlan.session_type == session_type).offset((page - 1) * limit).limit(limit)
-        result = await self.db_session.execute(query)
-        teachers_in_plans = list(result.scalars().all())
-        return teachers_in_plans if teachers_in_plans is not None else []
+    async def get_teachers_in_plans_by_session_type(self, session_type: str, page: int, limit: int, cursor: str | None = None, stream: bool = False, options: Sequence[ExecutableOption] = ()) -> Page | RowStream:
+        query = select(TeacherInPlan).options(*options).where(TeacherInPlan.session_type == session_type)
+        return await fetch_page(self.db_session, query, (TeacherInPlan.id,), page, limit, cursor, stream)
 
     @log_exceptions
     async def update_teacher_in_plan(self, target_id: int, **kwargs) -> TeacherInPlan | None:
         query = update(TeacherInPlan).where(TeacherInPlan.id == target_id).values(**kwargs).returning(TeacherInPlan)
         res = await self.db_session.execute(query)
         updated_teacher_in_plan = res.scalar_one_or_none()
+        if updated_teacher_in_plan is not None:
+            track_change(self.db_session, "set_plan", {"teacher_in_plan": updated_teacher_in_plan.id,
+                                                       "group_name": updated_teacher_in_plan.group_name,
+                                                       "teacher_id": updated_teacher_in_plan.teacher_id})
         return updated_teacher_in_plan
     
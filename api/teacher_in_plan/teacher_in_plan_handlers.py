@@ -4,7 +4,8 @@ from typing import Annotated
 from api.teacher_in_plan.teacher_in_plan_pydantic import *
 from api.models import QueryParams
 from db.session import get_db
-from api.teacher_in_plan.teacher_in_plan_services import TeacherInPlanService
+from api.teacher_in_plan.teacher_in_plan_services import TeacherInPlanService, TEACHER_IN_PLAN_EXPANSION
+from api.expansion import Projection
 
 teacher_in_plan_router = APIRouter()
 
@@ -32,28 +33,28 @@ async def _get_teacher_in_plan_by_group_and_subject_hours(group_name: str, subje
 
 
 @teacher_in_plan_router.get("/search/by_teacher/{teacher_id}", response_model=ShowTeacherInPlanListWithHATEOAS, responses={404: {"description": "Записи в расписании преподавателя не найдены"}})
-async def get_teachers_in_plans_by_teacher(teacher_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_in_plan_service._get_teachers_in_plans_by_teacher(teacher_id, query_param.page, query_param.limit, request, db)
+async def get_teachers_in_plans_by_teacher(teacher_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(TEACHER_IN_PLAN_EXPANSION)], db: AsyncSession = Depends(get_db)):
+    return await teacher_in_plan_service._get_teachers_in_plans_by_teacher(teacher_id, query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @teacher_in_plan_router.get("/search/by_group/{group_name}", response_model=ShowTeacherInPlanListWithHATEOAS, responses={404: {"description": "Записи в расписании преподавателя не найдены"}})
-async def get_teachers_in_plans_by_group(group_name: str, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_in_plan_service._get_teachers_in_plans_by_group(group_name, query_param.page, query_param.limit, request, db)
+async def get_teachers_in_plans_by_group(group_name: str, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(TEACHER_IN_PLAN_EXPANSION)], db: AsyncSession = Depends(get_db)):
+    return await teacher_in_plan_service._get_teachers_in_plans_by_group(group_name, query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @teacher_in_plan_router.get("/search/by_subject_hours/{subject_hours_id}", response_model=ShowTeacherInPlanListWithHATEOAS, responses={404: {"description": "Записи в расписании преподавателя не найдены"}})
-async def get_teachers_in_plans_by_subject_hours(subject_hours_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_in_plan_service._get_teachers_in_plans_by_subject_hours(subject_hours_id, query_param.page, query_param.limit, request, db)
+async def get_teachers_in_plans_by_subject_hours(subject_hours_id: int, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(TEACHER_IN_PLAN_EXPANSION)], db: AsyncSession = Depends(get_db)):
+    return await teacher_in_plan_service._get_teachers_in_plans_by_subject_hours(subject_hours_id, query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @teacher_in_plan_router.get("/search/by_session_type/{session_type}", response_model=ShowTeacherInPlanListWithHATEOAS, responses={404: {"description": "Записи в расписании преподавателя не найдены"}})
-async def get_teachers_in_plans_by_session_type(session_type: str, query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_in_plan_service._get_teachers_in_plans_by_session_type(session_type, query_param.page, query_param.limit, request, db)
+async def get_teachers_in_plans_by_session_type(session_type: str, query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(TEACHER_IN_PLAN_EXPANSION)], db: AsyncSession = Depends(get_db)):
+    return await teacher_in_plan_service._get_teachers_in_plans_by_session_type(session_type, query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @teacher_in_plan_router.get("/search", response_model=ShowTeacherInPlanListWithHATEOAS)
-async def get_all_teachers_in_plans(query_param: Annotated[QueryParams, Depends()], request: Request, db: AsyncSession = Depends(get_db)):
-    return await teacher_in_plan_service._get_all_teachers_in_plans(query_param.page, query_param.limit, request, db)
+async def get_all_teachers_in_plans(query_param: Annotated[QueryParams, Depends()], request: Request, projection: Annotated[Projection, Depends(TEACHER_IN_PLAN_EXPANSION)], db: AsyncSession = Depends(get_db)):
+    return await teacher_in_plan_service._get_all_teachers_in_plans(query_param.page, query_param.limit, query_param.cursor, projection, request, db)
 
 
 @teacher_in_plan_router.delete("/delete/{teacher_in_plan_id}", response_model=ShowTeacherInPlanWithHATEOAS, responses={404: {"description": "Запись в расписании преподавателя не найдена"}})
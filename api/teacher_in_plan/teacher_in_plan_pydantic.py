@@ -1,5 +1,5 @@
 from api.models import TunedModel
-from typing import List
+from typing import Any, List
 
 
 class ShowTeacherInPlan(TunedModel):
@@ -29,8 +29,11 @@ class UpdateTeacherInPlan(TunedModel):
 class ShowTeacherInPlanWithHATEOAS(TunedModel):
     teacher_in_plan: ShowTeacherInPlan
     links: dict[str, str] = {}
+    # Related rows asked by ?expand=, sent only with it
+    embedded: dict[str, Any] | None = None
 
 
 class ShowTeacherInPlanListWithHATEOAS(TunedModel):
     teachers_in_plans: List[ShowTeacherInPlanWithHATEOAS]
     links: dict[str, str] = {}
+    next_cursor: str | None = None
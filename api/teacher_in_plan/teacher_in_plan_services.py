@@ -2,16 +2,46 @@ from api.teacher.teacher_DAL import TeacherDAL
 from api.group.group_DAL import GroupDAL
 from api.session_type.session_type_DAL import SessionTypeDAL
 from api.teacher_in_plan.teacher_in_plan_pydantic import *
-from api.services_helpers import ensure_group_exists, ensure_session_type_exists, ensure_subject_in_cycle_hours_exists, ensure_teacher_exists, ensure_teacher_in_plan_exists
+from api.services_helpers import ensure_group_exists, ensure_session_type_exists, ensure_subject_in_cycle_hours_exists, ensure_teacher_exists, ensure_teacher_in_plan_exists, load_teacher_in_plan
 from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
 from api.subject_in_cycle_hours.subject_in_cycle_hours_DAL import SubjectsInCycleHoursDAL
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
+from api.links import Link, LinkSet, request_base_url, route_url
+from api.pagination import page_query
+from api.streaming import wants_ndjson, ndjson_response
+from api.serialization import orjson_response
+from api.expansion import Embed, Expansion, Projection
+from api.teacher.teacher_pydantic import ShowTeacher
+from api.group.group_pydantic import ShowGroup
+from api.subject_in_cycle_hours.subject_in_cycle_hours_pydantic import ShowSubjectsInCycleHours
+from api.subject_in_cycle.subject_in_cycle_pydantic import ShowSubjectsInCycle
+from db.models import TeacherInPlan
+from sqlalchemy.exc import IntegrityError
 
 from config.logging_config import configure_logging
 
 # Create logger object
 logger = configure_logging()
 
+TEACHER_IN_PLAN_LINKS = LinkSet(
+    self=Link("get_teacher_in_plan_by_id", teacher_in_plan_id="id"),
+    update=Link("update_teacher_in_plan"),
+    delete=Link("delete_teacher_in_plan", teacher_in_plan_id="id"),
+    teachers_in_plans=Link("get_all_teachers_in_plans"),
+    subjects_in_cycle_hours=Link("get_subject_in_cycle_hours_by_id", hours_id="subject_in_cycle_hours_id"),
+    teacher=Link("get_teacher_by_id"),
+    group=Link("get_group_by_name"),
+    session_type=Link("get_session_type_by_name", name="session_type"),
+    sessions=Link("get_sessions_by_plan", teacher_in_plan_id="id")
+)
+
+TEACHER_IN_PLAN_EXPANSION = Expansion(
+    TeacherInPlan, ShowTeacherInPlan,
+    teacher=Embed(ShowTeacher),
+    group=Embed(ShowGroup),
+    subjects_hours=Embed(ShowSubjectsInCycleHours, subjects_in_cycle=Embed(ShowSubjectsInCycle))
+)
+
 
 class TeacherInPlanService:
     async def _create_new_teacher_in_plan(self, body: CreateTeacherInPlan, request: Request, db) -> ShowTeacherInPlanWithHATEOAS:
@@ -38,24 +68,11 @@ class TeacherInPlanService:
                         group_name=body.group_name,
                         session_type=body.session_type
                     )
-                    teacher_in_plan_id = teacher_in_plan.id
                     teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                        "update": f'{api_base_url}/teachers_in_plans/update',
-                        "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{body.subject_in_cycle_hours_id}',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{body.teacher_id}',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{body.group_name}',
-                        "session_type": f'{api_base_url}/session-types/search/by_name/{body.session_type}',
-                        "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                    }
+                    hateoas_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)(teacher_in_plan)
 
                     return ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=hateoas_links)
 
@@ -73,27 +90,15 @@ class TeacherInPlanService:
             async with session.begin():
                 teacher_in_plan_dal = TeacherInPlanDAL(session)
                 try:
-                    if not await ensure_teacher_in_plan_exists(teacher_in_plan_dal, teacher_in_plan_id):
+                    teacher_in_plan = await load_teacher_in_plan(teacher_in_plan_dal, teacher_in_plan_id)
+                    if teacher_in_plan is None:
                         raise HTTPException(status_code=404, detail=f"Запись в расписании преподавателя с id {teacher_in_plan_id} не найдена")
 
-                    teacher_in_plan = await teacher_in_plan_dal.get_teacher_in_plan_by_id(teacher_in_plan_id)
                     teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                        "update": f'{api_base_url}/teachers_in_plans/update',
-                        "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{teacher_in_plan.subject_in_cycle_hours_id}',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_in_plan.teacher_id}',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{teacher_in_plan.group_name}',
-                        "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                        "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                    }
+                    hateoas_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)(teacher_in_plan)
 
                     return ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=hateoas_links)
 
@@ -128,21 +133,9 @@ class TeacherInPlanService:
 
                     teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan.id}',
-                        "update": f'{api_base_url}/teachers_in_plans/update',
-                        "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan.id}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{subject_in_cycle_hours_id}',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_in_plan.teacher_id}',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{teacher_in_plan.group_name}',
-                        "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                        "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan.id}'
-                    }
+                    hateoas_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)(teacher_in_plan)
 
                     return ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=hateoas_links)
 
@@ -153,7 +146,7 @@ class TeacherInPlanService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_teachers_in_plans_by_teacher(self, teacher_id: int, page: int, limit: int, request: Request, db) -> ShowTeacherInPlanListWithHATEOAS:
+    async def _get_teachers_in_plans_by_teacher(self, teacher_id: int, page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 teacher_dal = TeacherDAL(session)
@@ -162,37 +155,33 @@ class TeacherInPlanService:
                     if not await ensure_teacher_exists(teacher_dal, teacher_id):
                         raise HTTPException(status_code=404, detail=f"Преподаватель с id {teacher_id} не найден")
 
-                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_teacher(teacher_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    teachers_in_plans_with_hateoas = []
-                    for teacher_in_plan in teachers_in_plans:
+                    teacher_in_plan_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)
+
+                    def to_hateoas(teacher_in_plan) -> ShowTeacherInPlanWithHATEOAS:
                         teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
-                        teacher_in_plan_id = teacher_in_plan.id
-                        teacher_in_plan_links = {
-                            "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                            "update": f'{api_base_url}/teachers_in_plans/update',
-                            "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                            "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{teacher_in_plan.subject_in_cycle_hours_id}',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_id}',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{teacher_in_plan.group_name}',
-                            "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                            "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                        }
-                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links)
-                        teachers_in_plans_with_hateoas.append(teacher_in_plan_with_links)
+                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links(teacher_in_plan), embedded=projection.embed(teacher_in_plan))
+                        return teacher_in_plan_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherInPlanDAL(stream_session).get_teachers_in_plans_by_teacher(teacher_id, page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("teacher_in_plan"))
+
+                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_teacher(teacher_id, page, limit, cursor, options=projection.options)
+
+                    teachers_in_plans_with_hateoas = [to_hateoas(teacher_in_plan) for teacher_in_plan in teachers_in_plans]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_teacher/{teacher_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_in_plans/create',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_id}'
+                        "self": route_url(api_base_url, "get_teachers_in_plans_by_teacher", query=page_query(page, limit, cursor), teacher_id=teacher_id),
+                        "next": route_url(api_base_url, "get_teachers_in_plans_by_teacher", query=page_query(None, limit, teachers_in_plans.next_cursor), teacher_id=teacher_id) if teachers_in_plans.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_in_plan"),
+                        "teacher": route_url(api_base_url, "get_teacher_by_id", teacher_id=teacher_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links)
+                    return orjson_response(ShowTeacherInPlanListWithHATEOAS, ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links, next_cursor=teachers_in_plans.next_cursor),
+                                           exclude=projection.list_exclude("teachers_in_plans", "teacher_in_plan"))
 
                 except HTTPException:
                     raise
@@ -201,7 +190,7 @@ class TeacherInPlanService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_teachers_in_plans_by_group(self, group_name: str, page: int, limit: int, request: Request, db) -> ShowTeacherInPlanListWithHATEOAS:
+    async def _get_teachers_in_plans_by_group(self, group_name: str, page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 group_dal = GroupDAL(session)
@@ -210,37 +199,33 @@ class TeacherInPlanService:
                     if not await ensure_group_exists(group_dal, group_name):
                         raise HTTPException(status_code=404, detail=f"Группа с названием {group_name} не найдена")
 
-                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_group(group_name, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    teachers_in_plans_with_hateoas = []
-                    for teacher_in_plan in teachers_in_plans:
+                    teacher_in_plan_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)
+
+                    def to_hateoas(teacher_in_plan) -> ShowTeacherInPlanWithHATEOAS:
                         teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
-                        teacher_in_plan_id = teacher_in_plan.id
-                        teacher_in_plan_links = {
-                            "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                            "update": f'{api_base_url}/teachers_in_plans/update',
-                            "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                            "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{teacher_in_plan.subject_in_cycle_hours_id}',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_in_plan.teacher_id}',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{group_name}',
-                            "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                            "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                        }
-                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links)
-                        teachers_in_plans_with_hateoas.append(teacher_in_plan_with_links)
+                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links(teacher_in_plan), embedded=projection.embed(teacher_in_plan))
+                        return teacher_in_plan_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherInPlanDAL(stream_session).get_teachers_in_plans_by_group(group_name, page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("teacher_in_plan"))
+
+                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_group(group_name, page, limit, cursor, options=projection.options)
+
+                    teachers_in_plans_with_hateoas = [to_hateoas(teacher_in_plan) for teacher_in_plan in teachers_in_plans]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_group/{group_name}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_in_plans/create',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{group_name}'
+                        "self": route_url(api_base_url, "get_teachers_in_plans_by_group", query=page_query(page, limit, cursor), group_name=group_name),
+                        "next": route_url(api_base_url, "get_teachers_in_plans_by_group", query=page_query(None, limit, teachers_in_plans.next_cursor), group_name=group_name) if teachers_in_plans.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_in_plan"),
+                        "group": route_url(api_base_url, "get_group_by_name", group_name=group_name)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links)
+                    return orjson_response(ShowTeacherInPlanListWithHATEOAS, ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links, next_cursor=teachers_in_plans.next_cursor),
+                                           exclude=projection.list_exclude("teachers_in_plans", "teacher_in_plan"))
 
                 except HTTPException:
                     raise
@@ -249,7 +234,7 @@ class TeacherInPlanService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_teachers_in_plans_by_subject_hours(self, subject_hours_id: int, page: int, limit: int, request: Request, db) -> ShowTeacherInPlanListWithHATEOAS:
+    async def _get_teachers_in_plans_by_subject_hours(self, subject_hours_id: int, page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 subjects_in_cycle_hours_dal = SubjectsInCycleHoursDAL(session)
@@ -258,37 +243,33 @@ class TeacherInPlanService:
                     if not await ensure_subject_in_cycle_hours_exists(subjects_in_cycle_hours_dal, subject_hours_id):
                         raise HTTPException(status_code=404, detail=f"Запись о часах для предмета в цикле с id {subject_hours_id} не найдена")
 
-                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_subject_hours(subject_hours_id, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    teacher_in_plan_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)
 
-                    teachers_in_plans_with_hateoas = []
-                    for teacher_in_plan in teachers_in_plans:
+                    def to_hateoas(teacher_in_plan) -> ShowTeacherInPlanWithHATEOAS:
                         teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
-                        teacher_in_plan_id = teacher_in_plan.id
-                        teacher_in_plan_links = {
-                            "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                            "update": f'{api_base_url}/teachers_in_plans/update',
-                            "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                            "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{subject_hours_id}',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_in_plan.teacher_id}',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{teacher_in_plan.group_name}',
-                            "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                            "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                        }
-                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links)
-                        teachers_in_plans_with_hateoas.append(teacher_in_plan_with_links)
+                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links(teacher_in_plan), embedded=projection.embed(teacher_in_plan))
+                        return teacher_in_plan_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherInPlanDAL(stream_session).get_teachers_in_plans_by_subject_hours(subject_hours_id, page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("teacher_in_plan"))
+
+                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_subject_hours(subject_hours_id, page, limit, cursor, options=projection.options)
+
+                    teachers_in_plans_with_hateoas = [to_hateoas(teacher_in_plan) for teacher_in_plan in teachers_in_plans]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_subject_hours/{subject_hours_id}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_in_plans/create',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{subject_hours_id}'
+                        "self": route_url(api_base_url, "get_teachers_in_plans_by_subject_hours", query=page_query(page, limit, cursor), subject_hours_id=subject_hours_id),
+                        "next": route_url(api_base_url, "get_teachers_in_plans_by_subject_hours", query=page_query(None, limit, teachers_in_plans.next_cursor), subject_hours_id=subject_hours_id) if teachers_in_plans.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_in_plan"),
+                        "subjects_in_cycle_hours": route_url(api_base_url, "get_subject_in_cycle_hours_by_id", hours_id=subject_hours_id)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links)
+                    return orjson_response(ShowTeacherInPlanListWithHATEOAS, ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links, next_cursor=teachers_in_plans.next_cursor),
+                                           exclude=projection.list_exclude("teachers_in_plans", "teacher_in_plan"))
 
                 except HTTPException:
                     raise
@@ -297,7 +278,7 @@ class TeacherInPlanService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_teachers_in_plans_by_session_type(self, session_type: str, page: int, limit: int, request: Request, db) -> ShowTeacherInPlanListWithHATEOAS:
+    async def _get_teachers_in_plans_by_session_type(self, session_type: str, page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 session_type_dal = SessionTypeDAL(session)
@@ -306,37 +287,33 @@ class TeacherInPlanService:
                     if not await ensure_session_type_exists(session_type_dal, session_type):
                         raise HTTPException(status_code=404, detail=f"Тип занятия {session_type} не найден")
 
-                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_session_type(session_type, page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    teacher_in_plan_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)
 
-                    teachers_in_plans_with_hateoas = []
-                    for teacher_in_plan in teachers_in_plans:
+                    def to_hateoas(teacher_in_plan) -> ShowTeacherInPlanWithHATEOAS:
                         teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
-                        teacher_in_plan_id = teacher_in_plan.id
-                        teacher_in_plan_links = {
-                            "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                            "update": f'{api_base_url}/teachers_in_plans/update',
-                            "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                            "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{teacher_in_plan.subject_in_cycle_hours_id}',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_in_plan.teacher_id}',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{teacher_in_plan.group_name}',
-                            "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                            "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                        }
-                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links)
-                        teachers_in_plans_with_hateoas.append(teacher_in_plan_with_links)
+                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links(teacher_in_plan), embedded=projection.embed(teacher_in_plan))
+                        return teacher_in_plan_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherInPlanDAL(stream_session).get_teachers_in_plans_by_session_type(session_type, page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("teacher_in_plan"))
+
+                    teachers_in_plans = await teacher_in_plan_dal.get_teachers_in_plans_by_session_type(session_type, page, limit, cursor, options=projection.options)
+
+                    teachers_in_plans_with_hateoas = [to_hateoas(teacher_in_plan) for teacher_in_plan in teachers_in_plans]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_session_type/{session_type}?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_in_plans/create',
-                        "session_type": f'{api_base_url}/session-types/search/by_name/{session_type}'
+                        "self": route_url(api_base_url, "get_teachers_in_plans_by_session_type", query=page_query(page, limit, cursor), session_type=session_type),
+                        "next": route_url(api_base_url, "get_teachers_in_plans_by_session_type", query=page_query(None, limit, teachers_in_plans.next_cursor), session_type=session_type) if teachers_in_plans.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_in_plan"),
+                        "session_type": route_url(api_base_url, "get_session_type_by_name", name=session_type)
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links)
+                    return orjson_response(ShowTeacherInPlanListWithHATEOAS, ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links, next_cursor=teachers_in_plans.next_cursor),
+                                           exclude=projection.list_exclude("teachers_in_plans", "teacher_in_plan"))
 
                 except HTTPException:
                     raise
@@ -345,41 +322,37 @@ class TeacherInPlanService:
                     raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера.")
 
 
-    async def _get_all_teachers_in_plans(self, page: int, limit: int, request: Request, db) -> ShowTeacherInPlanListWithHATEOAS:
+    async def _get_all_teachers_in_plans(self, page: int, limit: int, cursor: str | None, projection: Projection, request: Request, db) -> Response:
         async with db as session:
             async with session.begin():
                 teacher_in_plan_dal = TeacherInPlanDAL(session)
                 try:
-                    teachers_in_plans = await teacher_in_plan_dal.get_all_teachers_in_plans(page, limit)
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
+
+                    teacher_in_plan_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)
 
-                    teachers_in_plans_with_hateoas = []
-                    for teacher_in_plan in teachers_in_plans:
+                    def to_hateoas(teacher_in_plan) -> ShowTeacherInPlanWithHATEOAS:
                         teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
-                        teacher_in_plan_id = teacher_in_plan.id
-                        teacher_in_plan_links = {
-                            "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                            "update": f'{api_base_url}/teachers_in_plans/update',
-                            "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                            "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                            "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{teacher_in_plan.subject_in_cycle_hours_id}',
-                            "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_in_plan.teacher_id}',
-                            "group": f'{api_base_url}/groups/search/by_group_name/{teacher_in_plan.group_name}',
-                            "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                            "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                        }
-                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links)
-                        teachers_in_plans_with_hateoas.append(teacher_in_plan_with_links)
+                        teacher_in_plan_with_links = ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=teacher_in_plan_links(teacher_in_plan), embedded=projection.embed(teacher_in_plan))
+                        return teacher_in_plan_with_links
+
+                    if wants_ndjson(request):
+                        return ndjson_response(session, lambda stream_session: TeacherInPlanDAL(stream_session).get_all_teachers_in_plans(page, limit, cursor, stream=True, options=projection.options), to_hateoas,
+                                               exclude=projection.item_exclude("teacher_in_plan"))
+
+                    teachers_in_plans = await teacher_in_plan_dal.get_all_teachers_in_plans(page, limit, cursor, options=projection.options)
+
+                    teachers_in_plans_with_hateoas = [to_hateoas(teacher_in_plan) for teacher_in_plan in teachers_in_plans]
 
                     collection_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search?page={page}&limit={limit}',
-                        "create": f'{api_base_url}/teachers_in_plans/create'
+                        "self": route_url(api_base_url, "get_all_teachers_in_plans", query=page_query(page, limit, cursor)),
+                        "next": route_url(api_base_url, "get_all_teachers_in_plans", query=page_query(None, limit, teachers_in_plans.next_cursor)) if teachers_in_plans.next_cursor else None,
+                        "create": route_url(api_base_url, "create_teacher_in_plan")
                     }
                     collection_links = {k: v for k, v in collection_links.items() if v is not None}
 
-                    return ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links)
+                    return orjson_response(ShowTeacherInPlanListWithHATEOAS, ShowTeacherInPlanListWithHATEOAS(teachers_in_plans=teachers_in_plans_with_hateoas, links=collection_links, next_cursor=teachers_in_plans.next_cursor),
+                                           exclude=projection.list_exclude("teachers_in_plans", "teacher_in_plan"))
 
                 except HTTPException:
                     raise
@@ -404,13 +377,11 @@ class TeacherInPlanService:
 
                     teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
                     hateoas_links = {
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                        "create": f'{api_base_url}/teachers_in_plans/create'
+                        "teachers_in_plans": route_url(api_base_url, "get_all_teachers_in_plans"),
+                        "create": route_url(api_base_url, "create_teacher_in_plan")
                     }
                     hateoas_links = {k: v for k, v in hateoas_links.items() if v is not None}
 
@@ -453,28 +424,19 @@ class TeacherInPlanService:
                     if not await ensure_teacher_in_plan_exists(teacher_in_plan_dal, body.teacher_in_plan_id):
                         raise HTTPException(status_code=404, detail=f"Запись в расписании преподавателя с id {body.teacher_in_plan_id} не найдена")
 
-                    teacher_in_plan = await teacher_in_plan_dal.update_teacher_in_plan(target_id=body.teacher_in_plan_id, **update_data)
+                    try:
+                        teacher_in_plan = await teacher_in_plan_dal.update_teacher_in_plan(target_id=body.teacher_in_plan_id, **update_data)
+                    except IntegrityError:
+                        # The new group or teacher is busy in a slot of the sessions of this record
+                        raise HTTPException(status_code=400, detail=f"Занятия записи в расписании преподавателя с id {body.teacher_in_plan_id} пересекаются с занятиями новой группы или преподавателя")
                     if not teacher_in_plan:
                         raise HTTPException(status_code=404, detail=f"Запись в расписании преподавателя с id {body.teacher_in_plan_id} не найдена")
 
-                    teacher_in_plan_id = teacher_in_plan.id
                     teacher_in_plan_pydantic = ShowTeacherInPlan.model_validate(teacher_in_plan, from_attributes=True)
 
-                    base_url = str(request.base_url).rstrip('/')
-                    api_prefix = ''
-                    api_base_url = f'{base_url}{api_prefix}'
+                    api_base_url = request_base_url(request)
 
-                    hateoas_links = {
-                        "self": f'{api_base_url}/teachers_in_plans/search/by_id/{teacher_in_plan_id}',
-                        "update": f'{api_base_url}/teachers_in_plans/update',
-                        "delete": f'{api_base_url}/teachers_in_plans/delete/{teacher_in_plan_id}',
-                        "teachers_in_plans": f'{api_base_url}/teachers_in_plans',
-                        "subjects_in_cycle_hours": f'{api_base_url}/subjects_in_cycles_hours/search/by_id/{teacher_in_plan.subject_in_cycle_hours_id}',
-                        "teacher": f'{api_base_url}/teachers/search/by_id/{teacher_in_plan.teacher_id}',
-                        "group": f'{api_base_url}/groups/search/by_group_name/{teacher_in_plan.group_name}',
-                        "session_type": f'{api_base_url}/session-types/search/by_name/{teacher_in_plan.session_type}',
-                        "sessions": f'{api_base_url}/sessions/search/by_plan/{teacher_in_plan_id}'
-                    }
+                    hateoas_links = TEACHER_IN_PLAN_LINKS.bind(api_base_url)(teacher_in_plan)
 
                     return ShowTeacherInPlanWithHATEOAS(teacher_in_plan=teacher_in_plan_pydantic, links=hateoas_links)
 
@@ -25,3 +25,37 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
 
 # Все роли в системе
 USERS_ROLES = os.getenv("USERS_ROLES", "Schedule Manager,Admin,Chief Admin").split(",")
+
+# Генерация docx документов с расписанием
+DOCX_RENDER_WORKERS = int(os.getenv("DOCX_RENDER_WORKERS", "2"))  # размер пула для рендеринга документов
+DOCX_CACHE_SIZE = int(os.getenv("DOCX_CACHE_SIZE", "128"))  # сколько готовых документов держать в памяти
+DOCX_CACHE_DIR = os.getenv("DOCX_CACHE_DIR", str(Path(ROOT_PATH) / "data" / "schedule_reports"))  # пустая строка - без кэша на диске
+DOCX_CACHE_DISK_SIZE = int(os.getenv("DOCX_CACHE_DISK_SIZE", "1024"))  # сколько документов держать на диске, давно не читанные удаляются
+DOCX_EXPORT_WORKERS = int(os.getenv("DOCX_EXPORT_WORKERS", str(os.cpu_count() or 2)))  # процессы для выгрузки всех документов
+
+# Индекс занятости слотов расписания в памяти
+OCCUPANCY_INDEX_ENABLED = os.getenv("OCCUPANCY_INDEX_ENABLED", "true").lower() == "true"
+OCCUPANCY_INDEX_DAYS_BACK = int(os.getenv("OCCUPANCY_INDEX_DAYS_BACK", "30"))  # за сколько прошедших дней загружать занятия
+OCCUPANCY_INDEX_REFRESH_SECONDS = int(os.getenv("OCCUPANCY_INDEX_REFRESH_SECONDS", "600"))  # полная перезагрузка индекса
+
+# Кэш ответов чтения расписания по версиям (ETag)
+SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", "256"))  # сколько сериализованных ответов держать в памяти
+SCHEDULE_CACHE_MAX_AGE_SECONDS = int(os.getenv("SCHEDULE_CACHE_MAX_AGE_SECONDS", "300"))  # как долго могут не замечаться изменения других процессов, 0 - без ограничения
+
+# Кэш справочников (типы занятий, формы оплаты, категории, здания, кабинеты, специальности) в памяти
+REFERENCE_CACHE_ENABLED = os.getenv("REFERENCE_CACHE_ENABLED", "true").lower() == "true"
+REFERENCE_CACHE_REFRESH_SECONDS = int(os.getenv("REFERENCE_CACHE_REFRESH_SECONDS", "600"))  # полная перезагрузка кэша
+
+# Состояния кабинетов, в которых нельзя проводить занятия (сравниваются без учёта регистра)
+CABINET_UNAVAILABLE_STATES = [state.strip().lower() for state in
+                              os.getenv("CABINET_UNAVAILABLE_STATES", "На ремонте,Ремонт,Закрыт").split(",") if state.strip()]
+
+# Автоматическое составление расписания
+SOLVER_WORKERS = int(os.getenv("SOLVER_WORKERS", str(os.cpu_count() or 1)))  # процессы для параллельных перезапусков
+SOLVER_RESTARTS = int(os.getenv("SOLVER_RESTARTS", str(max(SOLVER_WORKERS, 4))))  # перезапусков поиска по умолчанию
+SOLVER_MAX_JOBS = int(os.getenv("SOLVER_MAX_JOBS", "20"))  # сколько задач хранить в памяти
+
+# Парсер учебных планов
+PARSER_DEBUG_FILE_STRUCTURE = os.getenv("PARSER_DEBUG_FILE_STRUCTURE", "false").lower() == "true"  # выводить в лог структуру загружаемого файла
+PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", "2"))  # процессы для парсинга загруженных файлов
+PARSER_UPLOAD_CHUNK_SIZE = int(os.getenv("PARSER_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # размер куска при записи загрузки во временный файл, байт
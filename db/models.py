@@ -1,12 +1,12 @@
 '''File for database models'''
 
 from sqlalchemy import (Column, String, Boolean, Integer, Numeric, ForeignKey, Date, ForeignKeyConstraint,
-                        and_, Table, Double)
+                        and_, Table, Double, UniqueConstraint, FetchedValue, text, Index)
 from sqlalchemy.orm import relationship, DeclarativeBase, foreign
 
 # Новый стиль sqlalchemy 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ExcludeConstraint
 
 from uuid import UUID, uuid4
 
@@ -261,9 +261,10 @@ class TeacherBuilding(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
 
     # Foreign keys
-    teacher_id = Column(Integer, ForeignKey("teachers.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+    teacher_id = Column(Integer, ForeignKey("teachers.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False,
+                        index=True)
     building_number = Column(Integer, ForeignKey("buildings.building_number", ondelete="CASCADE", onupdate="CASCADE"),
-                             nullable=False)
+                             nullable=False, index=True)
 
     # Relations
     teacher = relationship("Teacher", back_populates="buildings_work")
@@ -299,6 +300,14 @@ class Session(Base):
         session_type (int): This is the type of the session (e.g. "lecture" or "laboratory")
         cabinet_number (int): Foreign key field for linking to the cabinets table
         building_number (int): Second foreign key field for linking to the building number
+        group_name (str): Group of the teacher in plan, filled by the sessions_fill_plan trigger
+        teacher_id (int): Teacher of the teacher in plan, filled by the sessions_fill_plan trigger
+
+    Constraints:
+        sessions_group_slot_key: a group has one session in a slot
+        sessions_teacher_slot_excl: a teacher is in one cabinet in a slot (a stream shares the cabinet)
+        sessions_cabinet_slot_excl: a cabinet is taken by one teacher in a slot
+        The slot constraints are checked at the end of a statement, so one statement may swap sessions
 
     Relations:
         plan (Plan): Relationship to access the teacher in plan associated with this session
@@ -317,6 +326,10 @@ class Session(Base):
     cabinet_number = Column(Integer, nullable=True)
     building_number = Column(Integer, nullable=True)
 
+    # Denormalized from teachers_in_plans by triggers for the slot constraints
+    group_name = Column(String, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    teacher_id = Column(Integer, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+
     # For a composite primary key
     __table_args__ = (
         ForeignKeyConstraint(
@@ -324,7 +337,25 @@ class Session(Base):
             ['cabinets.cabinet_number', 'cabinets.building_number'],
             onupdate="CASCADE", ondelete="SET NULL"
         ),
+        UniqueConstraint("group_name", "date", "session_number", name="sessions_group_slot_key",
+                         deferrable=True, initially="IMMEDIATE"),
+        # A session without a cabinet differs from any other session of the teacher
+        ExcludeConstraint(
+            ("teacher_id", "="), ("date", "="), ("session_number", "="),
+            (text("(coalesce((building_number::bigint << 32) + cabinet_number, -id))"), "<>"),
+            name="sessions_teacher_slot_excl", using="gist", deferrable=True, initially="IMMEDIATE"
+        ),
+        ExcludeConstraint(
+            ("building_number", "="), ("cabinet_number", "="), ("date", "="), ("session_number", "="),
+            ("teacher_id", "<>"),
+            name="sessions_cabinet_slot_excl", using="gist", deferrable=True, initially="IMMEDIATE"
+        ),
+        # Lists by date are ordered by (date, session_number, id), the same index serves the keyset pages
+        Index("ix_sessions_date_session_number_id", "date", "session_number", "id"),
+        Index("ix_sessions_teacher_in_plan_date", "teacher_in_plan", "date"),
+        Index("ix_sessions_building_number_cabinet_number_date", "building_number", "cabinet_number", "date"),
     )
+    __mapper_args__ = {"eager_defaults": True}
 
     # Relationships
     plan = relationship("TeacherInPlan", back_populates="sessions")
@@ -427,7 +458,8 @@ class Semester(Base):
     practice_weeks = Column(Integer, nullable=False)
 
     # Foreign keys
-    plan_id = Column(Integer, ForeignKey("plans.id", onupdate="CASCADE", ondelete="CASCADE"), primary_key=True)
+    plan_id = Column(Integer, ForeignKey("plans.id", onupdate="CASCADE", ondelete="CASCADE"), primary_key=True,
+                     index=True)
 
     # Relationships
     plan = relationship("Plan", back_populates="semesters")
@@ -484,7 +516,8 @@ class Chapter(Base):
     name = Column(String, nullable=False)
 
     # Foreign keys
-    plan_id = Column(Integer, ForeignKey("plans.id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False)
+    plan_id = Column(Integer, ForeignKey("plans.id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False,
+                     index=True)
 
     # Relationships
     plan = relationship("Plan", back_populates="chapters")
@@ -517,7 +550,7 @@ class Cycle(Base):
     # Foreign keys
     chapter_in_plan_id = Column(Integer,
                                 ForeignKey("chapter_in_plan.id", onupdate="CASCADE", ondelete="CASCADE"),
-                                nullable=False)
+                                nullable=False, index=True)
 
     # Relationships
     chapter = relationship("Chapter", back_populates="cycles")
@@ -547,7 +580,8 @@ class Module(Base):
 
     # Foreign keys
     cycle_in_chapter_id = Column(Integer,
-                                 ForeignKey("cycle_in_chapter.id", onupdate="CASCADE", ondelete="CASCADE"))
+                                 ForeignKey("cycle_in_chapter.id", onupdate="CASCADE", ondelete="CASCADE"),
+                                 index=True)
 
     # Relationships
     cycle = relationship("Cycle", back_populates="modules")
@@ -580,10 +614,10 @@ class SubjectsInCycle(Base):
     # Foreign keys
     module_in_cycle_id = Column(Integer,
                                 ForeignKey("module_in_cycle.id", onupdate="CASCADE", ondelete="CASCADE"),
-                                nullable=True)
+                                nullable=True, index=True)
     cycle_in_chapter_id = Column(Integer,
                                  ForeignKey("cycle_in_chapter.id", onupdate="CASCADE", ondelete="CASCADE"),
-                                 nullable=True)
+                                 nullable=True, index=True)
 
     # Relationships
     module = relationship("Module", back_populates="subjects")
@@ -630,6 +664,10 @@ class SubjectsInCycleHours(Base):
                                  ForeignKey("subjects_in_cycle.id", onupdate="CASCADE", ondelete="CASCADE"),
                                  nullable=False)
 
+    __table_args__ = (
+        Index("ix_subjects_in_cycle_hours_subject_in_cycle_id_semester", "subject_in_cycle_id", "semester"),
+    )
+
     # Relationships
     subjects_in_cycle = relationship("SubjectsInCycle", back_populates="hours")
     teachers_in_plans = relationship("TeacherInPlan", back_populates="subjects_hours")
@@ -692,9 +730,10 @@ class TeacherInPlan(Base):
 
     # Foreign key
     subject_in_cycle_hours_id = Column(Integer,
-                                       ForeignKey("subjects_in_cycle_hours.id", onupdate="CASCADE", ondelete="CASCADE"))
-    teacher_id = Column(Integer, ForeignKey("teachers.id", onupdate="CASCADE", ondelete="CASCADE"))
-    group_name = Column(String, ForeignKey("groups.group_name", onupdate="CASCADE", ondelete="CASCADE"))
+                                       ForeignKey("subjects_in_cycle_hours.id", onupdate="CASCADE", ondelete="CASCADE"),
+                                       index=True)
+    teacher_id = Column(Integer, ForeignKey("teachers.id", onupdate="CASCADE", ondelete="CASCADE"), index=True)
+    group_name = Column(String, ForeignKey("groups.group_name", onupdate="CASCADE", ondelete="CASCADE"), index=True)
     session_type = Column(String, ForeignKey("session_types.name", onupdate="CASCADE", ondelete="CASCADE"))
 
     # Relationships
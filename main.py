@@ -2,6 +2,9 @@
 This file is the entry point to the api
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.routing import APIRouter
 from fastapi.middleware.cors import CORSMiddleware
@@ -31,9 +34,33 @@ from api.schedule.schedule_handler import schedule_router
 from api.user.user_handlers import user_router
 from api.auth.auth_handlers import auth_router
 from api.backup.backup_handlers import backup_router
+from api.solver.solver_handlers import solver_router
+from api.session.occupancy_loader import load_occupancy_index, occupancy_refresh_loop
+from api.reference_cache import load_reference_cache, reference_cache_refresh_loop
+from api.links import load_route_templates
+from config.settings import (OCCUPANCY_INDEX_ENABLED, OCCUPANCY_INDEX_REFRESH_SECONDS, REFERENCE_CACHE_ENABLED,
+                             REFERENCE_CACHE_REFRESH_SECONDS)
+from db.session import async_session
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the slots occupancy index, without it the checks are made in the database
+    refresh_tasks = []
+    if OCCUPANCY_INDEX_ENABLED:
+        await load_occupancy_index(async_session)
+        refresh_tasks.append(asyncio.create_task(occupancy_refresh_loop(async_session, OCCUPANCY_INDEX_REFRESH_SECONDS)))
+    # Load the reference tables, the existence checks of their keys are answered without queries
+    if REFERENCE_CACHE_ENABLED:
+        await load_reference_cache(async_session)
+        refresh_tasks.append(asyncio.create_task(reference_cache_refresh_loop(async_session, REFERENCE_CACHE_REFRESH_SECONDS)))
+    yield
+    for refresh_task in refresh_tasks:
+        refresh_task.cancel()
+
 
 # Create fastapi app
-app = FastAPI(title="OGTIScheduleApi")
+app = FastAPI(title="OGTIScheduleApi", lifespan=lifespan)
 
 # Create main api router
 main_api_router = APIRouter()
@@ -60,6 +87,7 @@ main_api_router.include_router(certification_router, prefix="/certifications", t
 main_api_router.include_router(stream_router, prefix="/streams", tags=["streams"])
 main_api_router.include_router(teacher_building_router, prefix="/teachers_buildings", tags=["teachers-buildings"])
 main_api_router.include_router(schedule_router, prefix="/schedule", tags=["schedule"])
+main_api_router.include_router(solver_router, prefix="/solver", tags=["solver"])
 main_api_router.include_router(user_router, prefix="/user", tags=["user"])
 main_api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
 
@@ -72,6 +100,9 @@ main_api_router.include_router(backup_router, tags=["database"])
 # Add main api router into fastapi app
 app.include_router(main_api_router)
 
+# Path templates of the HATEOAS links are read from the final route table
+load_route_templates(app.routes)
+
 # Add CORS
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,147 @@
+"""sessions slot constraints
+
+Revision ID: b41d7e2c9a57
+Revises: 3a680119ed45
+Create Date: 2026-10-18 10:12:40.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d7e2c9a57'
+down_revision: Union[str, Sequence[str], None] = '3a680119ed45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Sessions which break a slot constraint, every row is a list of the ids of the sessions in one slot
+SLOT_CONFLICTS_QUERIES = {
+    'sessions_group_slot_key': """
+        SELECT array_agg(id ORDER BY id) FROM sessions
+        WHERE group_name IS NOT NULL
+        GROUP BY group_name, date, session_number
+        HAVING count(*) > 1
+    """,
+    'sessions_teacher_slot_excl': """
+        SELECT ARRAY[a.id, b.id] FROM sessions a
+        JOIN sessions b ON b.teacher_id = a.teacher_id AND b.date = a.date
+            AND b.session_number = a.session_number AND b.id > a.id
+        WHERE coalesce((a.building_number::bigint << 32) + a.cabinet_number, -a.id)
+            <> coalesce((b.building_number::bigint << 32) + b.cabinet_number, -b.id)
+    """,
+    'sessions_cabinet_slot_excl': """
+        SELECT ARRAY[a.id, b.id] FROM sessions a
+        JOIN sessions b ON b.building_number = a.building_number AND b.cabinet_number = a.cabinet_number
+            AND b.date = a.date AND b.session_number = a.session_number AND b.id > a.id
+        WHERE b.teacher_id <> a.teacher_id
+    """,
+}
+# Slots listed per constraint in the error
+SLOT_CONFLICTS_SHOWN = 50
+
+
+def check_slot_conflicts() -> None:
+    """
+    The constraints can not be created while the existing sessions break them
+    (the old primary key allowed several sessions of a group in a slot, teachers and cabinets were not checked).
+    Fails with the ids of the conflicting sessions, they must be moved or deleted before the upgrade
+    """
+    bind = op.get_bind()
+    lines = []
+    for constraint, query in SLOT_CONFLICTS_QUERIES.items():
+        slots = [row[0] for row in bind.execute(sa.text(query))]
+        if not slots:
+            continue
+        shown = "; ".join(", ".join(map(str, ids)) for ids in slots[:SLOT_CONFLICTS_SHOWN])
+        more = f" и ещё {len(slots) - SLOT_CONFLICTS_SHOWN}" if len(slots) > SLOT_CONFLICTS_SHOWN else ""
+        lines.append(f"{constraint}: {len(slots)} конфликтов, id занятий: {shown}{more}")
+    if lines:
+        raise RuntimeError("Существующие занятия нарушают ограничения слотов, перенесите или удалите их "
+                           "и повторите миграцию:\n" + "\n".join(lines))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Exclusion constraints on integer and date columns need the btree operators for gist
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.add_column('sessions', sa.Column('group_name', sa.String(), nullable=True))
+    op.add_column('sessions', sa.Column('teacher_id', sa.Integer(), nullable=True))
+
+    # Group and teacher of a session are copied from its teacher in plan
+    op.execute("""
+        CREATE FUNCTION sessions_fill_plan() RETURNS trigger AS $$
+        BEGIN
+            SELECT group_name, teacher_id INTO NEW.group_name, NEW.teacher_id
+            FROM teachers_in_plans WHERE id = NEW.teacher_in_plan;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER sessions_fill_plan
+        BEFORE INSERT OR UPDATE OF teacher_in_plan ON sessions
+        FOR EACH ROW EXECUTE FUNCTION sessions_fill_plan()
+    """)
+
+    # A changed group or teacher of the teacher in plan is copied to its sessions
+    op.execute("""
+        CREATE FUNCTION teachers_in_plans_sync_sessions() RETURNS trigger AS $$
+        BEGIN
+            UPDATE sessions SET group_name = NEW.group_name, teacher_id = NEW.teacher_id
+            WHERE teacher_in_plan = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER teachers_in_plans_sync_sessions
+        AFTER UPDATE OF group_name, teacher_id ON teachers_in_plans
+        FOR EACH ROW
+        WHEN (OLD.group_name IS DISTINCT FROM NEW.group_name OR OLD.teacher_id IS DISTINCT FROM NEW.teacher_id)
+        EXECUTE FUNCTION teachers_in_plans_sync_sessions()
+    """)
+
+    op.execute("""
+        UPDATE sessions SET group_name = teachers_in_plans.group_name, teacher_id = teachers_in_plans.teacher_id
+        FROM teachers_in_plans WHERE teachers_in_plans.id = sessions.teacher_in_plan
+    """)
+
+    check_slot_conflicts()
+
+    # The slot constraints are checked at the end of a statement, so one statement may swap sessions
+    # A group has one session in a slot
+    op.create_unique_constraint('sessions_group_slot_key', 'sessions', ['group_name', 'date', 'session_number'],
+                                deferrable=True, initially='IMMEDIATE')
+    # A teacher is in one cabinet in a slot, sessions of a stream share the cabinet.
+    # A session without a cabinet differs from any other session of the teacher
+    op.execute("""
+        ALTER TABLE sessions ADD CONSTRAINT sessions_teacher_slot_excl EXCLUDE USING gist (
+            teacher_id WITH =, date WITH =, session_number WITH =,
+            (coalesce((building_number::bigint << 32) + cabinet_number, -id)) WITH <>
+        ) DEFERRABLE INITIALLY IMMEDIATE
+    """)
+    # A cabinet is taken by one teacher in a slot
+    op.execute("""
+        ALTER TABLE sessions ADD CONSTRAINT sessions_cabinet_slot_excl EXCLUDE USING gist (
+            building_number WITH =, cabinet_number WITH =, date WITH =, session_number WITH =,
+            teacher_id WITH <>
+        ) DEFERRABLE INITIALLY IMMEDIATE
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE sessions DROP CONSTRAINT sessions_cabinet_slot_excl")
+    op.execute("ALTER TABLE sessions DROP CONSTRAINT sessions_teacher_slot_excl")
+    op.drop_constraint('sessions_group_slot_key', 'sessions', type_='unique')
+    op.execute("DROP TRIGGER teachers_in_plans_sync_sessions ON teachers_in_plans")
+    op.execute("DROP FUNCTION teachers_in_plans_sync_sessions()")
+    op.execute("DROP TRIGGER sessions_fill_plan ON sessions")
+    op.execute("DROP FUNCTION sessions_fill_plan()")
+    op.drop_column('sessions', 'teacher_id')
+    op.drop_column('sessions', 'group_name')
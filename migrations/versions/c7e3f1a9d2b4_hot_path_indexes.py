@@ -0,0 +1,54 @@
+"""hot path indexes
+
+Revision ID: c7e3f1a9d2b4
+Revises: b41d7e2c9a57
+Create Date: 2026-10-18 14:31:05.204918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3f1a9d2b4'
+down_revision: Union[str, Sequence[str], None] = 'b41d7e2c9a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    # Sessions: lists by date (and keyset pages), by teacher in plan, by cabinet
+    ('ix_sessions_date_session_number_id', 'sessions', ['date', 'session_number', 'id']),
+    ('ix_sessions_teacher_in_plan_date', 'sessions', ['teacher_in_plan', 'date']),
+    ('ix_sessions_building_number_cabinet_number_date', 'sessions', ['building_number', 'cabinet_number', 'date']),
+    # Teachers in plans by group, teacher and hours
+    ('ix_teachers_in_plans_group_name', 'teachers_in_plans', ['group_name']),
+    ('ix_teachers_in_plans_teacher_id', 'teachers_in_plans', ['teacher_id']),
+    ('ix_teachers_in_plans_subject_in_cycle_hours_id', 'teachers_in_plans', ['subject_in_cycle_hours_id']),
+    ('ix_subjects_in_cycle_hours_subject_in_cycle_id_semester', 'subjects_in_cycle_hours',
+     ['subject_in_cycle_id', 'semester']),
+    # Plan hierarchy: plan -> chapter -> cycle -> module -> subject
+    ('ix_semesters_plan_id', 'semesters', ['plan_id']),
+    ('ix_chapter_in_plan_plan_id', 'chapter_in_plan', ['plan_id']),
+    ('ix_cycle_in_chapter_chapter_in_plan_id', 'cycle_in_chapter', ['chapter_in_plan_id']),
+    ('ix_module_in_cycle_cycle_in_chapter_id', 'module_in_cycle', ['cycle_in_chapter_id']),
+    ('ix_subjects_in_cycle_cycle_in_chapter_id', 'subjects_in_cycle', ['cycle_in_chapter_id']),
+    ('ix_subjects_in_cycle_module_in_cycle_id', 'subjects_in_cycle', ['module_in_cycle_id']),
+    # Buildings of teachers
+    ('ix_teachers_buildings_teacher_id', 'teachers_buildings', ['teacher_id']),
+    ('ix_teachers_buildings_building_number', 'teachers_buildings', ['building_number']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,52 @@
+import json
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from api.serialization import orjson_response
+from api.session.session_pydantic import ShowSessionListWithHATEOAS
+from api.session.session_services import SESSION_EXPANSION
+from db.models import Cabinet, Session, Teacher, TeacherInPlan
+
+
+def make_session() -> Session:
+    teacher = Teacher(id=5, surname="Иванов", name="Иван", phone_number="+70000000000")
+    plan = TeacherInPlan(id=7, subject_in_cycle_hours_id=3, teacher_id=5, group_name="ИС-21", teacher=teacher)
+    cabinet = Cabinet(cabinet_number=101, building_number=1, capacity=30)
+    return Session(id=1, session_number=2, date=date(2025, 9, 1), teacher_in_plan=7, session_type="Лекция",
+                   building_number=1, cabinet_number=101, plan=plan, cabinet=cabinet)
+
+
+def render(projection, session_obj) -> dict:
+    body = {"sessions": [{"session": session_obj, "links": {}, "embedded": projection.embed(session_obj)}]}
+    response = orjson_response(ShowSessionListWithHATEOAS, body,
+                               exclude=projection.list_exclude("sessions", "session"))
+    return json.loads(response.body)["sessions"][0]
+
+
+def test_fields_and_expand_shape_the_items():
+    projection = SESSION_EXPANSION.project("id,session_date", "plan.teacher,cabinet")
+
+    item = render(projection, make_session())
+
+    # One selectinload chain per path
+    assert len(projection.options) == 2
+    assert item["session"] == {"id": 1, "session_date": "2025-09-01"}
+    assert item["embedded"]["plan"]["id"] == 7
+    assert item["embedded"]["plan"]["teacher"]["surname"] == "Иванов"
+    assert item["embedded"]["cabinet"]["capacity"] == 30
+
+
+def test_plain_request_keeps_the_item_unchanged():
+    item = render(SESSION_EXPANSION.project(), make_session())
+
+    assert "embedded" not in item
+    assert set(item["session"]) == SESSION_EXPANSION.fields
+
+
+@pytest.mark.parametrize("fields, expand", [("id,room", None), (None, "plan.sessions")])
+def test_unknown_field_or_relation_is_rejected(fields, expand):
+    with pytest.raises(HTTPException) as error:
+        SESSION_EXPANSION.project(fields, expand)
+    assert error.value.status_code == 400
@@ -0,0 +1,92 @@
+from datetime import date
+from types import SimpleNamespace
+
+from api.schedule.generate_doc import build_sessions_context, format_teacher_fio
+
+
+def make_row(**kwargs):
+    row = {
+        "date": date(2025, 12, 1),
+        "session_number": 1,
+        "session_type": "Лк",
+        "cabinet_number": 215,
+        "building_number": 2,
+        "group_name": "group",
+        "teacher_id": 1,
+        "teacher_surname": "Иванов",
+        "teacher_name": "Иван",
+        "teacher_fathername": "Иванович",
+        "teacher_category": "Высшая",
+        "subject_title": "Математика",
+    }
+    row.update(kwargs)
+    return SimpleNamespace(**row)
+
+
+def test_build_sessions_context():
+    rows = [
+        make_row(),
+        make_row(date=date(2025, 12, 3), session_number=4, cabinet_number=101, building_number=1),
+    ]
+
+    context = build_sessions_context(rows)
+
+    assert context["monday_1_session"] == "Математика, Лк, Иванов И.И., Высшая"
+    assert context["monday_1_cabinet"] == "2-215"
+    assert context["wednesday_4_cabinet"] == "1-101"
+    assert len(context) == 4
+
+
+def test_format_teacher_fio_without_fathername():
+    assert format_teacher_fio("Иванов", "Иван", None) == "Иванов И."
+
+
+def test_rendered_document_cache_evicts_oldest(tmp_path):
+    from api.schedule.docx_renderer import RenderedDocumentCache
+
+    cache = RenderedDocumentCache(max_size=2)
+    cache.put(("group", "a"), b"a")
+    cache.put(("group", "b"), b"b")
+    cache.get(("group", "a"))
+    cache.put(("group", "c"), b"c")
+
+    assert cache.get(("group", "b")) is None
+    assert cache.get(("group", "a")) == b"a"
+
+    disk_cache = RenderedDocumentCache(max_size=1, cache_dir=str(tmp_path))
+    disk_cache.put(("group", "a"), b"a")
+    disk_cache.put(("group", "b"), b"b")
+
+    assert disk_cache.get(("group", "a")) == b"a"
+
+
+def test_rendered_document_cache_bounds_files_on_disk(tmp_path):
+    import os
+    from api.schedule.docx_renderer import RenderedDocumentCache
+
+    disk_cache = RenderedDocumentCache(max_size=1, cache_dir=str(tmp_path), max_files=2)
+    for mtime, name in enumerate("abc"):
+        disk_cache.put(("group", name), name.encode())
+        os.utime(disk_cache._file_path(("group", name)), (mtime, mtime))
+
+    assert len(list(tmp_path.glob("*.docx"))) == 2
+    assert disk_cache.get(("group", "a")) is None
+    assert disk_cache.get(("group", "b")) == b"b"
+
+
+def test_report_documents_are_partitioned_by_group_and_teacher():
+    from api.schedule.report_archive import iter_report_documents
+
+    rows = [
+        make_row(group_name="ИС-21/1"),
+        make_row(group_name="ИС-22", session_number=2),
+        make_row(group_name="ИС-22", session_number=3, teacher_id=None),
+    ]
+
+    documents = list(iter_report_documents(rows, date(2025, 12, 1), include_teachers=True))
+    names = [file_name for file_name, _, _ in documents]
+
+    assert names == ["groups/ИС-21_1.docx", "groups/ИС-22.docx", "teachers/Иванов И.И._1.docx"]
+    teacher_context = documents[2][2]
+    assert teacher_context["monday_1_session"] == "Математика, Лк, ИС-21/1"
+    assert teacher_context["monday_2_session"] == "Математика, Лк, ИС-22"
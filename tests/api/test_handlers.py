@@ -1,4 +1,7 @@
 import pytest
+from sqlalchemy import delete
+
+from db.models import Teacher
 
 
 #############################
@@ -82,3 +85,164 @@ async def test_create_new_teacher(client):
 #
 # def test_update_teacher_error():
 #     pass
+
+
+#############################
+# TESTS FOR SCHEDULE HANDLERS
+#############################
+
+async def seed_week_sessions(sessions_count: int, start_period_date):
+    """Create a group with a plan and sessions_count sessions on the week from start_period_date"""
+    from datetime import timedelta
+    from db.models import (Speciality, Plan, Chapter, Cycle, SubjectsInCycle, SubjectsInCycleHours,
+                           Group, SessionType, TeacherInPlan, Session)
+    from tests.api.conftest import TestAsyncSessionLocal
+
+    async with TestAsyncSessionLocal() as session:
+        async with session.begin():
+            session.add_all([
+                Speciality(speciality_code="report.00.00"),
+                Group(group_name="report_group"),
+                SessionType(name="report_type"),
+            ])
+            plan = Plan(year=2023, speciality_code="report.00.00")
+            chapter = Chapter(code="ОП", name="chapter", plan=plan)
+            cycle = Cycle(contains_modules=False, code="ОГСЭ", name="cycle", chapter=chapter)
+            teacher = Teacher(name="Иван", surname="Иванов", fathername="Иванович", phone_number="report_phone")
+            session.add_all([plan, chapter, cycle, teacher])
+
+            plans = []
+            for subject_idx in range(sessions_count):
+                subject = SubjectsInCycle(code=f"ОГСЭ.{subject_idx}", title=f"subject {subject_idx}", cycle=cycle)
+                hours = SubjectsInCycleHours(semester=1, self_study_hours=0, lectures_hours=0, laboratory_hours=0,
+                                             practical_hours=0, course_project_hours=0, consultation_hours=0,
+                                             intermediate_assessment_hours=0, subjects_in_cycle=subject)
+                teacher_in_plan = TeacherInPlan(subjects_hours=hours, teacher=teacher,
+                                                group_name="report_group", session_type="report_type")
+                session.add_all([subject, hours, teacher_in_plan])
+                plans.append(teacher_in_plan)
+            await session.flush()
+
+            for idx, teacher_in_plan in enumerate(plans):
+                session.add(Session(session_number=idx % 6 + 1,
+                                    date=start_period_date + timedelta(days=idx // 6),
+                                    teacher_in_plan=teacher_in_plan.id,
+                                    session_type="report_type"))
+
+
+async def clean_week_sessions():
+    from db.models import Speciality, Plan, Group, SessionType
+    from tests.api.conftest import TestAsyncSessionLocal
+
+    async with TestAsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(delete(Plan).where(Plan.speciality_code == "report.00.00"))
+            await session.execute(delete(Group).where(Group.group_name == "report_group"))
+            await session.execute(delete(SessionType).where(SessionType.name == "report_type"))
+            await session.execute(delete(Speciality).where(Speciality.speciality_code == "report.00.00"))
+            await session.execute(delete(Teacher).where(Teacher.phone_number == "report_phone"))
+
+
+async def count_report_queries(client, sessions_count: int) -> int:
+    from datetime import date
+    from sqlalchemy import event
+    from tests.api.conftest import test_engine
+
+    start_period_date = date(2025, 12, 1)
+    await seed_week_sessions(sessions_count, start_period_date)
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = await client.get(f"/schedule/search/sessions/report/for-group/report_group/{start_period_date}")
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        await clean_week_sessions()
+
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+@pytest.mark.asyncio
+async def test_group_report_queries_do_not_depend_on_sessions_count(client):
+    one_session_queries = await count_report_queries(client, 1)
+    full_week_queries = await count_report_queries(client, 36)
+
+    assert one_session_queries == full_week_queries
+    assert full_week_queries <= 3
+
+
+@pytest.mark.asyncio
+async def test_free_teachers_exclude_busy_teacher(client):
+    from datetime import date
+
+    start_period_date = date(2025, 12, 1)
+    await seed_week_sessions(1, start_period_date)
+    try:
+        busy_response = await client.get("/teachers/free", params={"date": str(start_period_date), "session_number": 1})
+        free_response = await client.get("/teachers/free", params={"date": str(start_period_date), "session_number": 2})
+    finally:
+        await clean_week_sessions()
+
+    assert busy_response.status_code == 200, busy_response.text
+    assert free_response.status_code == 200, free_response.text
+    busy_phones = [item["teacher"]["phone_number"] for item in busy_response.json()["teachers"]]
+    free_phones = [item["teacher"]["phone_number"] for item in free_response.json()["teachers"]]
+    assert "report_phone" not in busy_phones
+    assert "report_phone" in free_phones
+
+
+@pytest.mark.asyncio
+async def test_busy_group_slot_is_rejected_by_constraint(client):
+    from datetime import date
+    from sqlalchemy import select
+    from db.models import Session
+    from tests.api.conftest import TestAsyncSessionLocal
+
+    start_period_date = date(2025, 12, 1)
+    await seed_week_sessions(2, start_period_date)
+    try:
+        async with TestAsyncSessionLocal() as session:
+            _, second = (await session.execute(
+                select(Session.id, Session.teacher_in_plan)
+                .where(Session.group_name == "report_group")
+                .order_by(Session.session_number)
+            )).all()
+
+        create_response = await client.post("/sessions/create", json={
+            "session_number": 1, "session_date": str(start_period_date),
+            "teacher_in_plan": second.teacher_in_plan, "session_type": "report_type"
+        })
+        update_response = await client.put("/sessions/update", json={"session_id": second.id, "new_session_number": 1})
+    finally:
+        await clean_week_sessions()
+
+    assert create_response.status_code == 400, create_response.text
+    # The session of the same teacher without a cabinet also breaks the teacher slot
+    assert "уже есть 1 пара" in create_response.json()["detail"]
+    assert update_response.status_code == 400, update_response.text
+    assert "уже есть 1 пара" in update_response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_sessions_stream_as_ndjson(client):
+    import json
+    from datetime import date
+
+    start_period_date = date(2025, 12, 1)
+    await seed_week_sessions(5, start_period_date)
+    try:
+        response = await client.get("/sessions/search", params={"page": 0},
+                                    headers={"Accept": "application/x-ndjson"})
+    finally:
+        await clean_week_sessions()
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) >= 5
+    assert all("session" in row and "links" in row for row in rows)
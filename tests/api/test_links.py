@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+import main  # loads the route templates
+from api import links as links_module
+from api.links import Link, LinkSet, load_route_templates, route_url
+from api.session.session_services import SESSION_LINKS
+from db.models import Session
+
+BASE_URL = "http://test"
+
+
+def make_session(**fields) -> Session:
+    values = dict(id=1, session_number=2, date=date(2025, 9, 1), teacher_in_plan=7, session_type="Лекция",
+                  building_number=1, cabinet_number=101)
+    values.update(fields)
+    return Session(**values)
+
+
+def test_full_links_point_to_routes():
+    links = SESSION_LINKS.bind(BASE_URL, "full")(make_session())
+
+    assert links == {
+        "self": f"{BASE_URL}/sessions/search/by_composite_key/2/2025-09-01/7",
+        "update": f"{BASE_URL}/sessions/update",
+        "delete": f"{BASE_URL}/sessions/delete/2/2025-09-01/7",
+        "sessions": f"{BASE_URL}/sessions/search",
+        "plan": f"{BASE_URL}/teachers_in_plans/search/by_id/7",
+        "type": f"{BASE_URL}/session_type/search/by_name/Лекция",
+        "cabinet": f"{BASE_URL}/cabinets/search/by_building_and_number/1/101",
+    }
+    assert route_url(BASE_URL, "get_all_sessions") == links["sessions"]
+
+
+def test_links_modes_and_optional_links():
+    session_obj = make_session(cabinet_number=None, building_number=None)
+
+    assert "cabinet" not in SESSION_LINKS.bind(BASE_URL, "full")(session_obj)
+    assert SESSION_LINKS.bind(BASE_URL, "self")(session_obj) == {
+        "self": f"{BASE_URL}/sessions/search/by_composite_key/2/2025-09-01/7"
+    }
+    assert SESSION_LINKS.bind(BASE_URL, "none")(session_obj) == {}
+
+
+def test_base_url_is_not_compiled_into_the_builder():
+    base_url = "http://x{{__class__}}"
+    links = SESSION_LINKS.bind(base_url, "self")(make_session())
+
+    assert links == {"self": f"{base_url}/sessions/search/by_composite_key/2/2025-09-01/7"}
+    assert SESSION_LINKS._builders.keys() <= set(links_module.LINKS_MODES)
+
+
+def test_link_to_missing_route_fails_at_startup(monkeypatch):
+    monkeypatch.setattr(links_module, "_LINK_SETS", list(links_module._LINK_SETS))
+    LinkSet(self=Link("no_such_route"))
+
+    with pytest.raises(RuntimeError, match="no_such_route"):
+        load_route_templates(main.app.routes)
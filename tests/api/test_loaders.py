@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from api.loaders import request_loader
+from api.services_helpers import CABINET_KEY, TEACHER_KEY, ensure_teacher_exists
+from db.models import Teacher
+
+
+class RecordingSession:
+    """Answers the queries of the loader from a set of existing teacher ids and records their SQL"""
+    def __init__(self, teacher_ids: set[int]):
+        self.info = {}
+        self.teacher_ids = teacher_ids
+        self.queries: list[str] = []
+
+    def record(self, query) -> str:
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        self.queries.append(sql)
+        return sql
+
+    async def scalar(self, query):
+        self.record(query)
+        return query.compile().params["id_1"] in self.teacher_ids
+
+    async def execute(self, query):
+        sql = self.record(query)
+        values = query.compile(compile_kwargs={"render_postcompile": True}).params.values()
+        ids = [value for value in values if value in self.teacher_ids]
+        if "teachers.surname" in sql:
+            return SimpleNamespace(scalars=lambda: [Teacher(id=teacher_id) for teacher_id in ids])
+        return [SimpleNamespace(id=teacher_id) for teacher_id in ids]
+
+
+def test_lookups_awaited_together_are_one_query():
+    db_session = RecordingSession({1, 2})
+    dal = SimpleNamespace(db_session=db_session)
+
+    async def check():
+        return await asyncio.gather(*(ensure_teacher_exists(dal, teacher_id) for teacher_id in (1, 2, 3, 1)))
+
+    assert asyncio.run(check()) == [True, True, False, True]
+    assert len(db_session.queries) == 1
+    # Only the key column is read
+    assert db_session.queries[0].startswith("SELECT teachers.id \nFROM teachers \nWHERE teachers.id IN")
+
+
+def test_single_check_is_exists_and_rows_are_shared():
+    db_session = RecordingSession({1})
+    dal = SimpleNamespace(db_session=db_session)
+
+    async def check():
+        loader = request_loader(db_session)
+        teacher = await loader.load(TEACHER_KEY, 1)
+        # Answered by the loaded row and by the failed check
+        assert await ensure_teacher_exists(dal, 1)
+        assert not await ensure_teacher_exists(dal, 5)
+        assert await loader.load(TEACHER_KEY, 5) is None
+        return teacher
+
+    assert asyncio.run(check()).id == 1
+    assert len(db_session.queries) == 2
+    assert db_session.queries[1].startswith("SELECT EXISTS (SELECT *")
+
+
+def test_composite_key_condition():
+    condition = CABINET_KEY.among([(1, 101), (2, 205)])
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("(cabinets.building_number, cabinets.cabinet_number) IN")
+    assert CABINET_KEY.value_of(SimpleNamespace(building_number=1, cabinet_number=101)) == (1, 101)
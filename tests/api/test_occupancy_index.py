@@ -0,0 +1,78 @@
+from datetime import date
+from types import SimpleNamespace
+
+from api.session.occupancy_index import OccupancyIndex, SlotConflict, GROUP, TEACHER, CABINET
+
+DAY = date(2025, 12, 1)
+
+
+def make_index() -> OccupancyIndex:
+    plans = [
+        SimpleNamespace(id=1, group_name="ИС-21", teacher_id=10),
+        SimpleNamespace(id=2, group_name="ИС-22", teacher_id=10),
+        SimpleNamespace(id=3, group_name="ИС-23", teacher_id=20),
+    ]
+    sessions = [
+        SimpleNamespace(id=100, date=DAY, session_number=1, teacher_in_plan=1, building_number=1, cabinet_number=101),
+    ]
+    return OccupancyIndex.from_rows(sessions, plans)
+
+
+def test_find_conflicts_by_group_teacher_and_cabinet():
+    index = make_index()
+
+    assert index.find_conflicts(DAY, 1, "ИС-21", 20, 1, 102) == [SlotConflict(GROUP, "ИС-21")]
+    assert index.find_conflicts(DAY, 1, "ИС-23", 10, 1, 102) == [SlotConflict(TEACHER, 10)]
+    assert index.find_conflicts(DAY, 1, "ИС-23", 20, 1, 101) == [SlotConflict(CABINET, (1, 101))]
+    assert index.find_conflicts(DAY, 2, "ИС-21", 10, 1, 101) == []
+
+
+def test_stream_session_is_not_a_conflict():
+    index = make_index()
+
+    # The same teacher with another group in the same cabinet
+    assert index.find_conflicts(DAY, 1, "ИС-22", 10, 1, 101) == []
+
+
+def test_session_does_not_conflict_with_itself():
+    index = make_index()
+
+    assert index.find_conflicts(DAY, 1, "ИС-21", 10, 1, 101, ignore_session_id=100) == []
+
+
+def test_remove_session_and_change_plan():
+    index = make_index()
+    assert not index.is_free(CABINET, (1, 101), DAY, 1)
+
+    index.set_teacher_in_plan(1, "ИС-21", 20)
+    assert index.is_free(TEACHER, 10, DAY, 1)
+    assert not index.is_free(TEACHER, 20, DAY, 1)
+
+    index.remove_session(100)
+    assert index.is_free(GROUP, "ИС-21", DAY, 1)
+    assert index.is_free(CABINET, (1, 101), DAY, 1)
+    assert index.busy_mask(TEACHER, DAY, 1) == 0
+
+
+def test_apply_reports_unknown_plan():
+    index = make_index()
+
+    assert not index.apply([("add", {"session_id": 101, "session_date": DAY, "session_number": 2,
+                                     "teacher_in_plan": 99})])
+
+
+def test_changes_committed_during_reload_are_replayed():
+    index = make_index()
+    index.begin_reload()
+    # The snapshot was read before these changes were committed
+    snapshot = make_index()
+    changes = [("remove", 100),
+               ("add", {"session_id": 101, "session_date": DAY, "session_number": 2, "teacher_in_plan": 3})]
+    index.record(changes)
+    index.apply(changes)
+
+    index.replace_with(snapshot)
+
+    assert index.is_free(GROUP, "ИС-21", DAY, 1)
+    assert not index.is_free(GROUP, "ИС-23", DAY, 2)
+    assert index.end_reload() == []
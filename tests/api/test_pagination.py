@@ -0,0 +1,41 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from api.models import QueryParams
+from api.pagination import FIRST_PAGE_CURSOR, cursor_key, decode_cursor, encode_cursor, page_query
+from db.models import Session
+
+
+def test_cursor_round_trip_keeps_key_types():
+    key = [date(2025, 12, 1), 3, 1024]
+
+    cursor = encode_cursor(key)
+
+    assert decode_cursor(cursor) == key
+    assert page_query(None, 10, cursor) == f"limit=10&cursor={cursor}"
+    assert page_query(2, 10) == "limit=10&page=2"
+
+
+def test_broken_cursor_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        QueryParams(cursor="not a cursor")
+    assert error.value.status_code == 400
+
+
+def test_keyset_pages_are_opt_in():
+    assert QueryParams().page == 0
+    assert QueryParams(cursor=FIRST_PAGE_CURSOR).cursor == FIRST_PAGE_CURSOR
+
+
+def test_cursor_values_must_match_the_key_columns():
+    key_columns = (Session.date, Session.session_number, Session.id)
+
+    assert cursor_key(encode_cursor([date(2025, 12, 1), 3, 1024]), key_columns) == [date(2025, 12, 1), 3, 1024]
+    for values in ([date(2025, 12, 1), "3", 1024], [date(2025, 12, 1), 3], [3, 3, 1024], [date(2025, 12, 1), True, 1]):
+        with pytest.raises(HTTPException) as error:
+            cursor_key(encode_cursor(values), key_columns)
+        assert error.value.status_code == 400
+    with pytest.raises(HTTPException):
+        QueryParams(cursor=encode_cursor([1.5, {"x": 1}]))
@@ -0,0 +1,74 @@
+import asyncio
+import os
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from fastapi import UploadFile
+
+from api.parser import parser_handler
+from api.parser.parser_service import ParserService, PlanWorkbook
+
+
+def make_sheet() -> pd.DataFrame:
+    return pd.DataFrame([
+        ["Объём ОП", np.nan, "Семестр 1", 17, "Семестр 2"],
+        [np.nan, "ОП", "Общеобразовательная подготовка", np.nan, "объём  ОП"],
+        ["Всего", "ОУД.01", "Русский язык", "Семестр", 2024.0],
+        [np.nan, np.nan, np.nan, "16 (2)", np.nan],
+    ])
+
+
+def test_scans_find_text_cells_in_row_order():
+    parser = ParserService()
+    df = make_sheet()
+
+    assert parser.find_semester_rows(df) == [(0, 2, "Семестр 1"), (0, 4, "Семестр 2")]
+    assert [(column['semester'], column['row_index'], column['col_index'])
+            for column in parser.find_semester_columns(df)] == [(1, 0, 2), (2, 0, 4)]
+    assert parser.find_second_op_volume_row(df) == 1
+    assert [chapter.code for chapter in parser.parse_structure(df)] == ["ОП"]
+
+
+def test_title_values_prefer_the_start_year_label():
+    parser = ParserService()
+    df = pd.DataFrame([
+        [2019.0, "Специальность 09.02.07 Информационные системы", np.nan],
+        ["Год начала подготовки", np.nan, "2023"],
+    ])
+
+    assert parser.find_title_values(df) == (2023, "09.02.07")
+    assert parser.find_title_values(df.iloc[:1]) == (2019, "09.02.07")
+
+
+def test_subject_index_keeps_the_first_row_of_a_subject():
+    parser = ParserService()
+    df = pd.DataFrame([
+        [np.nan, "ОУД.01", "Русский язык", "1"],
+        [np.nan, "ОУД.02", np.nan, "2"],
+        [np.nan, "ОУД.01", "Русский язык", "3"],
+    ])
+    subject_index = parser.build_subject_index(df)
+
+    row_idx, row = parser.find_subject_in_data(df, "ОУД.01", "Русский язык", subject_index)
+    assert (row_idx, row.iloc[3]) == (0, "1")
+    assert parser.find_subject_in_data(df, "ОУД.02", "nan", subject_index) is None
+
+
+def test_workbook_format_is_detected_by_the_signature():
+    assert PlanWorkbook.detect_engine(BytesIO(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 8)) == "xlrd"
+    assert PlanWorkbook.detect_engine(BytesIO(b"PK\x03\x04" + b"\x00" * 8)) == "openpyxl"
+    assert PlanWorkbook.detect_engine(BytesIO(b"code,name\n")) is None
+
+
+def test_upload_is_written_to_a_temp_file_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(parser_handler, "PARSER_UPLOAD_CHUNK_SIZE", 4)
+    content = b"\xd0\xcf\x11\xe0" * 5 + b"end"
+    upload = UploadFile(BytesIO(content), filename="План 2023.xls")
+
+    file_path, size = asyncio.run(parser_handler.save_upload_to_temp_file(upload, str(tmp_path)))
+
+    assert size == len(content)
+    assert file_path.endswith(".xls") and os.path.dirname(file_path) == str(tmp_path)
+    with open(file_path, "rb") as f:
+        assert f.read() == content
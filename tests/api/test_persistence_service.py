@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from api.parser.persistence_service import PersistenceService
+from db.models import Speciality
+
+
+class BulkSession:
+    """Finds the speciality but no plan, gives sequential ids to the inserted rows and records the inserts"""
+    def __init__(self):
+        self.info = {}
+        self.inserts: list[tuple[str, list[dict]]] = []
+        self.next_id = 100
+
+    async def execute(self, query, params=None):
+        if params is not None:
+            self.inserts.append((query.table.name, params))
+            return None
+        table_name = query.get_final_froms()[0].name
+        found = Speciality(speciality_code="09.02.07") if table_name == "specialties" else None
+        return SimpleNamespace(scalar_one_or_none=lambda: found)
+
+    async def scalars(self, query, params):
+        self.inserts.append((query.table.name, params))
+        ids = list(range(self.next_id, self.next_id + len(params)))
+        self.next_id += len(params)
+        return SimpleNamespace(all=lambda: ids)
+
+    def add(self, plan):
+        self.plan = plan
+
+    async def flush(self):
+        self.plan.id = 1
+
+
+def subject(code: str, module_id: int | None = None) -> dict:
+    return {'id': 1, 'code': code, 'title': code.lower(), 'module_in_cycle_id': module_id,
+            'hours': [{'semester': 1, 'lectures_hours': 10}, {'semester': 2, 'lectures_hours': 20}],
+            'certifications': [{'semester': 2, 'credit': True}]}
+
+
+def chapter(chapter_id: int, code: str) -> dict:
+    # Cycles and modules are numbered inside their parents, every chapter has cycle 1 with module 1
+    return {'id': chapter_id, 'code': code, 'name': code, 'cycles': [{
+        'id': 1, 'code': f"{code}.ПЦ", 'name': "цикл", 'contains_modules': True,
+        'subjects': [subject(f"{code}.01")],
+        'modules': [{'id': 1, 'code': f"{code}.ПМ", 'name': "модуль", 'subjects': [subject(f"{code}.МДК", 1)]}],
+    }]}
+
+
+def test_plan_is_saved_with_one_insert_per_level():
+    db_session = BulkSession()
+    parsed_data = {'year': 2023, 'speciality_code': "09.02.07",
+                   'semesters': [{'semester': 1, 'weeks': 17, 'practice_weeks': 0}],
+                   'chapters': [chapter(1, "ОП"), chapter(2, "ПП")]}
+
+    assert asyncio.run(PersistenceService(db_session).save_parsed_data(parsed_data)) == 1
+
+    inserts = dict(db_session.inserts)
+    assert [table_name for table_name, _ in db_session.inserts] == [
+        "semesters", "chapter_in_plan", "cycle_in_chapter", "module_in_cycle",
+        "subjects_in_cycle", "subjects_in_cycle_hours", "certifications"]
+    # Parents are matched by position, not by the ids of the parser repeated in every chapter
+    assert [row['chapter_in_plan_id'] for row in inserts["cycle_in_chapter"]] == [100, 101]
+    assert [row['cycle_in_chapter_id'] for row in inserts["module_in_cycle"]] == [102, 103]
+    assert [(row['code'], row['cycle_in_chapter_id'], row['module_in_cycle_id'])
+            for row in inserts["subjects_in_cycle"]] == [
+        ("ОП.01", 102, None), ("ОП.МДК", None, 104), ("ПП.01", 103, None), ("ПП.МДК", None, 105)]
+    # The certification of the 2nd semester is kept under the hours row of the 2nd semester of each subject
+    assert [row['id'] for row in inserts["certifications"]] == [111, 113, 115, 117]
@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from api.reference_cache import WRITES_KEY, ReferenceCache
+from api import loaders
+from api.services_helpers import BUILDING_KEY, CABINET_KEY, SESSION_TYPE_KEY, ensure_session_type_exists
+
+
+class TableSession:
+    """Returns the rows of the key columns of one table and counts the queries"""
+    def __init__(self, rows: list[tuple]):
+        self.info = {}
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        return [SimpleNamespace(**dict(zip(query.selected_columns.keys(), row))) for row in self.rows]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ReferenceCache()
+    for key in (BUILDING_KEY, CABINET_KEY, SESSION_TYPE_KEY):
+        cache.register(key)
+    monkeypatch.setattr(loaders, "reference_cache", cache)
+    return cache
+
+
+def test_checks_are_answered_by_the_loaded_table(cache):
+    db_session = TableSession([("Лекция",), ("Практика",)])
+    dal = SimpleNamespace(db_session=db_session)
+
+    async def check():
+        await cache.reload(db_session, SESSION_TYPE_KEY)
+        return [await ensure_session_type_exists(dal, name) for name in ("Лекция", "Экзамен")]
+
+    assert asyncio.run(check()) == [True, False]
+    # Only the load of the table
+    assert db_session.queries == 1
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_missing_table_is_loaded_once_for_a_batch(cache):
+    db_session = TableSession([("Лекция",)])
+    dal = SimpleNamespace(db_session=db_session)
+
+    async def check():
+        return await asyncio.gather(*(ensure_session_type_exists(dal, name) for name in ("Лекция", "Экзамен")))
+
+    assert asyncio.run(check()) == [True, False]
+    assert db_session.queries == 1
+    assert cache.misses == 2
+    assert cache.stats()["tables"]["session_types"] == 1
+
+
+def test_writes_bypass_and_invalidate_the_table(cache):
+    db_session = TableSession([(1,)])
+    asyncio.run(cache.reload(db_session, BUILDING_KEY))
+    cache.values[CABINET_KEY] = frozenset({(1, 101)})
+
+    db_session.info[WRITES_KEY] = {"buildings"}
+    assert not cache.serves(db_session, BUILDING_KEY)
+    assert cache.serves(db_session, CABINET_KEY)
+
+    # The cabinets of a building follow it by the db cascades
+    cache.invalidate({"buildings"})
+    assert cache.lookup(BUILDING_KEY, 1) is None
+    assert cache.lookup(CABINET_KEY, (1, 101)) is None
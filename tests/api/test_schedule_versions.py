@@ -0,0 +1,57 @@
+from datetime import date
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+
+from api.session.schedule_versions import (CHANGES_KEY, DATE, GROUP, schedule_versions, track_schedule_change,
+                                           versioned_response)
+
+DAY = date(2025, 9, 1)
+
+
+def make_client(builds: list) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/by_date/{session_date}")
+    async def by_date(session_date: date, request: Request):
+        async def build():
+            builds.append(session_date)
+            return ORJSONResponse({"sessions": len(builds)})
+        return await versioned_response(request, DATE, session_date, build)
+
+    return TestClient(app)
+
+
+def test_polls_are_answered_without_building_until_a_write():
+    builds = []
+    client = make_client(builds)
+
+    first = client.get(f"/by_date/{DAY}")
+    etag = first.headers["etag"]
+    assert client.get(f"/by_date/{DAY}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/by_date/{DAY}").json() == first.json()
+    assert len(builds) == 1
+
+    # A session written on another date doesn't touch this one
+    db_session = SimpleNamespace(info={})
+    track_schedule_change(db_session, SimpleNamespace(date=date(2025, 9, 2), group_name="ИС-21", teacher_id=5))
+    schedule_versions.bump(db_session.info.pop(CHANGES_KEY))
+    assert client.get(f"/by_date/{DAY}", headers={"If-None-Match": etag}).status_code == 304
+
+    track_schedule_change(db_session, SimpleNamespace(date=DAY, group_name="ИС-21", teacher_id=5))
+    schedule_versions.bump(db_session.info.pop(CHANGES_KEY))
+    changed = client.get(f"/by_date/{DAY}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert len(builds) == 2
+
+
+def test_write_without_scopes_bumps_everything():
+    group_version = schedule_versions.version(GROUP, "ИС-21")
+    db_session = SimpleNamespace(info={})
+
+    track_schedule_change(db_session)
+    schedule_versions.bump(db_session.info.pop(CHANGES_KEY))
+
+    assert schedule_versions.version(GROUP, "ИС-21") != group_version
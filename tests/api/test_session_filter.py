@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from api.session.session_DAL import SessionDAL
+from api.session.session_pydantic import SessionFilter
+from db.models import Session
+
+
+def compile_filter(**filters) -> str:
+    query = select(Session.id).where(*SessionDAL.filter_conditions(**filters))
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_filters_compile_to_one_query_on_sessions():
+    sql = compile_filter(**SessionFilter(date_from=date(2025, 9, 1), date_to=date(2025, 9, 7),
+                                         group_names=["ИС-21", "ИС-22"], cabinet_numbers=[101],
+                                         subject_ids=[3]).model_dump())
+
+    assert "sessions.date >=" in sql and "sessions.date <=" in sql
+    assert "sessions.group_name IN" in sql
+    assert "sessions.cabinet_number IN" in sql
+    assert "sessions.teacher_in_plan IN (SELECT teachers_in_plans.id" in sql
+    # Filters which are not given are not applied
+    assert "teacher_id" not in sql and "session_type" not in sql
+
+
+def test_empty_filter_has_no_conditions():
+    assert SessionDAL.filter_conditions(**SessionFilter().model_dump()) == []
+
+
+def test_reversed_period_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        SessionFilter(date_from=date(2025, 9, 7), date_to=date(2025, 9, 1))
+    assert error.value.status_code == 400
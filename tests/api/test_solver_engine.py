@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+from api.solver.engine import ScheduleProblem, SessionDemand, SolverCabinet, solve
+
+
+def assert_no_double_booking(placed):
+    taken = set()
+    for item in placed:
+        keys = [("group", item.group_name), ("teacher", item.teacher_id)]
+        if item.cabinet_number is not None:
+            keys.append(("cabinet", item.building_number, item.cabinet_number))
+        for key in keys:
+            slot_key = (key, item.day, item.session_number)
+            assert slot_key not in taken, slot_key
+            taken.add(slot_key)
+
+
+def test_solve_places_all_sessions_without_conflicts():
+    demands = [
+        SessionDemand(teacher_in_plan=group * 10 + subject, group_name=f"group {group}", teacher_id=subject,
+                      session_type="Лекция", count=2)
+        for group in range(5) for subject in range(6)
+    ]
+    problem = ScheduleProblem(
+        demands=demands,
+        cabinets=[SolverCabinet(1, 100 + number, 30) for number in range(5)],
+        group_sizes={f"group {group}": 25 for group in range(5)},
+    )
+
+    solution = solve(problem, seed=1)
+
+    assert solution.unplaced_count == 0
+    assert len(solution.placed) == 60
+    assert_no_double_booking(solution.placed)
+    assert all(item.cabinet_number is not None for item in solution.placed)
+
+
+def test_solve_keeps_busy_slots_free():
+    problem = ScheduleProblem(
+        demands=[SessionDemand(teacher_in_plan=1, group_name="group", teacher_id=1, session_type=None, count=3)],
+        days=1,
+        pairs_per_day=4,
+        busy_teachers={1: 0b0011},
+    )
+
+    solution = solve(problem, seed=0)
+
+    assert solution.unplaced_count == 1
+    assert sorted(item.session_number for item in solution.placed) == [3, 4]
+
+
+def test_weekly_sessions_count_by_session_type():
+    from api.solver.solver_services import weekly_sessions_count
+
+    row = SimpleNamespace(session_type="Лабораторная работа", lectures_hours=64, laboratory_hours=32,
+                          practical_hours=0, consultation_hours=0, course_project_hours=0)
+
+    assert weekly_sessions_count(row, 16) == 1
+    assert weekly_sessions_count(SimpleNamespace(**{**row.__dict__, "session_type": "Лекция"}), 16) == 2
+    assert weekly_sessions_count(SimpleNamespace(**{**row.__dict__, "session_type": "Практика"}), 16) == 0
+
+
+def test_repair_moves_only_affected_sessions():
+    from datetime import date
+    from api.session.occupancy_index import OccupancyIndex
+    from api.solver.repair import RepairSession, RepairCabinet, propose_repair
+
+    monday, tuesday = date(2025, 12, 1), date(2025, 12, 2)
+    plans = [SimpleNamespace(id=1, group_name="ИС-21", teacher_id=10),
+             SimpleNamespace(id=2, group_name="ИС-22", teacher_id=20)]
+    rows = [
+        SimpleNamespace(id=100, date=monday, session_number=1, teacher_in_plan=1, building_number=1, cabinet_number=101),
+        SimpleNamespace(id=101, date=monday, session_number=2, teacher_in_plan=2, building_number=1, cabinet_number=102),
+    ]
+    occupancy = OccupancyIndex.from_rows(rows, plans)
+    cabinets = [RepairCabinet(1, 101, 30), RepairCabinet(1, 102, 30), RepairCabinet(1, 103, 30)]
+    days = [monday, tuesday]
+
+    # Cabinet 1-102 is under repair: the session stays in its slot in another cabinet
+    affected = [RepairSession(101, monday, 2, 2, "ИС-22", 20, 1, 102)]
+    moves, unplaced = propose_repair(affected, occupancy, days, 2, cabinets,
+                                     slot_allowed=lambda session, slot_date, number: True,
+                                     cabinet_allowed=lambda cabinet, slot_date, number: cabinet != (1, 102))
+    assert unplaced == []
+    assert [(move.new_date, move.new_session_number, move.new_cabinet_number) for move in moves] == [(monday, 2, 101)]
+
+    # Teacher 10 is not available on monday: the session goes to the nearest free slot
+    affected = [RepairSession(100, monday, 1, 1, "ИС-21", 10, 1, 101)]
+    moves, unplaced = propose_repair(affected, occupancy, days, 2, cabinets,
+                                     slot_allowed=lambda session, slot_date, number: slot_date != monday,
+                                     cabinet_allowed=lambda cabinet, slot_date, number: True)
+    assert unplaced == []
+    assert [(move.new_date, move.new_session_number, move.new_cabinet_number) for move in moves] == [(tuesday, 1, 101)]
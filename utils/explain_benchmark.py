@@ -0,0 +1,392 @@
+'''
+EXPLAIN ANALYZE benchmark of the DAL queries on the hot paths
+
+Seeds a year of schedule (groups, plans with the whole hierarchy, teachers, cabinets, sessions),
+calls every measured DAL method once to capture the SQL it sends, then runs EXPLAIN ANALYZE
+of every captured statement without the indexes of the hot paths and with them.
+Everything happens in one transaction which is rolled back in the end, the database stays as it was.
+
+Usage (from the root of the project, the database must be migrated to head):
+    python -m utils.explain_benchmark --output explain.json
+    python -m utils.explain_benchmark --baseline explain.json   # exit code 1 on a regression
+'''
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from config.settings import TEST_DATABASE_URL
+from db.models import (Base, Building, Cabinet, Chapter, Cycle, Group, Module, Plan, Semester, Session,
+                       SessionType, Speciality, SubjectsInCycle, SubjectsInCycleHours, Teacher, TeacherBuilding,
+                       TeacherInPlan)
+from api.chapter.chapter_DAL import ChapterDAL
+from api.cycle.cycle_DAL import CycleDAL
+from api.group.group_DAL import GroupDAL
+from api.module.module_DAL import ModuleDAL
+from api.session.session_DAL import SessionDAL
+from api.solver.solver_DAL import SolverDAL
+from api.subject_in_cycle.subject_in_cycle_DAL import SubjectsInCycleDAL
+from api.subject_in_cycle_hours.subject_in_cycle_hours_DAL import SubjectsInCycleHoursDAL
+from api.teacher_building.teacher_building_DAL import TeacherBuildingDAL
+from api.teacher_in_plan.teacher_in_plan_DAL import TeacherInPlanDAL
+
+
+# Seeded ids start far from the real ones
+ID_OFFSET = 900_000_000
+SEMESTERS = 8
+PLANS_PER_GROUPS = 10  # one plan for every 10 groups
+CHAPTERS_PER_PLAN = 3
+SUBJECTS_PER_CYCLE = 4
+PLANS_PER_GROUP = 8  # teachers in plans of a group
+PAIRS_PER_DAY = 4
+SCHOOL_DAYS = 6  # monday - saturday
+
+
+@dataclass
+class SeedRefs:
+    '''Ids of the seeded rows the measured queries are called with'''
+    group_name: str = ""
+    plan_id: int = 0
+    chapter_id: int = 0
+    cycle_id: int = 0
+    module_id: int = 0
+    subject_id: int = 0
+    hours_id: int = 0
+    teacher_id: int = 0
+    teacher_in_plan_ids: list[int] = field(default_factory=list)
+    building_number: int = 0
+    cabinet_number: int = 0
+    session_type: str = ""
+    day: date = date(2025, 9, 1)
+    week_start: date = date(2025, 9, 1)
+    week_end: date = date(2025, 9, 6)
+
+
+def seed_rows(groups: int, weeks: int, start: date) -> tuple[list[tuple], SeedRefs]:
+    '''
+    Rows of the seeded schedule in the order of inserting: [(model, rows)].
+    Every group has its own cabinet and its own teachers, so the sessions never break the slot constraints
+    '''
+    speciality_code = "bench-00.00.00"
+    session_types = ["bench_Лекция", "bench_Практика"]
+    building_number = ID_OFFSET
+    plans, semesters, chapters, cycles, modules, subjects, hours = [], [], [], [], [], [], []
+    hours_by_plan = {}
+
+    for plan_index in range(max(1, -(-groups // PLANS_PER_GROUPS))):
+        plan_id = ID_OFFSET + plan_index
+        plans.append({"id": plan_id, "year": 2025, "speciality_code": speciality_code})
+        semesters += [{"semester": number, "weeks": 17.0, "practice_weeks": 2, "plan_id": plan_id}
+                      for number in range(1, SEMESTERS + 1)]
+        hours_by_plan[plan_id] = []
+        for chapter_index in range(CHAPTERS_PER_PLAN):
+            chapter_id = ID_OFFSET + len(chapters)
+            chapters.append({"id": chapter_id, "code": f"Ч.{chapter_index}", "name": "bench", "plan_id": plan_id})
+            # The first cycle of a chapter has a module, the second one has subjects directly
+            for contains_modules in (True, False):
+                cycle_id = ID_OFFSET + len(cycles)
+                cycles.append({"id": cycle_id, "contains_modules": contains_modules, "code": f"Ц.{cycle_id}",
+                               "name": "bench", "chapter_in_plan_id": chapter_id})
+                module_id = None
+                if contains_modules:
+                    module_id = ID_OFFSET + len(modules)
+                    modules.append({"id": module_id, "name": "bench", "code": f"М.{module_id}",
+                                    "cycle_in_chapter_id": cycle_id})
+                for _ in range(SUBJECTS_PER_CYCLE):
+                    subject_id = ID_OFFSET + len(subjects)
+                    subjects.append({"id": subject_id, "code": f"П.{subject_id}", "title": f"bench {subject_id}",
+                                     "module_in_cycle_id": module_id,
+                                     "cycle_in_chapter_id": None if contains_modules else cycle_id})
+                    for semester in range(1, SEMESTERS + 1):
+                        hours_id = ID_OFFSET + len(hours)
+                        hours.append({"id": hours_id, "semester": semester, "self_study_hours": 10,
+                                      "lectures_hours": 32, "laboratory_hours": 16, "practical_hours": 16,
+                                      "course_project_hours": 0, "consultation_hours": 2,
+                                      "intermediate_assessment_hours": 2, "subject_in_cycle_id": subject_id})
+                        if semester == 1:
+                            hours_by_plan[plan_id].append(hours_id)
+
+    group_rows, teachers, teachers_buildings, cabinets, teachers_in_plans = [], [], [], [], []
+    plan_ids_of_group = {}
+    for group_index in range(groups):
+        group_name = f"bench_{group_index:04d}"
+        plan_id = ID_OFFSET + group_index // PLANS_PER_GROUPS
+        group_rows.append({"group_name": group_name, "quantity_students": 25, "speciality_code": speciality_code})
+        cabinets.append({"cabinet_number": group_index + 1, "building_number": building_number, "capacity": 30})
+        plan_ids_of_group[group_name] = []
+        for plan_index in range(PLANS_PER_GROUP):
+            teacher_id = ID_OFFSET + len(teachers)
+            teachers.append({"id": teacher_id, "name": "Bench", "surname": f"Teacher {teacher_id}",
+                             "phone_number": f"+7900{teacher_id}"})
+            teachers_buildings.append({"teacher_id": teacher_id, "building_number": building_number})
+            plan_hours = hours_by_plan[plan_id]
+            teacher_in_plan_id = ID_OFFSET + len(teachers_in_plans)
+            teachers_in_plans.append({"id": teacher_in_plan_id, "group_name": group_name, "teacher_id": teacher_id,
+                                      "subject_in_cycle_hours_id": plan_hours[plan_index * 3 % len(plan_hours)],
+                                      "session_type": session_types[plan_index % 2]})
+            plan_ids_of_group[group_name].append(teacher_in_plan_id)
+
+    sessions = []
+    for week in range(weeks):
+        for weekday in range(SCHOOL_DAYS):
+            day = start + timedelta(weeks=week, days=weekday)
+            for session_number in range(1, PAIRS_PER_DAY + 1):
+                plan_index = (week + weekday + session_number) % PLANS_PER_GROUP
+                for group_index in range(len(group_rows)):
+                    teacher_in_plan = teachers_in_plans[group_index * PLANS_PER_GROUP + plan_index]
+                    sessions.append({"session_number": session_number, "date": day,
+                                     "teacher_in_plan": teacher_in_plan["id"],
+                                     "session_type": teacher_in_plan["session_type"],
+                                     "building_number": building_number, "cabinet_number": group_index + 1})
+
+    rows = [
+        (Speciality, [{"speciality_code": speciality_code}]),
+        (SessionType, [{"name": name} for name in session_types]),
+        (Building, [{"building_number": building_number, "city": "bench", "building_address": "bench"}]),
+        (Cabinet, cabinets),
+        (Plan, plans),
+        (Semester, semesters),
+        (Chapter, chapters),
+        (Cycle, cycles),
+        (Module, modules),
+        (SubjectsInCycle, subjects),
+        (SubjectsInCycleHours, hours),
+        (Teacher, teachers),
+        (TeacherBuilding, teachers_buildings),
+        (Group, group_rows),
+        (TeacherInPlan, teachers_in_plans),
+        (Session, sessions),
+    ]
+
+    middle_group = group_rows[len(group_rows) // 2]["group_name"]
+    week_start = start + timedelta(weeks=weeks // 2)
+    refs = SeedRefs(
+        group_name=middle_group,
+        plan_id=plans[0]["id"],
+        chapter_id=chapters[0]["id"],
+        cycle_id=cycles[0]["id"],
+        module_id=modules[0]["id"],
+        subject_id=subjects[0]["id"],
+        hours_id=teachers_in_plans[0]["subject_in_cycle_hours_id"],
+        teacher_id=teachers[len(teachers) // 2]["id"],
+        teacher_in_plan_ids=plan_ids_of_group[middle_group],
+        building_number=building_number,
+        cabinet_number=len(group_rows) // 2 + 1,
+        session_type=session_types[0],
+        day=week_start + timedelta(days=2),
+        week_start=week_start,
+        week_end=week_start + timedelta(days=SCHOOL_DAYS - 1),
+    )
+    return rows, refs
+
+
+def measured_calls(refs: SeedRefs) -> list[tuple]:
+    '''(name, call of the DAL method with a session) of every measured query'''
+    page, limit = None, 10
+    return [
+        ("SessionDAL.get_all_sessions", lambda db: SessionDAL(db).get_all_sessions(page, limit)),
+        ("SessionDAL.get_sessions_by_date", lambda db: SessionDAL(db).get_sessions_by_date(refs.day, page, limit)),
+        ("SessionDAL.get_sessions_by_date_and_group",
+         lambda db: SessionDAL(db).get_sessions_by_date_and_group(refs.day, refs.group_name, page, limit)),
+        ("SessionDAL.get_sessions_by_plan",
+         lambda db: SessionDAL(db).get_sessions_by_plan(refs.teacher_in_plan_ids[0], page, limit)),
+        ("SessionDAL.get_sessions_by_type",
+         lambda db: SessionDAL(db).get_sessions_by_type(refs.session_type, page, limit)),
+        ("SessionDAL.get_sessions_by_cabinet",
+         lambda db: SessionDAL(db).get_sessions_by_cabinet(refs.cabinet_number, refs.building_number, page, limit)),
+        ("SessionDAL.get_sessions_by_filter",
+         lambda db: SessionDAL(db).get_sessions_by_filter(page, limit, date_from=refs.week_start, date_to=refs.week_end,
+                                                          group_names=[refs.group_name], subject_ids=[refs.subject_id])),
+        ("SessionDAL.get_session_by_cabinet_and_time",
+         lambda db: SessionDAL(db).get_session_by_cabinet_and_time(refs.cabinet_number, refs.building_number,
+                                                                   refs.day, 1)),
+        ("SessionDAL.get_sessions_by_teacher_in_plan_and_date",
+         lambda db: SessionDAL(db).get_sessions_by_teacher_in_plan_and_date(refs.teacher_in_plan_ids,
+                                                                            refs.week_start, refs.week_end)),
+        ("SessionDAL.get_sessions_report_rows",
+         lambda db: SessionDAL(db).get_sessions_report_rows(refs.week_start, refs.week_end, refs.group_name)),
+        ("SessionDAL.get_sessions_by_date_range",
+         lambda db: SessionDAL(db).get_sessions_by_date_range(refs.week_start, refs.week_end)),
+        ("SessionDAL.count_sessions_by_date_range",
+         lambda db: SessionDAL(db).count_sessions_by_date_range(refs.week_start, refs.week_end, [refs.group_name])),
+        ("SessionDAL.get_occupancy_rows",
+         lambda db: SessionDAL(db).get_occupancy_rows(refs.week_start, refs.week_end)),
+        ("SessionDAL.get_slots_occupancy_rows",
+         lambda db: SessionDAL(db).get_slots_occupancy_rows([(refs.day, 1), (refs.day, 2)])),
+        ("TeacherInPlanDAL.get_teachers_in_plans_by_group",
+         lambda db: TeacherInPlanDAL(db).get_teachers_in_plans_by_group(refs.group_name, page, limit)),
+        ("TeacherInPlanDAL.get_teachers_in_plans_by_teacher",
+         lambda db: TeacherInPlanDAL(db).get_teachers_in_plans_by_teacher(refs.teacher_id, page, limit)),
+        ("TeacherInPlanDAL.get_teachers_in_plans_by_subject_hours",
+         lambda db: TeacherInPlanDAL(db).get_teachers_in_plans_by_subject_hours(refs.hours_id, page, limit)),
+        ("TeacherInPlanDAL.get_teacher_ids_by_subject",
+         lambda db: TeacherInPlanDAL(db).get_teacher_ids_by_subject(refs.subject_id)),
+        ("TeacherInPlanDAL.get_teacher_in_plan_by_group_and_subject_in_cycle_hours",
+         lambda db: TeacherInPlanDAL(db).get_teacher_in_plan_by_group_and_subject_in_cycle_hours(refs.group_name,
+                                                                                                 refs.hours_id)),
+        ("SubjectsInCycleHoursDAL.get_subjects_in_cycle_hours_by_subject_in_cycle",
+         lambda db: SubjectsInCycleHoursDAL(db).get_subjects_in_cycle_hours_by_subject_in_cycle(refs.subject_id,
+                                                                                                page, limit)),
+        ("SubjectsInCycleHoursDAL.get_subjects_in_cycle_hours_by_subject_and_semester",
+         lambda db: SubjectsInCycleHoursDAL(db).get_subjects_in_cycle_hours_by_subject_and_semester(refs.subject_id,
+                                                                                                    1)),
+        ("ChapterDAL.get_chapters_by_plan", lambda db: ChapterDAL(db).get_chapters_by_plan(refs.plan_id, page, limit)),
+        ("CycleDAL.get_cycles_by_chapter", lambda db: CycleDAL(db).get_cycles_by_chapter(refs.chapter_id, page, limit)),
+        ("ModuleDAL.get_modules_by_cycle", lambda db: ModuleDAL(db).get_modules_by_cycle(refs.cycle_id, page, limit)),
+        ("SubjectsInCycleDAL.get_subjects_in_cycle_by_cycle",
+         lambda db: SubjectsInCycleDAL(db).get_subjects_in_cycle_by_cycle(refs.cycle_id, page, limit)),
+        ("SubjectsInCycleDAL.get_subjects_in_cycle_by_module",
+         lambda db: SubjectsInCycleDAL(db).get_subjects_in_cycle_by_module(refs.module_id, page, limit)),
+        ("SubjectsInCycleDAL.get_subjects_in_plan", lambda db: SubjectsInCycleDAL(db).get_subjects_in_plan(refs.plan_id)),
+        ("GroupDAL.get_subjects_with_lectures_by_group",
+         lambda db: GroupDAL(db).get_subjects_with_lectures_by_group(refs.group_name)),
+        ("TeacherBuildingDAL.get_teachers_buildings_by_teacher",
+         lambda db: TeacherBuildingDAL(db).get_teachers_buildings_by_teacher(refs.teacher_id, page, limit)),
+        ("SolverDAL.get_demand_rows", lambda db: SolverDAL(db).get_demand_rows([refs.group_name], 1)),
+        ("SolverDAL.count_sessions_by_plans",
+         lambda db: SolverDAL(db).count_sessions_by_plans(refs.teacher_in_plan_ids, refs.week_start, refs.week_end)),
+    ]
+
+
+async def capture_statements(conn: AsyncConnection, calls: list[tuple]) -> list[tuple]:
+    '''[(name, statement, parameters)] of the selects sent by the DAL methods'''
+    captured = []
+    current = {"name": None}
+
+    def on_execute(_conn, _cursor, statement, parameters, _context, _executemany):
+        if current["name"] is not None and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            # The second select of the same method gets a number
+            name = current["name"]
+            same = sum(1 for captured_name, _, _ in captured if captured_name.split(" #")[0] == name)
+            captured.append((f"{name} #{same + 1}" if same else name, statement, parameters))
+
+    event.listen(conn.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        db = AsyncSession(bind=conn)
+        for name, call in calls:
+            current["name"] = name
+            await call(db)
+        current["name"] = None
+    finally:
+        event.remove(conn.sync_engine, "before_cursor_execute", on_execute)
+    return captured
+
+
+def plan_access_paths(node: dict) -> list[str]:
+    '''Scans of the plan, e.g. "Index Scan ix_sessions_teacher_in_plan_date", "Seq Scan sessions"'''
+    paths = []
+    if "Scan" in node["Node Type"]:
+        paths.append(f'{node["Node Type"]} {node.get("Index Name") or node.get("Relation Name", "")}'.strip())
+    for child in node.get("Plans", []):
+        paths += plan_access_paths(child)
+    return paths
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters, runs: int) -> tuple[float, list[str]]:
+    '''The best execution time (ms) of the runs after one warm up run, and the scans of the plan'''
+    timings, paths = [], []
+    for _ in range(runs + 1):
+        result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)
+        report = result.scalar_one()
+        report = json.loads(report) if isinstance(report, str) else report
+        timings.append(report[0]["Execution Time"])
+        paths = plan_access_paths(report[0]["Plan"])
+    return min(timings[1:]), paths
+
+
+async def run_benchmark(database_url: str, groups: int, weeks: int, runs: int) -> dict:
+    engine = create_async_engine(database_url)
+    # Indexes of the hot paths are dropped in a savepoint for the measurements "before"
+    hot_indexes = [index.name for table in Base.metadata.sorted_tables for index in table.indexes
+                   if table.name != "users"]
+    results = {}
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                rows, refs = seed_rows(groups, weeks, date(2025, 9, 1))
+                for model, model_rows in rows:
+                    if model_rows:
+                        await conn.execute(insert(model), model_rows)
+                await conn.exec_driver_sql("ANALYZE")
+                print(f"Засеяно: {sum(len(model_rows) for _, model_rows in rows)} строк, "
+                      f"занятий: {len(rows[-1][1])}", file=sys.stderr)
+
+                captured = await capture_statements(conn, measured_calls(refs))
+                for name, statement, parameters in captured:
+                    after_ms, after_paths = await explain(conn, statement, parameters, runs)
+                    results.setdefault(name, {})["after_ms"] = round(after_ms, 3)
+                    results[name]["after_plan"] = after_paths
+
+                savepoint = await conn.begin_nested()
+                for index_name in hot_indexes:
+                    await conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{index_name}"')
+                for name, statement, parameters in captured:
+                    before_ms, before_paths = await explain(conn, statement, parameters, runs)
+                    results[name]["before_ms"] = round(before_ms, 3)
+                    results[name]["before_plan"] = before_paths
+                await savepoint.rollback()
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    '''Queries whose time with the indexes grew more than tolerance times against the baseline'''
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if (result["after_ms"] > previous["after_ms"] * tolerance
+                and result["after_ms"] - previous["after_ms"] > min_delta_ms):
+            regressions.append(f"{name}: {previous['after_ms']} мс -> {result['after_ms']} мс")
+    return regressions
+
+
+def print_report(results: dict):
+    print(f"{'Запрос':<78} {'до, мс':>10} {'после, мс':>10} {'ускорение':>10}")
+    for name, result in results.items():
+        speedup = result["before_ms"] / result["after_ms"] if result["after_ms"] else float("inf")
+        print(f"{name:<78} {result['before_ms']:>10.3f} {result['after_ms']:>10.3f} {speedup:>9.1f}x")
+        print(f"    до:    {', '.join(result['before_plan'])}")
+        print(f"    после: {', '.join(result['after_plan'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE запросов DAL до и после индексов")
+    parser.add_argument("--database-url", default=TEST_DATABASE_URL, help="база данных, мигрированная до head")
+    parser.add_argument("--groups", type=int, default=40, help="количество групп")
+    parser.add_argument("--weeks", type=int, default=34, help="количество учебных недель с занятиями")
+    parser.add_argument("--runs", type=int, default=3, help="запусков каждого запроса, берётся лучший")
+    parser.add_argument("--output", help="сохранить результаты в json")
+    parser.add_argument("--baseline", help="json прошлого запуска для поиска регрессий")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="во сколько раз запрос может замедлиться")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="замедления меньше этого не считаются")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.database_url, args.groups, args.weeks, args.runs))
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("Регрессии:", *regressions, sep="\n  ")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+'''
+Benchmark of the curriculum parser (api.parser.parser_service.ParserService) on a real plan
+
+Compares, on the "План" sheet of the file:
+    old - the scans of the sheet cell by cell with df.iloc in Python loops (kept here as they were);
+    new - the vectorized scans of ParserService (.str masks over all cells and np.argwhere).
+Both scans are checked to return the same positions.
+Then parse_structure and the whole parse_excel_file are measured, the exit code is 1 when its best run exceeds --budget-ms.
+
+Usage (from the root of the project):
+    python -m utils.parser_benchmark
+    python -m utils.parser_benchmark --file "plan.xls" --runs 5 --budget-ms 200
+'''
+import argparse
+import re
+import sys
+import timeit
+
+import pandas as pd
+
+from api.parser.parser_service import ParserService
+
+
+DEFAULT_FILE = "__Учебный план 09.02.07_2023 год .osf-1.xls"
+
+
+def old_find_semester_rows(df: pd.DataFrame) -> list:
+    results = []
+    for row_idx in range(len(df)):
+        for col_idx in range(len(df.columns)):
+            cell_value = df.iloc[row_idx, col_idx]
+            if pd.notna(cell_value) and isinstance(cell_value, str):
+                if re.search(r'семестр', cell_value, re.IGNORECASE) and re.search(r'(\d+)', cell_value):
+                    results.append((row_idx, col_idx, cell_value))
+    return results
+
+
+def old_find_semester_columns(df: pd.DataFrame) -> list:
+    results = []
+    for row_idx in range(len(df)):
+        for col_idx in range(len(df.columns)):
+            cell_value = df.iloc[row_idx, col_idx]
+            if pd.notna(cell_value) and isinstance(cell_value, str):
+                match = re.search(r'семестр\s+(\d+)', cell_value, re.IGNORECASE)
+                if match:
+                    results.append({'semester': int(match.group(1)), 'col_index': col_idx, 'row_index': row_idx})
+    return results
+
+
+def old_find_second_op_volume_row(df: pd.DataFrame) -> int | None:
+    op_volume_rows = []
+    for row_idx in range(len(df)):
+        for cell in df.iloc[row_idx]:
+            if pd.notna(cell) and isinstance(cell, str) and re.search(r'объём\s+оп', cell, re.IGNORECASE):
+                op_volume_rows.append(row_idx)
+                if len(op_volume_rows) == 2:
+                    return op_volume_rows[1]
+    return op_volume_rows[0] if op_volume_rows else None
+
+
+def best_ms(func, runs: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=runs)) * 1000
+
+
+def run_benchmark(file_path: str, runs: int) -> dict:
+    parser = ParserService()
+    df = pd.read_excel(file_path, header=None, sheet_name=parser.sheet_name)
+
+    scans = {
+        "find_semester_rows": (lambda: old_find_semester_rows(df), lambda: parser.find_semester_rows(df)),
+        "find_semester_columns": (lambda: old_find_semester_columns(df), lambda: parser.find_semester_columns(df)),
+        "find_second_op_volume_row": (lambda: old_find_second_op_volume_row(df),
+                                      lambda: parser.find_second_op_volume_row(df)),
+    }
+
+    results = {}
+    for name, (old, new) in scans.items():
+        if old() != new():
+            raise AssertionError(f"{name}: результаты до и после различаются")
+        results[name] = {"before_ms": best_ms(old, runs), "after_ms": best_ms(new, runs)}
+
+    results["parse_structure"] = {"before_ms": None, "after_ms": best_ms(lambda: parser.parse_structure(df), runs)}
+    results["parse_excel_file"] = {"before_ms": None,
+                                   "after_ms": best_ms(lambda: parser.parse_excel_file(file_path), runs)}
+    return results
+
+
+def print_report(results: dict):
+    print(f"{'Проход':<32} {'до, мс':>10} {'после, мс':>10} {'ускорение':>10}")
+    for name, result in results.items():
+        before = result["before_ms"]
+        if before is None:
+            print(f"{name:<32} {'-':>10} {result['after_ms']:>10.3f} {'-':>10}")
+            continue
+        speedup = before / result["after_ms"] if result["after_ms"] else float("inf")
+        print(f"{name:<32} {before:>10.3f} {result['after_ms']:>10.3f} {speedup:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Скорость парсера учебных планов до и после векторизации")
+    parser.add_argument("--file", default=DEFAULT_FILE, help="файл учебного плана (xls/xlsx)")
+    parser.add_argument("--runs", type=int, default=3, help="запусков каждого прохода, берётся лучший")
+    parser.add_argument("--budget-ms", type=float, help="допустимое время parse_excel_file, мс")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.file, args.runs)
+    print_report(results)
+
+    if args.budget_ms is not None and results["parse_excel_file"]["after_ms"] > args.budget_ms:
+        print(f"parse_excel_file дольше {args.budget_ms} мс")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+'''
+Microbenchmark of the serialization of the /sessions/search?page=0 response
+
+Compares, on the same ORM rows (no database, the rows are built in memory):
+    old - a dict per row -> ShowSession.model_validate -> ShowSessionWithHATEOAS -> ShowSessionListWithHATEOAS,
+          then FastAPI validates and encodes the model again by response_model and renders JSONResponse;
+    new - the rows are validated once from the attributes by the TypeAdapter of the schema
+          and rendered by orjson (api.serialization.orjson_response).
+Both bodies are checked to be the same JSON.
+Then the new path is measured with the links of SessionService for every ?links= mode.
+
+Usage (from the root of the project):
+    python -m utils.serialization_benchmark --rows 10000
+'''
+import argparse
+import asyncio
+import json
+import timeit
+from datetime import date, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+import main  # loads the route templates of the links
+from api.links import LINKS_MODES
+from api.serialization import orjson_response
+from api.session.session_services import SESSION_LINKS
+from api.session.session_pydantic import ShowSession, ShowSessionWithHATEOAS, ShowSessionListWithHATEOAS
+from db.models import Session
+
+
+API_BASE_URL = "http://localhost:8000"
+
+
+def make_rows(count: int) -> list[Session]:
+    '''A year of sessions of 40 groups: 4 pairs a day in their own cabinets'''
+    return [
+        Session(id=number, session_number=number % 4 + 1, date=date(2025, 9, 1) + timedelta(days=number // 160),
+                teacher_in_plan=number % 320, session_type="Лекция", building_number=1,
+                cabinet_number=100 + number % 40)
+        for number in range(count)
+    ]
+
+
+def session_links(session_obj) -> dict:
+    '''The links of a session, the same as in SessionService'''
+    session_number = session_obj.session_number
+    session_date = session_obj.date
+    plan_id = session_obj.teacher_in_plan
+    session_links = {
+        "self": f'{API_BASE_URL}/sessions/search/by_composite_key/{session_number}/{session_date}/{plan_id}',
+        "update": f'{API_BASE_URL}/sessions/update',
+        "delete": f'{API_BASE_URL}/sessions/delete/{session_number}/{session_date}/{plan_id}',
+        "sessions": f'{API_BASE_URL}/sessions',
+        "plan": f'{API_BASE_URL}/teachers_in_plans/search/by_id/{plan_id}',
+        "type": f'{API_BASE_URL}/session-types/search/by_name/{session_obj.session_type}',
+        "cabinet": f'{API_BASE_URL}/cabinets/search/by_building_and_number/{session_obj.building_number}/{session_obj.cabinet_number}' if session_obj.cabinet_number and session_obj.building_number else None
+    }
+    return {k: v for k, v in session_links.items() if v is not None}
+
+
+COLLECTION_LINKS = {"self": f"{API_BASE_URL}/sessions/search?limit=10&page=0", "create": f"{API_BASE_URL}/sessions/create"}
+RESPONSE_FIELD = create_model_field(name="Response_get_all_sessions", type_=ShowSessionListWithHATEOAS,
+                                    mode="serialization")
+
+
+def old_body(rows: list[Session]) -> bytes:
+    sessions_with_hateoas = []
+    for session_obj in rows:
+        session_dict = {
+            "id": session_obj.id,
+            "session_number": session_obj.session_number,
+            "session_date": session_obj.date,
+            "teacher_in_plan": session_obj.teacher_in_plan,
+            "session_type": session_obj.session_type,
+            "cabinet_number": session_obj.cabinet_number,
+            "building_number": session_obj.building_number,
+        }
+        session_pydantic = ShowSession.model_validate(session_dict)
+        sessions_with_hateoas.append(ShowSessionWithHATEOAS(session=session_pydantic, links=session_links(session_obj)))
+    model = ShowSessionListWithHATEOAS(sessions=sessions_with_hateoas, links=COLLECTION_LINKS)
+
+    # What FastAPI does with the returned model of an endpoint with response_model
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=model, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def new_body(rows: list[Session]) -> bytes:
+    sessions_with_hateoas = [{"session": session_obj, "links": session_links(session_obj)} for session_obj in rows]
+    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas,
+                                                        "links": COLLECTION_LINKS}).body
+
+
+def links_body(rows: list[Session], mode: str) -> bytes:
+    row_links = SESSION_LINKS.bind(API_BASE_URL, mode)
+    sessions_with_hateoas = [{"session": session_obj, "links": row_links(session_obj)} for session_obj in rows]
+    return orjson_response(ShowSessionListWithHATEOAS, {"sessions": sessions_with_hateoas,
+                                                        "links": COLLECTION_LINKS}).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сериализация ответа /sessions/search?page=0")
+    parser.add_argument("--rows", type=int, default=10000, help="количество занятий в ответе")
+    parser.add_argument("--repeat", type=int, default=7, help="повторов, берётся лучший")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    if json.loads(old_body(rows)) != json.loads(new_body(rows)):
+        raise SystemExit("Ответы старого и нового пути отличаются")
+
+    timings = {}
+    for name, body in (("old", old_body), ("new", new_body)):
+        timings[name] = min(timeit.repeat(lambda: body(rows), number=1, repeat=args.repeat))
+        print(f"{name}: {timings[name] * 1000:.1f} мс на ответ, {args.rows / timings[name]:,.0f} строк/с, "
+              f"{len(body(rows)) / 1024:.0f} КБ")
+    print(f"Ускорение: {timings['old'] / timings['new']:.2f}x")
+
+    for mode in LINKS_MODES:
+        timing = min(timeit.repeat(lambda: links_body(rows, mode), number=1, repeat=args.repeat))
+        print(f"links={mode}: {timing * 1000:.1f} мс на ответ, {len(links_body(rows, mode)) / 1024:.0f} КБ")
+
+
+if __name__ == "__main__":
+    main()